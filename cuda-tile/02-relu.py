@@ -7,12 +7,12 @@ def relu_kernel(input, output, n: int, m: int, n_tile: ct.Constant[int], m_tile:
     bidy = ct.bid(1)
 
     input_tile = ct.load(input, index=(bidx, bidy), shape=(n_tile, m_tile), padding_mode=ct.PaddingMode.ZERO)
-    output_tile = ct.maximum(input_tile, 0.0)
-    ct.store(output, index=(bidx, bidy), tile=output_tile)
+    output_tile = ct.maximum(ct.astype(input_tile, ct.float32), 0.0)
+    ct.store(output, index=(bidx, bidy), tile=ct.astype(output_tile, output.dtype))
     
 
 # You can use cupy.cuda.get_current_stream() to get the current stream to launch cuTile kernels.
-# Note: input, output are all float32 device tensors
+# Note: input, output are float32, float16, bfloat16 or float8_e4m3fn device tensors
 def solution(input, output, n: int, m: int):
     n_tile = 64
     m_tile = 128
@@ -21,31 +21,35 @@ def solution(input, output, n: int, m: int):
 
 
 if __name__ == "__main__":
+    import numpy as np
     import torch
 
     # Test with 6144x4096 tensor
     n, m = 6144, 4096
 
-    # Create random input tensor (with negative values for ReLU testing)
-    input_torch = torch.randn(n, m, dtype=torch.float32, device="cuda")
-    output_torch = torch.zeros(n, m, dtype=torch.float32, device="cuda")
-
-    # Convert to cupy for cuda.tile
-    input_cupy = cupy.asarray(input_torch)
-    output_cupy = cupy.asarray(output_torch)
-
-    # Run cuda.tile ReLU
-    solution(input_cupy, output_cupy, n, m)
-
-    # PyTorch reference
-    expected = torch.relu(input_torch)
-
-    # Convert result back to torch for comparison
-    result = torch.as_tensor(output_cupy, device="cuda")
-
-    # Check correctness
-    if torch.allclose(result, expected):
-        print(f"✓ ReLU test passed! Shape: ({n}, {m})")
-    else:
-        diff = torch.abs(result - expected).max().item()
-        print(f"✗ ReLU test failed! Max diff: {diff}")
+    # Relative tolerance of one rounding to the output dtype.
+    dtypes = {
+        torch.float32: 1e-6,
+        torch.float16: 1e-3,
+        torch.bfloat16: 1e-2,
+        torch.float8_e4m3fn: 1.25e-1,
+    }
+
+    for dtype, tol in dtypes.items():
+        # Create random input tensor (with negative values for ReLU testing)
+        input_torch = torch.randn(n, m, dtype=torch.float32, device="cuda").to(dtype)
+        output_torch = torch.zeros(n, m, dtype=torch.float32, device="cuda").to(dtype)
+
+        # cuTile takes torch tensors directly (cupy has no bfloat16/float8)
+        solution(input_torch, output_torch, n, m)
+
+        # NumPy float32 reference
+        expected = np.maximum(input_torch.float().cpu().numpy(), 0.0)
+        result = output_torch.float().cpu().numpy()
+
+        # Check correctness
+        if np.allclose(result, expected, rtol=tol, atol=tol):
+            print(f"✓ ReLU test passed! Shape: ({n}, {m}), dtype={dtype}")
+        else:
+            diff = np.abs(result - expected).max()
+            print(f"✗ ReLU test failed! dtype={dtype}, Max diff: {diff}")
@@ -9,11 +9,11 @@ def mat_vec_mul_kernel(A, B, C, M: int, K: int, M_TILE: ct.Constant[int]):
     acc = ct.zeros((M_TILE,), dtype=ct.float32)
 
     for k in range(K):
-        a_col = ct.gather(A, (row_indices, k), padding_value=0.0) 
-        b_val = ct.gather(B, k)
+        a_col = ct.astype(ct.gather(A, (row_indices, k), padding_value=0.0), ct.float32)
+        b_val = ct.astype(ct.gather(B, k), ct.float32)
         acc = acc + a_col * b_val
 
-    ct.store(C, index=(bidx,), tile=acc)
+    ct.store(C, index=(bidx,), tile=ct.astype(acc, C.dtype))
     
 
 # Input
@@ -22,7 +22,7 @@ def mat_vec_mul_kernel(A, B, C, M: int, K: int, M_TILE: ct.Constant[int]):
 # Output
 # - Vector C of size M
 # You can use cupy.cuda.get_current_stream() to get the current stream to launch cuTile kernels.
-# Note: input_a, input_b, output_c are all float32 device tensors
+# Note: input_a, input_b, output_c are float32, float16 or bfloat16 device tensors (accumulation is float32)
 def solution(input_a, input_b, output_c, m: int, k: int):
     M_TILE = 256
     grid = (ct.cdiv(m, M_TILE),)
@@ -30,34 +30,32 @@ def solution(input_a, input_b, output_c, m: int, k: int):
 
 
 if __name__ == "__main__":
+    import numpy as np
     import torch
 
     # Test parameters
     M = 2048
     K = 131072
 
-    # Create random input matrix and vector
-    A_torch = torch.randn(M, K, dtype=torch.float32, device="cuda")
-    B_torch = torch.randn(K, dtype=torch.float32, device="cuda")
-    C_torch = torch.zeros(M, dtype=torch.float32, device="cuda")
+    # Tolerance: float32 accumulation plus one rounding to the output dtype.
+    dtypes = {torch.float32: 1e-3, torch.float16: 2e-3, torch.bfloat16: 1e-2}
 
-    # Convert to cupy for cuda.tile
-    A_cupy = cupy.asarray(A_torch)
-    B_cupy = cupy.asarray(B_torch)
-    C_cupy = cupy.asarray(C_torch)
+    for dtype, tol in dtypes.items():
+        # Create random input matrix and vector
+        A_torch = torch.randn(M, K, dtype=dtype, device="cuda")
+        B_torch = torch.randn(K, dtype=dtype, device="cuda")
+        C_torch = torch.zeros(M, dtype=dtype, device="cuda")
 
-    # Run cuda.tile matrix-vector multiplication
-    solution(A_cupy, B_cupy, C_cupy, M, K)
+        # Run cuda.tile matrix-vector multiplication (torch tensors go in directly; cupy has no bfloat16)
+        solution(A_torch, B_torch, C_torch, M, K)
 
-    # PyTorch reference: C = A @ B
-    expected = torch.matmul(A_torch, B_torch)
+        # NumPy float32 reference: C = A @ B
+        expected = A_torch.float().cpu().numpy() @ B_torch.float().cpu().numpy()
+        result = C_torch.float().cpu().numpy()
 
-    # Convert result back to torch for comparison
-    result = torch.as_tensor(C_cupy, device="cuda")
-
-    # Check correctness
-    if torch.allclose(result, expected, rtol=1e-3, atol=1e-3):
-        print(f"✓ Matrix-Vector Multiplication test passed! M={M}, K={K}")
-    else:
-        diff = torch.abs(result - expected).max().item()
-        print(f"✗ Matrix-Vector Multiplication test failed! Max diff: {diff}")
+        # Check correctness
+        if np.allclose(result, expected, rtol=tol, atol=tol):
+            print(f"✓ Matrix-Vector Multiplication test passed! M={M}, K={K}, dtype={dtype}")
+        else:
+            diff = np.abs(result - expected).max()
+            print(f"✗ Matrix-Vector Multiplication test failed! dtype={dtype}, Max diff: {diff}")
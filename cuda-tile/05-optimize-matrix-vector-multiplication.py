@@ -1,64 +1,154 @@
 import cuda.tile as ct
 import cupy
 
+# Epilogue activations, passed to the kernel as the ACTIVATION constant.
+ACTIVATIONS = {None: 0, "relu": 1, "leaky_relu": 2, "gelu": 3}
+
+
 @ct.kernel
-def mat_vec_mul_kernel(A, B, C, M: int, K: int, M_TILE: ct.Constant[int], K_TILE: ct.Constant[int], NUM_K_TILES: ct.Constant[int]):
+def mat_vec_mul_kernel(
+    A, B, C, Bias, Residual, M: int, K: int, alpha: float, scale: float,
+    M_TILE: ct.Constant[int], K_TILE: ct.Constant[int], NUM_K_TILES: ct.Constant[int],
+    TRANS_A: ct.Constant[int], HAS_BIAS: ct.Constant[int], ACTIVATION: ct.Constant[int], HAS_RESIDUAL: ct.Constant[int],
+):
     bidx = ct.bid(0)
 
     acc = ct.zeros((M_TILE,), dtype=ct.float32)
 
     for k_block in range(NUM_K_TILES):
-        a_tile = ct.load(A, index=(bidx, k_block), shape=(M_TILE, K_TILE), padding_mode=ct.PaddingMode.ZERO)
-        b_tile = ct.load(B, index=(k_block,), shape=(K_TILE,), padding_mode=ct.PaddingMode.ZERO)
-        acc = acc + ct.sum(a_tile * b_tile, axis=1)
+        b_tile = ct.astype(ct.load(B, index=(k_block,), shape=(K_TILE,), padding_mode=ct.PaddingMode.ZERO), ct.float32)
+        if TRANS_A:
+            # A is stored (K, M): each tile row is a contiguous run of M.
+            a_tile = ct.load(A, index=(k_block, bidx), shape=(K_TILE, M_TILE), padding_mode=ct.PaddingMode.ZERO)
+            acc = acc + ct.sum(ct.astype(a_tile, ct.float32) * ct.expand_dims(b_tile, 1), axis=0)
+        else:
+            a_tile = ct.load(A, index=(bidx, k_block), shape=(M_TILE, K_TILE), padding_mode=ct.PaddingMode.ZERO)
+            acc = acc + ct.sum(ct.astype(a_tile, ct.float32) * b_tile, axis=1)
+
+    # Epilogue: C = act(scale * acc + bias) + residual, all in float32.
+    # The flags are constants, so each combination is its own specialization.
+    acc = acc * scale
+    if HAS_BIAS:
+        acc = acc + ct.astype(ct.load(Bias, index=(bidx,), shape=(M_TILE,), padding_mode=ct.PaddingMode.ZERO), ct.float32)
+    if ACTIVATION == 1:
+        acc = ct.maximum(acc, 0.0)
+    elif ACTIVATION == 2:
+        acc = ct.where(acc > 0, acc, alpha * acc)
+    elif ACTIVATION == 3:
+        # ct.sqrt(2 / math.pi) = 0.7978845608
+        acc = 0.5 * acc * (1 + ct.tanh(0.7978845608 * (acc + 0.044715 * acc ** 3)))
+    if HAS_RESIDUAL:
+        acc = acc + ct.astype(ct.load(Residual, index=(bidx,), shape=(M_TILE,), padding_mode=ct.PaddingMode.ZERO), ct.float32)
+
+    ct.store(C, index=(bidx,), tile=ct.astype(acc, C.dtype))
 
-    ct.store(C, index=(bidx,), tile=acc)
-    
 
 # Input
-# - Matrix A of size (M, K)
+# - Matrix A of size (M, K), or (K, M) with trans_a=True
 # - Vector B of size K
+# - Optional epilogue: bias and residual vectors of size M, an activation
+#   ("relu", "leaky_relu" with slope alpha, "gelu") and a scale
 # Output
-# - Vector C of size M
+# - Vector C = act(scale * (A @ B) + bias) + residual of size M
 # You can use cupy.cuda.get_current_stream() to get the current stream to launch cuTile kernels.
-# Note: input_a, input_b, output_c are all float32 device tensors
-def solution(input_a, input_b, output_c, m: int, k: int):
-    M_TILE = 64
-    K_TILE = 512
+# Note: all tensors are float32, float16 or bfloat16 device tensors (accumulation is float32)
+def solution(
+    input_a, input_b, output_c, m: int, k: int,
+    *, bias=None, activation=None, alpha: float = 0.01, residual=None, scale: float = 1.0, trans_a: bool = False,
+):
+    if activation not in ACTIVATIONS:
+        raise ValueError(f"Unknown activation {activation!r}, expected one of {list(ACTIVATIONS)}")
+    if trans_a:
+        M_TILE = 128
+        K_TILE = 256
+    else:
+        M_TILE = 64
+        K_TILE = 512
     NUM_K_TILES = ct.cdiv(k, K_TILE)
     grid = (ct.cdiv(m, M_TILE),)
-    ct.launch(cupy.cuda.get_current_stream(), grid, mat_vec_mul_kernel, (input_a, input_b, output_c, m, k, M_TILE, K_TILE, NUM_K_TILES))
+    # Absent epilogue operands are never read; output_c stands in for them.
+    args = (
+        input_a, input_b, output_c,
+        output_c if bias is None else bias,
+        output_c if residual is None else residual,
+        m, k, float(alpha), float(scale),
+        M_TILE, K_TILE, NUM_K_TILES,
+        int(trans_a), int(bias is not None), ACTIVATIONS[activation], int(residual is not None),
+    )
+    ct.launch(cupy.cuda.get_current_stream(), grid, mat_vec_mul_kernel, args)
 
 
 if __name__ == "__main__":
+    import numpy as np
     import torch
 
+    def epilogue_ref(c, bias=None, activation=None, alpha=0.01, residual=None, scale=1.0):
+        # NumPy float32 reference for act(scale * c + bias) + residual
+        c = c * scale
+        if bias is not None:
+            c = c + bias
+        if activation == "relu":
+            c = np.maximum(c, 0)
+        elif activation == "leaky_relu":
+            c = np.where(c > 0, c, alpha * c)
+        elif activation == "gelu":
+            c = 0.5 * c * (1 + np.tanh(0.7978845608 * (c + 0.044715 * c**3)))
+        if residual is not None:
+            c = c + residual
+        return c
+
+    def to_numpy(t):
+        return None if t is None else t.float().cpu().numpy()
+
     # Test parameters
     M = 2048
     K = 131072
 
-    # Create random input matrix and vector
-    A_torch = torch.randn(M, K, dtype=torch.float32, device="cuda")
-    B_torch = torch.randn(K, dtype=torch.float32, device="cuda")
-    C_torch = torch.zeros(M, dtype=torch.float32, device="cuda")
+    # Tolerance: float32 accumulation plus one rounding to the output dtype.
+    dtypes = {torch.float32: 1e-3, torch.float16: 2e-3, torch.bfloat16: 1e-2}
+
+    all_passed = True
+    for dtype, tol in dtypes.items():
+        # Create random input matrix and vector
+        A_torch = torch.randn(M, K, dtype=dtype, device="cuda")
+        B_torch = torch.randn(K, dtype=dtype, device="cuda")
+        bias = torch.randn(M, dtype=dtype, device="cuda")
+        residual = torch.randn(M, dtype=dtype, device="cuda")
+        A_np, B_np = to_numpy(A_torch), to_numpy(B_torch)
+        # NumPy float32 reference: C = A @ B
+        base = A_np @ B_np
 
-    # Convert to cupy for cuda.tile
-    A_cupy = cupy.asarray(A_torch)
-    B_cupy = cupy.asarray(B_torch)
-    C_cupy = cupy.asarray(C_torch)
+        epilogues = [
+            {},
+            {"bias": bias, "activation": "gelu"},
+            {"bias": bias, "activation": "relu", "residual": residual},
+            {"activation": "leaky_relu", "alpha": 0.1, "scale": 0.5},
+            {"trans_a": True},
+            {"trans_a": True, "bias": bias, "activation": "gelu", "residual": residual, "scale": 0.25},
+        ]
+        for epilogue in epilogues:
+            trans_a = epilogue.get("trans_a", False)
+            # A^T is materialized so the kernel sees a (K, M) row-major matrix
+            A_in = A_torch.t().contiguous() if trans_a else A_torch
+            C_torch = torch.zeros(M, dtype=dtype, device="cuda")
 
-    # Run cuda.tile matrix-vector multiplication
-    solution(A_cupy, B_cupy, C_cupy, M, K)
+            # Run cuda.tile matrix-vector multiplication (torch tensors go in directly; cupy has no bfloat16)
+            solution(A_in, B_torch, C_torch, M, K, **epilogue)
 
-    # PyTorch reference: C = A @ B
-    expected = torch.matmul(A_torch, B_torch)
+            ref_kwargs = {key: (to_numpy(v) if torch.is_tensor(v) else v) for key, v in epilogue.items() if key != "trans_a"}
+            expected = epilogue_ref(base, **ref_kwargs)
+            result = C_torch.float().cpu().numpy()
 
-    # Convert result back to torch for comparison
-    result = torch.as_tensor(C_cupy, device="cuda")
+            name = ", ".join(epilogue) or "plain"
+            # Check correctness
+            if np.allclose(result, expected, rtol=tol, atol=tol):
+                print(f"✓ Matrix-Vector Multiplication test passed! M={M}, K={K}, dtype={dtype}, epilogue=[{name}]")
+            else:
+                diff = np.abs(result - expected).max()
+                print(f"✗ Matrix-Vector Multiplication test failed! dtype={dtype}, epilogue=[{name}], Max diff: {diff}")
+                all_passed = False
 
-    # Check correctness
-    if torch.allclose(result, expected, rtol=1e-3, atol=1e-3):
-        print(f"✓ Matrix-Vector Multiplication test passed! M={M}, K={K}")
+    if all_passed:
+        print("✓ All tests passed!")
     else:
-        diff = torch.abs(result - expected).max().item()
-        print(f"✗ Matrix-Vector Multiplication test failed! Max diff: {diff}")
+        print("✗ Some tests failed!")
@@ -6,10 +6,10 @@ def leaky_relu_kernel(input, alpha: float,output, n: int, m: int, n_tile: ct.Con
     bidx = ct.bid(0)
     bidy = ct.bid(1)
 
-    input_tile = ct.load(input, index=(bidx, bidy), shape=(n_tile, m_tile))
+    input_tile = ct.astype(ct.load(input, index=(bidx, bidy), shape=(n_tile, m_tile)), ct.float32)
     # output_tile = mask * input_tile + (1 - mask) * alpha * input_tile
     output_tile = ct.where(input_tile > 0, input_tile, alpha * input_tile)
-    ct.store(output, index=(bidx, bidy), tile=output_tile)
+    ct.store(output, index=(bidx, bidy), tile=ct.astype(output_tile, output.dtype))
     
 # Input
 # - Matrix A of size (M, N)
@@ -18,7 +18,7 @@ def leaky_relu_kernel(input, alpha: float,output, n: int, m: int, n_tile: ct.Con
 # - Matrix C of size (M, N)
 #
 # You can use cupy.cuda.get_current_stream() to get the current stream to launch cuTile kernels.
-# Note: input, output are all float32 device tensors
+# Note: input, output are float32, float16, bfloat16 or float8_e4m3fn device tensors
 def solution(input, alpha: float, output, n: int, m: int):
     n_tile = 32
     m_tile = 64
@@ -27,32 +27,37 @@ def solution(input, alpha: float, output, n: int, m: int):
 
 
 if __name__ == "__main__":
+    import numpy as np
     import torch
 
     # Test with 6144x4096 tensor
     n, m = 6144, 4096
     alpha = 0.1
 
-    # Create random input tensor (with negative values for ReLU testing)
-    input_torch = torch.randn(n, m, dtype=torch.float32, device="cuda")
-    output_torch = torch.zeros(n, m, dtype=torch.float32, device="cuda")
-
-    # Convert to cupy for cuda.tile
-    input_cupy = cupy.asarray(input_torch)
-    output_cupy = cupy.asarray(output_torch)
-
-    # Run cuda.tile Leaky ReLU
-    solution(input_cupy, alpha, output_cupy, n, m)
-
-    # PyTorch reference
-    expected = torch.nn.functional.leaky_relu(input_torch, negative_slope=alpha)
-
-    # Convert result back to torch for comparison
-    result = torch.as_tensor(output_cupy, device="cuda")
-
-    # Check correctness
-    if torch.allclose(result, expected):
-        print(f"✓ ReLU test passed! Shape: ({n}, {m})")
-    else:
-        diff = torch.abs(result - expected).max().item()
-        print(f"✗ ReLU test failed! Max diff: {diff}")
+    # Relative tolerance of one rounding to the output dtype.
+    dtypes = {
+        torch.float32: 1e-6,
+        torch.float16: 1e-3,
+        torch.bfloat16: 1e-2,
+        torch.float8_e4m3fn: 1.25e-1,
+    }
+
+    for dtype, tol in dtypes.items():
+        # Create random input tensor (with negative values for ReLU testing)
+        input_torch = torch.randn(n, m, dtype=torch.float32, device="cuda").to(dtype)
+        output_torch = torch.zeros(n, m, dtype=torch.float32, device="cuda").to(dtype)
+
+        # Run cuda.tile Leaky ReLU (torch tensors go in directly; cupy has no bfloat16/float8)
+        solution(input_torch, alpha, output_torch, n, m)
+
+        # NumPy float32 reference
+        x = input_torch.float().cpu().numpy()
+        expected = np.where(x > 0, x, np.float32(alpha) * x)
+        result = output_torch.float().cpu().numpy()
+
+        # Check correctness
+        if np.allclose(result, expected, rtol=tol, atol=tol):
+            print(f"✓ ReLU test passed! Shape: ({n}, {m}), dtype={dtype}")
+        else:
+            diff = np.abs(result - expected).max()
+            print(f"✗ ReLU test failed! dtype={dtype}, Max diff: {diff}")
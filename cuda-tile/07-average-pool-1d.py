@@ -9,9 +9,9 @@ def average_pool_1d_kernel(input, kernel_size: int, stride: int, padding: int, o
     init_indices = out_indices * stride - padding
     acc = ct.zeros((TILE_SIZE,), dtype=ct.float32)
     for k in range(kernel_size):
-        acc = acc + ct.gather(input, init_indices + k)
+        acc = acc + ct.astype(ct.gather(input, init_indices + k), ct.float32)
     acc = acc / kernel_size
-    ct.store(output, index=(bidx,), tile=acc)
+    ct.store(output, index=(bidx,), tile=ct.astype(acc, output.dtype))
 
 # output[i]= 1/k * sum(input[S*i+m−P]) m=0~k-1
 #
@@ -23,7 +23,7 @@ def average_pool_1d_kernel(input, kernel_size: int, stride: int, padding: int, o
 # Output:
 # - Matrix output of size ceil((H + 2P - k) / S + 1) (output tensor)
 # You can use cupy.cuda.get_current_stream() to get the current stream to launch cuTile kernels.
-# Note: input, output are all float32 device tensors
+# Note: input, output are float32, float16 or bfloat16 device tensors (accumulation is float32)
 def solution(input, kernel_size: int, stride: int, padding: int, output, H: int):
     out_size = (H + 2 * padding - kernel_size) // stride + 1
     TILE_SIZE = 256
@@ -32,8 +32,23 @@ def solution(input, kernel_size: int, stride: int, padding: int, output, H: int)
 
 
 if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+
+    import numpy as np
     import torch
-    import torch.nn as nn
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from gpu_tile.datastore import FixtureStore
+
+    def avg_pool_1d_ref(x, kernel_size, stride, padding):
+        # NumPy float32 reference over the last axis (zero padding counted, like nn.AvgPool1d).
+        # Window sums come from a float64 prefix sum, so this is O(H) per row.
+        xp = np.pad(x, [(0, 0)] * (x.ndim - 1) + [(padding, padding)])
+        prefix = np.zeros(xp.shape[:-1] + (xp.shape[-1] + 1,), dtype=np.float64)
+        np.cumsum(xp, axis=-1, out=prefix[..., 1:])
+        starts = np.arange((x.shape[-1] + 2 * padding - kernel_size) // stride + 1) * stride
+        return ((prefix[..., starts + kernel_size] - prefix[..., starts]) / kernel_size).astype(np.float32)
 
     # Test parameters from the provided example
     batch_size = 64
@@ -51,28 +66,51 @@ if __name__ == "__main__":
     print(f"  Output shape: ({batch_size}, {in_channels}, {output_length})")
     print(f"  kernel_size={kernel_size}, stride={stride}, padding={padding}")
 
-    # Create random input tensor
-    input_torch = torch.randn(batch_size, in_channels, input_length, dtype=torch.float32, device="cuda")
-    output_torch = torch.zeros(batch_size, in_channels, output_length, dtype=torch.float32, device="cuda")
-
-    # PyTorch reference
-    avg_pool = nn.AvgPool1d(kernel_size=kernel_size, stride=stride, padding=padding)
-    expected = avg_pool(input_torch)
-
-    # Run cuda.tile Average Pooling for each batch and channel
-    for b in range(batch_size):
-        for c in range(in_channels):
-            input_cupy = cupy.asarray(input_torch[b, c])
-            output_cupy = cupy.asarray(output_torch[b, c])
-            solution(input_cupy, kernel_size, stride, padding, output_cupy, input_length)
-            output_torch[b, c] = torch.as_tensor(output_cupy, device="cuda")
-
-    # Check correctness
-    if torch.allclose(output_torch, expected, rtol=1e-4, atol=1e-5):
-        print(f"✓ Average Pool 1D test passed!")
-    else:
-        diff = torch.abs(output_torch - expected).max().item()
-        mean_diff = torch.abs(output_torch - expected).mean().item()
-        print(f"✗ Average Pool 1D test failed!")
-        print(f"  Max diff: {diff}")
-        print(f"  Mean diff: {mean_diff}")
+    # (rtol, atol): float32 keeps the original bounds, narrower dtypes add one output rounding.
+    dtypes = {
+        torch.float32: (1e-4, 1e-5),
+        torch.float16: (2e-3, 1e-3),
+        torch.bfloat16: (1e-2, 1e-2),
+    }
+
+    # The 2 GiB input is generated once into the fixture store and memory-mapped
+    # on later runs; references are cached there per dtype.
+    fixture = FixtureStore().generate(
+        "avg_pool_1d-64x128x65536", [(batch_size, in_channels, input_length)], seed=0
+    )
+    params = {"kernel_size": kernel_size, "stride": stride, "padding": padding}
+
+    for dtype, (rtol, atol) in dtypes.items():
+        # Stream the input to the device in pinned chunks, rounding to dtype on the way
+        input_torch = fixture.to_device(0, "cuda", dtype=dtype)
+        output_torch = torch.zeros(batch_size, in_channels, output_length, dtype=dtype, device="cuda")
+
+        def compute_reference(out):
+            # Reference on the dtype-rounded input, one batch at a time to bound host memory
+            for b in range(batch_size):
+                out[b] = avg_pool_1d_ref(input_torch[b].float().cpu().numpy(), kernel_size, stride, padding)
+
+        expected_all = fixture.expected(
+            "avg_pool1d", {**params, "dtype": str(dtype)}, compute=compute_reference, shape=output_torch.shape
+        )
+
+        # Run cuda.tile Average Pooling for each batch and channel.
+        # Rows are contiguous views, so the kernel writes output_torch in place.
+        for b in range(batch_size):
+            for c in range(in_channels):
+                solution(input_torch[b, c], kernel_size, stride, padding, output_torch[b, c], input_length)
+
+        # Check correctness one batch at a time to bound host memory
+        max_diff = 0.0
+        passed = True
+        for b in range(batch_size):
+            expected = expected_all[b]
+            result = output_torch[b].float().cpu().numpy()
+            passed = passed and np.allclose(result, expected, rtol=rtol, atol=atol)
+            max_diff = max(max_diff, float(np.abs(result - expected).max()))
+
+        if passed:
+            print(f"✓ Average Pool 1D test passed! dtype={dtype}")
+        else:
+            print(f"✗ Average Pool 1D test failed! dtype={dtype}")
+            print(f"  Max diff: {max_diff}")
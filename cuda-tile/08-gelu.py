@@ -7,15 +7,15 @@ def gelu_kernel(input, output, n: int, m: int, N_TILE: ct.Constant[int], M_TILE:
     bidx = ct.bid(0)
     bidy = ct.bid(1)
 
-    input_tile = ct.load(input, index=(bidx, bidy), shape=(N_TILE, M_TILE))
+    input_tile = ct.astype(ct.load(input, index=(bidx, bidy), shape=(N_TILE, M_TILE)), ct.float32)
     # ct.sqrt(2 / math.pi) = 0.7978845608
     output_tile = 0.5 * input_tile * (1 + ct.tanh(0.7978845608 * (input_tile + 0.044715 * input_tile ** 3)))
-    ct.store(output, index=(bidx, bidy), tile=output_tile)
+    ct.store(output, index=(bidx, bidy), tile=ct.astype(output_tile, output.dtype))
 
     
 
 # You can use cupy.cuda.get_current_stream() to get the current stream to launch cuTile kernels.
-# Note: input, output are all float32 device tensors
+# Note: input, output are float32, float16, bfloat16 or float8_e4m3fn device tensors
 def solution(input, output, n: int, m: int):
     N_TILE = 32
     M_TILE = 64
@@ -24,35 +24,39 @@ def solution(input, output, n: int, m: int):
 
 
 if __name__ == "__main__":
+    import numpy as np
     import torch
-    import torch.nn.functional as F
 
     # Test with 6144x4096 tensor
     n, m = 6144, 4096
 
-    # Create random input tensor
-    input_torch = torch.randn(n, m, dtype=torch.float32, device="cuda")
-    output_torch = torch.zeros(n, m, dtype=torch.float32, device="cuda")
-
-    # Convert to cupy for cuda.tile
-    input_cupy = cupy.asarray(input_torch)
-    output_cupy = cupy.asarray(output_torch)
-
-    # Run cuda.tile GELU
-    solution(input_cupy, output_cupy, n, m)
-
-    # PyTorch reference (approximate GELU)
-    expected = F.gelu(input_torch, approximate='tanh')
-
-    # Convert result back to torch for comparison
-    result = torch.as_tensor(output_cupy, device="cuda")
-
-    # Check correctness
-    if torch.allclose(result, expected, rtol=1e-4, atol=1e-5):
-        print(f"✓ GELU test passed! Shape: ({n}, {m})")
-    else:
-        diff = torch.abs(result - expected).max().item()
-        mean_diff = torch.abs(result - expected).mean().item()
-        print(f"✗ GELU test failed!")
-        print(f"  Max diff: {diff}")
-        print(f"  Mean diff: {mean_diff}")
+    # (rtol, atol): float32 keeps the original bounds, narrower dtypes add one output rounding.
+    dtypes = {
+        torch.float32: (1e-4, 1e-5),
+        torch.float16: (2e-3, 1e-3),
+        torch.bfloat16: (1e-2, 1e-2),
+        torch.float8_e4m3fn: (1.25e-1, 2e-2),
+    }
+
+    for dtype, (rtol, atol) in dtypes.items():
+        # Create random input tensor
+        input_torch = torch.randn(n, m, dtype=torch.float32, device="cuda").to(dtype)
+        output_torch = torch.zeros(n, m, dtype=torch.float32, device="cuda").to(dtype)
+
+        # Run cuda.tile GELU (torch tensors go in directly; cupy has no bfloat16/float8)
+        solution(input_torch, output_torch, n, m)
+
+        # NumPy float32 reference (approximate GELU)
+        x = input_torch.float().cpu().numpy()
+        expected = 0.5 * x * (1 + np.tanh(np.float32(math.sqrt(2 / math.pi)) * (x + np.float32(0.044715) * x**3)))
+        result = output_torch.float().cpu().numpy()
+
+        # Check correctness
+        if np.allclose(result, expected, rtol=rtol, atol=atol):
+            print(f"✓ GELU test passed! Shape: ({n}, {m}), dtype={dtype}")
+        else:
+            diff = np.abs(result - expected).max()
+            mean_diff = np.abs(result - expected).mean()
+            print(f"✗ GELU test failed! dtype={dtype}")
+            print(f"  Max diff: {diff}")
+            print(f"  Mean diff: {mean_diff}")
@@ -1,6 +1,11 @@
+import functools
+import math
+
 import cuda.tile as ct
 import cupy
 
+REDUCE_TILE = 16
+
 @ct.kernel
 def sum_dim_kernel(input, output, dim0: int, dim2: int, reduce_dim: int, REDUCE_TILE: ct.Constant[int], DIM2_TILE: ct.Constant[int]):
     # dim0, reduce, dim2 -> dim0, 1, dim2
@@ -8,8 +13,9 @@ def sum_dim_kernel(input, output, dim0: int, dim2: int, reduce_dim: int, REDUCE_
     bidy = ct.bid(1)  # reduce tile index
     bidz = ct.bid(2)  # dim2 tile index
 
-    tile = ct.load(input, index=(bidx, bidy, bidz), shape=(1, REDUCE_TILE, DIM2_TILE))
-    result = ct.sum(tile, axis=(0, 1))
+    # The last reduce tile runs past reduce_dim; zero padding keeps it out of the sum.
+    tile = ct.load(input, index=(bidx, bidy, bidz), shape=(1, REDUCE_TILE, DIM2_TILE), padding_mode=ct.PaddingMode.ZERO)
+    result = ct.sum(ct.astype(tile, ct.float32), axis=(0, 1))
 
     # ct.store(output, index=(bidx, bidy, bidz), tile=result)
 
@@ -19,34 +25,65 @@ def sum_dim_kernel(input, output, dim0: int, dim2: int, reduce_dim: int, REDUCE_
     ct.atomic_add(output, (dim0_idx, dim1_idx, dim2_idx), result)
 
 
+# Rounds the float32 partial sums into a narrower output dtype.
+@ct.kernel
+def cast_kernel(src, dst, TILE: ct.Constant[int]):
+    bid = ct.bid(0)
+    tile = ct.load(src, index=(bid,), shape=(TILE,))
+    ct.store(dst, index=(bid,), tile=ct.astype(tile, dst.dtype))
+
+
+@functools.lru_cache(maxsize=256)
+def _launch_dims(shape: tuple, dim: int):
+    # Host-side descriptor: (dim0, reduce, dim2) view, dim2 tile and grid, per input shape
+    dim0 = math.prod(shape[:dim])
+    dim1 = shape[dim]  # reduce target
+    dim2 = math.prod(shape[dim + 1:])
+    DIM2_TILE = min(256, 1 << (dim2 - 1).bit_length())  # tile dims are powers of two
+    grid = (dim0, ct.cdiv(dim1, REDUCE_TILE), ct.cdiv(dim2, DIM2_TILE))
+    return dim0, dim1, dim2, DIM2_TILE, grid
+
+
 # You can use cupy.cuda.get_current_stream() to get the current stream to launch cuTile kernels.
-# Note: input, output, shape are all float32 device tensors
+# Note: input, output are float32, float16 or bfloat16 device tensors, shape is an int32 device tensor.
+# A float32 output must be zero-initialized; narrower outputs are accumulated in a float32 buffer.
+# Dimensions come from input.shape: reading the device-side shape would cost one
+# device-to-host copy, and a stream sync, per element before anything launches.
 def solution(input, dim: int, output, shape, ndim: int):
-    dim0 = 1
-    dim2 = 1
-    dim1 = int(shape[dim]) # reduce target
-    for i in range(ndim):
-        if i < dim:
-            dim0 *= int(shape[i])
-        elif i > dim:
-            dim2 *= int(shape[i])
-
-    DIM2_TILE = min(256, dim2)
-    REDUCE_TILE = 16
-    grid = (dim0, ct.cdiv(dim1, REDUCE_TILE), ct.cdiv(dim2, DIM2_TILE))
+    dim0, dim1, dim2, DIM2_TILE, grid = _launch_dims(tuple(input.shape), dim)
 
     input_reshaped = input.reshape((dim0, dim1, dim2))
-    output_flat = output.reshape((dim0, 1, dim2))
+    if str(output.dtype).endswith("float32"):
+        output_flat = output.reshape((dim0, 1, dim2))
+    else:
+        output_flat = cupy.zeros((dim0, 1, dim2), dtype=cupy.float32)
+
+    stream = cupy.cuda.get_current_stream()
     ct.launch(
-        cupy.cuda.get_current_stream(),
+        stream,
         grid,
         sum_dim_kernel,
         (input_reshaped, output_flat, dim0, dim2, dim1, REDUCE_TILE, DIM2_TILE)
     )
 
+    if not str(output.dtype).endswith("float32"):
+        CAST_TILE = 1024
+        n = dim0 * dim2
+        ct.launch(stream, (ct.cdiv(n, CAST_TILE),), cast_kernel, (output_flat.reshape((n,)), output.reshape((n,)), CAST_TILE))
+
 if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+
+    import numpy as np
     import torch
 
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from gpu_tile import syncdebug
+
+    # Any device sync inside solution() fails the test
+    syncdebug.enable("raise")
+
     test_configs = [
         # (shape, dim)
         ((16, 128, 256), 1),
@@ -57,39 +94,38 @@ if __name__ == "__main__":
         ((128, 64, 64, 64), 3),
     ]
 
+    # Tolerance: float32 accumulation plus one rounding to the output dtype.
+    dtypes = {torch.float32: 1e-3, torch.float16: 2e-3, torch.bfloat16: 1e-2}
+
     print("Testing Sum Over Dimension:")
     all_passed = True
 
-    for shape, reduce_dim in test_configs:
-        output_shape = list(shape)
-        output_shape[reduce_dim] = 1
-
-        # Create random input tensor
-        input_torch = torch.randn(*shape, dtype=torch.float32, device="cuda")
-        output_torch = torch.zeros(*output_shape, dtype=torch.float32, device="cuda")
-
-        # Convert to cupy
-        input_cupy = cupy.asarray(input_torch)
-        output_cupy = cupy.asarray(output_torch)
-        shape_cupy = cupy.array(input_torch.shape, dtype=cupy.int32)
-
-        # Run cuda.tile sum reduction
-        solution(input_cupy, reduce_dim, output_cupy, shape_cupy, input_torch.ndim)
-
-        # PyTorch reference
-        expected = torch.sum(input_torch, dim=reduce_dim, keepdim=True)
-
-        # Convert result back to torch for comparison
-        result = torch.as_tensor(output_cupy, device="cuda")
-
-        # Check correctness
-        if torch.allclose(result, expected, rtol=1e-3, atol=1e-3):
-            print(f"  ✓ shape={shape}, dim={reduce_dim}")
-        else:
-            diff = torch.abs(result - expected).max().item()
-            mean_diff = torch.abs(result - expected).mean().item()
-            print(f"  ✗ shape={shape}, dim={reduce_dim} - Max diff: {diff}, Mean diff: {mean_diff}")
-            all_passed = False
+    for dtype, tol in dtypes.items():
+        for shape, reduce_dim in test_configs:
+            output_shape = list(shape)
+            output_shape[reduce_dim] = 1
+
+            # Create random input tensor
+            input_torch = torch.randn(*shape, dtype=dtype, device="cuda")
+            output_torch = torch.zeros(*output_shape, dtype=dtype, device="cuda")
+            shape_cupy = cupy.array(input_torch.shape, dtype=cupy.int32)
+
+            # Run cuda.tile sum reduction (torch tensors go in directly; cupy has no bfloat16)
+            with syncdebug.watch("solution"):
+                solution(input_torch, reduce_dim, output_torch, shape_cupy, input_torch.ndim)
+
+            # NumPy float32 reference
+            expected = np.sum(input_torch.float().cpu().numpy(), axis=reduce_dim, keepdims=True)
+            result = output_torch.float().cpu().numpy()
+
+            # Check correctness
+            if np.allclose(result, expected, rtol=tol, atol=tol):
+                print(f"  ✓ shape={shape}, dim={reduce_dim}, dtype={dtype}")
+            else:
+                diff = np.abs(result - expected).max()
+                mean_diff = np.abs(result - expected).mean()
+                print(f"  ✗ shape={shape}, dim={reduce_dim}, dtype={dtype} - Max diff: {diff}, Mean diff: {mean_diff}")
+                all_passed = False
 
     if all_passed:
         print("✓ All tests passed!")
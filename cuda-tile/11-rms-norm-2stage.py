@@ -11,7 +11,7 @@ def compute_rstd_kernel(X, Rstd, N: int, B_TILE: ct.Constant[int], N_TILE: ct.Co
     sum_sq = ct.zeros((B_TILE,), dtype=ct.float32)
 
     for ni in range(num_tiles):
-        X_tile = ct.load(X, index=(bid, ni), shape=(B_TILE, N_TILE))
+        X_tile = ct.astype(ct.load(X, index=(bid, ni), shape=(B_TILE, N_TILE)), ct.float32)
         sum_sq += ct.sum(X_tile * X_tile, axis=1)
 
     rstd = 1 / ct.sqrt(sum_sq / N + EPSILON)
@@ -26,11 +26,12 @@ def normalize_kernel(X, Rstd, Y, B_TILE: ct.Constant[int], N_TILE: ct.Constant[i
 
     rstd = ct.load(Rstd, index=(bid_b,), shape=(B_TILE,))
     rstd = ct.expand_dims(rstd, 1)
-    X_tile = ct.load(X, index=(bid_b, bid_n), shape=(B_TILE, N_TILE))
+    X_tile = ct.astype(ct.load(X, index=(bid_b, bid_n), shape=(B_TILE, N_TILE)), ct.float32)
     Y_tile = X_tile * rstd
-    ct.store(Y, index=(bid_b, bid_n), tile=Y_tile)
+    ct.store(Y, index=(bid_b, bid_n), tile=ct.astype(Y_tile, Y.dtype))
 
 
+# Note: X, Y are float32, float16 or bfloat16 device tensors; Rstd stays float32.
 def solution(X, Y, B: int, N: int):
     B_TILE = 32
     N_TILE = 128
@@ -49,16 +50,12 @@ def solution(X, Y, B: int, N: int):
 
 
 if __name__ == "__main__":
+    import numpy as np
     import torch
 
-    class RMSNormRef:
-        def __init__(self, epsilon=1e-5):
-            self.epsilon = epsilon
-
-        def __call__(self, x: torch.Tensor) -> torch.Tensor:
-            with torch.no_grad(), torch.autocast("cuda", enabled=False, dtype=torch.float32):
-                rms = torch.sqrt(torch.mean(x ** 2, dim=1, keepdim=True) + self.epsilon)
-                return x / rms
+    def rms_norm_ref(x):
+        # NumPy float32 reference
+        return x / np.sqrt(np.mean(x**2, axis=1, keepdims=True) + EPSILON)
 
     test_configs = [
         (16, 128),
@@ -68,28 +65,29 @@ if __name__ == "__main__":
         (256, 2048),
     ]
 
+    # Tolerance: float32 accumulation plus one rounding to the output dtype.
+    dtypes = {torch.float32: 1e-3, torch.float16: 2e-3, torch.bfloat16: 1e-2}
+
     print("Testing RMS Normalization:")
     all_passed = True
-    ref = RMSNormRef(epsilon=EPSILON)
-
-    for B, N in test_configs:
-        X_torch = torch.randn(B, N, dtype=torch.float32, device="cuda")
-        Y_torch = torch.zeros(B, N, dtype=torch.float32, device="cuda")
 
-        X_cupy = cupy.asarray(X_torch)
-        Y_cupy = cupy.asarray(Y_torch)
+    for dtype, tol in dtypes.items():
+        for B, N in test_configs:
+            X_torch = torch.randn(B, N, dtype=dtype, device="cuda")
+            Y_torch = torch.zeros(B, N, dtype=dtype, device="cuda")
 
-        solution(X_cupy, Y_cupy, B, N)
+            # torch tensors go in directly; cupy has no bfloat16
+            solution(X_torch, Y_torch, B, N)
 
-        expected = ref(X_torch)
-        result = torch.as_tensor(Y_cupy, device="cuda")
+            expected = rms_norm_ref(X_torch.float().cpu().numpy())
+            result = Y_torch.float().cpu().numpy()
 
-        if torch.allclose(result, expected, rtol=1e-3, atol=1e-3):
-            print(f"  ✓ B={B}, N={N}")
-        else:
-            diff = torch.abs(result - expected).max().item()
-            print(f"  ✗ B={B}, N={N} - Max diff: {diff}")
-            all_passed = False
+            if np.allclose(result, expected, rtol=tol, atol=tol):
+                print(f"  ✓ B={B}, N={N}, dtype={dtype}")
+            else:
+                diff = np.abs(result - expected).max()
+                print(f"  ✗ B={B}, N={N}, dtype={dtype} - Max diff: {diff}")
+                all_passed = False
 
     if all_passed:
         print("✓ All tests passed!")
@@ -10,19 +10,19 @@ def l1_norm_kernel(X, Y, B: int, D: int, B_TILE: ct.Constant[int], D_TILE: ct.Co
     sum_l1 = ct.full((B_TILE, 1), EPSILON, ct.float32)
 
     for di in range(num_d_tiles):
-        X_tile = ct.load(X, index=(bidx, di), shape=(B_TILE, D_TILE))
+        X_tile = ct.astype(ct.load(X, index=(bidx, di), shape=(B_TILE, D_TILE)), ct.float32)
         sum_l1 += ct.sum(ct.where(X_tile > 0, X_tile, -X_tile), axis=1, keepdims=True)
 
     mean_l1 = sum_l1 / D  # sum → mean
 
     for di in range(num_d_tiles):
-        X_tile = ct.load(X, index=(bidx, di), shape=(B_TILE, D_TILE))
+        X_tile = ct.astype(ct.load(X, index=(bidx, di), shape=(B_TILE, D_TILE)), ct.float32)
         Y_tile = X_tile / mean_l1
-        ct.store(Y, index=(bidx, di), tile=Y_tile)
+        ct.store(Y, index=(bidx, di), tile=ct.astype(Y_tile, Y.dtype))
         
 
 # You can use cupy.cuda.get_current_stream() to get the current stream to launch cuTile kernels.
-# Note: X, Y are all float32 device tensors
+# Note: X, Y are float32, float16 or bfloat16 device tensors (accumulation is float32)
 def solution(X, Y, B: int, D: int):
     B_TILE = 32
     D_TILE = 128
@@ -31,12 +31,12 @@ def solution(X, Y, B: int, D: int):
 
 
 if __name__ == "__main__":
+    import numpy as np
     import torch
 
-    class L1NormRef:
-        def __call__(self, x: torch.Tensor) -> torch.Tensor:
-            with torch.no_grad(), torch.autocast("cuda", enabled=False, dtype=torch.float32):
-                return x / torch.mean(torch.abs(x), dim=1, keepdim=True)
+    def l1_norm_ref(x):
+        # NumPy float32 reference
+        return x / np.mean(np.abs(x), axis=1, keepdims=True)
 
     test_configs = [
         (16, 128),
@@ -46,28 +46,29 @@ if __name__ == "__main__":
         (256, 2048),
     ]
 
+    # Tolerance: float32 accumulation plus one rounding to the output dtype.
+    dtypes = {torch.float32: 1e-3, torch.float16: 2e-3, torch.bfloat16: 1e-2}
+
     print("Testing L1 Normalization:")
     all_passed = True
-    ref = L1NormRef()
-
-    for B, N in test_configs:
-        X_torch = torch.randn(B, N, dtype=torch.float32, device="cuda")
-        Y_torch = torch.zeros(B, N, dtype=torch.float32, device="cuda")
 
-        X_cupy = cupy.asarray(X_torch)
-        Y_cupy = cupy.asarray(Y_torch)
+    for dtype, tol in dtypes.items():
+        for B, N in test_configs:
+            X_torch = torch.randn(B, N, dtype=dtype, device="cuda")
+            Y_torch = torch.zeros(B, N, dtype=dtype, device="cuda")
 
-        solution(X_cupy, Y_cupy, B, N)
+            # torch tensors go in directly; cupy has no bfloat16
+            solution(X_torch, Y_torch, B, N)
 
-        expected = ref(X_torch)
-        result = torch.as_tensor(Y_cupy, device="cuda")
+            expected = l1_norm_ref(X_torch.float().cpu().numpy())
+            result = Y_torch.float().cpu().numpy()
 
-        if torch.allclose(result, expected, rtol=1e-3, atol=1e-3):
-            print(f"  ✓ B={B}, N={N}")
-        else:
-            diff = torch.abs(result - expected).max().item()
-            print(f"  ✗ B={B}, N={N} - Max diff: {diff}")
-            all_passed = False
+            if np.allclose(result, expected, rtol=tol, atol=tol):
+                print(f"  ✓ B={B}, N={N}, dtype={dtype}")
+            else:
+                diff = np.abs(result - expected).max()
+                print(f"  ✗ B={B}, N={N}, dtype={dtype} - Max diff: {diff}")
+                all_passed = False
 
     if all_passed:
         print("✓ All tests passed!")
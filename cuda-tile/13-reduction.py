@@ -0,0 +1,320 @@
+import sys
+from pathlib import Path
+
+import cuda.tile as ct
+import cupy
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from gpu_tile import reduce_plan  # noqa: E402
+
+# Kernel constants (see gpu_tile/reduce_plan.py for the ops built from them)
+COMBINE = {"sum": 0, "prod": 1, "max": 2, "min": 3, "argmax": 4, "argmin": 5}
+MAP = {None: 0, "abs": 1, "square": 2}
+POST = {None: 0, "mean": 1, "sqrt": 2}
+INT32_MAX = 2147483647
+
+# Every kernel keeps an elementwise running accumulator the size of one tile and
+# does a single cross-lane reduce at the end. arg* ops carry the index of the
+# first winner per lane; the final reduce keeps the smallest index among ties.
+
+
+@ct.kernel
+def reduce_inner_kernel(
+    X, Y, XI, YI, reduce: int, identity: float, post_scale: float,
+    O_TILE: ct.Constant[int], R_TILE: ct.Constant[int], NUM_R_TILES: ct.Constant[int],
+    COMBINE_OP: ct.Constant[int], MAP_OP: ct.Constant[int], POST_OP: ct.Constant[int], HAS_INDEX: ct.Constant[int],
+):
+    # (outer, reduce) -> (outer,), each row read along its contiguous axis
+    bid = ct.bid(0)
+
+    acc = ct.full((O_TILE, R_TILE), identity, ct.float32)
+    best = ct.zeros((O_TILE, R_TILE), ct.int32)
+    for ri in range(NUM_R_TILES):
+        cols = ri * R_TILE + ct.arange(R_TILE, dtype=ct.int32)
+        x = ct.astype(ct.load(X, index=(bid, ri), shape=(O_TILE, R_TILE), padding_mode=ct.PaddingMode.ZERO), ct.float32)
+        if MAP_OP == 1:
+            x = ct.where(x > 0, x, -x)
+        elif MAP_OP == 2:
+            x = x * x
+        x = ct.where(ct.expand_dims(cols < reduce, 0), x, identity)
+
+        if COMBINE_OP == 0:
+            acc = acc + x
+        elif COMBINE_OP == 1:
+            acc = acc * x
+        elif COMBINE_OP == 2:
+            acc = ct.maximum(acc, x)
+        elif COMBINE_OP == 3:
+            acc = ct.minimum(acc, x)
+        else:
+            if HAS_INDEX:
+                idx = ct.load(XI, index=(bid, ri), shape=(O_TILE, R_TILE), padding_mode=ct.PaddingMode.ZERO)
+            else:
+                idx = ct.expand_dims(cols, 0)
+            if COMBINE_OP == 4:
+                better = x > acc
+            else:
+                better = x < acc
+            acc = ct.where(better, x, acc)
+            best = ct.where(better, idx, best)
+
+    if COMBINE_OP == 0:
+        res = ct.sum(acc, axis=1)
+    elif COMBINE_OP == 1:
+        res = ct.prod(acc, axis=1)
+    elif COMBINE_OP == 2:
+        res = ct.max(acc, axis=1)
+    elif COMBINE_OP == 3:
+        res = ct.min(acc, axis=1)
+    elif COMBINE_OP == 4:
+        res = ct.max(acc, axis=1)
+    else:
+        res = ct.min(acc, axis=1)
+    if COMBINE_OP >= 4:
+        winner = ct.where(acc == ct.expand_dims(res, 1), best, INT32_MAX)
+        ct.store(YI, index=(bid,), tile=ct.astype(ct.min(winner, axis=1), YI.dtype))
+
+    if POST_OP == 1:
+        res = res * post_scale
+    elif POST_OP == 2:
+        res = ct.sqrt(res)
+    ct.store(Y, index=(bid,), tile=ct.astype(res, Y.dtype))
+
+
+@ct.kernel
+def reduce_outer_kernel(
+    X, Y, YI, reduce: int, identity: float, post_scale: float,
+    R_TILE: ct.Constant[int], I_TILE: ct.Constant[int], NUM_R_TILES: ct.Constant[int],
+    COMBINE_OP: ct.Constant[int], MAP_OP: ct.Constant[int], POST_OP: ct.Constant[int],
+):
+    # (outer, reduce, inner) -> (outer, inner), tiles coalesced along inner
+    bidx = ct.bid(0)  # outer index
+    bidy = ct.bid(1)  # inner tile index
+
+    acc = ct.full((1, R_TILE, I_TILE), identity, ct.float32)
+    best = ct.zeros((1, R_TILE, I_TILE), ct.int32)
+    for ri in range(NUM_R_TILES):
+        rows = ct.expand_dims(ct.expand_dims(ri * R_TILE + ct.arange(R_TILE, dtype=ct.int32), 0), 2)
+        x = ct.astype(
+            ct.load(X, index=(bidx, ri, bidy), shape=(1, R_TILE, I_TILE), padding_mode=ct.PaddingMode.ZERO), ct.float32
+        )
+        if MAP_OP == 1:
+            x = ct.where(x > 0, x, -x)
+        elif MAP_OP == 2:
+            x = x * x
+        x = ct.where(rows < reduce, x, identity)
+
+        if COMBINE_OP == 0:
+            acc = acc + x
+        elif COMBINE_OP == 1:
+            acc = acc * x
+        elif COMBINE_OP == 2:
+            acc = ct.maximum(acc, x)
+        elif COMBINE_OP == 3:
+            acc = ct.minimum(acc, x)
+        else:
+            if COMBINE_OP == 4:
+                better = x > acc
+            else:
+                better = x < acc
+            acc = ct.where(better, x, acc)
+            best = ct.where(better, rows, best)
+
+    if COMBINE_OP == 0:
+        res = ct.sum(acc, axis=1)
+    elif COMBINE_OP == 1:
+        res = ct.prod(acc, axis=1)
+    elif COMBINE_OP == 2:
+        res = ct.max(acc, axis=1)
+    elif COMBINE_OP == 3:
+        res = ct.min(acc, axis=1)
+    elif COMBINE_OP == 4:
+        res = ct.max(acc, axis=1)
+    else:
+        res = ct.min(acc, axis=1)
+    if COMBINE_OP >= 4:
+        winner = ct.where(acc == ct.expand_dims(res, 1), best, INT32_MAX)
+        ct.store(YI, index=(bidx, bidy), tile=ct.astype(ct.min(winner, axis=1), YI.dtype))
+
+    if POST_OP == 1:
+        res = res * post_scale
+    elif POST_OP == 2:
+        res = ct.sqrt(res)
+    ct.store(Y, index=(bidx, bidy), tile=ct.astype(res, Y.dtype))
+
+
+@ct.kernel
+def reduce_full_kernel(
+    X, P, PI, n: int, identity: float,
+    TILE: ct.Constant[int], BLOCKS: ct.Constant[int], NUM_ITERS: ct.Constant[int],
+    COMBINE_OP: ct.Constant[int], MAP_OP: ct.Constant[int],
+):
+    # Stage 1 of a full reduce: block b folds tiles b, b + BLOCKS, ... into P[b]
+    bid = ct.bid(0)
+
+    acc = ct.full((1, TILE), identity, ct.float32)
+    best = ct.zeros((1, TILE), ct.int32)
+    for i in range(NUM_ITERS):
+        t = i * BLOCKS + bid
+        idx = ct.expand_dims(t * TILE + ct.arange(TILE, dtype=ct.int32), 0)
+        x = ct.astype(ct.load(X, index=(0, t), shape=(1, TILE), padding_mode=ct.PaddingMode.ZERO), ct.float32)
+        if MAP_OP == 1:
+            x = ct.where(x > 0, x, -x)
+        elif MAP_OP == 2:
+            x = x * x
+        x = ct.where(idx < n, x, identity)
+
+        if COMBINE_OP == 0:
+            acc = acc + x
+        elif COMBINE_OP == 1:
+            acc = acc * x
+        elif COMBINE_OP == 2:
+            acc = ct.maximum(acc, x)
+        elif COMBINE_OP == 3:
+            acc = ct.minimum(acc, x)
+        else:
+            if COMBINE_OP == 4:
+                better = x > acc
+            else:
+                better = x < acc
+            acc = ct.where(better, x, acc)
+            best = ct.where(better, idx, best)
+
+    if COMBINE_OP == 0:
+        res = ct.sum(acc, axis=1)
+    elif COMBINE_OP == 1:
+        res = ct.prod(acc, axis=1)
+    elif COMBINE_OP == 2:
+        res = ct.max(acc, axis=1)
+    elif COMBINE_OP == 3:
+        res = ct.min(acc, axis=1)
+    elif COMBINE_OP == 4:
+        res = ct.max(acc, axis=1)
+    else:
+        res = ct.min(acc, axis=1)
+    if COMBINE_OP >= 4:
+        winner = ct.where(acc == ct.expand_dims(res, 1), best, INT32_MAX)
+        ct.store(PI, index=(bid,), tile=ct.min(winner, axis=1))
+    ct.store(P, index=(bid,), tile=res)
+
+
+def _launch_pass(stream, ps, rop, count, src, dst, dst_idx):
+    outer, reduce, inner = ps.shape
+    combine = COMBINE[rop.combine]
+    map_op, post_op = MAP[ps.map], POST[ps.post]
+    post_scale = 1.0 / count
+    t = ps.tiles
+
+    if ps.strategy == "inner":
+        num_r_tiles = ct.cdiv(reduce, t["R_TILE"])
+        args = (src.reshape((outer, reduce)), dst, src, dst_idx, reduce, rop.identity, post_scale,
+                t["O_TILE"], t["R_TILE"], num_r_tiles, combine, map_op, post_op, 0)
+        ct.launch(stream, ps.grid, reduce_inner_kernel, args)
+    elif ps.strategy == "outer":
+        num_r_tiles = ct.cdiv(reduce, t["R_TILE"])
+        args = (src.reshape((outer, reduce, inner)), dst.reshape((outer, inner)), dst_idx.reshape((outer, inner)),
+                reduce, rop.identity, post_scale, t["R_TILE"], t["I_TILE"], num_r_tiles, combine, map_op, post_op)
+        ct.launch(stream, ps.grid, reduce_outer_kernel, args)
+    else:
+        # Two stages, as in 11-rms-norm-2stage: BLOCKS partials, then one block over them.
+        blocks = t["BLOCKS"]
+        partial = cupy.empty((blocks,), dtype=cupy.float32)
+        partial_idx = cupy.zeros((blocks,), dtype=cupy.int32)
+        num_iters = ct.cdiv(ct.cdiv(reduce, t["TILE"]), blocks)
+        args = (src.reshape((1, reduce)), partial, partial_idx, reduce, rop.identity,
+                t["TILE"], blocks, num_iters, combine, map_op)
+        ct.launch(stream, ps.grid, reduce_full_kernel, args)
+        args = (partial.reshape((1, blocks)), dst, partial_idx.reshape((1, blocks)), dst_idx, blocks, rop.identity,
+                post_scale, 1, t["P_TILE"], 1, combine, 0, post_op, 1)
+        ct.launch(stream, (1,), reduce_inner_kernel, args)
+
+
+# Input
+# - input: tensor of any shape
+# - axes: int, tuple of ints or None (all axes)
+# - op: sum, mean, prod, max, min, argmax, argmin, l1, l2
+# Output
+# - output: input.shape with the reduced axes removed (or kept as 1 with keepdims);
+#   int64 indices for argmax/argmin (flattened index when reducing every axis)
+# You can use cupy.cuda.get_current_stream() to get the current stream to launch cuTile kernels.
+# Note: input, output are float32, float16 or bfloat16 device tensors (accumulation is float32)
+def solution(input, output, axes=None, op: str = "sum", keepdims: bool = False):
+    plan = reduce_plan.plan(input.shape, axes, op, keepdims)
+    rop = plan.op
+    is_arg = rop.combine in ("argmax", "argmin")
+    stream = cupy.cuda.get_current_stream()
+
+    src = input.reshape((-1,))
+    for i, ps in enumerate(plan.passes):
+        outer, _, inner = ps.shape
+        last = i == len(plan.passes) - 1
+        if last and not is_arg:
+            dst = output.reshape((outer * inner,))
+        else:
+            # Intermediate passes (and arg* values) stay float32.
+            dst = cupy.empty((outer * inner,), dtype=cupy.float32)
+        dst_idx = output.reshape((outer * inner,)) if is_arg else dst
+        _launch_pass(stream, ps, rop, plan.count, src, dst, dst_idx)
+        src = dst
+
+
+if __name__ == "__main__":
+    import numpy as np
+    import torch
+
+    test_configs = [
+        # (shape, axes, op)
+        ((16, 128, 256), 1, "sum"),
+        ((32, 512, 512), 0, "sum"),
+        ((128, 64, 64, 64), 3, "sum"),
+        ((8, 1024, 1024), None, "sum"),
+        ((64, 128, 128), (1, 2), "mean"),
+        ((8, 16, 32, 64), (0, 2), "max"),
+        ((256, 4096), 1, "min"),
+        ((64, 1000), 1, "prod"),
+        ((4096, 1000), 1, "argmax"),
+        ((512, 64, 32), 1, "argmin"),
+        ((1000003,), None, "argmax"),
+        ((256, 2048), 1, "l1"),
+        ((64, 4, 256), (0, 2), "l2"),
+    ]
+
+    # Tolerance: float32 accumulation plus one rounding to the output dtype.
+    dtypes = {torch.float32: 1e-3, torch.float16: 2e-3, torch.bfloat16: 1e-2}
+
+    print("Testing N-D Reduction:")
+    all_passed = True
+
+    for dtype, tol in dtypes.items():
+        for shape, axes, op in test_configs:
+            x = torch.randn(*shape, dtype=torch.float32, device="cuda")
+            if op == "prod":
+                # keep products of 1000 terms finite
+                x = 1 + 0.001 * x
+            x = x.to(dtype)
+            out_shape = reduce_plan.plan(shape, axes, op).out_shape
+            out_dtype = torch.int64 if op in ("argmax", "argmin") else dtype
+            out = torch.empty(out_shape, dtype=out_dtype, device="cuda")
+
+            # torch tensors go in directly; cupy has no bfloat16
+            solution(x, out, axes, op)
+
+            # NumPy float32 reference
+            expected = reduce_plan.reference(x.float().cpu().numpy(), axes, op)
+            result = out.cpu().numpy() if out_dtype == torch.int64 else out.float().cpu().numpy()
+
+            if out_dtype == torch.int64:
+                passed = np.array_equal(result, expected)
+            else:
+                passed = np.allclose(result, expected, rtol=tol, atol=tol)
+            if passed:
+                print(f"  ✓ {op} shape={shape}, axes={axes}, dtype={dtype}")
+            else:
+                diff = np.abs(result.astype(np.float64) - expected).max()
+                print(f"  ✗ {op} shape={shape}, axes={axes}, dtype={dtype} - Max diff: {diff}")
+                all_passed = False
+
+    if all_passed:
+        print("✓ All tests passed!")
+    else:
+        print("✗ Some tests failed!")
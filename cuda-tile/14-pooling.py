@@ -0,0 +1,273 @@
+import cuda.tile as ct
+import cupy
+
+# Pooling kinds and epilogue activations, passed to the kernels as constants.
+KINDS = {"avg": 0, "max": 1, "min": 2, "lp": 3}
+ACTIVATIONS = {None: 0, "relu": 1, "leaky_relu": 2, "gelu": 3}
+NEG_INF = float("-inf")
+POS_INF = float("inf")
+
+# avg/lp windows at least this wide take the prefix-sum path: O(1) per output instead of O(k).
+PREFIX_MIN_K = 16
+
+OUT_TILE = 256
+SCAN_TILE = 256
+
+
+# Direct path: one gather per tap, O(kernel_size) per output (as 07-average-pool-1d).
+@ct.kernel
+def pool_window_kernel(
+    X, Y, kernel_size: int, stride: int, padding: int, p: float, alpha: float, scale: float,
+    OUT_TILE: ct.Constant[int], KIND: ct.Constant[int], ACTIVATION: ct.Constant[int],
+):
+    bidx = ct.bid(0)
+    starts = (bidx * OUT_TILE + ct.arange(OUT_TILE, dtype=ct.int32)) * stride - padding
+
+    if KIND == 1:
+        acc = ct.full((OUT_TILE,), NEG_INF, ct.float32)
+    elif KIND == 2:
+        acc = ct.full((OUT_TILE,), POS_INF, ct.float32)
+    else:
+        acc = ct.zeros((OUT_TILE,), dtype=ct.float32)
+
+    for k in range(kernel_size):
+        # Padding never wins a max/min; it counts as zero for avg and lp.
+        if KIND == 1:
+            acc = ct.maximum(acc, ct.astype(ct.gather(X, starts + k, padding_value=NEG_INF), ct.float32))
+        elif KIND == 2:
+            acc = ct.minimum(acc, ct.astype(ct.gather(X, starts + k, padding_value=POS_INF), ct.float32))
+        elif KIND == 3:
+            x = ct.astype(ct.gather(X, starts + k), ct.float32)
+            acc = acc + ct.exp(p * ct.log(ct.where(x > 0, x, -x)))
+        else:
+            acc = acc + ct.astype(ct.gather(X, starts + k), ct.float32)
+
+    if KIND == 0:
+        acc = acc / kernel_size
+    elif KIND == 3:
+        acc = ct.exp(ct.log(acc) / p)
+
+    # Epilogue: Y = act(scale * pool(X)), in float32
+    acc = acc * scale
+    if ACTIVATION == 1:
+        acc = ct.maximum(acc, 0.0)
+    elif ACTIVATION == 2:
+        acc = ct.where(acc > 0, acc, alpha * acc)
+    elif ACTIVATION == 3:
+        acc = 0.5 * acc * (1 + ct.tanh(0.7978845608 * (acc + 0.044715 * acc ** 3)))
+    ct.store(Y, index=(bidx,), tile=ct.astype(acc, Y.dtype))
+
+
+# Prefix-sum path, stage 1: block-local inclusive prefix sums of the padded input
+# (|x|^p for lp) and one total per block. The input is read exactly once.
+@ct.kernel
+def prefix_scan_kernel(X, Local, Totals, padding: int, p: float, SCAN_TILE: ct.Constant[int], KIND: ct.Constant[int]):
+    bidx = ct.bid(0)
+    idx = bidx * SCAN_TILE + ct.arange(SCAN_TILE, dtype=ct.int32) - padding
+    x = ct.astype(ct.gather(X, idx), ct.float32)
+    if KIND == 3:
+        x = ct.exp(p * ct.log(ct.where(x > 0, x, -x)))
+    ct.store(Local, index=(bidx,), tile=ct.cumsum(x, axis=0))
+    ct.store(Totals, index=(bidx,), tile=ct.sum(x, axis=0, keepdims=True))
+
+
+# Stage 2: exclusive scan of the block totals, in one block. The offsets are
+# float64: for lp they grow with the input length, and a float32 difference of
+# two large offsets would lose the window sum.
+@ct.kernel
+def scan_totals_kernel(Totals, Offsets, SCAN_TILE: ct.Constant[int], NUM_TILES: ct.Constant[int]):
+    carry = ct.zeros((1,), dtype=ct.float64)
+    for t in range(NUM_TILES):
+        totals = ct.astype(ct.load(Totals, index=(t,), shape=(SCAN_TILE,), padding_mode=ct.PaddingMode.ZERO), ct.float64)
+        ct.store(Offsets, index=(t,), tile=ct.cumsum(totals, axis=0) - totals + carry)
+        carry = carry + ct.sum(totals, axis=0, keepdims=True)
+
+
+# Stage 3: window sum = prefix(end) - prefix(start), two gathers per output.
+# Local and offset differences are taken separately, so a window inside one
+# block never sees the running offset.
+@ct.kernel
+def prefix_window_kernel(
+    Local, Offsets, Y, kernel_size: int, stride: int, p: float, alpha: float, scale: float,
+    OUT_TILE: ct.Constant[int], SCAN_TILE: ct.Constant[int], KIND: ct.Constant[int], ACTIVATION: ct.Constant[int],
+):
+    bidx = ct.bid(0)
+    lo = (bidx * OUT_TILE + ct.arange(OUT_TILE, dtype=ct.int32)) * stride - 1  # last element before the window
+    hi = lo + kernel_size
+    # lo == -1 gathers out of bounds, which reads 0: the empty prefix
+    lo_block = ct.where(lo >= 0, lo // SCAN_TILE, -1)
+    local = ct.gather(Local, hi) - ct.gather(Local, lo)
+    offset = ct.astype(ct.gather(Offsets, hi // SCAN_TILE) - ct.gather(Offsets, lo_block), ct.float32)
+    acc = local + offset
+
+    if KIND == 3:
+        acc = ct.exp(ct.log(ct.maximum(acc, 0.0)) / p)
+    else:
+        acc = acc / kernel_size
+
+    acc = acc * scale
+    if ACTIVATION == 1:
+        acc = ct.maximum(acc, 0.0)
+    elif ACTIVATION == 2:
+        acc = ct.where(acc > 0, acc, alpha * acc)
+    elif ACTIVATION == 3:
+        acc = 0.5 * acc * (1 + ct.tanh(0.7978845608 * (acc + 0.044715 * acc ** 3)))
+    ct.store(Y, index=(bidx,), tile=ct.astype(acc, Y.dtype))
+
+
+def out_size(H, kernel_size, stride, padding):
+    return (H + 2 * padding - kernel_size) // stride + 1
+
+
+def _check(kind, activation):
+    if kind not in KINDS:
+        raise ValueError(f"Unknown pooling kind {kind!r}, expected one of {list(KINDS)}")
+    if activation not in ACTIVATIONS:
+        raise ValueError(f"Unknown activation {activation!r}, expected one of {list(ACTIVATIONS)}")
+
+
+def prefix_scan(input, H, padding, kind="avg", p=2.0):
+    """Stages 1 and 2: float32 block-local prefixes and float64 block offsets for ``prefix_window``."""
+    stream = cupy.cuda.get_current_stream()
+    num_blocks = ct.cdiv(H + 2 * padding, SCAN_TILE)
+    local = cupy.empty((num_blocks * SCAN_TILE,), dtype=cupy.float32)
+    totals = cupy.empty((num_blocks,), dtype=cupy.float32)
+    offsets = cupy.empty((num_blocks,), dtype=cupy.float64)
+    ct.launch(stream, (num_blocks,), prefix_scan_kernel, (input, local, totals, padding, float(p), SCAN_TILE, KINDS[kind]))
+    ct.launch(stream, (1,), scan_totals_kernel, (totals, offsets, SCAN_TILE, ct.cdiv(num_blocks, SCAN_TILE)))
+    return local, offsets
+
+
+def prefix_window(local, offsets, output, kernel_size, stride, *, kind="avg", p=2.0, activation=None, alpha=0.01, scale=1.0):
+    """Stage 3 for one window size."""
+    grid = (ct.cdiv(output.shape[0], OUT_TILE),)
+    args = (local, offsets, output, kernel_size, stride, float(p), float(alpha), float(scale),
+            OUT_TILE, SCAN_TILE, KINDS[kind], ACTIVATIONS[activation])
+    ct.launch(cupy.cuda.get_current_stream(), grid, prefix_window_kernel, args)
+
+
+# Input
+# - Vector input of size H
+# - kernel_size (k), stride (S), padding (P): as 07-average-pool-1d
+# - kind: "avg" (zero padding counted, like nn.AvgPool1d), "max", "min" (padding
+#   ignored, like nn.MaxPool1d) or "lp" ((sum |x|^p)^(1/p), zero padding)
+# - Optional epilogue: act(scale * pool(x)) with "relu", "leaky_relu" (slope alpha) or "gelu"
+# - method: "window" (O(k) per output), "prefix" (O(1) per output, avg/lp only) or None to choose
+# Output
+# - Vector output of size (H + 2P - k) // S + 1
+# You can use cupy.cuda.get_current_stream() to get the current stream to launch cuTile kernels.
+# Note: input, output are float32, float16 or bfloat16 device tensors (accumulation is float32)
+def solution(
+    input, kernel_size: int, stride: int, padding: int, output, H: int,
+    *, kind: str = "avg", p: float = 2.0, activation=None, alpha: float = 0.01, scale: float = 1.0, method=None,
+):
+    _check(kind, activation)
+    if method is None:
+        method = "prefix" if kind in ("avg", "lp") and kernel_size >= PREFIX_MIN_K else "window"
+    if method == "prefix":
+        if kind not in ("avg", "lp"):
+            raise ValueError(f"The prefix-sum path needs an additive pool, not {kind!r}")
+        local, offsets = prefix_scan(input, H, padding, kind, p)
+        prefix_window(local, offsets, output, kernel_size, stride, kind=kind, p=p, activation=activation, alpha=alpha, scale=scale)
+        return
+
+    grid = (ct.cdiv(out_size(H, kernel_size, stride, padding), OUT_TILE),)
+    args = (input, output, kernel_size, stride, padding, float(p), float(alpha), float(scale),
+            OUT_TILE, KINDS[kind], ACTIVATIONS[activation])
+    ct.launch(cupy.cuda.get_current_stream(), grid, pool_window_kernel, args)
+
+
+# Multi-scale pooling: outputs[i] pools with kernel_sizes[i] (same stride and padding).
+# avg/lp read the input once into a prefix sum and then cost two gathers per
+# output per window size; max/min fall back to one direct launch per size.
+def solution_multi(
+    input, kernel_sizes, stride: int, padding: int, outputs, H: int,
+    *, kind: str = "avg", p: float = 2.0, activation=None, alpha: float = 0.01, scale: float = 1.0,
+):
+    _check(kind, activation)
+    if len(kernel_sizes) != len(outputs):
+        raise ValueError("one output per kernel size")
+    epilogue = {"kind": kind, "p": p, "activation": activation, "alpha": alpha, "scale": scale}
+    if kind in ("max", "min"):
+        for k, out in zip(kernel_sizes, outputs):
+            solution(input, k, stride, padding, out, H, method="window", **epilogue)
+        return
+    local, offsets = prefix_scan(input, H, padding, kind, p)
+    for k, out in zip(kernel_sizes, outputs):
+        prefix_window(local, offsets, out, k, stride, **epilogue)
+
+
+if __name__ == "__main__":
+    import numpy as np
+    import torch
+
+    def pool_ref(x, kernel_size, stride, padding, kind="avg", p=2.0, activation=None, alpha=0.01, scale=1.0):
+        # NumPy float64 reference, then float32
+        fill = {"max": -np.inf, "min": np.inf}.get(kind, 0.0)
+        xp = np.pad(x.astype(np.float64), padding, constant_values=fill)
+        windows = np.lib.stride_tricks.sliding_window_view(xp, kernel_size)[::stride]
+        if kind == "avg":
+            y = windows.mean(axis=1)
+        elif kind == "max":
+            y = windows.max(axis=1)
+        elif kind == "min":
+            y = windows.min(axis=1)
+        else:
+            y = (np.abs(windows) ** p).sum(axis=1) ** (1 / p)
+        y = y * scale
+        if activation == "relu":
+            y = np.maximum(y, 0)
+        elif activation == "leaky_relu":
+            y = np.where(y > 0, y, alpha * y)
+        elif activation == "gelu":
+            y = 0.5 * y * (1 + np.tanh(0.7978845608 * (y + 0.044715 * y**3)))
+        return y.astype(np.float32)
+
+    H = 1 << 20
+    configs = [
+        # (kernel_size, stride, padding, options)
+        (8, 1, 4, {}),
+        (64, 1, 32, {}),
+        (64, 1, 32, {"method": "window"}),
+        (255, 4, 0, {}),
+        (3, 2, 1, {"kind": "max"}),
+        (16, 16, 0, {"kind": "min", "activation": "relu"}),
+        (64, 1, 0, {"kind": "lp", "p": 2.0}),
+        (32, 2, 8, {"activation": "gelu", "scale": 2.0}),
+    ]
+
+    # Tolerance: float32 accumulation plus one rounding to the output dtype.
+    dtypes = {torch.float32: 1e-3, torch.float16: 2e-3, torch.bfloat16: 1e-2}
+
+    print("Testing 1D Pooling:")
+    all_passed = True
+    for dtype, tol in dtypes.items():
+        x_torch = torch.randn(H, dtype=dtype, device="cuda")
+        x_np = x_torch.float().cpu().numpy()
+        for k, s, pad, options in configs:
+            y_torch = torch.zeros(out_size(H, k, s, pad), dtype=dtype, device="cuda")
+            solution(x_torch, k, s, pad, y_torch, H, **options)
+            ref_options = {key: v for key, v in options.items() if key != "method"}
+            expected = pool_ref(x_np, k, s, pad, **ref_options)
+            result = y_torch.float().cpu().numpy()
+            if np.allclose(result, expected, rtol=tol, atol=tol):
+                print(f"  ✓ k={k}, S={s}, P={pad}, {options}, dtype={dtype}")
+            else:
+                print(f"  ✗ k={k}, S={s}, P={pad}, {options}, dtype={dtype} - Max diff: {np.abs(result - expected).max()}")
+                all_passed = False
+
+        # Multi-scale: three window sizes from one read of the input
+        sizes = (16, 64, 256)
+        outs = [torch.zeros(out_size(H, k, 1, 8), dtype=dtype, device="cuda") for k in sizes]
+        solution_multi(x_torch, sizes, 1, 8, outs, H)
+        for k, out in zip(sizes, outs):
+            if np.allclose(out.float().cpu().numpy(), pool_ref(x_np, k, 1, 8), rtol=tol, atol=tol):
+                print(f"  ✓ multi-scale k={k}, dtype={dtype}")
+            else:
+                print(f"  ✗ multi-scale k={k}, dtype={dtype}")
+                all_passed = False
+
+    if all_passed:
+        print("✓ All tests passed!")
+    else:
+        print("✗ Some tests failed!")
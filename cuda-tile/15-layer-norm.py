@@ -0,0 +1,235 @@
+import cuda.tile as ct
+import cupy
+
+EPSILON = 1e-5
+
+# Rows up to this long are normalized from a single tile: X is read once.
+ONE_TILE_MAX_N = 4096
+ONE_TILE_ELEMS = 8192  # B_TILE * N_TILE for the one-tile path
+
+# Split-row path: each stats block folds CHUNK_TILES tiles of N_TILE columns.
+N_TILE = 1024
+CHUNK_TILES = 4
+SPLIT_B_TILE = 4
+
+
+# Welford/Chan statistics. A tile's (count, mean, M2) comes from the values
+# already in registers: its sum, then the sum of squared deviations from its
+# own mean. Partials are merged with Chan's update
+#
+#   n = na + nb,  delta = mean_b - mean_a
+#   mean = mean_a + delta * nb / n
+#   M2 = M2_a + M2_b + delta^2 * na * nb / n
+#
+# so the variance never goes through E[x^2] - E[x]^2, which cancels badly
+# when |mean| >> std, and X is never read a second time just for the mean.
+
+
+# One-tile path: the whole row is one tile, so X is loaded once.
+@ct.kernel
+def layer_norm_row_kernel(
+    X, Y, W, Bias, Mean, Rstd, N: int, eps: float,
+    B_TILE: ct.Constant[int], N_TILE: ct.Constant[int],
+    HAS_WEIGHT: ct.Constant[int], HAS_BIAS: ct.Constant[int], SAVE_STATS: ct.Constant[int],
+):
+    bid = ct.bid(0)
+    x = ct.astype(ct.load(X, index=(bid, 0), shape=(B_TILE, N_TILE), padding_mode=ct.PaddingMode.ZERO), ct.float32)
+    in_row = ct.expand_dims(ct.arange(N_TILE, dtype=ct.int32) < N, 0)
+
+    mean = ct.sum(x, axis=1) / N
+    d = ct.where(in_row, x - ct.expand_dims(mean, 1), 0.0)
+    rstd = ct.rsqrt(ct.sum(d * d, axis=1) / N + eps)
+
+    y = d * ct.expand_dims(rstd, 1)
+    if HAS_WEIGHT:
+        y = y * ct.expand_dims(ct.astype(ct.load(W, index=(0,), shape=(N_TILE,), padding_mode=ct.PaddingMode.ZERO), ct.float32), 0)
+    if HAS_BIAS:
+        y = y + ct.expand_dims(ct.astype(ct.load(Bias, index=(0,), shape=(N_TILE,), padding_mode=ct.PaddingMode.ZERO), ct.float32), 0)
+    ct.store(Y, index=(bid, 0), tile=ct.astype(y, Y.dtype))
+
+    if SAVE_STATS:
+        ct.store(Mean, index=(bid,), tile=mean)
+        ct.store(Rstd, index=(bid,), tile=rstd)
+
+
+# Split-row path, kernel 1: (mean, M2) of one chunk of CHUNK_TILES tiles per row.
+@ct.kernel
+def layer_norm_stats_kernel(
+    X, PMean, PM2, N: int,
+    B_TILE: ct.Constant[int], N_TILE: ct.Constant[int], CHUNK_TILES: ct.Constant[int],
+):
+    bid_b = ct.bid(0)
+    bid_c = ct.bid(1)
+    count = ct.zeros((B_TILE,), dtype=ct.float32)
+    mean = ct.zeros((B_TILE,), dtype=ct.float32)
+    m2 = ct.zeros((B_TILE,), dtype=ct.float32)
+
+    for t in range(CHUNK_TILES):
+        ni = bid_c * CHUNK_TILES + t
+        cols = ni * N_TILE + ct.arange(N_TILE, dtype=ct.int32)
+        in_row = ct.expand_dims(cols < N, 0)
+        n_t = ct.sum(ct.astype(cols < N, ct.float32))  # 0 past the end of the row
+
+        x = ct.astype(ct.load(X, index=(bid_b, ni), shape=(B_TILE, N_TILE), padding_mode=ct.PaddingMode.ZERO), ct.float32)
+        tile_mean = ct.sum(x, axis=1) / ct.maximum(n_t, 1.0)
+        d = ct.where(in_row, x - ct.expand_dims(tile_mean, 1), 0.0)
+        tile_m2 = ct.sum(d * d, axis=1)
+
+        n = count + n_t
+        delta = tile_mean - mean
+        mean = mean + delta * (n_t / ct.maximum(n, 1.0))
+        m2 = m2 + tile_m2 + delta * delta * (count * n_t / ct.maximum(n, 1.0))
+        count = n
+
+    ct.store(PMean, index=(bid_b, bid_c), tile=ct.reshape(mean, (B_TILE, 1)))
+    ct.store(PM2, index=(bid_b, bid_c), tile=ct.reshape(m2, (B_TILE, 1)))
+
+
+# Split-row path, kernel 2: merge the chunk partials, then normalize one (B_TILE, N_TILE) tile.
+# Every N tile re-merges its rows' partials; there are only N / CHUNK of them.
+@ct.kernel
+def layer_norm_apply_kernel(
+    X, Y, W, Bias, PMean, PM2, Mean, Rstd, N: int, chunk: int, eps: float,
+    B_TILE: ct.Constant[int], N_TILE: ct.Constant[int], C_TILE: ct.Constant[int],
+    HAS_WEIGHT: ct.Constant[int], HAS_BIAS: ct.Constant[int], SAVE_STATS: ct.Constant[int],
+):
+    bid_b = ct.bid(0)
+    bid_n = ct.bid(1)
+
+    # Chan's update for C partials at once: counts are known from N, and chunks
+    # past the end of the row load as zero with count 0.
+    counts = ct.astype(ct.minimum(ct.maximum(N - ct.arange(C_TILE, dtype=ct.int32) * chunk, 0), chunk), ct.float32)
+    counts = ct.expand_dims(counts, 0)
+    pmean = ct.load(PMean, index=(bid_b, 0), shape=(B_TILE, C_TILE), padding_mode=ct.PaddingMode.ZERO)
+    pm2 = ct.load(PM2, index=(bid_b, 0), shape=(B_TILE, C_TILE), padding_mode=ct.PaddingMode.ZERO)
+    mean = ct.sum(counts * pmean, axis=1) / N
+    dm = pmean - ct.expand_dims(mean, 1)
+    rstd = ct.rsqrt((ct.sum(pm2, axis=1) + ct.sum(counts * dm * dm, axis=1)) / N + eps)
+
+    x = ct.astype(ct.load(X, index=(bid_b, bid_n), shape=(B_TILE, N_TILE), padding_mode=ct.PaddingMode.ZERO), ct.float32)
+    y = (x - ct.expand_dims(mean, 1)) * ct.expand_dims(rstd, 1)
+    if HAS_WEIGHT:
+        y = y * ct.expand_dims(ct.astype(ct.load(W, index=(bid_n,), shape=(N_TILE,), padding_mode=ct.PaddingMode.ZERO), ct.float32), 0)
+    if HAS_BIAS:
+        y = y + ct.expand_dims(ct.astype(ct.load(Bias, index=(bid_n,), shape=(N_TILE,), padding_mode=ct.PaddingMode.ZERO), ct.float32), 0)
+    ct.store(Y, index=(bid_b, bid_n), tile=ct.astype(y, Y.dtype))
+
+    if SAVE_STATS:
+        if bid_n == 0:
+            ct.store(Mean, index=(bid_b,), tile=mean)
+            ct.store(Rstd, index=(bid_b,), tile=rstd)
+
+
+# Note: X, Y, weight and bias are float32, float16 or bfloat16 device tensors
+# (statistics are float32). Pass float32 `mean` and `rstd` of shape (B,) to
+# keep the statistics for the backward pass.
+def solution(X, Y, B: int, N: int, weight=None, bias=None, mean=None, rstd=None, eps: float = EPSILON):
+    stream = cupy.cuda.get_current_stream()
+    save = mean is not None
+    if save != (rstd is not None):
+        raise ValueError("mean and rstd are saved together")
+    # Unused arguments still need an array; the kernels never load them.
+    W = weight if weight is not None else X
+    Bias = bias if bias is not None else X
+    flags = (int(weight is not None), int(bias is not None), int(save))
+
+    if N <= ONE_TILE_MAX_N:
+        n_tile = 1 << (N - 1).bit_length()
+        b_tile = max(1, min(16, ONE_TILE_ELEMS // n_tile))
+        Mean, Rstd = (mean, rstd) if save else (X, X)
+        grid = (ct.cdiv(B, b_tile),)
+        ct.launch(stream, grid, layer_norm_row_kernel, (X, Y, W, Bias, Mean, Rstd, N, eps, b_tile, n_tile, *flags))
+        return
+
+    chunk = N_TILE * CHUNK_TILES
+    chunks = ct.cdiv(N, chunk)
+    PMean = cupy.empty((B, chunks), dtype=cupy.float32)
+    PM2 = cupy.empty((B, chunks), dtype=cupy.float32)
+    Mean, Rstd = (mean, rstd) if save else (PMean, PM2)
+
+    grid1 = (ct.cdiv(B, SPLIT_B_TILE), chunks)
+    ct.launch(stream, grid1, layer_norm_stats_kernel, (X, PMean, PM2, N, SPLIT_B_TILE, N_TILE, CHUNK_TILES))
+
+    c_tile = 1 << (chunks - 1).bit_length()
+    grid2 = (ct.cdiv(B, SPLIT_B_TILE), ct.cdiv(N, N_TILE))
+    ct.launch(
+        stream, grid2, layer_norm_apply_kernel,
+        (X, Y, W, Bias, PMean, PM2, Mean, Rstd, N, chunk, eps, SPLIT_B_TILE, N_TILE, c_tile, *flags),
+    )
+
+
+if __name__ == "__main__":
+    import numpy as np
+    import torch
+
+    def layer_norm_ref(x, w, b):
+        # NumPy float64 reference
+        x = x.astype(np.float64)
+        mean = x.mean(axis=1, keepdims=True)
+        rstd = 1 / np.sqrt(((x - mean) ** 2).mean(axis=1, keepdims=True) + EPSILON)
+        y = (x - mean) * rstd
+        if w is not None:
+            y = y * w
+        if b is not None:
+            y = y + b
+        return y, mean[:, 0], rstd[:, 0]
+
+    test_configs = [
+        # (B, N, affine, offset); N > 4096 takes the split-row path
+        (16, 128, True, 0.0),
+        (37, 1000, True, 0.0),
+        (64, 4096, False, 0.0),
+        (8, 5000, True, 0.0),
+        (33, 16384, True, 0.0),
+        (16, 1024, True, 1000.0),
+        (16, 12288, False, 1000.0),
+    ]
+
+    # Tolerance: float32 statistics plus one rounding to the output dtype.
+    dtypes = {torch.float32: 1e-3, torch.float16: 5e-3, torch.bfloat16: 2e-2}
+
+    print("Testing LayerNorm:")
+    all_passed = True
+
+    for dtype, tol in dtypes.items():
+        for B, N, affine, offset in test_configs:
+            if offset and dtype != torch.float32:
+                continue  # an offset of 1000 is already coarser than the row's spread in half precision
+            X = (torch.randn(B, N, device="cuda") + offset).to(dtype)
+            Y = torch.empty_like(X)
+            w = torch.randn(N, device="cuda").to(dtype) if affine else None
+            b = torch.randn(N, device="cuda").to(dtype) if affine else None
+            mean = torch.empty(B, dtype=torch.float32, device="cuda")
+            rstd = torch.empty(B, dtype=torch.float32, device="cuda")
+
+            solution(X, Y, B, N, weight=w, bias=b, mean=mean, rstd=rstd)
+
+            host = lambda t: None if t is None else t.float().cpu().numpy()  # noqa: E731
+            expected, exp_mean, exp_rstd = layer_norm_ref(host(X), host(w), host(b))
+            ok = (
+                np.allclose(host(Y), expected, rtol=tol, atol=tol * (1 + np.abs(host(b)).max() if affine else 1))
+                and np.allclose(host(mean), exp_mean, rtol=1e-5, atol=1e-4)
+                and np.allclose(host(rstd), exp_rstd, rtol=1e-3)
+            )
+            label = f"B={B}, N={N}, affine={affine}" + (f", offset={offset:g}" if offset else "") + f", dtype={dtype}"
+            if ok:
+                print(f"  ✓ {label}")
+            else:
+                diff = np.abs(host(Y) - expected).max()
+                print(f"  ✗ {label} - Max diff: {diff}")
+                all_passed = False
+
+    # Without mean/rstd the kernels skip the statistics stores.
+    X = torch.randn(8, 8192, device="cuda")
+    Y = torch.empty_like(X)
+    solution(X, Y, 8, 8192)
+    if np.allclose(Y.cpu().numpy(), layer_norm_ref(X.cpu().numpy(), None, None)[0], atol=1e-3):
+        print("  ✓ no affine, no saved statistics")
+    else:
+        print("  ✗ no affine, no saved statistics")
+        all_passed = False
+
+    if all_passed:
+        print("✓ All tests passed!")
+    else:
+        print("✗ Some tests failed!")
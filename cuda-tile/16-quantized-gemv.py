@@ -0,0 +1,118 @@
+import cuda.tile as ct
+import cupy
+
+# Weight-only quantized GEMV: y = dequant(Q) @ x with int8 or packed int4
+# codes, per-group float16 scales and uint8 zero-points. The layout and the
+# host-side quantize/pack utilities are in gpu_tile/quant.py.
+#
+# At M=2048, K=131072 the float32 A of 05-optimize-matrix-vector-multiplication
+# is 1 GiB per call; int8 codes are 4x and int4 codes 8x smaller (plus ~2.3%
+# for scales and zeros at group_size 128). Codes are widened and dequantized in
+# registers, and the dot product accumulates in float32.
+
+M_TILE = 64
+K_TILE = 512  # columns per step; a multiple of group_size
+
+
+@ct.kernel
+def quant_gemv_kernel(
+    Q, Scales, Zeros, X, Y,
+    M_TILE: ct.Constant[int], K_TILE: ct.Constant[int], NUM_K_TILES: ct.Constant[int],
+    GROUP: ct.Constant[int], BITS: ct.Constant[int],
+):
+    bidx = ct.bid(0)
+    GROUPS = K_TILE // GROUP
+
+    acc = ct.zeros((M_TILE,), dtype=ct.float32)
+    if BITS == 4:
+        # Byte j holds column 2j in the low nibble and 2j + 1 in the high one:
+        # shifting a (.., K/2, 1) tile by (0, 4) lays the codes out in column order.
+        shifts = ct.reshape(ct.arange(2, dtype=ct.int32) * 4, (1, 1, 2))
+
+    for k_block in range(NUM_K_TILES):
+        x = ct.astype(ct.load(X, index=(k_block,), shape=(K_TILE,), padding_mode=ct.PaddingMode.ZERO), ct.float32)
+        if BITS == 4:
+            packed = ct.astype(ct.load(Q, index=(bidx, k_block), shape=(M_TILE, K_TILE // 2), padding_mode=ct.PaddingMode.ZERO), ct.int32)
+            q = ct.reshape((ct.expand_dims(packed, 2) >> shifts) & 0xF, (M_TILE, K_TILE))
+        else:
+            q = ct.astype(ct.load(Q, index=(bidx, k_block), shape=(M_TILE, K_TILE), padding_mode=ct.PaddingMode.ZERO), ct.int32)
+
+        scale = ct.astype(ct.load(Scales, index=(bidx, k_block), shape=(M_TILE, GROUPS), padding_mode=ct.PaddingMode.ZERO), ct.float32)
+        zero = ct.astype(ct.load(Zeros, index=(bidx, k_block), shape=(M_TILE, GROUPS), padding_mode=ct.PaddingMode.ZERO), ct.float32)
+
+        # (M_TILE, GROUPS, GROUP): one scale and zero-point per group
+        w = (ct.astype(ct.reshape(q, (M_TILE, GROUPS, GROUP)), ct.float32) - ct.expand_dims(zero, 2)) * ct.expand_dims(scale, 2)
+        acc = acc + ct.sum(ct.sum(w * ct.reshape(x, (1, GROUPS, GROUP)), axis=2), axis=1)
+
+    ct.store(Y, index=(bidx,), tile=ct.astype(acc, Y.dtype))
+
+
+# Input
+# - Q: uint8 codes of a (m, k) weight, (m, kp) for bits=8 or (m, kp // 2) for bits=4,
+#   where kp is k rounded up to a multiple of group_size
+# - Scales (float16) and Zeros (uint8) of shape (m, kp // group_size)
+# - Vector x of size k (float32, float16 or bfloat16)
+# Output
+# - Vector y = dequant(Q) @ x of size m
+def solution(q, scales, zeros, x, y, m: int, k: int, bits: int, group_size: int):
+    if bits not in (4, 8):
+        raise ValueError(f"bits must be 4 or 8, not {bits}")
+    if K_TILE % group_size:
+        raise ValueError(f"group_size must divide {K_TILE}, not {group_size}")
+    kp = -(-k // group_size) * group_size
+    if tuple(q.shape) != (m, kp * bits // 8) or tuple(scales.shape) != (m, kp // group_size):
+        raise ValueError(f"expected codes {(m, kp * bits // 8)} and scales {(m, kp // group_size)}, got {tuple(q.shape)} and {tuple(scales.shape)}")
+    grid = (ct.cdiv(m, M_TILE),)
+    # x past k loads as zero, so padded columns never contribute.
+    args = (q, scales, zeros, x, y, M_TILE, K_TILE, ct.cdiv(k, K_TILE), group_size, bits)
+    ct.launch(cupy.cuda.get_current_stream(), grid, quant_gemv_kernel, args)
+
+
+if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+
+    import numpy as np
+    import torch
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from gpu_tile import quant
+
+    test_configs = [
+        # (M, K, bits, group_size)
+        (2048, 131072, 8, 128),
+        (2048, 131072, 4, 128),
+        (4096, 4096, 4, 64),
+        (1000, 3000, 4, 128),
+        (1000, 3000, 8, 256),
+    ]
+
+    print("Testing quantized GEMV:")
+    all_passed = True
+
+    for M, K, bits, group_size in test_configs:
+        rng = np.random.default_rng(0)
+        w = rng.standard_normal((M, K), dtype=np.float32)
+        x = rng.standard_normal(K, dtype=np.float32)
+        qw = quant.quantize(w, bits, group_size)
+        q, scales, zeros = (torch.from_numpy(a).cuda() for a in (qw.q, qw.scales, qw.zeros))
+        y = torch.empty(M, dtype=torch.float32, device="cuda")
+
+        solution(q, scales, zeros, torch.from_numpy(x).cuda(), y, M, K, bits, group_size)
+
+        # Tolerance: the kernel against the dequantized weight, float32 accumulation.
+        expected = quant.reference_gemv(qw, x)
+        result = y.cpu().numpy()
+        rel = np.abs(result - expected).max() / np.abs(expected).max()
+        fp32_err = np.linalg.norm(result - w @ x) / np.linalg.norm(w @ x)
+        label = f"M={M}, K={K}, int{bits}, group={group_size} ({fp32_err:.1%} from fp32 weights)"
+        if rel < 1e-4:
+            print(f"  ✓ {label}")
+        else:
+            print(f"  ✗ {label} - Max rel diff: {rel}")
+            all_passed = False
+
+    if all_passed:
+        print("✓ All tests passed!")
+    else:
+        print("✗ Some tests failed!")
@@ -0,0 +1,156 @@
+import cuda.tile as ct
+import cupy
+
+# Sparse matrix-vector multiply, y = A @ x, for A in CSR or BSR form. The host
+# side (conversion, row binning, choosing dense vs sparse) is gpu_tile/sparse.py.
+#
+# CSR rows are binned by length on the host. Short rows get one lane each:
+# R_TILE rows per block, and lane i walks row i. Long rows get one block each,
+# which reads the row NNZ_TILE nonzeros at a time, coalesced. Padded lanes and
+# positions past the end of a row use index -1, which gathers as 0 and
+# scatters nowhere.
+
+R_TILE = 128
+NNZ_TILE = 256
+
+
+@ct.kernel
+def csr_short_rows_kernel(Indptr, Indices, Data, X, Y, Rows, max_nnz: int, R_TILE: ct.Constant[int]):
+    bid = ct.bid(0)
+    rows = ct.gather(Rows, bid * R_TILE + ct.arange(R_TILE, dtype=ct.int32), padding_value=-1)
+    start = ct.gather(Indptr, rows)
+    end = ct.gather(Indptr, rows + 1)
+
+    acc = ct.zeros((R_TILE,), dtype=ct.float32)
+    for j in range(max_nnz):
+        idx = ct.where(start + j < end, start + j, -1)
+        cols = ct.gather(Indices, idx, padding_value=-1)
+        acc = acc + ct.astype(ct.gather(Data, idx), ct.float32) * ct.astype(ct.gather(X, cols), ct.float32)
+
+    ct.scatter(Y, rows, ct.astype(acc, Y.dtype))
+
+
+@ct.kernel
+def csr_long_rows_kernel(Indptr, Indices, Data, X, Y, Rows, num_chunks: int, NNZ_TILE: ct.Constant[int]):
+    bid = ct.bid(0)
+    row = ct.load(Rows, index=(bid,), shape=(1,))
+    start = ct.gather(Indptr, row)
+    end = ct.gather(Indptr, row + 1)
+
+    acc = ct.zeros((NNZ_TILE,), dtype=ct.float32)
+    for c in range(num_chunks):
+        pos = start + c * NNZ_TILE + ct.arange(NNZ_TILE, dtype=ct.int32)
+        idx = ct.where(pos < end, pos, -1)
+        cols = ct.gather(Indices, idx, padding_value=-1)
+        acc = acc + ct.astype(ct.gather(Data, idx), ct.float32) * ct.astype(ct.gather(X, cols), ct.float32)
+
+    ct.scatter(Y, row, ct.astype(ct.sum(acc, axis=0, keepdims=True), Y.dtype))
+
+
+# BSR: one block row per program. Each nonzero (BM, BK) block is a full tile,
+# as the M_TILE x K_TILE loads of 05-optimize-matrix-vector-multiplication.
+# Its position comes from Indptr in device memory, so it is fetched with a
+# gather over the block's (BM, BK) index tile; the addresses are contiguous
+# and the access coalesces like a load.
+@ct.kernel
+def bsr_kernel(Indptr, Indices, Blocks, X, Y, max_blocks: int, BM: ct.Constant[int], BK: ct.Constant[int]):
+    bid = ct.bid(0)
+    start = ct.load(Indptr, index=(bid,), shape=(1,))
+    end = ct.load(Indptr, index=(bid + 1,), shape=(1,))
+    r = ct.expand_dims(ct.arange(BM, dtype=ct.int32), 1)
+    c = ct.expand_dims(ct.arange(BK, dtype=ct.int32), 0)
+
+    acc = ct.zeros((BM,), dtype=ct.float32)
+    for j in range(max_blocks):
+        b = ct.where(start + j < end, start + j, -1)
+        col = ct.gather(Indices, b, padding_value=-1)
+        block = ct.astype(ct.gather(Blocks, (ct.reshape(b, (1, 1)), r, c)), ct.float32)
+        x = ct.astype(ct.gather(X, ct.where(col >= 0, col * BK + ct.arange(BK, dtype=ct.int32), -1)), ct.float32)
+        acc = acc + ct.sum(block * ct.expand_dims(x, 0), axis=1)
+
+    ct.store(Y, index=(bid,), tile=ct.astype(acc, Y.dtype))
+
+
+# Input
+# - CSR: indptr (m + 1) and indices (nnz) int32, data (nnz) float32/float16/bfloat16
+# - x of size k
+# - The row bins from gpu_tile.sparse.bin_rows: short and long row ids (int32
+#   device arrays) and the longest row in each bin
+# Output
+# - y = A @ x of size m
+def solution(indptr, indices, data, x, y, short_rows, long_rows, short_nnz: int, long_nnz: int):
+    stream = cupy.cuda.get_current_stream()
+    if short_rows.shape[0]:
+        grid = (ct.cdiv(short_rows.shape[0], R_TILE),)
+        ct.launch(stream, grid, csr_short_rows_kernel, (indptr, indices, data, x, y, short_rows, short_nnz, R_TILE))
+    if long_rows.shape[0]:
+        grid = (long_rows.shape[0],)
+        args = (indptr, indices, data, x, y, long_rows, ct.cdiv(long_nnz, NNZ_TILE), NNZ_TILE)
+        ct.launch(stream, grid, csr_long_rows_kernel, args)
+
+
+# Input
+# - BSR: indptr (m / bm + 1) and block column indices (nnzb) int32, blocks (nnzb, bm, bk)
+#   with bm and bk powers of two, and the most blocks in any block row
+# - x of size k
+# Output
+# - y = A @ x of size m (rounded up to a multiple of bm, or shorter: rows past y are dropped)
+def solution_bsr(indptr, indices, blocks, x, y, max_blocks: int):
+    _, bm, bk = blocks.shape
+    grid = (indptr.shape[0] - 1,)
+    ct.launch(cupy.cuda.get_current_stream(), grid, bsr_kernel, (indptr, indices, blocks, x, y, max_blocks, bm, bk))
+
+
+if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+
+    import numpy as np
+    import torch
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from gpu_tile import sparse
+
+    def cuda(a):
+        return torch.from_numpy(np.ascontiguousarray(a)).cuda()
+
+    test_configs = [
+        # (M, K, density, skewed rows)
+        (2048, 4096, 0.01, False),
+        (2048, 4096, 0.05, True),
+        (4096, 16384, 0.001, True),
+        (1000, 3000, 0.1, False),
+    ]
+
+    print("Testing SpMV:")
+    all_passed = True
+
+    for M, K, density, skew in test_configs:
+        rng = np.random.default_rng(0)
+        a = sparse.random_sparse(rng, M, K, density, skew=skew)
+        x = rng.standard_normal(K, dtype=np.float32)
+        expected = a.astype(np.float64) @ x
+
+        csr = sparse.CSR.from_dense(a)
+        bins = csr.bins()
+        y = torch.empty(M, device="cuda")
+        solution(cuda(csr.indptr), cuda(csr.indices), cuda(csr.data), cuda(x), y,
+                 cuda(bins.short), cuda(bins.long), bins.short_nnz, bins.long_nnz)
+        csr_ok = np.allclose(y.cpu().numpy(), expected, rtol=1e-4, atol=1e-4)
+
+        bsr = sparse.BSR.from_dense(a, (16, 64))
+        y = torch.empty(bsr.shape[0], device="cuda")
+        solution_bsr(cuda(bsr.indptr), cuda(bsr.indices), cuda(bsr.blocks), cuda(x), y, bsr.max_blocks)
+        bsr_ok = np.allclose(y.cpu().numpy()[:M], expected, rtol=1e-4, atol=1e-4)
+
+        label = f"M={M}, K={K}, density={density:g}{', skewed' if skew else ''} ({sparse.choose(a)} preferred)"
+        if csr_ok and bsr_ok:
+            print(f"  ✓ {label}")
+        else:
+            print(f"  ✗ {label} - csr {'ok' if csr_ok else 'wrong'}, bsr {'ok' if bsr_ok else 'wrong'}")
+            all_passed = False
+
+    if all_passed:
+        print("✓ All tests passed!")
+    else:
+        print("✗ Some tests failed!")
@@ -0,0 +1,235 @@
+import sys
+from pathlib import Path
+
+import cuda.tile as ct
+import cupy
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from gpu_tile import scan_plan  # noqa: E402
+
+# Prefix sums: inclusive, exclusive and segmented scans along any axis. The
+# strategy and tiles come from gpu_tile/scan_plan.py.
+
+
+# Block-local scan of an (outer, n, inner) view along n. Each block owns
+# O_TILE x I_TILE whole lines and walks them N_TILE at a time; the running
+# carry holds each line's total so far.
+@ct.kernel
+def scan_local_kernel(
+    X, Y, EXCLUSIVE: ct.Constant[int], INTEGER: ct.Constant[int],
+    O_TILE: ct.Constant[int], N_TILE: ct.Constant[int], I_TILE: ct.Constant[int], NUM_N_TILES: ct.Constant[int],
+):
+    bo = ct.bid(0)
+    bi = ct.bid(1)
+    if INTEGER:
+        carry = ct.zeros((O_TILE, 1, I_TILE), dtype=ct.int32)
+    else:
+        carry = ct.zeros((O_TILE, 1, I_TILE), dtype=ct.float32)
+
+    for t in range(NUM_N_TILES):
+        x = ct.load(X, index=(bo, t, bi), shape=(O_TILE, N_TILE, I_TILE), padding_mode=ct.PaddingMode.ZERO)
+        if INTEGER:
+            x = ct.astype(x, ct.int32)
+        else:
+            x = ct.astype(x, ct.float32)
+        s = ct.cumsum(x, axis=1) + carry
+        carry = carry + ct.sum(x, axis=1, keepdims=True)
+        if EXCLUSIVE:
+            s = s - x
+        ct.store(Y, index=(bo, t, bi), tile=ct.astype(s, Y.dtype))
+
+
+# Single-pass scan of (lines, n) with decoupled look-back. Each block scans one
+# (ROWS, TILE) chunk of a line and chains onto the chunks before it through
+# per-chunk status words:
+#
+#   Status[c]      0 = nothing yet, 1 = Aggregates[c] is set, 2 = Prefixes[c] is set
+#   Aggregates[c]  the chunk's own total (segmented: the sum since its last head)
+#   Prefixes[c]    the inclusive prefix up to the end of the chunk
+#   Heads[c]       the chunk holds a segment head (segmented scans only)
+#
+# A block publishes its aggregate, then reads the statuses of up to LOOKBACK
+# predecessors at a time, nearest first, until it finds an inclusive prefix, a
+# chunk with a segment head, or the start of its line. Blocks are not scheduled
+# in launch order, so chunk ids come from an atomic counter in the order blocks
+# start: every chunk a block waits on belongs to a block that is already
+# running, and the look-back always terminates. Atomics default to acq_rel at
+# device scope: the flag update releases the value stored before it, and the
+# add-zero read of a flag acquires it.
+@ct.kernel
+def scan_lookback_kernel(
+    X, Y, Counter, Status, Aggregates, Prefixes, Flags, Heads,
+    EXCLUSIVE: ct.Constant[int], INTEGER: ct.Constant[int], SEGMENTED: ct.Constant[int],
+    ROWS: ct.Constant[int], TILE: ct.Constant[int], CHUNKS: ct.Constant[int], LOOKBACK: ct.Constant[int],
+):
+    chunk = ct.atomic_add(Counter, ct.zeros((1,), dtype=ct.int32), 1)
+    line = chunk // CHUNKS
+    first = line * CHUNKS  # the line's first chunk: nothing before it is folded in
+
+    r = ct.reshape(ct.arange(ROWS, dtype=ct.int32), (ROWS, 1))
+    t = ct.reshape(ct.arange(TILE, dtype=ct.int32), (1, TILE))
+    cols = ct.reshape((chunk - first) * (ROWS * TILE), (1, 1)) + r * TILE + t
+    rows = ct.reshape(line, (1, 1))
+    x = ct.gather(X, (rows, cols))
+    if INTEGER:
+        x = ct.astype(x, ct.int32)
+        prefix = ct.zeros((1,), dtype=ct.int32)
+    else:
+        x = ct.astype(x, ct.float32)
+        prefix = ct.zeros((1,), dtype=ct.float32)
+
+    if SEGMENTED:
+        h = ct.astype(ct.gather(Flags, (rows, cols)) != 0, ct.int32)
+        seg = ct.cumsum(h, axis=1)  # heads so far in the row
+        # Row-local segmented scan: s[r, i] sums x[r, j] for j <= i in the same segment.
+        same = (ct.expand_dims(seg, 2) == ct.expand_dims(seg, 1)) & (ct.reshape(t, (1, TILE, 1)) >= ct.reshape(t, (1, 1, TILE)))
+        s = ct.sum(ct.where(same, ct.expand_dims(x, 1), 0), axis=2)
+        # Row r continues the rows before it back to the last one with a head.
+        row_total = ct.sum(ct.where(t == TILE - 1, s, 0), axis=1)
+        row_head = ct.max(h, axis=1)
+        row_seg = ct.cumsum(row_head, axis=0)
+        before = row_seg - row_head  # heads in the rows before r
+        q = ct.reshape(ct.arange(ROWS, dtype=ct.int32), (1, ROWS))
+        take = (q < r) & (ct.expand_dims(row_seg, 0) == ct.expand_dims(before, 1))
+        carry = ct.sum(ct.where(take, ct.expand_dims(row_total, 0), 0), axis=1, keepdims=True)
+        s = s + ct.where(seg == 0, carry, 0)
+        # only elements before the chunk's first head continue the previous chunk
+        open_ = (seg == 0) & (ct.expand_dims(before, 1) == 0)
+        has_head = ct.max(row_seg, axis=0, keepdims=True)
+    else:
+        s = ct.cumsum(x, axis=1)
+        row_total = ct.sum(x, axis=1)
+        s = s + ct.expand_dims(ct.cumsum(row_total, axis=0) - row_total, 1)
+        has_head = ct.zeros((1,), dtype=ct.int32)
+    aggregate = ct.sum(ct.sum(ct.where((r == ROWS - 1) & (t == TILE - 1), s, 0), axis=1), axis=0, keepdims=True)
+
+    # publish the aggregate
+    ct.scatter(Aggregates, chunk, aggregate)
+    if SEGMENTED:
+        ct.scatter(Heads, chunk, has_head)
+    ct.atomic_add(Status, chunk, 1)
+
+    lanes = ct.arange(LOOKBACK, dtype=ct.int32)
+    end = chunk  # predecessors [first, end) are still to be folded in
+    todo = ct.sum(chunk - first, axis=0)
+    while todo > 0:
+        idx = end - LOOKBACK + lanes
+        valid = idx >= first
+        status = ct.atomic_add(Status, ct.where(valid, idx, -1), 0)
+        status = ct.where(valid, status, 2)  # before the line start: an empty prefix
+        stop = status == 2
+        if SEGMENTED:
+            stop = stop | (ct.gather(Heads, ct.where(status == 1, idx, -1)) != 0)
+        last = ct.max(ct.where(stop, lanes, -1), axis=0)  # nearest stop, -1 if none in the window
+        # ready once every lane from the stop up has published
+        ready = ct.min(ct.where(lanes > last, status, 2), axis=0) > 0
+        # only lanes from the stop up are read: the stop's prefix (or, for a
+        # head, its aggregate) and the aggregates after it
+        need = valid & (lanes >= last)
+        prefixes = ct.gather(Prefixes, ct.where(need & (status == 2), idx, -1))
+        aggregates = ct.gather(Aggregates, ct.where(need & (status == 1), idx, -1))
+        folded = ct.sum(prefixes + aggregates, axis=0, keepdims=True)
+        prefix = prefix + ct.where(ready, folded, 0)
+        end = end - ct.where(ready, LOOKBACK, 0)
+        todo = ct.where(ready, ct.where(last >= 0, 0, todo - LOOKBACK), todo)
+
+    # publish the inclusive prefix, then write the chunk out
+    if SEGMENTED:
+        inclusive = ct.where(has_head > 0, aggregate, prefix + aggregate)
+    else:
+        inclusive = prefix + aggregate
+    ct.scatter(Prefixes, chunk, inclusive)
+    ct.atomic_add(Status, chunk, 1)
+
+    if SEGMENTED:
+        y = s + ct.where(open_, ct.reshape(prefix, (1, 1)), 0)
+    else:
+        y = s + ct.reshape(prefix, (1, 1))
+    if EXCLUSIVE:
+        y = y - x
+    ct.scatter(Y, (rows, cols), ct.astype(y, Y.dtype))
+
+
+# Input
+# - Array X (float16, bfloat16, float32 or int32) and an output array Y of the same shape
+# - axis: the axis to scan; exclusive: shift by one, starting from 0
+# - flags: segment heads of X's shape, scanned along the last axis; each nonzero entry restarts the sum
+# Output
+# - Y = cumsum(X, axis) (minus X when exclusive), per segment when flags is given
+def solution(input, output, axis: int = -1, exclusive: bool = False, flags=None):
+    plan = scan_plan.plan(input.shape, axis, segmented=flags is not None)
+    integer = int(scan_plan.accumulator(input.dtype) == "int32")
+    outer, n, inner = plan.shape
+    stream = cupy.cuda.get_current_stream()
+
+    if plan.strategy == "local":
+        args = (input.reshape((outer, n, inner)), output.reshape((outer, n, inner)), int(exclusive), integer, *plan.tiles.values())
+        ct.launch(stream, plan.grid, scan_local_kernel, args)
+        return
+
+    chunks = plan.grid[0]
+    acc = cupy.int32 if integer else cupy.float32
+    counter = cupy.zeros((1,), dtype=cupy.int32)
+    status = cupy.zeros((chunks,), dtype=cupy.int32)
+    aggregates = cupy.empty((chunks,), dtype=acc)
+    prefixes = cupy.empty((chunks,), dtype=acc)
+    # absent segment flags and heads: placeholder arrays that are never read
+    heads = cupy.zeros((chunks,), dtype=cupy.int32) if flags is not None else status
+    flags = flags.reshape((outer, n)) if flags is not None else status
+    args = (
+        input.reshape((outer, n)), output.reshape((outer, n)), counter, status, aggregates, prefixes, flags, heads,
+        int(exclusive), integer, int(plan.segmented), *plan.tiles.values(),
+    )
+    ct.launch(stream, plan.grid, scan_lookback_kernel, args)
+
+
+if __name__ == "__main__":
+    import numpy as np
+    import torch
+
+    test_configs = [
+        # (shape, axis, segment head density or None)
+        ((1 << 24,), 0, None),
+        ((1000,), 0, None),
+        ((8, 1 << 20), 1, None),
+        ((4096, 2048), 1, None),
+        ((64, 4096, 32), 1, None),
+        ((16, 256, 256), 0, None),
+        ((1 << 22,), 0, 0.001),
+        ((4, 100_000), 1, 0.01),
+    ]
+
+    print("Testing prefix scan:")
+    all_passed = True
+
+    for dtype in (torch.float32, torch.float16, torch.int32):
+        for shape, axis, density in test_configs:
+            if dtype == torch.int32:
+                x = torch.randint(-100, 100, shape, dtype=dtype, device="cuda")
+            else:
+                x = torch.randn(*shape, device="cuda").to(dtype)
+            flags = (torch.rand(*shape, device="cuda") < density).to(torch.int8) if density is not None else None
+            for exclusive in (False, True):
+                y = torch.empty_like(x)
+                solution(x, y, axis, exclusive, flags)
+
+                expected = scan_plan.reference(x.cpu().numpy(), axis, exclusive, None if flags is None else flags.cpu().numpy())
+                result = y.cpu().numpy().astype(np.float64)
+                label = f"{tuple(shape)}, axis={axis}, {str(dtype).removeprefix('torch.')}"
+                label += f"{', exclusive' if exclusive else ''}{', segmented' if flags is not None else ''}"
+                label += f" ({scan_plan.plan(shape, axis, flags is not None).strategy})"
+                if dtype == torch.int32:
+                    ok = np.array_equal(result, expected.astype(np.int32))
+                else:
+                    # Tolerance: float32 running sums, compared to the size of the sums themselves.
+                    ok = np.allclose(result, expected, rtol=1e-3, atol=1e-3 * np.sqrt(shape[axis]))
+                if ok:
+                    print(f"  ✓ {label}")
+                else:
+                    print(f"  ✗ {label} - Max diff: {np.abs(result - expected).max()}")
+                    all_passed = False
+
+    if all_passed:
+        print("✓ All tests passed!")
+    else:
+        print("✗ Some tests failed!")
@@ -4,6 +4,10 @@ import cutlass.cute as cute
 from cutlass.cute.runtime import from_dlpack
 import argparse
 import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from gpu_tile import conv_plan, occupancy  # noqa: E402
 
 @cute.kernel
 def conv1d_kernel(gX: cute.Tensor, gW: cute.Tensor, gY: cute.Tensor, gIdx: cute.Tensor, tv_layout: cute.Layout, stride: cutlass.Int32, padding: cutlass.Int32, total_out_size: cutlass.Int32):
@@ -43,7 +47,7 @@ def conv1d_kernel(gX: cute.Tensor, gW: cute.Tensor, gY: cute.Tensor, gIdx: cute.
 @cute.jit
 def conv1d(X: cute.Tensor, W: cute.Tensor, Y: cute.Tensor, stride: cutlass.Int32, padding: cutlass.Int32):
     # Idiomatic CuTe: Define layouts and tiling
-    threads_per_block = 128
+    threads_per_block = THREADS
     values_per_thread = 1
     
     thr_layout = cute.make_layout(threads_per_block)
@@ -66,8 +70,92 @@ def conv1d(X: cute.Tensor, W: cute.Tensor, Y: cute.Tensor, stride: cutlass.Int32
         block=(threads_per_block, 1, 1)
     )
 
-def test_conv1d(L, K, S, P):
-    print(f"Testing L={L}, K={K}, S={S}, P={P}")
+# Table mode: gpu_tile.conv_plan precomputes, per block of THREADS outputs, the
+# input origin of tap 0, and per thread of each edge block the valid taps
+# [k_lo, k_hi). Interior blocks run a kernel with no index checks at all.
+THREADS = 128
+
+
+@cute.kernel
+def conv1d_interior_kernel(gX: cute.Tensor, gW: cute.Tensor, gY: cute.Tensor, gOrigin: cute.Tensor, stride: cutlass.Int32, first_block: cutlass.Int32):
+    tidx, _, _ = cute.arch.thread_idx()
+    bidx, _, _ = cute.arch.block_idx()
+
+    blk = first_block + bidx
+    start = gOrigin[blk] + tidx * stride
+
+    # Every tap is in bounds: no predicates, and K is static so this unrolls.
+    acc = 0.0
+    for k in range(cute.size(gW)):
+        acc += gX[start + k] * gW[k]
+    gY[blk * THREADS + tidx] = acc
+
+
+@cute.kernel
+def conv1d_edge_kernel(gX: cute.Tensor, gW: cute.Tensor, gY: cute.Tensor, gOrigin: cute.Tensor, gEdge: cute.Tensor, gTaps: cute.Tensor, stride: cutlass.Int32):
+    tidx, _, _ = cute.arch.thread_idx()
+    bidx, _, _ = cute.arch.block_idx()
+
+    blk = gEdge[bidx]
+    row = (bidx * THREADS + tidx) * 2
+    k_lo = gTaps[row]
+    k_hi = gTaps[row + 1]
+
+    # k_hi < 0 marks threads past the end of the output.
+    if k_hi >= 0:
+        start = gOrigin[blk] + tidx * stride
+        acc = 0.0
+        for k in range(k_lo, k_hi):
+            acc += gX[start + k] * gW[k]
+        gY[blk * THREADS + tidx] = acc
+
+
+@cute.jit
+def conv1d_tables(X: cute.Tensor, W: cute.Tensor, Y: cute.Tensor, origins: cute.Tensor, edge: cute.Tensor, taps: cute.Tensor, stride: cutlass.Int32, first_block: cutlass.Int32, num_interior: cutlass.Constexpr, num_edge: cutlass.Constexpr):
+    if num_interior > 0:
+        conv1d_interior_kernel(X, W, Y, origins, stride, first_block).launch(
+            grid=(num_interior, 1, 1),
+            block=(THREADS, 1, 1)
+        )
+    if num_edge > 0:
+        conv1d_edge_kernel(X, W, Y, origins, edge, taps, stride).launch(
+            grid=(num_edge, 1, 1),
+            block=(THREADS, 1, 1)
+        )
+
+
+def make_tables(L, K, S, P, device="cuda"):
+    """Index tables for conv1d_tables as int32 torch tensors, plus the plan."""
+    plan = conv_plan.plan(L, K, S, P, block=THREADS)
+    origins = torch.tensor(plan.origins, dtype=torch.int32, device=device)
+    # Empty tables still need one element to be passed as tensors.
+    edge = torch.tensor(plan.edge or (0,), dtype=torch.int32, device=device)
+    taps = torch.tensor([k for pair in plan.taps for k in pair] or [0, -1], dtype=torch.int32, device=device)
+    return plan, origins, edge, taps
+
+
+def compile_conv1d(x_torch, w_torch, y_torch, S, P, mode="identity"):
+    """Compile either kernel variant and return a zero-argument launcher."""
+    X, W, Y = from_dlpack(x_torch), from_dlpack(w_torch), from_dlpack(y_torch)
+    if mode == "identity":
+        compiled = cute.compile(conv1d, X, W, Y, cutlass.Int32(S), cutlass.Int32(P))
+        return lambda: compiled(X, W, Y, cutlass.Int32(S), cutlass.Int32(P))
+
+    plan, origins, edge, taps = make_tables(x_torch.numel(), w_torch.numel(), S, P, device=x_torch.device)
+    tables = (from_dlpack(origins), from_dlpack(edge), from_dlpack(taps))
+    scalars = (cutlass.Int32(S), cutlass.Int32(plan.interior.start))
+    compiled = cute.compile(conv1d_tables, X, W, Y, *tables, *scalars, len(plan.interior), len(plan.edge))
+
+    def run():
+        compiled(X, W, Y, *tables, *scalars)
+
+    # Keep the table tensors alive as long as the launcher.
+    run.tables = (origins, edge, taps)
+    return run
+
+
+def test_conv1d(L, K, S, P, mode="identity"):
+    print(f"Testing L={L}, K={K}, S={S}, P={P}, mode={mode}")
     
     # Calculate output size: (L + 2*P - K) // S + 1
     out_size = (L + 2 * P - K) // S + 1
@@ -77,8 +165,8 @@ def test_conv1d(L, K, S, P):
     y_torch = torch.zeros(out_size, dtype=torch.float32, device="cuda")
     
     # Compile and run
-    conv1d_compiled = cute.compile(conv1d, from_dlpack(x_torch), from_dlpack(w_torch), from_dlpack(y_torch), cutlass.Int32(S), cutlass.Int32(P))
-    conv1d_compiled(from_dlpack(x_torch), from_dlpack(w_torch), from_dlpack(y_torch), cutlass.Int32(S), cutlass.Int32(P))
+    run = compile_conv1d(x_torch, w_torch, y_torch, S, P, mode)
+    run()
     
     # Verification
     x_4d = x_torch.view(1, 1, L)
@@ -93,8 +181,8 @@ def test_conv1d(L, K, S, P):
         print(f"  Max diff: {(y_torch - expected).abs().max()}")
     return is_correct
 
-def benchmark_conv1d(L=2**20, K=15, S=3, P=1, iters=100):
-    print(f"Benchmarking: L={L}, K={K}, S={S}, P={P}, iters={iters}")
+def benchmark_conv1d(L=2**20, K=15, S=3, P=1, iters=100, mode="identity"):
+    print(f"Benchmarking: L={L}, K={K}, S={S}, P={P}, iters={iters}, mode={mode}")
     
     out_size = (L + 2 * P - K) // S + 1
     x_torch = torch.randn(L, dtype=torch.float32, device="cuda")
@@ -102,11 +190,11 @@ def benchmark_conv1d(L=2**20, K=15, S=3, P=1, iters=100):
     y_torch = torch.zeros(out_size, dtype=torch.float32, device="cuda")
     
     # Compile
-    conv1d_compiled = cute.compile(conv1d, from_dlpack(x_torch), from_dlpack(w_torch), from_dlpack(y_torch), cutlass.Int32(S), cutlass.Int32(P))
+    run = compile_conv1d(x_torch, w_torch, y_torch, S, P, mode)
     
     # Warmup
     for _ in range(10):
-        conv1d_compiled(from_dlpack(x_torch), from_dlpack(w_torch), from_dlpack(y_torch), cutlass.Int32(S), cutlass.Int32(P))
+        run()
     torch.cuda.synchronize()
     
     # Timing CuTe
@@ -115,7 +203,7 @@ def benchmark_conv1d(L=2**20, K=15, S=3, P=1, iters=100):
     
     start_event.record()
     for _ in range(iters):
-        conv1d_compiled(from_dlpack(x_torch), from_dlpack(w_torch), from_dlpack(y_torch), cutlass.Int32(S), cutlass.Int32(P))
+        run()
     end_event.record()
     torch.cuda.synchronize()
     
@@ -145,24 +233,23 @@ def benchmark_conv1d(L=2**20, K=15, S=3, P=1, iters=100):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--benchmark", action="store_true", help="Run benchmark")
+    parser.add_argument("--mode", choices=["identity", "tables", "both"], default="both",
+                        help="identity: per-element index math; tables: precomputed interior/edge tables")
     args = parser.parse_args()
+    modes = ["identity", "tables"] if args.mode == "both" else [args.mode]
+    print(occupancy.plan(occupancy.tv_tile("conv1d_kernel", THREADS, 1), occupancy.current_device()).summary())
     
     if args.benchmark:
-        benchmark_conv1d()
+        for mode in modes:
+            benchmark_conv1d(mode=mode)
     else:
-        test_cases = [
-            (1024, 3, 1, 0),
-            (1024, 3, 1, 1), # Same padding for K=3
-            (1024, 5, 1, 2), # Same padding for K=5
-            (1024, 3, 2, 1),
-            (2048, 7, 3, 3),
-            (512, 11, 4, 5),
-            (100, 3, 1, 0),
-        ]
+        # Shared with the planner self-check in gpu_tile/conv_plan.py
+        test_cases = conv_plan.TEST_CASES
         
         all_success = True
-        for L, K, S, P in test_cases:
-            if not test_conv1d(L, K, S, P):
-                all_success = False
+        for mode in modes:
+            for L, K, S, P in test_cases:
+                if not test_conv1d(L, K, S, P, mode):
+                    all_success = False
         
         print("\nOverall Status:", "PASS" if all_success else "FAIL")
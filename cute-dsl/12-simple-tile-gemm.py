@@ -2,6 +2,11 @@ import cutlass
 import cutlass.cute as cute
 from cutlass.cute.runtime import from_dlpack
 import torch
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from gpu_tile import occupancy  # noqa: E402
 
 # Tile sizes
 BM = cutlass.const_expr(128)
@@ -11,6 +16,10 @@ BK = cutlass.const_expr(32)
 TM = cutlass.const_expr(4) 
 TN = cutlass.const_expr(4)
 
+# Thread layout of a block: one TM x TN fragment of C per thread, so THREADS
+# x (TM, TN) must cover BM x BN (occupancy.gemm_tile checks this)
+THREADS = (32, 32)
+
 @cute.kernel
 def gemm_kernel(
     gA: cute.Tensor, gB: cute.Tensor, gC: cute.Tensor, 
@@ -107,13 +116,13 @@ def gemm_kernel(
 @cute.jit
 def simple_tile_gemm(A: cute.Tensor, B: cute.Tensor, C: cute.Tensor):
     # Thread layout: 32x32 = 1024 threads
-    thr_layout = cute.make_layout((32, 32), stride=(1, 32))
+    thr_layout = cute.make_layout(THREADS, stride=(1, THREADS[0]))
 
-    valA = cute.make_layout((4, 1)) # (4,1): (1,0)
-    valB = cute.make_layout((1, 4)) # (1,4): (0,1)
+    valA = cute.make_layout((TM, 1)) # (4,1): (1,0)
+    valB = cute.make_layout((1, TN)) # (1,4): (0,1)
 
     # 핵심: C의 per-thread 4x4는 row-major
-    valC = cute.make_layout((4, 4), stride=(4, 1))
+    valC = cute.make_layout((TM, TN), stride=(TN, 1))
 
     tilerA, tvA = cute.make_layout_tv(thr_layout, valA)
     tilerB, tvB = cute.make_layout_tv(thr_layout, valB)
@@ -163,6 +172,9 @@ def test_gemm(M, N, K):
 
 
 if __name__ == "__main__":
+    # Fails here, before compiling, if the block cannot fit this GPU
+    launch = occupancy.gemm_tile(BM, BN, BK, thr=THREADS, val=(TM, TN))
+    print(occupancy.plan(launch, occupancy.current_device()).summary())
     test_gemm(512, 1024, 512)
     test_gemm(333, 333, 333)
     test_gemm(8192, 6144, 4096)
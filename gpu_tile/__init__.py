@@ -0,0 +1,5 @@
+"""Host-side tooling shared by the cuda-tile, cute-dsl and triton examples.
+
+Submodules are imported explicitly (``from gpu_tile import profiling``) so that
+importing the package never pulls in torch, cupy, cutlass or triton.
+"""
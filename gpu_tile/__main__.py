@@ -0,0 +1,5 @@
+import sys
+
+from gpu_tile.cli import main
+
+sys.exit(main())
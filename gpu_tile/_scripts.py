@@ -0,0 +1,31 @@
+"""Load the numbered example scripts (``cuda-tile/03-conv1d.py``) as modules.
+
+The file names are not importable identifiers, so they are loaded by path.
+Each script is executed at most once per process; its ``__main__`` block does
+not run.
+"""
+
+import functools
+import importlib.util
+import re
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@functools.cache
+def load(relpath: str):
+    path = ROOT / relpath
+    if not path.is_file():
+        raise FileNotFoundError(f"No such script: {relpath}")
+    name = "_gpu_tile_script_" + re.sub(r"\W", "_", relpath.removesuffix(".py"))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
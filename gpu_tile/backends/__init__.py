@@ -0,0 +1,21 @@
+"""Backend implementations registered into ``gpu_tile.registry.REGISTRY``.
+
+Backend modules only declare implementations and capability predicates. torch,
+cupy, cutlass, triton and the example scripts are imported the first time an
+implementation actually runs.
+"""
+
+import importlib
+
+BACKENDS = ("numpy_ref", "cutile", "cute", "triton", "torch_ref")
+# Registered backend name -> module
+MODULES = {"numpy": "numpy_ref", "cutile": "cutile", "cute": "cute", "triton": "triton", "torch": "torch_ref"}
+
+
+def load(names=BACKENDS):
+    for name in names:
+        try:
+            importlib.import_module(f"gpu_tile.backends.{name}")
+        except ImportError:
+            # A backend whose host-side dependencies are missing stays unregistered.
+            pass
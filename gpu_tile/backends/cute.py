@@ -0,0 +1,74 @@
+"""CuTe DSL implementations backed by the scripts in ``cute-dsl/``.
+
+``cute.compile`` specializes on tensor shapes. Each op declares a shape policy
+(``gpu_tile/compile_cache.py``): lengths and matrix extents are dynamic, so
+variable sizes share a compiled function per alignment class, and the conv1d
+filter length is bucketed to a power of two so its tap loop stays static.
+"""
+
+from gpu_tile import _scripts
+from gpu_tile.compile_cache import CACHE, Dynamic, Pow2, ShapePolicy
+from gpu_tile.registry import all_of, contiguous, dtypes, lib, ndim, on, register, register_backend
+
+register_backend("cute", requires=("cutlass", "torch"))
+
+_device = all_of(lib("torch"), on("cuda"), contiguous)
+
+# cute-dsl/09 is unpredicated, so every length is a multiple of its 1024-element tile.
+_VECTOR_ADD = ShapePolicy((Dynamic(1024),), (Dynamic(1024),), (Dynamic(1024),))
+# x and y are dynamic; zero taps past the end of w add nothing, so w is padded to a power of two.
+_CONV1D = ShapePolicy((Dynamic(),), (Pow2(4),), (Dynamic(),))
+_GEMM = ShapePolicy((Dynamic(), Dynamic()), (Dynamic(), Dynamic()), (Dynamic(), Dynamic()))
+
+
+def _run(name, policy, fn, tensors, *scalars):
+    args = (*policy.mark(tensors), *scalars)
+
+    def build():
+        import cutlass.cute as cute
+
+        return cute.compile(fn, *args)
+
+    key = (policy.key([tuple(t.shape) for t in tensors]), str(tensors[0].dtype))
+    CACHE.get(name, key, build)(*args)
+
+
+def _whole_tiles(sig):
+    # cute-dsl/09 tiles by 128 threads x 8 values without predication.
+    return sig.arrays[0].numel % 1024 == 0
+
+
+@register("vector_add", "cute", supports=all_of(_device, ndim(1), dtypes("float16", "float32"), _whole_tiles), priority=1)
+def vector_add(a, b):
+    import cutlass.cute as cute
+    import torch
+
+    out = torch.empty_like(a)
+    mod = _scripts.load("cute-dsl/09-optimize-vector-addition.py")
+    _run("vector_add", _VECTOR_ADD, mod.solution, (a, b, out), cute.Int32(a.shape[0]), False)
+    return out
+
+
+@register("conv1d", "cute", supports=all_of(_device, ndim(1), dtypes("float32")), priority=1)
+def conv1d(x, w, stride=1, padding=0):
+    import cutlass
+    import torch
+
+    out_size = (x.shape[0] + 2 * padding - w.shape[0]) // stride + 1
+    out = torch.empty(out_size, dtype=x.dtype, device=x.device)
+    (k,) = _CONV1D.pad_shapes([tuple(x.shape), tuple(w.shape)])[1]
+    if k != w.shape[0]:
+        w = torch.nn.functional.pad(w, (0, k - w.shape[0]))
+    mod = _scripts.load("cute-dsl/10-1d-conv.py")
+    _run("conv1d", _CONV1D, mod.conv1d, (x, w, out), cutlass.Int32(stride), cutlass.Int32(padding))
+    return out
+
+
+@register("gemm", "cute", supports=all_of(_device, ndim(2), dtypes("float32")), priority=0)
+def gemm(a, b):
+    import torch
+
+    out = torch.empty(a.shape[0], b.shape[1], dtype=a.dtype, device=a.device)
+    mod = _scripts.load("cute-dsl/12-simple-tile-gemm.py")
+    _run("gemm", _GEMM, mod.simple_tile_gemm, (a, b, out))
+    return out
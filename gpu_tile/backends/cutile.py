@@ -0,0 +1,180 @@
+"""cuTile implementations backed by the scripts in ``cuda-tile/``."""
+
+from gpu_tile import _scripts
+from gpu_tile.registry import all_of, contiguous, dtypes, lib, ndim, on, register, register_backend
+
+register_backend("cutile", requires=("cuda.tile", "cupy", "torch"))
+
+_device = all_of(lib("torch"), on("cuda"), contiguous)
+
+# Kernels accumulate in float32 and round to the output dtype on store.
+_HALF = ("float16", "bfloat16", "float32")
+# Elementwise kernels can additionally store fp8 (e4m3).
+_ELEMENTWISE = ("float8_e4m3fn",) + _HALF
+
+
+@register("vector_add", "cutile", supports=all_of(_device, ndim(1), dtypes(*_ELEMENTWISE, "float64")), priority=2)
+def vector_add(a, b):
+    import torch
+
+    out = torch.empty_like(a)
+    _scripts.load("cuda-tile/01-vector-add.py").launch_vector_add(a, b, out)
+    return out
+
+
+def _same_conv(sig):
+    # cuda-tile/03 computes a centered ("same") convolution with stride 1.
+    x, w = sig.arrays
+    k = w.shape[0]
+    return k % 2 == 1 and sig.params.get("stride", 1) == 1 and sig.params.get("padding", 0) == k // 2
+
+
+@register("conv1d", "cutile", supports=all_of(_device, ndim(1), dtypes(*_HALF), _same_conv), priority=2)
+def conv1d(x, w, stride=1, padding=0):
+    import torch
+
+    out = torch.empty_like(x)
+    _scripts.load("cuda-tile/03-conv1d.py").solution(x, w, out, x.shape[0], w.shape[0])
+    return out
+
+
+@register("gemv", "cutile", supports=all_of(_device, ndim(2, 1), dtypes(*_HALF)), priority=2)
+def gemv(a, x, trans_a=False):
+    return fused_gemv(a, x, None, trans_a=trans_a)
+
+
+def _gemv_operands(sig):
+    # A, x, then the optional bias and residual vectors
+    return 2 <= len(sig.arrays) <= 4 and sig.arrays[0].ndim == 2 and all(a.ndim == 1 for a in sig.arrays[1:])
+
+
+@register("fused_gemv", "cutile", supports=all_of(_device, _gemv_operands, dtypes(*_HALF)), priority=2)
+def fused_gemv(a, x, bias=None, residual=None, activation=None, alpha=0.01, scale=1.0, trans_a=False):
+    import torch
+
+    k, m = a.shape if trans_a else a.shape[::-1]
+    out = torch.empty(m, dtype=a.dtype, device=a.device)
+    _scripts.load("cuda-tile/05-optimize-matrix-vector-multiplication.py").solution(
+        a, x, out, m, k, bias=bias, activation=activation, alpha=alpha, residual=residual, scale=scale, trans_a=trans_a
+    )
+    return out
+
+
+def _solution_2d(script):
+    # relu/gelu style scripts: solution(input, output, n, m)
+    def run(x):
+        import torch
+
+        out = torch.empty_like(x)
+        _scripts.load(script).solution(x, out, x.shape[0], x.shape[1])
+        return out
+
+    return run
+
+
+_elementwise_2d = all_of(_device, ndim(2), dtypes(*_ELEMENTWISE))
+
+register("relu", "cutile", _solution_2d("cuda-tile/02-relu.py"), supports=_elementwise_2d, priority=2)
+register("gelu", "cutile", _solution_2d("cuda-tile/08-gelu.py"), supports=_elementwise_2d, priority=2)
+
+
+@register("leaky_relu", "cutile", supports=_elementwise_2d, priority=2)
+def leaky_relu(x, alpha=0.01):
+    import torch
+
+    out = torch.empty_like(x)
+    _scripts.load("cuda-tile/06-leaky-relu.py").solution(x, alpha, out, x.shape[0], x.shape[1])
+    return out
+
+
+@register("avg_pool1d", "cutile", supports=all_of(_device, ndim(1), dtypes(*_HALF)), priority=2)
+def avg_pool1d(x, kernel_size, stride=1, padding=0):
+    import torch
+
+    h = x.shape[0]
+    out = torch.empty((h + 2 * padding - kernel_size) // stride + 1, dtype=x.dtype, device=x.device)
+    _scripts.load("cuda-tile/07-average-pool-1d.py").solution(x, kernel_size, stride, padding, out, h)
+    return out
+
+
+@register("pool1d", "cutile", supports=all_of(_device, ndim(1), dtypes(*_HALF)), priority=2)
+def pool1d(x, kernel_size, stride=1, padding=0, kind="avg", p=2.0, activation=None, alpha=0.01, scale=1.0):
+    import torch
+
+    h = x.shape[0]
+    out = torch.empty((h + 2 * padding - kernel_size) // stride + 1, dtype=x.dtype, device=x.device)
+    _scripts.load("cuda-tile/14-pooling.py").solution(
+        x, kernel_size, stride, padding, out, h, kind=kind, p=p, activation=activation, alpha=alpha, scale=scale
+    )
+    return out
+
+
+@register("sum_dim", "cutile", supports=all_of(_device, dtypes(*_HALF)), priority=2)
+def sum_dim(x, dim):
+    import torch
+
+    out_shape = list(x.shape)
+    out_shape[dim] = 1
+    # sum_dim_kernel accumulates with atomic_add, so the output starts at zero.
+    out = torch.zeros(out_shape, dtype=x.dtype, device=x.device)
+    _scripts.load("cuda-tile/09-sum-over-dimension.py").solution(x, dim, out, x.shape, x.ndim)
+    return out
+
+
+def _default_eps(sig):
+    return sig.params.get("eps", 1e-5) == 1e-5
+
+
+@register("rms_norm", "cutile", supports=all_of(_device, ndim(2), dtypes(*_HALF), _default_eps), priority=2)
+def rms_norm(x, eps=1e-5):
+    import torch
+
+    out = torch.empty_like(x)
+    _scripts.load("cuda-tile/10-rms-norm.py").solution(x, out, x.shape[0], x.shape[1])
+    return out
+
+
+def _rows(sig):
+    # x is (B, N); weight and bias, when given, are (N,)
+    x, *affine = sig.arrays
+    return x.ndim == 2 and all(a.shape == x.shape[1:] for a in affine)
+
+
+@register("layer_norm", "cutile", supports=all_of(_device, dtypes(*_HALF), _rows), priority=2)
+def layer_norm(x, weight=None, bias=None, eps=1e-5):
+    import torch
+
+    out = torch.empty_like(x)
+    _scripts.load("cuda-tile/15-layer-norm.py").solution(x, out, x.shape[0], x.shape[1], weight, bias, eps=eps)
+    return out
+
+
+@register("l1_norm", "cutile", supports=all_of(_device, ndim(2), dtypes(*_HALF)), priority=2)
+def l1_norm(x):
+    import torch
+
+    out = torch.empty_like(x)
+    _scripts.load("cuda-tile/12-l1-norm.py").solution(x, out, x.shape[0], x.shape[1])
+    return out
+
+
+@register("reduce", "cutile", supports=all_of(_device, dtypes(*_HALF)), priority=2)
+def reduce(x, op="sum", axes=None, keepdims=False):
+    import torch
+
+    from gpu_tile import reduce_plan
+
+    out_shape = reduce_plan.plan(x.shape, axes, op, keepdims).out_shape
+    out_dtype = torch.int64 if op in ("argmax", "argmin") else x.dtype
+    out = torch.empty(out_shape, dtype=out_dtype, device=x.device)
+    _scripts.load("cuda-tile/13-reduction.py").solution(x, out, axes, op, keepdims)
+    return out
+
+
+@register("cumsum", "cutile", supports=all_of(_device, dtypes(*_HALF, "int32")), priority=2)
+def cumsum(x, axis=-1, exclusive=False):
+    import torch
+
+    out = torch.empty_like(x)
+    _scripts.load("cuda-tile/18-scan.py").solution(x, out, axis, exclusive)
+    return out
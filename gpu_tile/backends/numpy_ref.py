@@ -0,0 +1,187 @@
+"""NumPy reference backend. Runs on the host and is the fallback without a GPU.
+
+Every op is vectorized: windows are strided views, reductions are single
+NumPy calls, and nothing loops over elements in Python. Like the cuTile
+kernels, narrow inputs (float16) are computed in float32 and rounded back to
+the input dtype; float64 stays float64.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided, sliding_window_view
+
+from gpu_tile import reduce_plan, scan_plan
+from gpu_tile.registry import on, register, register_backend
+
+register_backend("numpy", requires=("numpy",))
+
+_host = on("cpu")
+
+
+def _f32(x):
+    x = np.asarray(x)
+    return x if x.dtype == np.float64 else x.astype(np.float32, copy=False)
+
+
+def _like(y, x):
+    return y.astype(np.asarray(x).dtype, copy=False)
+
+
+def _gelu(x):
+    # tanh approximation, as F.gelu(approximate="tanh") and cuda-tile/08
+    return 0.5 * x * (1 + np.tanh(0.7978845608 * (x + 0.044715 * x**3)))
+
+
+def _activate(y, activation, alpha):
+    if activation == "relu":
+        return np.maximum(y, 0)
+    if activation == "leaky_relu":
+        return np.where(y > 0, y, alpha * y)
+    if activation == "gelu":
+        return _gelu(y)
+    return y
+
+
+@register("vector_add", "numpy", supports=_host, priority=-10)
+def vector_add(a, b):
+    return _like(np.add(_f32(a), _f32(b)), a)
+
+
+@register("gemv", "numpy", supports=_host, priority=-10)
+def gemv(a, x, trans_a=False):
+    a = _f32(a)
+    return _like((a.T if trans_a else a) @ _f32(x), x)
+
+
+@register("fused_gemv", "numpy", supports=_host, priority=-10)
+def fused_gemv(a, x, bias=None, residual=None, activation=None, alpha=0.01, scale=1.0, trans_a=False):
+    # act(scale * A @ x + bias) + residual, as cuda-tile/05
+    a = _f32(a)
+    y = (a.T if trans_a else a) @ _f32(x) * scale
+    if bias is not None:
+        y = y + _f32(bias)
+    y = _activate(y, activation, alpha)
+    if residual is not None:
+        y = y + _f32(residual)
+    return _like(y, x)
+
+
+@register("gemm", "numpy", supports=_host, priority=-10)
+def gemm(a, b):
+    return _like(_f32(a) @ _f32(b), a)
+
+
+@register("conv1d", "numpy", supports=_host, priority=-10)
+def conv1d(x, w, stride=1, padding=0):
+    # Cross-correlation, as F.conv1d: y[i] = sum_k x[i*S + k - P] * w[k]
+    xf = _f32(x)
+    xp = np.pad(xf, padding) if padding else xf
+    windows = sliding_window_view(xp, np.shape(w)[0])[::stride]
+    return _like(windows @ _f32(w), x)
+
+
+@register("relu", "numpy", supports=_host, priority=-10)
+def relu(x):
+    return np.maximum(x, 0)
+
+
+@register("leaky_relu", "numpy", supports=_host, priority=-10)
+def leaky_relu(x, alpha=0.01):
+    xf = _f32(x)
+    return _like(np.where(xf > 0, xf, alpha * xf), x)
+
+
+@register("gelu", "numpy", supports=_host, priority=-10)
+def gelu(x):
+    return _like(_gelu(_f32(x)), x)
+
+
+@register("avg_pool1d", "numpy", supports=_host, priority=-10)
+def avg_pool1d(x, kernel_size, stride=1, padding=0):
+    # Over the last axis, zero padding counted, as nn.AvgPool1d.
+    xf = _f32(x)
+    xp = np.pad(xf, [(0, 0)] * (xf.ndim - 1) + [(padding, padding)]) if padding else np.ascontiguousarray(xf)
+    out = (xp.shape[-1] - kernel_size) // stride + 1
+    step = xp.strides[-1]
+    windows = as_strided(xp, xp.shape[:-1] + (out, kernel_size), xp.strides[:-1] + (stride * step, step), writeable=False)
+    # One full-length add per tap; reducing the short window axis directly is ~5x slower.
+    acc = windows[..., 0].copy()
+    for k in range(1, kernel_size):
+        acc += windows[..., k]
+    return _like(acc / kernel_size, x)
+
+
+@register("pool1d", "numpy", supports=_host, priority=-10)
+def pool1d(x, kernel_size, stride=1, padding=0, kind="avg", p=2.0, activation=None, alpha=0.01, scale=1.0):
+    xf = _f32(x)
+    if kind in ("avg", "lp"):
+        # O(1) per output from a float64 prefix sum
+        v = np.abs(xf) ** p if kind == "lp" else xf
+        prefix = np.concatenate([[0.0], np.cumsum(np.pad(v, padding), dtype=np.float64)])
+        starts = np.arange((xf.shape[0] + 2 * padding - kernel_size) // stride + 1) * stride
+        y = prefix[starts + kernel_size] - prefix[starts]
+        y = (y / kernel_size if kind == "avg" else np.maximum(y, 0) ** (1 / p)).astype(xf.dtype)
+    else:
+        fill = -np.inf if kind == "max" else np.inf
+        combine = np.maximum if kind == "max" else np.minimum
+        windows = sliding_window_view(np.pad(xf, padding, constant_values=fill), kernel_size)[::stride]
+        y = windows[:, 0].copy()
+        for k in range(1, kernel_size):
+            combine(y, windows[:, k], out=y)
+    return _like(_activate(y * scale, activation, alpha), x)
+
+
+@register("sum_dim", "numpy", supports=_host, priority=-10)
+def sum_dim(x, dim):
+    return _like(_f32(x).sum(axis=dim, keepdims=True), x)
+
+
+@register("rms_norm", "numpy", supports=_host, priority=-10)
+def rms_norm(x, eps=1e-5):
+    xf = _f32(x)
+    return _like(xf / np.sqrt(np.mean(xf * xf, axis=1, keepdims=True) + eps), x)
+
+
+@register("layer_norm", "numpy", supports=_host, priority=-10)
+def layer_norm(x, weight=None, bias=None, eps=1e-5):
+    xf = _f32(x)
+    d = xf - xf.mean(axis=1, keepdims=True)
+    y = d / np.sqrt(np.mean(d * d, axis=1, keepdims=True) + eps)
+    if weight is not None:
+        y = y * _f32(weight)
+    if bias is not None:
+        y = y + _f32(bias)
+    return _like(y, x)
+
+
+@register("l1_norm", "numpy", supports=_host, priority=-10)
+def l1_norm(x):
+    xf = _f32(x)
+    return _like(xf / np.mean(np.abs(xf), axis=1, keepdims=True), x)
+
+
+@register("reduce", "numpy", supports=_host, priority=-10)
+def reduce(x, op="sum", axes=None, keepdims=False):
+    return reduce_plan.reference(x, axes, op, keepdims)
+
+
+@register("cumsum", "numpy", supports=_host, priority=-10)
+def cumsum(x, axis=-1, exclusive=False):
+    return _like(scan_plan.reference(x, axis, exclusive), x)
+
+
+@register("attention", "numpy", supports=_host, priority=-10)
+def attention(q, k, v, causal=False, lens=None, sm_scale=None):
+    # (B, H, L, D) operands through the full (Lq, Lk) scores
+    qf, kf, vf = _f32(q), _f32(k), _f32(v)
+    lq, lk, d = qf.shape[2], kf.shape[2], qf.shape[3]
+    s = qf @ np.swapaxes(kf, -1, -2) * (d**-0.5 if sm_scale is None else sm_scale)
+    visible = np.ones((lq, lk), bool)
+    if causal:
+        visible = np.tril(visible)
+    if lens is not None:
+        visible = visible & (np.arange(lk) < np.asarray(lens)[:, None, None, None])
+    s = np.where(visible, s, -np.inf)
+    m = s.max(axis=-1, keepdims=True)
+    p = np.exp(s - np.where(np.isfinite(m), m, 0))
+    l = p.sum(axis=-1, keepdims=True)
+    return _like(p @ vf / np.where(l > 0, l, 1), q)
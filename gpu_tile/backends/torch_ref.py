@@ -0,0 +1,159 @@
+"""PyTorch implementations, the baseline the example scripts compare against."""
+
+from gpu_tile.registry import lib, register, register_backend
+
+register_backend("torch", requires=("torch",))
+
+_torch = lib("torch")
+
+
+@register("vector_add", "torch", supports=_torch, priority=-1)
+def vector_add(a, b):
+    return a + b
+
+
+@register("gemv", "torch", supports=_torch, priority=-1)
+def gemv(a, x, trans_a=False):
+    return (a.t() if trans_a else a) @ x
+
+
+@register("fused_gemv", "torch", supports=_torch, priority=-1)
+def fused_gemv(a, x, bias=None, residual=None, activation=None, alpha=0.01, scale=1.0, trans_a=False):
+    y = gemv(a, x, trans_a) * scale
+    if bias is not None:
+        y = y + bias
+    if activation == "relu":
+        y = relu(y)
+    elif activation == "leaky_relu":
+        y = leaky_relu(y, alpha)
+    elif activation == "gelu":
+        y = gelu(y)
+    return y if residual is None else y + residual
+
+
+@register("gemm", "torch", supports=_torch, priority=-1)
+def gemm(a, b):
+    return a @ b
+
+
+@register("conv1d", "torch", supports=_torch, priority=-1)
+def conv1d(x, w, stride=1, padding=0):
+    import torch.nn.functional as F
+
+    return F.conv1d(x.view(1, 1, -1), w.view(1, 1, -1), stride=stride, padding=padding).view(-1)
+
+
+@register("relu", "torch", supports=_torch, priority=-1)
+def relu(x):
+    import torch
+
+    return torch.relu(x)
+
+
+@register("leaky_relu", "torch", supports=_torch, priority=-1)
+def leaky_relu(x, alpha=0.01):
+    import torch.nn.functional as F
+
+    return F.leaky_relu(x, negative_slope=alpha)
+
+
+@register("gelu", "torch", supports=_torch, priority=-1)
+def gelu(x):
+    import torch.nn.functional as F
+
+    return F.gelu(x, approximate="tanh")
+
+
+@register("avg_pool1d", "torch", supports=_torch, priority=-1)
+def avg_pool1d(x, kernel_size, stride=1, padding=0):
+    import torch.nn.functional as F
+
+    return F.avg_pool1d(x.view(1, 1, -1), kernel_size, stride=stride, padding=padding).view(-1)
+
+
+@register("pool1d", "torch", supports=_torch, priority=-1)
+def pool1d(x, kernel_size, stride=1, padding=0, kind="avg", p=2.0, activation=None, alpha=0.01, scale=1.0):
+    import torch.nn.functional as F
+
+    if kind == "avg":
+        y = avg_pool1d(x, kernel_size, stride, padding)
+    elif kind in ("max", "min"):
+        sign = 1 if kind == "max" else -1
+        xp = F.pad(sign * x.view(1, 1, -1), (padding, padding), value=float("-inf"))
+        y = sign * F.max_pool1d(xp, kernel_size, stride).view(-1)
+    else:
+        xp = F.pad(x.abs().view(1, 1, -1), (padding, padding))
+        y = F.lp_pool1d(xp, p, kernel_size, stride).view(-1)
+    y = y * scale
+    if activation == "relu":
+        return relu(y)
+    if activation == "leaky_relu":
+        return leaky_relu(y, alpha)
+    if activation == "gelu":
+        return gelu(y)
+    return y
+
+
+@register("sum_dim", "torch", supports=_torch, priority=-1)
+def sum_dim(x, dim):
+    return x.sum(dim=dim, keepdim=True)
+
+
+@register("rms_norm", "torch", supports=_torch, priority=-1)
+def rms_norm(x, eps=1e-5):
+    import torch
+
+    return x * torch.rsqrt(x.pow(2).mean(dim=1, keepdim=True) + eps)
+
+
+@register("layer_norm", "torch", supports=_torch, priority=-1)
+def layer_norm(x, weight=None, bias=None, eps=1e-5):
+    import torch.nn.functional as F
+
+    return F.layer_norm(x, x.shape[1:], weight, bias, eps)
+
+
+@register("l1_norm", "torch", supports=_torch, priority=-1)
+def l1_norm(x):
+    return x / x.abs().mean(dim=1, keepdim=True)
+
+
+@register("reduce", "torch", supports=_torch, priority=-1)
+def reduce(x, op="sum", axes=None, keepdims=False):
+    import torch
+
+    dims = tuple(range(x.ndim)) if axes is None else (axes,) if isinstance(axes, int) else tuple(axes)
+    if op in ("argmax", "argmin"):
+        fn = torch.argmax if op == "argmax" else torch.argmin
+        if len(dims) == x.ndim and x.ndim != 1:
+            out = fn(x)
+            return out.view((1,) * x.ndim) if keepdims else out
+        return fn(x, dim=dims[0], keepdim=keepdims)
+    if op == "prod":
+        for d in sorted(dims, reverse=True):
+            x = x.prod(dim=d, keepdim=True)
+        return x if keepdims else x.squeeze(dims)
+    if op in ("l1", "l2"):
+        return torch.linalg.vector_norm(x, 1 if op == "l1" else 2, dim=dims, keepdim=keepdims)
+    fn = {"sum": torch.sum, "mean": torch.mean, "max": torch.amax, "min": torch.amin}[op]
+    return fn(x, dim=dims, keepdim=keepdims)
+
+
+@register("cumsum", "torch", supports=_torch, priority=-1)
+def cumsum(x, axis=-1, exclusive=False):
+    y = x.cumsum(dim=axis, dtype=x.dtype)
+    return y - x if exclusive else y
+
+
+@register("attention", "torch", supports=_torch, priority=-1)
+def attention(q, k, v, causal=False, lens=None, sm_scale=None):
+    import torch
+    import torch.nn.functional as F
+
+    mask = None
+    if causal:
+        mask = torch.ones(q.shape[2], k.shape[2], dtype=torch.bool, device=q.device).tril()
+    if lens is not None:
+        keys = torch.arange(k.shape[2], device=q.device) < lens.to(q.device)[:, None, None, None]
+        mask = keys if mask is None else mask & keys
+    return F.scaled_dot_product_attention(q, k, v, attn_mask=mask, scale=sm_scale)
@@ -0,0 +1,42 @@
+"""Triton implementations backed by the scripts in ``triton/``."""
+
+from gpu_tile import _scripts
+from gpu_tile.registry import ArraySpec, all_of, contiguous, dtypes, leading, lib, ndim, on, register, register_backend
+
+register_backend("triton", requires=("triton", "torch"))
+
+_device = all_of(lib("torch"), on("cuda"))
+
+
+@register("vector_add", "triton", supports=all_of(_device, contiguous, ndim(1), dtypes("float16", "float32", "float64")), priority=1)
+def vector_add(a, b):
+    import torch
+
+    out = torch.empty_like(a)
+    _scripts.load("triton/01-vector-add.py").vadd(a, b, out)
+    return out
+
+
+# matmul_kernel takes strides, so non-contiguous operands are fine. ``config``
+# is simple_matmul's launch options (BLOCK_M, GROUP_M, num_warps, ...).
+@register("gemm", "triton", supports=all_of(_device, ndim(2), dtypes("float32")), priority=1)
+def gemm(a, b, **config):
+    import torch
+
+    out = torch.empty(a.shape[0], b.shape[1], dtype=a.dtype, device=a.device)
+    _scripts.load("triton/02-tiled-matmul.py").simple_matmul(a, b, out, **config)
+    return out
+
+
+def _lens(sig):
+    # ``lens``, positional or keyword, is one int32 key count per batch on the GPU.
+    lens = sig.arrays[3] if len(sig.arrays) == 4 else sig.params.get("lens")
+    if lens is None:
+        return len(sig.arrays) == 3
+    batch = sig.arrays[0].shape[:1]
+    return isinstance(lens, ArraySpec) and lens.lib == "torch" and lens.device == "cuda" and lens.dtype == "int32" and lens.shape == batch
+
+
+@register("attention", "triton", supports=all_of(leading(3, _device, ndim(4), dtypes("float16", "bfloat16")), _lens), priority=1)
+def attention(q, k, v, causal=False, lens=None, sm_scale=None):
+    return _scripts.load("triton/05-flash-attention.py").attention(q, k, v, causal, lens, sm_scale)
@@ -0,0 +1,443 @@
+"""Benchmark matrix over every registered op, backend and shape, with regression gating.
+
+``triton/03-vector-add-benchmark.py`` sweeps one op against torch. This runs
+each case in ``CASES`` on every backend that can take it (cuTile, CuTe DSL,
+Triton, torch, and NumPy on the host), writes the results as versioned JSON and
+compares them against a baseline:
+
+    python -m gpu_tile.bench run --out results.json
+    python -m gpu_tile.bench compare baseline.json results.json --tolerance 0.05
+
+``compare`` (and ``run --baseline``) exits with status 1 when any result got
+slower than ``baseline * (1 + tolerance)``. Per-op tolerances override the
+global one: ``--op-tolerance gemm=0.1``.
+
+The comparison and report code only reads JSON, so ``python -m gpu_tile.bench
+selfcheck`` exercises it on CPU against the recorded results in
+``gpu_tile/data/bench/``.
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+SCHEMA_VERSION = 1
+_ITEMSIZE = {"float8_e4m3fn": 1, "float16": 2, "bfloat16": 2, "float32": 4, "float64": 8}
+DATA_DIR = Path(__file__).resolve().parent / "data" / "bench"
+
+
+@dataclass(frozen=True)
+class Case:
+    op: str
+    inputs: tuple  # one shape per array argument
+    params: dict = field(default_factory=dict)
+    bytes: int = 0  # unique bytes read + written at 4 bytes per element
+    flops: int = 0
+    devices: str = "any"  # any | cuda | cpu: shapes too big for the host references get a smaller cpu twin
+
+    def runs_on(self, device: str) -> bool:
+        return self.devices == "any" or self.devices == device.split(":")[0]
+
+    @property
+    def label(self) -> str:
+        shapes = ",".join("x".join(map(str, s)) for s in self.inputs)
+        params = ",".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{shapes}" + (f" {params}" if params else "")
+
+
+def _numel(shape):
+    n = 1
+    for s in shape:
+        n *= s
+    return n
+
+
+def _elementwise(op, shape, **params):
+    return Case(op, (shape,), params, bytes=2 * 4 * _numel(shape), flops=_numel(shape))
+
+
+def _cases():
+    cases = []
+    for n in (2**16, 2**20, 2**24):
+        cases.append(Case("vector_add", ((n,), (n,)), bytes=3 * 4 * n, flops=n))
+    for m, k in ((1024, 16384), (2048, 65536)):
+        cases.append(Case("gemv", ((m, k), (k,)), bytes=4 * (m * k + k + m), flops=2 * m * k))
+        cases.append(
+            Case("fused_gemv", ((m, k), (k,), (m,)), {"activation": "gelu"}, bytes=4 * (m * k + k + 2 * m), flops=2 * m * k)
+        )
+    for m, n, k in ((512, 512, 512), (1024, 1024, 1024), (2048, 2048, 2048)):
+        cases.append(Case("gemm", ((m, k), (k, n)), bytes=4 * (m * k + k * n + m * n), flops=2 * m * n * k))
+    for n, k, s, p in ((2**20, 3, 1, 1), (2**20, 15, 1, 7), (2**20, 15, 3, 1)):
+        out = (n + 2 * p - k) // s + 1
+        cases.append(Case("conv1d", ((n,), (k,)), {"stride": s, "padding": p}, bytes=4 * (n + k + out), flops=2 * k * out))
+    for n, k, s, p in ((65536, 8, 1, 4), (2**20, 8, 1, 4), (2**20, 64, 1, 32)):
+        out = (n + 2 * p - k) // s + 1
+        cases.append(Case("avg_pool1d", ((n,),), {"kernel_size": k, "stride": s, "padding": p}, bytes=4 * (n + out), flops=k * out))
+    for n, k, s, p, kind in ((2**20, 64, 1, 32, "avg"), (2**20, 256, 1, 128, "avg"), (2**20, 3, 2, 1, "max")):
+        out = (n + 2 * p - k) // s + 1
+        params = {"kernel_size": k, "stride": s, "padding": p, "kind": kind}
+        cases.append(Case("pool1d", ((n,),), params, bytes=4 * (n + out), flops=k * out))
+    for shape, dim in (((16, 128, 256), 1), ((32, 512, 512), 0), ((128, 64, 64, 64), 3)):
+        n = _numel(shape)
+        cases.append(Case("sum_dim", (shape,), {"dim": dim}, bytes=4 * (n + n // shape[dim]), flops=n))
+    for shape, axes, op, devices in (
+        ((128, 64, 64, 64), 3, "sum", "cuda"),
+        ((16, 64, 64, 64), 3, "sum", "cpu"),
+        ((32, 512, 512), 0, "sum", "cuda"),
+        ((8, 512, 512), 0, "sum", "cpu"),
+        ((8, 1024, 1024), None, "max", "cuda"),
+        ((2, 1024, 1024), None, "max", "cpu"),
+        ((4096, 1000), 1, "argmax", "any"),
+    ):
+        n = _numel(shape)
+        kept = n // _numel(shape if axes is None else (shape[axes],))
+        cases.append(Case("reduce", (shape,), {"op": op, "axes": axes}, bytes=4 * (n + kept), flops=n, devices=devices))
+    for op in ("rms_norm", "l1_norm"):
+        for shape in ((256, 2048), (4096, 4096)):
+            cases.append(Case(op, (shape,), bytes=2 * 4 * _numel(shape), flops=3 * _numel(shape)))
+    for shape, devices in (((256, 1024), "any"), ((4096, 4096), "cuda"), ((512, 4096), "cpu"), ((64, 32768), "any")):
+        n, d = shape
+        cases.append(Case("layer_norm", (shape, (d,), (d,)), bytes=4 * (2 * n * d + 2 * d), flops=8 * n * d, devices=devices))
+    for shape, axis in (((2**24,), 0), ((64, 2**18), 1), ((16, 1024, 256), 1)):
+        n = _numel(shape)
+        cases.append(Case("cumsum", (shape,), {"axis": axis}, bytes=2 * 4 * n, flops=n))
+    # The host references materialize the (n, n) scores: 2 GiB at n=4096.
+    for b, h, n, d, devices in ((8, 16, 1024, 64, "cuda"), (2, 16, 4096, 128, "cuda"), (1, 4, 256, 64, "cpu"), (1, 4, 1024, 64, "cpu")):
+        for causal in (False, True):
+            flops = 4 * b * h * n * n * d // (2 if causal else 1)
+            shape = (b, h, n, d)
+            cases.append(Case("attention", (shape,) * 3, {"causal": causal}, bytes=4 * 4 * _numel(shape), flops=flops, devices=devices))
+    for op in ("relu", "gelu"):
+        for shape in ((1024, 1024), (6144, 4096)):
+            cases.append(_elementwise(op, shape))
+    for shape in ((1024, 1024), (6144, 4096)):
+        cases.append(_elementwise("leaky_relu", shape, alpha=0.1))
+    return cases
+
+
+CASES = _cases()
+
+
+# Running
+
+
+def _make_inputs(case: Case, dtype: str, device: str, seed: int = 0, fixtures=None):
+    if fixtures is not None:
+        # Generated once on disk, then memory-mapped (CPU) or streamed to the device.
+        name = re.sub(r"[^\w.\-]+", "_", f"bench-{case.op}-{case.label}-s{seed}")
+        fixture = fixtures.generate(name, case.inputs, seed=seed)
+        if device == "cpu":
+            return [fixture.to_device(i, "cpu", dtype=dtype) for i in range(len(case.inputs))]
+        import torch
+
+        return [fixture.to_device(i, device, dtype=getattr(torch, dtype)) for i in range(len(case.inputs))]
+    if device == "cpu":
+        import numpy as np
+
+        rng = np.random.default_rng(seed)
+        return [rng.standard_normal(shape, dtype=np.float32).astype(dtype) for shape in case.inputs]
+    import torch
+
+    gen = torch.Generator(device=device).manual_seed(seed)
+    # randn has no float8 kernels, so sample in float32 and cast.
+    return [
+        torch.randn(shape, dtype=torch.float32, device=device, generator=gen).to(getattr(torch, dtype))
+        for shape in case.inputs
+    ]
+
+
+def _time_ms(fn, device: str, iters: int, warmup: int) -> float:
+    for _ in range(warmup):
+        fn()
+    if device == "cpu":
+        start = time.perf_counter()
+        for _ in range(iters):
+            fn()
+        return (time.perf_counter() - start) * 1e3 / iters
+
+    import torch
+
+    torch.cuda.synchronize()
+    start_event = torch.cuda.Event(enable_timing=True)
+    end_event = torch.cuda.Event(enable_timing=True)
+    start_event.record()
+    for _ in range(iters):
+        fn()
+    end_event.record()
+    torch.cuda.synchronize()
+    return start_event.elapsed_time(end_event) / iters
+
+
+def run(ops=None, backends=None, dtypes=("float32",), device="cuda", iters=100, warmup=5, log=print, fixtures=None) -> dict:
+    """Time every (case, backend, dtype) the registry can serve and return a results document."""
+    from gpu_tile import registry
+
+    registry.ensure_backends()
+    reg = registry.REGISTRY
+    if isinstance(dtypes, str):
+        dtypes = (dtypes,)
+    results = []
+    for dtype in dtypes:
+        for case in CASES:
+            if (ops and case.op not in ops) or not case.runs_on(device):
+                continue
+            args = _make_inputs(case, dtype, device, fixtures=fixtures)
+            nbytes = case.bytes * _ITEMSIZE.get(dtype, 4) // 4
+            sig = reg.signature(args, case.params)
+            for impl in reg.candidates(case.op, sig):
+                if backends and impl.backend not in backends:
+                    continue
+                ms = _time_ms(lambda: impl.fn(*args, **case.params), device, iters, warmup)
+                result = {
+                    "op": case.op,
+                    "backend": impl.backend,
+                    "inputs": [list(s) for s in case.inputs],
+                    "params": case.params,
+                    "dtype": dtype,
+                    "ms": ms,
+                    "gbps": nbytes / (ms * 1e6),
+                    "gflops": case.flops / (ms * 1e6),
+                }
+                results.append(result)
+                log(
+                    f"{case.op:12s} {impl.backend:8s} {case.label:32s} {dtype:13s} "
+                    f"{ms:9.4f} ms {result['gbps']:9.2f} GB/s"
+                )
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "env": _environment(device),
+        "results": results,
+    }
+
+
+def bandwidth_by_dtype(doc: dict) -> dict:
+    """Peak GB/s per (op, backend) for each dtype: ``{dtype: {(op, backend): gbps}}``."""
+    table = {}
+    for r in doc["results"]:
+        row = table.setdefault(r["dtype"], {})
+        key = (r["op"], r["backend"])
+        row[key] = max(row.get(key, 0.0), r["gbps"])
+    return table
+
+
+def bandwidth_report(doc: dict) -> str:
+    table = bandwidth_by_dtype(doc)
+    dtypes = list(table)
+    keys = sorted({key for row in table.values() for key in row})
+    lines = ["Peak bandwidth (GB/s)", f"  {'op':12s} {'backend':8s} " + " ".join(f"{d:>13s}" for d in dtypes)]
+    for op, backend in keys:
+        cells = (table[d].get((op, backend)) for d in dtypes)
+        lines.append(f"  {op:12s} {backend:8s} " + " ".join("            -" if c is None else f"{c:13.2f}" for c in cells))
+    return "\n".join(lines)
+
+
+def _environment(device):
+    env = {"python": platform.python_version(), "platform": platform.platform(), "device": device}
+    if device != "cpu":
+        import torch
+
+        env["torch"] = torch.__version__
+        env["gpu"] = torch.cuda.get_device_name()
+    return env
+
+
+# Storage and comparison
+
+
+def save(doc: dict, path):
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=2)
+
+
+def load(path) -> dict:
+    with open(path) as f:
+        doc = json.load(f)
+    version = doc.get("schema_version")
+    if version != SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported schema_version {version!r} (expected {SCHEMA_VERSION})")
+    return doc
+
+
+def result_key(result: dict) -> tuple:
+    return (
+        result["op"],
+        result["backend"],
+        tuple(tuple(s) for s in result["inputs"]),
+        result["dtype"],
+        json.dumps(result.get("params", {}), sort_keys=True),
+    )
+
+
+@dataclass
+class Comparison:
+    regressions: list = field(default_factory=list)
+    improvements: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+    missing: list = field(default_factory=list)  # in baseline, not in current
+    new: list = field(default_factory=list)  # in current, not in baseline
+
+    @property
+    def ok(self) -> bool:
+        return not self.regressions
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.05, op_tolerance: dict | None = None) -> Comparison:
+    """Classify each current result against the baseline.
+
+    A result regresses when ``current_ms > baseline_ms * (1 + tol)`` and improves
+    when ``current_ms < baseline_ms / (1 + tol)``; ``tol`` is the op's entry in
+    ``op_tolerance`` if present, else ``tolerance``.
+    """
+    op_tolerance = op_tolerance or {}
+    base = {result_key(r): r for r in baseline["results"]}
+    cur = {result_key(r): r for r in current["results"]}
+    out = Comparison()
+    for key, r in cur.items():
+        b = base.get(key)
+        if b is None:
+            out.new.append(r)
+            continue
+        tol = op_tolerance.get(r["op"], tolerance)
+        entry = {**r, "baseline_ms": b["ms"], "ratio": r["ms"] / b["ms"], "tolerance": tol}
+        if r["ms"] > b["ms"] * (1 + tol):
+            out.regressions.append(entry)
+        elif r["ms"] < b["ms"] / (1 + tol):
+            out.improvements.append(entry)
+        else:
+            out.unchanged.append(entry)
+    out.missing = [r for key, r in base.items() if key not in cur]
+    for group in (out.regressions, out.improvements):
+        group.sort(key=lambda e: -abs(e["ratio"] - 1))
+    return out
+
+
+def _row(e):
+    shapes = ",".join("x".join(map(str, s)) for s in e["inputs"])
+    params = ",".join(f"{k}={v}" for k, v in e.get("params", {}).items())
+    label = f"{shapes} {params}".strip()
+    return f"  {e['op']:12s} {e['backend']:8s} {label:34s} {e['dtype']:9s} {e['baseline_ms']:9.4f} -> {e['ms']:9.4f} ms ({e['ratio']:.2f}x)"
+
+
+def report(cmp: Comparison) -> str:
+    lines = []
+    for title, group in (("Regressions", cmp.regressions), ("Improvements", cmp.improvements)):
+        if group:
+            lines.append(f"{title} ({len(group)}):")
+            lines.extend(_row(e) for e in group)
+    lines.append(
+        f"{len(cmp.regressions)} regressed, {len(cmp.improvements)} improved, {len(cmp.unchanged)} unchanged, "
+        f"{len(cmp.new)} new, {len(cmp.missing)} missing"
+    )
+    lines.append("✓ No regressions" if cmp.ok else "✗ Performance regressions detected")
+    return "\n".join(lines)
+
+
+def _parse_op_tolerance(items):
+    out = {}
+    for item in items or []:
+        op, _, value = item.partition("=")
+        out[op] = float(value)
+    return out
+
+
+def selfcheck() -> bool:
+    baseline = load(DATA_DIR / "baseline.json")
+    current = load(DATA_DIR / "current.json")
+    all_passed = True
+
+    def check(cond, msg):
+        nonlocal all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    print("Testing the case matrix:")
+    cpu = [c for c in CASES if c.runs_on("cpu")]
+    check({c.op for c in cpu} == {c.op for c in CASES if c.runs_on("cuda:0")}, "every op benchmarked on cuda has a cpu case")
+    scores = max(c.inputs[0][0] * c.inputs[0][1] * c.inputs[0][2] ** 2 for c in cpu if c.op == "attention")
+    check(scores * 4 <= 64 << 20, f"cpu attention materializes at most {scores * 4 >> 20} MiB of scores")
+
+    print("Testing benchmark comparison:")
+    cmp = compare(baseline, current, tolerance=0.05)
+    regressed = {(e["op"], e["backend"]) for e in cmp.regressions}
+    check(regressed == {("gemm", "triton"), ("rms_norm", "cutile")}, f"regressions detected: {sorted(regressed)}")
+    check([(e["op"], e["backend"]) for e in cmp.improvements] == [("vector_add", "cute")], "improvement detected")
+    check(len(cmp.missing) == 1 and cmp.missing[0]["op"] == "conv1d", "missing result reported")
+    check(len(cmp.new) == 1 and cmp.new[0]["backend"] == "numpy", "new result reported")
+    check(not cmp.ok, "comparison fails on regression")
+
+    relaxed = compare(baseline, current, tolerance=0.05, op_tolerance={"gemm": 0.5, "rms_norm": 0.5})
+    check(relaxed.ok, "per-op tolerance overrides the global one")
+    check(compare(baseline, baseline).ok, "baseline against itself passes")
+
+    text = report(cmp)
+    check("gemm" in text and "✗ Performance regressions detected" in text, "report lists regressions")
+
+    try:
+        load(DATA_DIR / "unsupported_version.json")
+        check(False, "unknown schema_version rejected")
+    except ValueError:
+        check(True, "unknown schema_version rejected")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
+    return all_passed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m gpu_tile.bench")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_run = sub.add_parser("run", help="Run the benchmark matrix")
+    p_run.add_argument("--out", required=True)
+    p_run.add_argument("--ops", nargs="*")
+    p_run.add_argument("--backends", nargs="*")
+    p_run.add_argument("--dtypes", nargs="+", default=["float32"], choices=list(_ITEMSIZE))
+    p_run.add_argument("--device", default="cuda", help="'cpu' benchmarks the NumPy backend")
+    p_run.add_argument("--iters", type=int, default=100)
+    p_run.add_argument("--warmup", type=int, default=5)
+    p_run.add_argument("--baseline")
+    p_run.add_argument("--fixtures", nargs="?", const="", metavar="DIR",
+                       help="read inputs from a fixture store (default gpu_tile/data/fixtures)")
+
+    p_cmp = sub.add_parser("compare", help="Compare results against a baseline")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+
+    for p in (p_run, p_cmp):
+        p.add_argument("--tolerance", type=float, default=0.05)
+        p.add_argument("--op-tolerance", nargs="*", metavar="OP=TOL")
+
+    sub.add_parser("selfcheck", help="Check the comparison logic against recorded results")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "selfcheck":
+        return 0 if selfcheck() else 1
+
+    if args.cmd == "run":
+        fixtures = None
+        if args.fixtures is not None:
+            from gpu_tile.datastore import FixtureStore
+
+            fixtures = FixtureStore(args.fixtures or None)
+        current = run(args.ops, args.backends, args.dtypes, args.device, args.iters, args.warmup, fixtures=fixtures)
+        save(current, args.out)
+        print(bandwidth_report(current))
+        if not args.baseline:
+            return 0
+        baseline = load(args.baseline)
+    else:
+        baseline, current = load(args.baseline), load(args.current)
+
+    cmp = compare(baseline, current, args.tolerance, _parse_op_tolerance(args.op_tolerance))
+    print(report(cmp))
+    return 0 if cmp.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,527 @@
+"""Ahead-of-time kernel bundles: compile a manifest once, ship one file.
+
+Every backend compiles on first call, so a fresh worker pays for each kernel
+it touches. A build step runs a declared manifest of
+``(op, backend, dtype, shapes, params, config)`` entries once, captures each
+compiled artifact, and writes them all into a single versioned bundle file.
+Workers open the bundle at startup and install an artifact the first time its
+entry is used; anything not in the bundle compiles as before.
+
+Bundle file layout (little-endian)::
+
+    b"GTBUNDLE" | u32 format | u32 header length | header JSON | artifacts
+
+Each artifact starts on a 64-byte boundary. The header records the bundle
+version, the toolchain the artifacts were built with, and one index row per
+entry (key, offset, size, sha256). A bundle built with another toolchain is
+ignored as a whole, so every lookup falls back to JIT.
+
+Entries are looked up by bucket, not by exact shape: each mode is reduced to
+its alignment class (``Dynamic(16)`` from ``gpu_tile/compile_cache.py``),
+which is what Triton specializes integer arguments on.
+
+``params`` and ``config`` are both keyword arguments of the op: ``params``
+are the op's own (``stride``, ``padding``), ``config`` its launch options
+(``BLOCK_M``, ``num_warps`` for the Triton GEMM). The build passes both, and
+a registry call hits an entry when its keywords, with the op's defaults
+filled in, are the entry's: ``conv1d(x, w)`` hits an entry built with
+``{"stride": 1, "padding": 0}``.
+
+Exporters capture and install artifacts per backend:
+
+- ``triton``: Triton writes compiled kernels to ``$TRITON_CACHE_DIR``. The
+  build runs each entry against an empty cache directory and packs what
+  appears; the loader unpacks it into the worker's cache directory, where
+  Triton finds it instead of compiling.
+- ``stub``: the serialized entry itself, so the manifest, file format and
+  loader index are testable on the host.
+
+A backend without an exporter (``cute``, ``cutile``) is skipped at build time
+and JIT-compiles at run time. ::
+
+    python -m gpu_tile.bundle build manifest.json -o kernels.gtb
+    python -m gpu_tile.bundle inspect kernels.gtb
+"""
+
+import argparse
+import hashlib
+import inspect
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import tarfile
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from gpu_tile.compile_cache import Dynamic, ShapePolicy
+
+MAGIC = b"GTBUNDLE"
+FORMAT = 1
+ALIGN = 64
+_PREFIX = struct.Struct("<8sII")
+
+BUCKET = Dynamic(16)
+
+
+def bucket(shapes) -> list:
+    """Alignment class of every mode, JSON-ready."""
+    policy = ShapePolicy(*((BUCKET,) * len(s) for s in shapes))
+    return [[k[1] for k in arg] for arg in policy.key(shapes)]
+
+
+@dataclass(frozen=True)
+class Entry:
+    op: str
+    backend: str
+    dtype: str
+    shapes: tuple  # representative input shapes, used to build
+    params: dict = field(default_factory=dict)
+    config: dict = field(default_factory=dict)
+
+    @property
+    def kwargs(self) -> dict:
+        """What the build passes to the op besides the arrays."""
+        return {**self.params, **self.config}
+
+    @property
+    def key(self) -> str:
+        return entry_key(self.op, self.backend, self.dtype, self.shapes, self.params, self.config)
+
+    def to_json(self) -> dict:
+        return {"op": self.op, "backend": self.backend, "dtype": self.dtype, "shapes": [list(s) for s in self.shapes],
+                "params": self.params, "config": self.config}
+
+    @classmethod
+    def from_json(cls, d: dict) -> "Entry":
+        return cls(d["op"], d["backend"], d["dtype"], tuple(tuple(s) for s in d["shapes"]), d.get("params", {}), d.get("config", {}))
+
+
+def entry_key(op, backend, dtype, shapes, params=None, config=None) -> str:
+    """Lookup key: op, backend, dtype, bucketed shapes and the params/config."""
+    extra = json.dumps([params or {}, config or {}], sort_keys=True, default=str)
+    return f"{op}/{backend}/{dtype}/{json.dumps(bucket(shapes))}/{extra}"
+
+
+@dataclass
+class Manifest:
+    version: str
+    entries: list
+
+    @classmethod
+    def load(cls, path) -> "Manifest":
+        with open(path) as f:
+            d = json.load(f)
+        entries = [Entry.from_json(e) for e in d["entries"]]
+        keys = [e.key for e in entries]
+        dupes = sorted({k for k in keys if keys.count(k) > 1})
+        if dupes:
+            raise ValueError(f"{path}: entries share a bucket: {', '.join(dupes)}")
+        return cls(str(d["version"]), entries)
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump({"version": self.version, "entries": [e.to_json() for e in self.entries]}, f, indent=2)
+
+
+def toolchain() -> dict:
+    """Versions the artifacts depend on. Missing packages are left out."""
+    from importlib import metadata
+
+    out = {}
+    for name in ("triton", "nvidia-cutlass-dsl", "cuda-tile", "torch"):
+        try:
+            out[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            pass
+    return out
+
+
+# -- exporters ---------------------------------------------------------------
+
+
+class StubExporter:
+    """Artifacts are the serialized entry: exercises everything but a compiler."""
+
+    def export(self, entry: Entry) -> bytes:
+        return json.dumps(entry.to_json(), sort_keys=True).encode()
+
+    def install(self, entry: Entry, data: bytes, cache_dir: Path):
+        path = cache_dir / "stub" / (hashlib.sha256(entry.key.encode()).hexdigest()[:16] + ".json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+
+class CacheDirExporter:
+    """Pack the files a JIT writes to its cache directory (``env``) while the entry runs."""
+
+    def __init__(self, env: str):
+        self.env = env
+
+    def export(self, entry: Entry) -> bytes:
+        with tempfile.TemporaryDirectory() as tmp:
+            previous = os.environ.get(self.env)
+            os.environ[self.env] = tmp
+            try:
+                _run_entry(entry)
+            finally:
+                if previous is None:
+                    os.environ.pop(self.env)
+                else:
+                    os.environ[self.env] = previous
+            buf = io.BytesIO()
+            with tarfile.open(fileobj=buf, mode="w") as tar:
+                tar.add(tmp, arcname=".")
+            return buf.getvalue()
+
+    def install(self, entry: Entry, data: bytes, cache_dir: Path):
+        # Point the JIT at the loader's directory unless the worker already chose one.
+        target = Path(os.environ.setdefault(self.env, str(cache_dir / self.env.lower())))
+        with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+            tar.extractall(target, filter="data")
+
+
+EXPORTERS = {
+    "stub": StubExporter(),
+    "triton": CacheDirExporter("TRITON_CACHE_DIR"),
+}
+
+
+def _run_entry(entry: Entry):
+    import torch
+
+    from gpu_tile import registry
+
+    registry.ensure_backends()
+    dtype = getattr(torch, entry.dtype)
+    args = [torch.randn(s, device="cuda").to(dtype) for s in entry.shapes]
+    registry.REGISTRY.get(entry.op, entry.backend)(*args, **entry.kwargs)
+    torch.cuda.synchronize()
+
+
+# -- file format ---------------------------------------------------------------
+
+
+def build(manifest: Manifest, path, exporters=None) -> dict:
+    """Export every entry with an exporter for its backend into one bundle file.
+
+    Returns the header that was written. Entries without an exporter are
+    listed under ``"skipped"``.
+    """
+    exporters = EXPORTERS if exporters is None else exporters
+    blobs, index, skipped = [], [], []
+    offset = 0
+    for entry in manifest.entries:
+        exporter = exporters.get(entry.backend)
+        if exporter is None:
+            skipped.append(entry.key)
+            continue
+        data = exporter.export(entry)
+        index.append({"key": entry.key, "entry": entry.to_json(), "offset": offset, "size": len(data),
+                      "sha256": hashlib.sha256(data).hexdigest()})
+        pad = -len(data) % ALIGN
+        blobs.append(data + b"\0" * pad)
+        offset += len(data) + pad
+    header = {"version": manifest.version, "toolchain": toolchain(), "entries": index, "skipped": skipped}
+    raw = json.dumps(header, sort_keys=True).encode()
+    # Artifact offsets are relative to the first 64-byte boundary after the header.
+    raw += b" " * (-(_PREFIX.size + len(raw)) % ALIGN)
+    tmp = Path(f"{path}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT, len(raw)))
+        f.write(raw)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp, path)
+    return header
+
+
+class Bundle:
+    """A memory-mapped bundle file. Artifacts are read only when asked for."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _PREFIX.size:
+            raise ValueError(f"{self.path}: not a kernel bundle")
+        magic, fmt, header_len = _PREFIX.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path}: not a kernel bundle")
+        if fmt != FORMAT:
+            raise ValueError(f"{self.path}: bundle format {fmt}, this loader reads {FORMAT}")
+        self.header = json.loads(bytes(self._map[_PREFIX.size:_PREFIX.size + header_len]))
+        self._base = _PREFIX.size + header_len
+        self.index = {row["key"]: row for row in self.header["entries"]}
+
+    @property
+    def version(self) -> str:
+        return self.header["version"]
+
+    def __contains__(self, key) -> bool:
+        return key in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def artifact(self, key) -> memoryview:
+        """The artifact bytes for ``key``, checked against their sha256."""
+        row = self.index[key]
+        start = self._base + row["offset"]
+        data = memoryview(self._map)[start:start + row["size"]]
+        if hashlib.sha256(data).hexdigest() != row["sha256"]:
+            raise ValueError(f"{self.path}: artifact {key} is corrupt")
+        return data
+
+    def close(self):
+        self._map.close()
+
+
+@dataclass
+class LoaderStats:
+    hits: int = 0  # calls served by an installed artifact
+    installs: int = 0  # artifacts unpacked on first use
+    misses: int = 0  # calls that JIT-compile
+
+
+class Loader:
+    """Installs bundle artifacts the first time each entry is used."""
+
+    def __init__(self, path, cache_dir=None, exporters=None, check_toolchain=True):
+        self.bundle = Bundle(path)
+        self.exporters = EXPORTERS if exporters is None else exporters
+        self.cache_dir = Path(cache_dir or tempfile.mkdtemp(prefix="gpu_tile_bundle_"))
+        self.stats = LoaderStats()
+        self._installed = set()
+        self.stale = check_toolchain and self.bundle.header["toolchain"] != toolchain()
+
+    def ensure(self, op, backend, dtype, shapes, params=None, config=None) -> bool:
+        """Install the matching artifact if there is one. False means JIT."""
+        return self._ensure(entry_key(op, backend, dtype, shapes, params, config), backend)
+
+    def _ensure(self, key, backend) -> bool:
+        if key in self._installed:
+            self.stats.hits += 1
+            return True
+        exporter = self.exporters.get(backend)
+        if self.stale or exporter is None or key not in self.bundle:
+            self.stats.misses += 1
+            return False
+        exporter.install(Entry.from_json(self.bundle.index[key]["entry"]), bytes(self.bundle.artifact(key)), self.cache_dir)
+        self._installed.add(key)
+        self.stats.installs += 1
+        self.stats.hits += 1
+        return True
+
+    def attach(self, reg=None):
+        """Wrap the bundle's ops in ``reg`` so each call runs ``ensure`` first."""
+        from gpu_tile import registry
+
+        reg = reg or registry.REGISTRY
+        if reg is registry.REGISTRY:
+            registry.ensure_backends()
+        routes = {}
+        for key, row in self.bundle.index.items():
+            entry = Entry.from_json(row["entry"])
+            routes.setdefault((entry.op, entry.backend), []).append((entry, key))
+        for (op, backend), rows in sorted(routes.items()):
+            for impl in reg.impls(op):
+                if impl.backend == backend:
+                    reg.register(op, backend, self._wrap(impl, rows), supports=impl.supports, priority=impl.priority)
+
+    def _wrap(self, impl, rows):
+        fn = impl.fn
+        sig = inspect.signature(fn)
+        # call key (dtype, buckets, keywords with the op's defaults) -> bundle key
+        routes = {}
+        for entry, key in rows:
+            kwargs = _keywords(sig, [_ARRAY] * len(entry.shapes), entry.kwargs)
+            routes[_call_key(entry.dtype, entry.shapes, kwargs)] = key
+
+        def wrapper(*args, **params):
+            arrays = [a for a in args if _is_array(a)]
+            dtype = str(arrays[0].dtype).removeprefix("torch.") if arrays else ""
+            try:
+                key = routes.get(_call_key(dtype, [tuple(a.shape) for a in arrays], _keywords(sig, args, params)))
+            except TypeError:  # arguments the op does not take: let the op raise
+                key = None
+            if key is None:
+                self.stats.misses += 1
+            else:
+                self._ensure(key, impl.backend)
+            return fn(*args, **params)
+
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+
+_ARRAY = object()  # stands in for an entry's arrays when binding its keywords
+
+
+def _is_array(a) -> bool:
+    return hasattr(a, "shape") and hasattr(a, "dtype")
+
+
+def _keywords(sig, args, params) -> dict:
+    """The non-array arguments of a call, with the op's defaults filled in."""
+    bound = sig.bind(*args, **params)
+    bound.apply_defaults()
+    out = {}
+    for name, value in bound.arguments.items():
+        kind = sig.parameters[name].kind
+        if kind is inspect.Parameter.VAR_KEYWORD:
+            out.update(value)
+        elif kind is not inspect.Parameter.VAR_POSITIONAL and value is not _ARRAY and not _is_array(value):
+            out[name] = value
+    return out
+
+
+def _call_key(dtype, shapes, kwargs) -> str:
+    return f"{dtype}/{json.dumps(bucket(shapes))}/{json.dumps(kwargs, sort_keys=True, default=str)}"
+
+
+def selfcheck() -> bool:
+    import numpy as np
+
+    from gpu_tile.registry import Registry
+
+    all_passed = True
+
+    def check(cond, msg):
+        nonlocal all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    print("Testing bundle manifest and format:")
+    check(bucket([(1024,), (1000, 48)]) == [[16], [8, 16]], "shapes bucket to alignment classes")
+    check(entry_key("relu", "stub", "float32", [(4096,)]) == entry_key("relu", "stub", "float32", [(2048,)]), "lengths in one class share a key")
+    check(entry_key("relu", "stub", "float32", [(4096,)]) != entry_key("relu", "stub", "float32", [(4100,)]), "  ...and other classes do not")
+
+    entries = [
+        Entry("vector_add", "stub", "float32", ((1 << 20,), (1 << 20,))),
+        Entry("conv1d", "stub", "float32", ((4096,), (7,)), {"stride": 1, "padding": 3}),
+        Entry("gemm", "stub", "float16", ((512, 512), (512, 512)), config={"BM": 128, "BN": 128}),
+        Entry("gemm", "cute", "float32", ((512, 512), (512, 512))),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        Manifest("2026.10", entries).save(tmp / "manifest.json")
+        manifest = Manifest.load(tmp / "manifest.json")
+        check(manifest.entries == entries, "manifest round-trips through JSON")
+        check(entries[2].kwargs == {"BM": 128, "BN": 128}, "the build passes an entry's config to the op")
+        Manifest("x", entries[:1] * 2).save(tmp / "dupe.json")
+        try:
+            Manifest.load(tmp / "dupe.json")
+            check(False, "duplicate buckets are rejected")
+        except ValueError:
+            check(True, "duplicate buckets are rejected")
+
+        header = build(manifest, tmp / "kernels.gtb", exporters={"stub": StubExporter()})
+        check(len(header["entries"]) == 3 and header["skipped"] == [entries[3].key], "entries without an exporter are skipped")
+        bundle = Bundle(tmp / "kernels.gtb")
+        check(bundle.version == "2026.10" and len(bundle) == 3, "header and index read back")
+        check(all((bundle._base + row["offset"]) % ALIGN == 0 for row in bundle.index.values()), "artifacts are 64-byte aligned")
+        check(json.loads(bytes(bundle.artifact(entries[1].key))) == entries[1].to_json(), "artifact bytes read back through the map")
+        first = bundle._base
+        bundle.close()
+
+        corrupt = bytearray((tmp / "kernels.gtb").read_bytes())
+        corrupt[first] ^= 0xFF
+        (tmp / "corrupt.gtb").write_bytes(bytes(corrupt))
+        bad = Bundle(tmp / "corrupt.gtb")
+        try:
+            for key in bad.index:
+                bad.artifact(key)
+            check(False, "a corrupt artifact fails its checksum")
+        except ValueError:
+            check(True, "a corrupt artifact fails its checksum")
+        bad.close()
+        (tmp / "old.gtb").write_bytes(_PREFIX.pack(MAGIC, FORMAT + 1, 2) + b"{}")
+        for name, why in (("old.gtb", "a newer format"), ("manifest.json", "a non-bundle file")):
+            try:
+                Bundle(tmp / name)
+                check(False, f"rejects {why}")
+            except ValueError:
+                check(True, f"rejects {why}")
+
+        print("Testing loader:")
+        loader = Loader(tmp / "kernels.gtb", cache_dir=tmp / "cache", exporters={"stub": StubExporter()})
+        check(not loader.stale, "same toolchain: the bundle is used")
+        check(loader.ensure("vector_add", "stub", "float32", [(1 << 16,), (1 << 16,)]), "a different length in the same bucket hits")
+        check(loader.ensure("vector_add", "stub", "float32", [(1 << 20,), (1 << 20,)]), "  ...and installs only once")
+        check(len(list((tmp / "cache" / "stub").iterdir())) == 1, "one artifact unpacked")
+        check(not loader.ensure("vector_add", "stub", "float16", [(1 << 20,), (1 << 20,)]), "another dtype falls back to JIT")
+        check(not loader.ensure("conv1d", "stub", "float32", [(4096,), (7,)], {"stride": 2, "padding": 3}), "other params fall back to JIT")
+        check(not loader.ensure("gemm", "cute", "float32", [(512, 512), (512, 512)]), "a skipped backend falls back to JIT")
+        check(loader.stats == LoaderStats(hits=2, installs=1, misses=3), f"stats: {loader.stats}")
+
+        stale = Loader(tmp / "kernels.gtb", cache_dir=tmp / "stale", exporters={"stub": StubExporter()})
+        stale.stale = True  # as if built with another toolchain
+        check(not stale.ensure("vector_add", "stub", "float32", [(1 << 20,), (1 << 20,)]), "a stale bundle is ignored")
+
+        reg = Registry()
+        reg.register_backend("stub")
+        reg.register("vector_add", "stub", lambda a, b: a + b)
+        reg.register("conv1d", "stub", lambda x, w, stride=1, padding=0: x)
+        reg.register("gemm", "stub", lambda a, b, **config: a @ b)
+        loader = Loader(tmp / "kernels.gtb", cache_dir=tmp / "attached", exporters={"stub": StubExporter()})
+        loader.attach(reg)
+        a = np.ones(1 << 20, np.float32)
+        out = reg.call("vector_add", a, a)
+        check(out[0] == 2 and loader.stats.installs == 1, "attach installs on the first registry call")
+        reg.call("vector_add", a, a)
+        check(loader.stats == LoaderStats(hits=2, installs=1, misses=0), "  ...and later calls only hit")
+        x, w = np.ones(4096, np.float32), np.ones(7, np.float32)
+        reg.call("conv1d", x, w, padding=3)
+        check(loader.stats.installs == 2, "the op's defaults fill in params the call leaves out")
+        reg.call("conv1d", x, w, stride=2, padding=3)
+        check(loader.stats.misses == 1, "  ...and other params still miss")
+        m = np.ones((512, 512), np.float16)
+        reg.call("gemm", m, m, BM=128, BN=128)
+        check(loader.stats.installs == 3, "a call with the entry's config hits it")
+        reg.call("gemm", m, m)
+        check(loader.stats.misses == 2, "  ...and one without it misses")
+
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
+    return all_passed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m gpu_tile.bundle")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_build = sub.add_parser("build", help="Compile a manifest into a bundle")
+    p_build.add_argument("manifest")
+    p_build.add_argument("-o", "--output", required=True)
+    p_build.add_argument("--stub", action="store_true", help="write stub artifacts (no GPU needed)")
+
+    p_inspect = sub.add_parser("inspect", help="List a bundle's entries")
+    p_inspect.add_argument("bundle")
+
+    sub.add_parser("selfcheck", help="Check the manifest, file format and loader on the host")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "selfcheck":
+        return 0 if selfcheck() else 1
+    if args.cmd == "build":
+        manifest = Manifest.load(args.manifest)
+        if args.stub:
+            manifest.entries = [Entry(e.op, "stub", e.dtype, e.shapes, e.params, e.config) for e in manifest.entries]
+        header = build(manifest, args.output)
+        print(f"{args.output}: {len(header['entries'])} artifacts, {len(header['skipped'])} skipped (JIT at run time)")
+        return 0
+    bundle = Bundle(args.bundle)
+    print(f"{bundle.path}: version {bundle.version}, format {FORMAT}, toolchain {bundle.header['toolchain']}")
+    for key, row in bundle.index.items():
+        print(f"  {row['size']:10d} B  {key}")
+    for key in bundle.header["skipped"]:
+        print(f"  {'skipped':>10}    {key}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""One command line for every op: ``python -m gpu_tile <command>``.
+
+::
+
+    python -m gpu_tile ops
+    python -m gpu_tile run conv1d --backend numpy --shape 65536 --shape 15 --param padding=7
+    python -m gpu_tile test gemm --device cuda
+    python -m gpu_tile bench --ops gemm --backends triton cute --out results.json
+    python -m gpu_tile tune --m 2048 --n 2048 --k 2048 --db tuning.json
+    python -m gpu_tile --importtime run vector_add --backend numpy
+
+Nothing heavy is imported up front. Backend modules only register
+implementations (``gpu_tile/backends``). ``--backend`` loads just that one,
+and torch, cupy, cutlass, triton and cuda.tile are imported the first time a
+kernel actually runs. ``--help`` and the NumPy backend on ``--device cpu``
+never import them.
+
+``--importtime`` reruns the command under ``python -X importtime`` and prints
+where startup went: total import time, the slowest top-level imports, and
+which GPU libraries were imported at all.
+"""
+
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+import time
+
+GPU_LIBRARIES = ("torch", "cupy", "cupyx", "cutlass", "triton", "cuda")
+
+
+# -- backend and input setup ---------------------------------------------------
+
+
+def _registry(backends=None):
+    """The registry with only ``backends`` loaded (all of them when None)."""
+    from gpu_tile import backends as backend_modules
+    from gpu_tile import registry
+
+    if backends is None:
+        registry.ensure_backends()
+    else:
+        unknown = [b for b in backends if b not in backend_modules.MODULES]
+        if unknown:
+            raise SystemExit(f"unknown backend {unknown[0]!r}; choose from {', '.join(backend_modules.MODULES)}")
+        backend_modules.load([backend_modules.MODULES[b] for b in backends])
+    return registry.REGISTRY
+
+
+def _shape(text: str) -> tuple:
+    try:
+        return tuple(int(n) for n in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shape must look like 1024 or 64x128, not {text!r}") from None
+
+
+def _param(text: str) -> tuple:
+    key, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"parameters are KEY=VALUE, not {text!r}")
+    try:
+        return key, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return key, value
+
+
+def _case(op: str, shapes, params):
+    """A bench ``Case``: the given shapes, or the op's smallest benchmark case."""
+    from gpu_tile.bench import CASES, Case, _numel
+
+    if shapes:
+        return Case(op, tuple(shapes), dict(params))
+    known = [c for c in CASES if c.op == op]
+    if not known:
+        raise SystemExit(f"{op} has no default shapes; pass one --shape per array argument")
+    case = min(known, key=lambda c: sum(_numel(s) for s in c.inputs))
+    return Case(op, case.inputs, {**case.params, **dict(params)})
+
+
+def _to_host(x):
+    import numpy as np
+
+    if hasattr(x, "get") and not isinstance(x, np.ndarray):
+        return x.get()  # cupy
+    if hasattr(x, "detach"):
+        return x.detach().float().cpu().numpy()  # torch
+    return np.asarray(x)
+
+
+def _tolerance(dtype: str) -> float:
+    return {"float16": 2e-2, "bfloat16": 5e-2, "float64": 1e-9}.get(dtype, 1e-4)
+
+
+# -- commands ------------------------------------------------------------------
+
+
+def cmd_ops(args) -> int:
+    reg = _registry(args.backends)
+    backends = reg.backends()
+    print(f"{'op':14} " + " ".join(f"{b:>8}" for b in backends))
+    for op in reg.ops():
+        have = {i.backend for i in reg.impls(op)}
+        print(f"{op:14} " + " ".join(f"{'x' if b in have else '-':>8}" for b in backends))
+    print(f"{'available':14} " + " ".join(f"{'yes' if reg.is_available(b) else 'no':>8}" for b in backends))
+    return 0
+
+
+def cmd_run(args) -> int:
+    from gpu_tile.bench import _make_inputs, _time_ms
+
+    reg = _registry(None if args.backend is None else [args.backend])
+    case = _case(args.op, args.shape, args.param)
+    inputs = _make_inputs(case, args.dtype, args.device)
+    if args.backend is None:
+        impl = reg.select(args.op, *inputs, **case.params)
+        backend, fn = impl.backend, impl.fn
+    else:
+        backend, fn = args.backend, reg.get(args.op, args.backend)
+    out = fn(*inputs, **case.params)
+    ms = _time_ms(lambda: fn(*inputs, **case.params), args.device, args.iters, args.warmup) if args.iters else None
+    host = _to_host(out)
+    print(f"{args.op} on {backend}: {case.label} {args.dtype} -> {'x'.join(map(str, host.shape)) or 'scalar'} {host.dtype}")
+    print(f"  checksum {float(host.astype('float64').sum()):.6g}" + (f", {ms:.4f} ms" if ms is not None else ""))
+    return 0
+
+
+def cmd_test(args) -> int:
+    import numpy as np
+
+    from gpu_tile.bench import CASES, _make_inputs
+
+    reg = _registry(None if args.backends is None else sorted({*args.backends, "numpy"}))
+    ops = args.ops or sorted({c.op for c in CASES})
+    failures = 0
+    for op in ops:
+        case = _case(op, args.shape, args.param)
+        inputs = _make_inputs(case, args.dtype, args.device)
+        host_inputs = [_to_host(x).astype(np.float32 if args.dtype != "float64" else np.float64) for x in inputs]
+        expected = reg.get(op, "numpy")(*host_inputs, **case.params)
+        sig = reg.signature(inputs, case.params)
+        for impl in reg.candidates(op, sig):
+            if args.backends and impl.backend not in args.backends:
+                continue
+            got = _to_host(impl.fn(*inputs, **case.params))
+            tol = _tolerance(args.dtype)
+            scale = max(1.0, float(np.max(np.abs(expected))) if np.size(expected) else 1.0)
+            ok = got.shape == np.shape(expected) and np.allclose(got, expected, rtol=tol, atol=tol * scale)
+            failures += not ok
+            print(f"  {'✓' if ok else '✗'} {op:12} {impl.backend:8} {case.label}")
+    print("✓ All tests passed!" if not failures else f"✗ {failures} failed")
+    return 1 if failures else 0
+
+
+def cmd_bench(args) -> int:
+    from gpu_tile import bench
+
+    doc = bench.run(args.ops, args.backends, args.dtypes, args.device, args.iters, args.warmup)
+    if args.out:
+        bench.save(doc, args.out)
+    print(bench.bandwidth_report(doc))
+    return 0
+
+
+def cmd_tune(args) -> int:
+    from gpu_tile import tuner
+
+    return tuner.main(["run", *args.rest])
+
+
+# -- startup measurement -------------------------------------------------------
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_importtime(stderr: str) -> list:
+    """``(module, self_us, cumulative_us, depth)`` for each ``-X importtime`` line."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _IMPORTTIME.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), (len(m.group(3)) - 1) // 2))
+    return rows
+
+
+def import_profile(argv) -> tuple:
+    """Run ``python -m gpu_tile argv`` under ``-X importtime``: ``(rows, wall_s, returncode, stdout)``."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [_root(), os.environ.get("PYTHONPATH")])))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "gpu_tile", *argv], capture_output=True, text=True, env=env
+    )
+    wall = time.perf_counter() - start
+    stderr = "\n".join(line for line in proc.stderr.splitlines() if not _IMPORTTIME.match(line) and "import time:" not in line)
+    if stderr:
+        print(stderr, file=sys.stderr)
+    return parse_importtime(proc.stderr), wall, proc.returncode, proc.stdout
+
+
+def gpu_imports(rows) -> list:
+    return sorted({name for name, *_ in rows if name.split(".")[0] in GPU_LIBRARIES})
+
+
+def importtime_report(rows, wall, top=10) -> str:
+    roots = [r for r in rows if r[3] == 0]
+    total_ms = sum(r[2] for r in roots) / 1e3
+    lines = [f"startup: {wall * 1e3:.0f} ms wall, {total_ms:.0f} ms importing {len(rows)} modules"]
+    lines.append(f"  {'cumulative':>10} {'self':>8}  module")
+    for name, self_us, cum_us, _ in sorted(roots, key=lambda r: -r[2])[:top]:
+        lines.append(f"  {cum_us / 1e3:8.1f}ms {self_us / 1e3:6.1f}ms  {name}")
+    gpu = gpu_imports(rows)
+    lines.append("  GPU libraries imported: " + (", ".join(gpu) if gpu else "none"))
+    return "\n".join(lines)
+
+
+def _root() -> str:
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# -- entry point ---------------------------------------------------------------
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m gpu_tile", description="Run, test, benchmark and tune the kernels.")
+    parser.add_argument("--importtime", action="store_true", help="rerun under -X importtime and report startup cost")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_ops = sub.add_parser("ops", help="List ops and the backends that implement them")
+    p_ops.add_argument("--backends", nargs="*", help="load only these backends")
+    p_ops.set_defaults(fn=cmd_ops)
+
+    p_run = sub.add_parser("run", help="Run one op once and time it")
+    p_run.add_argument("op")
+    p_run.add_argument("--backend", help="default: what the registry picks for the inputs")
+    p_run.add_argument("--iters", type=int, default=10, help="timed calls (0 to skip timing)")
+    p_run.add_argument("--warmup", type=int, default=2)
+    p_run.set_defaults(fn=cmd_run)
+
+    p_test = sub.add_parser("test", help="Check backends against the NumPy reference")
+    p_test.add_argument("ops", nargs="*", help="default: every op with benchmark cases")
+    p_test.add_argument("--backends", nargs="*")
+    p_test.set_defaults(fn=cmd_test)
+
+    for p in (p_run, p_test):
+        p.add_argument("--shape", type=_shape, action="append", help="one per array argument, e.g. 64x128")
+        p.add_argument("--param", type=_param, action="append", default=[], metavar="KEY=VALUE")
+        p.add_argument("--dtype", default="float32")
+        p.add_argument("--device", default="cpu", help="'cuda' for the GPU backends")
+
+    p_bench = sub.add_parser("bench", help="Benchmark matrix (see gpu_tile.bench)")
+    p_bench.add_argument("--ops", nargs="*")
+    p_bench.add_argument("--backends", nargs="*")
+    p_bench.add_argument("--dtypes", nargs="+", default=["float32"])
+    p_bench.add_argument("--device", default="cuda")
+    p_bench.add_argument("--iters", type=int, default=100)
+    p_bench.add_argument("--warmup", type=int, default=5)
+    p_bench.add_argument("--out")
+    p_bench.set_defaults(fn=cmd_bench)
+
+    p_tune = sub.add_parser("tune", help="Autotune the Triton matmul (see gpu_tile.tuner)", add_help=False)
+    p_tune.add_argument("rest", nargs=argparse.REMAINDER)
+    p_tune.set_defaults(fn=cmd_tune)
+
+    sub.add_parser("selfcheck", help="Check that the CLI stays import-light").set_defaults(fn=lambda args: 0 if selfcheck() else 1)
+    return parser
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = build_parser().parse_args(argv)
+    if args.importtime:
+        rows, wall, code, stdout = import_profile([a for a in argv if a != "--importtime"])
+        sys.stdout.write(stdout)
+        print(importtime_report(rows, wall))
+        return code
+    return args.fn(args)
+
+
+def selfcheck() -> bool:
+    all_passed = True
+
+    def check(cond, msg):
+        nonlocal all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    print("Testing lazy imports:")
+    for argv in (["--help"], ["run", "--help"], ["ops", "--backends", "numpy"], ["run", "relu", "--backend", "numpy", "--iters", "1"]):
+        rows, wall, code, _ = import_profile(argv)
+        gpu = gpu_imports(rows)
+        check(code == 0 and rows and not gpu, f"{' '.join(argv)}: {wall * 1e3:.0f} ms, GPU libraries: {gpu or 'none'}")
+    rows, _, _, _ = import_profile(["--help"])
+    check("numpy" not in {r[0] for r in rows}, "--help does not even import numpy")
+
+    sample = "import time:       120 |        340 | gpu_tile\nimport time:        80 |         80 |   gpu_tile.cli\n"
+    check(parse_importtime(sample) == [("gpu_tile", 120, 340, 0), ("gpu_tile.cli", 80, 80, 1)], "parses -X importtime output")
+
+    print("Testing commands on the NumPy backend:")
+    check(_shape("64x128") == (64, 128) and _param("padding=7") == ("padding", 7) and _param("kind=max") == ("kind", "max"), "shape and parameter parsing")
+    check(_case("conv1d", [], [("padding", 1)]).params["padding"] == 1, "default shapes come from the benchmark cases")
+    check(main(["run", "conv1d", "--backend", "numpy", "--shape", "4096", "--shape", "5", "--param", "padding=2", "--iters", "0"]) == 0, "run conv1d")
+    check(main(["test", "gemm", "relu", "pool1d", "--backends", "numpy"]) == 0, "test against the reference")
+    try:
+        main(["run", "relu", "--backend", "nope"])
+        check(False, "unknown backend is rejected")
+    except SystemExit as e:
+        check("unknown backend" in str(e), "unknown backend is rejected")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
+    return all_passed
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""Bounded ``cute.compile`` caching with per-kernel shape policies.
+
+``cute.compile`` bakes every static extent into the kernel (``8:1`` in
+``cute-dsl/13-layout.py``), so keying compiled functions on exact shapes
+compiles one variant per distinct shape. With variable sequence lengths that
+is hundreds of compiles. A ``ShapePolicy`` says, per tensor argument and
+mode, how much of the extent the kernel is specialized on:
+
+- ``Static()``: the exact extent (the default, and the old behaviour);
+- ``Dynamic(align)``: compiled as ``?`` with ``mark_compact_shape_dynamic``.
+  Only the alignment class is kept, the largest power of two up to ``align``
+  that divides the extent, as the ``divisibility`` hint, so at most
+  ``log2(align) + 1`` variants exist;
+- ``Pow2(minimum)`` and ``Multiple(n)``: buckets. The kernel stays static at
+  the bucket extent, and the caller pads the tensor up to it (``pad_shapes``).
+  Use these for modes whose static value matters to the generated code, such
+  as a short loop that gets unrolled, and where padding is harmless.
+
+``CompileCache`` keys on the policy's bucketed shapes, keeps at most
+``max_variants`` compiled functions per kernel (least recently used first out)
+and counts compiles, hits, evictions and compile time::
+
+    python -m gpu_tile.compile_cache simulate --policy pow2 --calls 2000
+"""
+
+import argparse
+import collections
+import sys
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Static:
+    def key(self, n: int):
+        return n
+
+    def bucket(self, n: int) -> int:
+        return n
+
+
+@dataclass(frozen=True)
+class Dynamic:
+    align: int = 16
+
+    def key(self, n: int):
+        return ("?", self.divisibility(n))
+
+    def divisibility(self, n: int) -> int:
+        return min(self.align, n & -n) if n else self.align
+
+    def bucket(self, n: int) -> int:
+        return n
+
+
+@dataclass(frozen=True)
+class Pow2:
+    minimum: int = 1
+
+    def key(self, n: int):
+        return self.bucket(n)
+
+    def bucket(self, n: int) -> int:
+        return max(self.minimum, 1 << (n - 1).bit_length() if n > 1 else 1)
+
+
+@dataclass(frozen=True)
+class Multiple:
+    n: int
+
+    def key(self, n: int):
+        return self.bucket(n)
+
+    def bucket(self, n: int) -> int:
+        return max(self.n, -(-n // self.n) * self.n)
+
+
+STATIC = Static()
+
+
+class ShapePolicy:
+    """Per-mode policies for each tensor argument, in argument order.
+
+    ``ShapePolicy((Dynamic(), Static()), None)`` makes mode 0 of the first
+    tensor dynamic and leaves everything else static.
+    """
+
+    def __init__(self, *args):
+        self.args = tuple(tuple(modes) if modes is not None else () for modes in args)
+
+    def _modes(self, i, ndim):
+        modes = self.args[i] if i < len(self.args) else ()
+        return modes + (STATIC,) * (ndim - len(modes))
+
+    def key(self, shapes) -> tuple:
+        return tuple(
+            tuple(m.key(n) for m, n in zip(self._modes(i, len(shape)), shape)) for i, shape in enumerate(shapes)
+        )
+
+    def pad_shapes(self, shapes) -> list:
+        """Shapes the tensors must be padded to: bucketed modes rounded up."""
+        return [tuple(m.bucket(n) for m, n in zip(self._modes(i, len(shape)), shape)) for i, shape in enumerate(shapes)]
+
+    def dynamic_modes(self, i, shape) -> list:
+        """``(mode, divisibility)`` to mark dynamic on tensor ``i``."""
+        return [(mode, m.divisibility(n)) for mode, (m, n) in enumerate(zip(self._modes(i, len(shape)), shape)) if isinstance(m, Dynamic)]
+
+    def mark(self, tensors) -> list:
+        """``from_dlpack`` each tensor with its dynamic modes marked."""
+        from cutlass.cute.runtime import from_dlpack
+
+        out = []
+        for i, t in enumerate(tensors):
+            ct = from_dlpack(t)
+            for mode, divisibility in self.dynamic_modes(i, tuple(t.shape)):
+                ct = ct.mark_compact_shape_dynamic(mode=mode, divisibility=divisibility)
+            out.append(ct)
+        return out
+
+    def __repr__(self):
+        return f"ShapePolicy{self.args!r}"
+
+
+@dataclass
+class KernelStats:
+    compiles: int = 0
+    hits: int = 0
+    evictions: int = 0
+    compile_s: float = 0.0
+    variants: int = 0  # currently cached
+
+    @property
+    def hit_rate(self) -> float:
+        calls = self.compiles + self.hits
+        return self.hits / calls if calls else 0.0
+
+
+class CompileCache:
+    def __init__(self, max_variants: int | None = 64):
+        self.max_variants = max_variants
+        self._entries = {}  # kernel -> OrderedDict(key -> compiled)
+        self._stats = {}  # kernel -> KernelStats
+
+    def get(self, kernel: str, key, build):
+        """The compiled function for ``key``, calling ``build()`` on a miss."""
+        entries = self._entries.setdefault(kernel, collections.OrderedDict())
+        stats = self._stats.setdefault(kernel, KernelStats())
+        compiled = entries.get(key)
+        if compiled is not None:
+            entries.move_to_end(key)
+            stats.hits += 1
+            return compiled
+        start = time.perf_counter()
+        compiled = entries[key] = build()
+        stats.compile_s += time.perf_counter() - start
+        stats.compiles += 1
+        if self.max_variants is not None and len(entries) > self.max_variants:
+            entries.popitem(last=False)
+            stats.evictions += 1
+        stats.variants = len(entries)
+        return compiled
+
+    def stats(self) -> dict:
+        return dict(self._stats)
+
+    def clear(self):
+        self._entries.clear()
+        self._stats.clear()
+
+    def report(self) -> str:
+        lines = [f"{'kernel':24} {'compiles':>8} {'hits':>8} {'hit rate':>8} {'variants':>8} {'evicted':>8} {'compile s':>10}"]
+        for kernel, s in sorted(self._stats.items()):
+            lines.append(
+                f"{kernel:24} {s.compiles:8d} {s.hits:8d} {s.hit_rate:8.1%} {s.variants:8d} {s.evictions:8d} {s.compile_s:10.3f}"
+            )
+        return "\n".join(lines)
+
+
+CACHE = CompileCache()
+
+# Named policies for a 1D tensor, for the simulator and the CLI
+POLICIES = {
+    "static": ShapePolicy((STATIC,)),
+    "dynamic": ShapePolicy((Dynamic(),)),
+    "pow2": ShapePolicy((Pow2(16),)),
+    "multiple": ShapePolicy((Multiple(128),)),
+}
+
+
+def simulate(policy: ShapePolicy, lengths, max_variants=None) -> KernelStats:
+    """Replay a stream of 1D lengths against a cache with a no-op compile."""
+    cache = CompileCache(max_variants)
+    for n in lengths:
+        cache.get("kernel", policy.key([(n,)]), object)
+    return cache.stats()["kernel"]
+
+
+def padding_overhead(policy: ShapePolicy, lengths) -> float:
+    """Extra elements processed because of bucket padding, relative to the input."""
+    padded = sum(policy.pad_shapes([(n,)])[0][0] for n in lengths)
+    return padded / sum(lengths) - 1
+
+
+def selfcheck() -> bool:
+    import random
+
+    all_passed = True
+
+    def check(cond, msg):
+        nonlocal all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    print("Testing shape policies:")
+    check([Pow2().bucket(n) for n in (1, 2, 3, 1000, 1024, 1025)] == [1, 2, 4, 1024, 1024, 2048], "pow2 rounds up")
+    check(Pow2(16).bucket(3) == 16 and Multiple(128).bucket(129) == 256 and Multiple(128).bucket(0) == 128, "minimum bucket and multiples")
+    check([Dynamic(16).divisibility(n) for n in (1024, 24, 7, 0)] == [16, 8, 1, 16], "dynamic keeps only the alignment class")
+    policy = ShapePolicy((Dynamic(), STATIC), (Pow2(),))
+    shapes = [(1000, 64), (7,)]
+    check(policy.key(shapes) == ((("?", 8), 64), (8,)), f"key per argument and mode: {policy.key(shapes)}")
+    check(policy.pad_shapes(shapes) == [(1000, 64), (8,)], "only bucketed modes are padded")
+    check(policy.dynamic_modes(0, (1000, 64)) == [(0, 8)] and policy.dynamic_modes(1, (7,)) == [], "dynamic modes are marked with their divisibility")
+    check(ShapePolicy().key([(3, 4)]) == ((3, 4),), "unlisted modes are static")
+
+    print("Testing compile cache:")
+    built = []
+    cache = CompileCache(max_variants=2)
+    for key in ("a", "b", "a", "c", "b"):
+        cache.get("k", key, lambda key=key: built.append(key) or key)
+    s = cache.stats()["k"]
+    check(built == ["a", "b", "c", "b"], f"compiles only on a miss: {built}")
+    check((s.compiles, s.hits, s.evictions, s.variants) == (4, 1, 2, 2), "LRU keeps max_variants per kernel")
+
+    random.seed(0)
+    lengths = [random.randint(1, 4096) for _ in range(2000)]
+    counts = {name: simulate(p, lengths).compiles for name, p in POLICIES.items()}
+    check(counts["static"] > 1000, f"static: {counts['static']} compiles for 2000 random lengths")
+    check(counts["dynamic"] <= 5, f"dynamic: {counts['dynamic']} compiles (alignment classes 1..16)")
+    check(counts["pow2"] <= 9, f"pow2: {counts['pow2']} compiles, {padding_overhead(POLICIES['pow2'], lengths):.0%} padding")
+    check(counts["multiple"] <= 32, f"multiple of 128: {counts['multiple']} compiles, {padding_overhead(POLICIES['multiple'], lengths):.1%} padding")
+    check(simulate(POLICIES["static"], lengths, max_variants=64).variants == 64, "max_variants bounds the cache size")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
+    return all_passed
+
+
+def main(argv=None) -> int:
+    import random
+
+    parser = argparse.ArgumentParser(prog="python -m gpu_tile.compile_cache")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_sim = sub.add_parser("simulate", help="Compile counts for random 1D lengths under each policy")
+    p_sim.add_argument("--policy", choices=sorted(POLICIES), nargs="*", default=None)
+    p_sim.add_argument("--calls", type=int, default=1000)
+    p_sim.add_argument("--max-len", type=int, default=4096)
+    p_sim.add_argument("--max-variants", type=int, default=None)
+    p_sim.add_argument("--seed", type=int, default=0)
+
+    sub.add_parser("selfcheck", help="Check bucketing and the cache")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "selfcheck":
+        return 0 if selfcheck() else 1
+    rng = random.Random(args.seed)
+    lengths = [rng.randint(1, args.max_len) for _ in range(args.calls)]
+    print(f"{'policy':10} {'compiles':>8} {'hit rate':>8} {'evicted':>8} {'padding':>8}")
+    for name in args.policy or POLICIES:
+        s = simulate(POLICIES[name], lengths, args.max_variants)
+        print(f"{name:10} {s.compiles:8d} {s.hit_rate:8.1%} {s.evictions:8d} {padding_overhead(POLICIES[name], lengths):8.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""Host-side index tables for ``cute-dsl/10-1d-conv.py``.
+
+For a 1D convolution with input length ``L``, kernel size ``K``, stride ``S``
+and zero padding ``P``, output ``o`` reads ``x[o*S - P + k]`` for
+``k in [0, K)``. Only taps that land inside ``[0, L)`` contribute, and those
+always form one contiguous range ``[k_lo, k_hi)``.
+
+The output is cut into blocks of ``block`` elements (one thread each).
+
+* An interior block is full, and every tap of every output in it is in
+  bounds. It needs no predicates at all.
+* Every other block is an edge block. It gets a row in the tap table: one
+  ``(k_lo, k_hi)`` pair per thread. Threads past the end of the output get
+  ``(0, -1)``, which tells them not to store.
+
+Interior blocks always form one contiguous range, so they launch as a single
+grid with a block offset.
+"""
+
+from dataclasses import dataclass
+
+# (L, K, S, P) cases shared with cute-dsl/10-1d-conv.py
+TEST_CASES = [
+    (1024, 3, 1, 0),
+    (1024, 3, 1, 1),  # Same padding for K=3
+    (1024, 5, 1, 2),  # Same padding for K=5
+    (1024, 3, 2, 1),
+    (2048, 7, 3, 3),
+    (512, 11, 4, 5),
+    (100, 3, 1, 0),
+]
+
+
+def out_size(L: int, K: int, S: int, P: int) -> int:
+    return (L + 2 * P - K) // S + 1
+
+
+def tap_range(o: int, L: int, K: int, S: int, P: int) -> tuple:
+    """Valid taps ``[k_lo, k_hi)`` for output ``o``.
+
+    With ``P >= K`` a window can lie entirely in the padding. Its range is
+    empty (``k_lo == k_hi``) but never negative, so it stays distinct from the
+    ``(0, -1)`` past-the-end marker and the output is still stored (as 0).
+    """
+    start = o * S - P
+    k_lo = min(K, max(0, -start))
+    return k_lo, max(k_lo, min(K, L - start))
+
+
+@dataclass(frozen=True)
+class ConvPlan:
+    L: int
+    K: int
+    S: int
+    P: int
+    block: int
+    out_size: int
+    origins: tuple  # input index of tap 0 for the first output of each block
+    interior: range  # block ids that need no predicates (contiguous)
+    edge: tuple  # remaining block ids, in order
+    taps: tuple  # (k_lo, k_hi) per thread of each edge block, flattened
+
+    @property
+    def num_blocks(self) -> int:
+        return len(self.origins)
+
+    def tap_mask(self, edge_row: int, thread: int) -> int:
+        """The valid-tap bitmask (bit k set when tap k is read) of one edge-block thread."""
+        k_lo, k_hi = self.taps[edge_row * self.block + thread]
+        return sum(1 << k for k in range(k_lo, max(k_lo, k_hi)))
+
+
+def _first_interior(L, K, S, P, block):
+    # Smallest block whose first output has start = o*S - P >= 0.
+    first_out = -(-P // S)
+    return -(-first_out // block)
+
+
+def _end_interior(L, K, S, P, block, n_out):
+    # Largest output o with o*S - P + K - 1 < L, capped at the last output.
+    last_out = min(n_out - 1, (L - K + P) // S)
+    # Blocks ending at or before last_out (and full) are interior.
+    return (last_out + 1) // block
+
+
+def plan(L: int, K: int, S: int, P: int, block: int = 128) -> ConvPlan:
+    if K > L + 2 * P:
+        raise ValueError(f"kernel size {K} exceeds padded length {L + 2 * P}")
+    n_out = out_size(L, K, S, P)
+    num_blocks = -(-n_out // block)
+    origins = tuple(b * block * S - P for b in range(num_blocks))
+
+    begin = _first_interior(L, K, S, P, block)
+    end = max(begin, _end_interior(L, K, S, P, block, n_out))
+    interior = range(begin, end)
+    edge = tuple(b for b in range(num_blocks) if b not in interior)
+
+    taps = []
+    for b in edge:
+        for t in range(block):
+            o = b * block + t
+            taps.append(tap_range(o, L, K, S, P) if o < n_out else (0, -1))
+    return ConvPlan(L, K, S, P, block, n_out, origins, interior, edge, tuple(taps))
+
+
+if __name__ == "__main__":
+    import numpy as np
+
+    all_passed = True
+
+    def check(cond, msg):
+        global all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    def brute_force_interior(L, K, S, P, block):
+        n_out = out_size(L, K, S, P)
+        interior = []
+        for b in range(-(-n_out // block)):
+            outs = range(b * block, (b + 1) * block)
+            if outs[-1] < n_out and all(tap_range(o, L, K, S, P) == (0, K) for o in outs):
+                interior.append(b)
+        return interior
+
+    def conv_from_plan(x, w, p):
+        # Replays what the interior and edge kernels do with the tables.
+        y = np.full(p.out_size, np.nan)  # outputs the kernels never store stay NaN
+        for b in p.interior:
+            for t in range(p.block):
+                start = p.origins[b] + t * p.S
+                y[b * p.block + t] = x[start:start + p.K] @ w
+        for row, b in enumerate(p.edge):
+            for t in range(p.block):
+                k_lo, k_hi = p.taps[row * p.block + t]
+                if k_hi < 0:
+                    continue
+                start = p.origins[b] + t * p.S
+                y[b * p.block + t] = x[start + k_lo:start + k_hi] @ w[k_lo:k_hi]
+        return y
+
+    def conv_ref(x, w, S, P):
+        xp = np.pad(x, P)
+        n_out = out_size(len(x), len(w), S, P)
+        return np.array([xp[o * S:o * S + len(w)] @ w for o in range(n_out)])
+
+    print("Testing conv index tables:")
+    rng = np.random.default_rng(0)
+    extra = [(4096, 15, 1, 7), (2**16, 15, 3, 1), (300, 64, 1, 32), (7, 7, 1, 0)]
+    extra += [(10, 3, 1, 5), (300, 4, 3, 9), (40, 2, 2, 8)]  # P >= K: windows entirely in the padding
+    for L, K, S, P in TEST_CASES + extra:
+        for block in (128, 32):
+            p = plan(L, K, S, P, block)
+            ok = list(p.interior) == brute_force_interior(L, K, S, P, block)
+            ok = ok and sorted(list(p.interior) + list(p.edge)) == list(range(p.num_blocks))
+            x = rng.standard_normal(L)
+            w = rng.standard_normal(K)
+            ok = ok and np.allclose(conv_from_plan(x, w, p), conv_ref(x, w, S, P))
+            check(
+                ok,
+                f"L={L}, K={K}, S={S}, P={P}, block={block}: "
+                f"{len(p.interior)} interior / {len(p.edge)} edge blocks",
+            )
+
+    p = plan(10, 3, 1, 5, block=32)
+    check(p.taps[0] == (3, 3) and p.taps[p.out_size - 1] == (0, 0), "P >= K: all-padding windows get an empty range, not (0, -1)")
+
+    p = plan(1024, 3, 1, 1)
+    check(p.tap_mask(0, 0) == 0b110 and p.tap_mask(0, 1) == 0b111, "first output of same-padded K=3 skips tap 0")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
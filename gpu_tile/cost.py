@@ -0,0 +1,303 @@
+"""Predict a kernel's global-memory traffic from its access pattern.
+
+A script runs under the tile simulator (``gpu_tile/tilesim.py``) with address
+tracing on. Every launch then yields, per kernel argument:
+
+- bytes requested by loads, gathers, stores and atomics (``loaded``/``stored``);
+- the distinct bytes behind them (``unique_*``), so ``reuse = loaded / unique``;
+- the 32-byte sectors each access pulls in, which exposes uncoalesced gathers.
+
+Expected HBM traffic uses a two-state L2 model. The resident blocks
+(``min(blocks, sms)``) each touch up to ``block_footprint`` bytes. If all of
+that fits in L2, rereads hit and only the distinct sectors reach HBM
+(``compulsory``). Otherwise every access goes to HBM (``uncached``).
+
+Rereads and sector over-fetch above ``threshold`` are flagged::
+
+    python -m gpu_tile.cost report                       # every built-in case
+    python -m gpu_tile.cost report cuda-tile/03-conv1d.py --l2-mb 4 --strict
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from gpu_tile.tilesim import Simulator
+
+SECTOR = 32  # bytes per DRAM sector
+L2_BYTES = 50 * 2**20  # H100
+SMS = 132
+
+
+@dataclass(frozen=True)
+class BufferCost:
+    name: str
+    loaded: int  # bytes requested
+    unique_loaded: int  # distinct bytes
+    stored: int  # stores and atomics
+    unique_stored: int
+    sectors: int  # bytes of the 32-byte sectors, summed access by access
+
+    @property
+    def reuse(self) -> float:
+        return self.loaded / self.unique_loaded if self.unique_loaded else 0.0
+
+    @property
+    def overfetch(self) -> float:
+        requested = self.loaded + self.stored
+        return self.sectors / requested if requested else 0.0
+
+
+@dataclass(frozen=True)
+class KernelCost:
+    script: str
+    kernel: str
+    grid: tuple
+    buffers: tuple  # BufferCost per kernel argument that is touched
+    compulsory: int  # distinct sectors, in bytes
+    uncached: int  # sectors of every access, in bytes
+    block_footprint: int  # largest distinct-sector footprint of one block, in bytes
+    fits_l2: bool
+    flags: tuple
+
+    @property
+    def total(self) -> int:
+        return sum(b.loaded + b.stored for b in self.buffers)
+
+    @property
+    def unique(self) -> int:
+        return sum(b.unique_loaded + b.unique_stored for b in self.buffers)
+
+    @property
+    def reuse(self) -> float:
+        return self.total / self.unique if self.unique else 0.0
+
+    @property
+    def expected_hbm(self) -> int:
+        return self.compulsory if self.fits_l2 else self.uncached
+
+
+def _distinct(parts, unit=1):
+    # Number of distinct ``address // unit`` across the arrays in ``parts``
+    return np.unique(np.concatenate(parts) // unit).size if parts else 0
+
+
+def kernel_cost(launch, script="", l2_bytes=L2_BYTES, sms=SMS, threshold=1.5, min_share=0.05) -> KernelCost:
+    """Cost of one traced ``tilesim.Launch``.
+
+    Buffers that carry less than ``min_share`` of the requested bytes (a bias,
+    a scalar weight) are reported but never flagged.
+    """
+    names = list(launch.buffers)
+    los = np.array([launch.buffers[n][0] for n in names], dtype=np.int64)
+    order = np.argsort(los)
+
+    per_buffer = {n: {"loaded": [], "stored": [], "load_bytes": 0, "store_bytes": 0, "sectors": 0, "itemsize": 1} for n in names}
+    per_block = {}
+    for block, kind, addresses, nbytes in launch.accesses:
+        if not addresses.size:
+            continue
+        i = order[np.searchsorted(los[order], addresses[0], side="right") - 1]
+        # Offsets from the buffer start: device allocations are sector aligned, host ones need not be.
+        name, offsets = names[i], addresses - los[i]
+        entry = per_buffer[name]
+        entry["itemsize"] = nbytes // addresses.size
+        side = "loaded" if kind == "loaded" else "stored"
+        entry[side].append(offsets)
+        entry["load_bytes" if side == "loaded" else "store_bytes"] += nbytes
+        entry["sectors"] += _distinct([offsets], SECTOR) * SECTOR
+        per_block.setdefault(block, {}).setdefault(name, []).append(offsets)
+
+    buffers = []
+    compulsory = 0
+    for name in names:
+        e = per_buffer[name]
+        if not (e["loaded"] or e["stored"]):
+            continue
+        buffers.append(BufferCost(
+            name,
+            e["load_bytes"],
+            _distinct(e["loaded"]) * e["itemsize"],
+            e["store_bytes"],
+            _distinct(e["stored"]) * e["itemsize"],
+            e["sectors"],
+        ))
+        compulsory += _distinct(e["loaded"] + e["stored"], SECTOR) * SECTOR
+    uncached = sum(b.sectors for b in buffers)
+    footprint = max(
+        (sum(_distinct(parts, SECTOR) for parts in block.values()) * SECTOR for block in per_block.values()), default=0
+    )
+    fits = footprint * min(len(per_block), sms) <= l2_bytes
+
+    flags = []
+    total = sum(b.loaded + b.stored for b in buffers)
+    for b in buffers:
+        if b.loaded + b.stored < min_share * total:
+            continue
+        if b.reuse >= threshold:
+            fate = "served by L2" if fits else "each reread hits HBM"
+            flags.append(f"{b.name} is read {b.reuse:.2f}x ({fate})")
+        if b.overfetch >= threshold:
+            flags.append(f"{b.name} moves {b.overfetch:.2f}x the requested bytes in 32B sectors (uncoalesced)")
+    return KernelCost(script, launch.kernel, launch.grid, tuple(buffers), compulsory, uncached, footprint, fits, tuple(flags))
+
+
+def analyze(script, *args, entry="solution", l2_bytes=L2_BYTES, sms=SMS, threshold=1.5, **kwargs) -> list:
+    """Run ``script.entry(*args, **kwargs)`` on NumPy arrays and cost every launch it makes."""
+    sim = Simulator(trace=True)
+    getattr(sim.load_script(script), entry)(*args, **kwargs)
+    return [kernel_cost(launch, script, l2_bytes, sms, threshold) for launch in sim.launches]
+
+
+def _f32(rng, *shape):
+    return rng.standard_normal(shape, dtype=np.float32)
+
+
+def _empty(*shape):
+    return np.zeros(shape, np.float32)
+
+
+# Built-in cases: script -> (args builder, kwargs); about 1M elements each.
+def _quantized(rng, m, k, bits):
+    from gpu_tile import quant
+
+    qw = quant.quantize(_f32(rng, m, k), bits)
+    return (qw.q, qw.scales, qw.zeros, _f32(rng, k), _empty(m), m, k, bits, qw.group_size), {}
+
+
+def _sparse(rng, m, k, density):
+    from gpu_tile import sparse
+
+    csr = sparse.CSR.from_dense(sparse.random_sparse(rng, m, k, density, skew=True))
+    return (csr.indptr, csr.indices, csr.data, _f32(rng, k), _empty(m), *csr.bins()), {}
+
+
+CASES = {
+    "cuda-tile/02-relu.py": lambda rng: ((_f32(rng, 1024, 1024), _empty(1024, 1024), 1024, 1024), {}),
+    "cuda-tile/03-conv1d.py": lambda rng: ((_f32(rng, 2**20), _f32(rng, 15), _empty(2**20), 2**20, 15), {}),
+    "cuda-tile/04-matrix-vector-multiplication.py": lambda rng: ((_f32(rng, 1024, 1024), _f32(rng, 1024), _empty(1024), 1024, 1024), {}),
+    "cuda-tile/05-optimize-matrix-vector-multiplication.py": lambda rng: ((_f32(rng, 1024, 1024), _f32(rng, 1024), _empty(1024), 1024, 1024), {}),
+    "cuda-tile/07-average-pool-1d.py": lambda rng: ((_f32(rng, 2**20), 8, 1, 4, _empty(2**20 + 1), 2**20), {}),
+    "cuda-tile/14-pooling.py": lambda rng: ((_f32(rng, 2**20), 64, 1, 32, _empty(2**20 + 1), 2**20), {}),
+    "cuda-tile/09-sum-over-dimension.py": lambda rng: ((_f32(rng, 16, 256, 256), 1, _empty(16, 1, 256), (16, 256, 256), 3), {}),
+    "cuda-tile/10-rms-norm.py": lambda rng: ((_f32(rng, 256, 4096), _empty(256, 4096), 256, 4096), {}),
+    "cuda-tile/11-rms-norm-2stage.py": lambda rng: ((_f32(rng, 256, 4096), _empty(256, 4096), 256, 4096), {}),
+    "cuda-tile/12-l1-norm.py": lambda rng: ((_f32(rng, 256, 4096), _empty(256, 4096), 256, 4096), {}),
+    "cuda-tile/16-quantized-gemv.py": lambda rng: _quantized(rng, 1024, 1024, bits=4),
+    "cuda-tile/17-spmv.py": lambda rng: _sparse(rng, 1024, 4096, 0.01),
+    "cuda-tile/15-layer-norm.py": lambda rng: ((_f32(rng, 256, 4096), _empty(256, 4096), 256, 4096), {}),
+    "cuda-tile/18-scan.py": lambda rng: ((_f32(rng, 2**20), _empty(2**20)), {}),
+}
+
+
+def run_case(script, **options) -> list:
+    args, kwargs = CASES[script](np.random.default_rng(0))
+    return analyze(script, *args, **options, **kwargs)
+
+
+def _mib(n):
+    return f"{n / 2**20:8.2f} MiB"
+
+
+def report(costs) -> str:
+    lines = []
+    for c in costs:
+        lines.append(f"{c.script}  {c.kernel}  grid={c.grid}")
+        for b in c.buffers:
+            line = f"  {b.name:10s}"
+            if b.loaded:
+                line += f" loaded {_mib(b.loaded)} unique {_mib(b.unique_loaded)} reuse {b.reuse:5.2f}x"
+            if b.stored:
+                line += f" stored {_mib(b.stored)}"
+            lines.append(line)
+        lines.append(
+            f"  requested {_mib(c.total)}  compulsory {_mib(c.compulsory)}  uncached {_mib(c.uncached)}"
+            f"  expected HBM {_mib(c.expected_hbm)} (block footprint {c.block_footprint / 1024:.0f} KiB, "
+            f"{'fits' if c.fits_l2 else 'exceeds'} L2)"
+        )
+        lines.extend(f"  ! {flag}" for flag in c.flags)
+    return "\n".join(lines)
+
+
+def selfcheck() -> bool:
+    all_passed = True
+
+    def check(cond, msg):
+        nonlocal all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    print("Testing cost analyzer:")
+
+    (relu,) = run_case("cuda-tile/02-relu.py")
+    check(relu.reuse == 1.0 and not relu.flags and relu.expected_hbm == 8 * 2**20, "relu touches every byte once, no flags")
+
+    (rms,) = run_case("cuda-tile/10-rms-norm.py")
+    x = {b.name: b for b in rms.buffers}["X"]
+    check(x.reuse == 2.0 and any(f.startswith("X is read 2.00x") for f in rms.flags), "rms_norm_kernel reads X twice")
+    check(rms.fits_l2 and rms.expected_hbm == rms.compulsory, "  ...and the rereads fit in L2")
+    (l1,) = run_case("cuda-tile/12-l1-norm.py")
+    check({b.name: b for b in l1.buffers}["X"].reuse == 2.0, "l1_norm_kernel reads X twice")
+    (tight,) = run_case("cuda-tile/12-l1-norm.py", l2_bytes=2**20)
+    check(not tight.fits_l2 and tight.expected_hbm == tight.uncached and "each reread hits HBM" in tight.flags[0], "a small L2 turns rereads into HBM traffic")
+
+    (ln,) = run_case("cuda-tile/15-layer-norm.py")
+    check({b.name: b for b in ln.buffers}["X"].reuse == 1.0, "layer_norm_row_kernel reads X once")
+
+    (scan,) = run_case("cuda-tile/18-scan.py")
+    x = {b.name: b for b in scan.buffers}["X"]
+    check(scan.kernel == "scan_lookback_kernel" and x.reuse == 1.0 and x.unique_loaded == 4 * 2**20, "single-pass scan reads X once")
+
+    (conv,) = run_case("cuda-tile/03-conv1d.py")
+    a = {b.name: b for b in conv.buffers}["A"]
+    check(abs(a.reuse - 15) < 0.01, f"conv1d gathers every input K=15 times ({a.reuse:.2f}x)")
+    (pool,) = run_case("cuda-tile/07-average-pool-1d.py")
+    check(abs({b.name: b for b in pool.buffers}["input"].reuse - 8) < 0.01, "avg pool gathers kernel_size times at stride 1")
+
+    (gemv,) = run_case("cuda-tile/04-matrix-vector-multiplication.py")
+    check(any("A moves 8.00x" in f for f in gemv.flags), "column gathers in the naive gemv are uncoalesced")
+    (gemv2,) = run_case("cuda-tile/05-optimize-matrix-vector-multiplication.py")
+    check(not any(f.startswith("A ") for f in gemv2.flags), "tiled gemv reads A once, coalesced")
+    (qgemv,) = run_case("cuda-tile/16-quantized-gemv.py")
+    ratio = gemv2.compulsory / qgemv.compulsory
+    check(ratio > 6 and not any(f.startswith("Q ") for f in qgemv.flags), f"int4 gemv moves {ratio:.1f}x fewer bytes than fp32, Q read once")
+
+    rstd, norm = run_case("cuda-tile/11-rms-norm-2stage.py")
+    check((rstd.kernel, norm.kernel) == ("compute_rstd_kernel", "normalize_kernel"), "one cost per launch")
+    check(sum(c.expected_hbm for c in (rstd, norm)) >= rms.expected_hbm, "two stages cannot beat the fused kernel")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
+    return all_passed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m gpu_tile.cost")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_report = sub.add_parser("report", help="Cost the built-in cases")
+    p_report.add_argument("scripts", nargs="*", metavar="SCRIPT", help=f"default: all of {', '.join(CASES)}")
+    p_report.add_argument("--l2-mb", type=float, default=L2_BYTES / 2**20)
+    p_report.add_argument("--sms", type=int, default=SMS)
+    p_report.add_argument("--threshold", type=float, default=1.5)
+    p_report.add_argument("--strict", action="store_true", help="exit 1 if anything is flagged")
+
+    sub.add_parser("selfcheck", help="Check the analyzer against kernels with known reuse")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "selfcheck":
+        return 0 if selfcheck() else 1
+
+    unknown = sorted(set(args.scripts) - set(CASES))
+    if unknown:
+        parser.error(f"no built-in case for {', '.join(unknown)}")
+    costs = []
+    for script in args.scripts or CASES:
+        costs += run_case(script, l2_bytes=int(args.l2_mb * 2**20), sms=args.sms, threshold=args.threshold)
+    print(report(costs))
+    return 1 if args.strict and any(c.flags for c in costs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""On-disk fixtures for the test and benchmark drivers.
+
+A fixture is a directory under the store root (``gpu_tile/data/fixtures`` or
+``$GPU_TILE_FIXTURES``)::
+
+    <name>/meta.json                 inputs (file, dtype, shape) + free-form metadata
+    <name>/input0.npy ...            inputs, .npy or raw little-endian files
+    <name>/expected/<op>-<hash>.npy  cached reference outputs
+
+Inputs open as ``numpy.memmap``, so the NumPy backend reads them in place
+without loading them. ``Fixture.to_device`` streams one to the GPU through two
+pinned staging buffers: the copy of one chunk overlaps the disk read of the
+next. Reference results are computed on first use, once per
+``(op, params)`` key, and every later run memory-maps them from disk.
+
+Large random inputs are generated once, chunk by chunk, straight into the
+file, so a 2 GiB input is never built in host memory::
+
+    fx = FixtureStore().generate("avg_pool_1d", [(64, 128, 65536)], seed=0)
+    x = fx.to_device(0, "cuda", dtype=torch.bfloat16)
+    ref = fx.expected("avg_pool1d", {"kernel_size": 8}, compute=...)
+
+Production tensors are saved with ``FixtureStore.save``. bfloat16 (which
+NumPy lacks) is stored raw as uint16 and reinterpreted on the way to torch.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_ROOT = Path(__file__).resolve().parent / "data" / "fixtures"
+# Size of each pinned staging buffer used by Fixture.to_device.
+CHUNK_BYTES = 64 << 20
+# Elements generated per step by FixtureStore.generate.
+GENERATE_CHUNK = 1 << 24
+
+# Raw storage for dtypes NumPy has no type for.
+_RAW_STORAGE = {"bfloat16": "uint16"}
+
+
+def _storage_dtype(dtype: str) -> np.dtype:
+    return np.dtype(_RAW_STORAGE.get(dtype, dtype))
+
+
+def params_key(op: str, params: dict | None) -> str:
+    """File stem for a cached reference: readable op name plus a hash of the params."""
+    canonical = json.dumps(params or {}, sort_keys=True, default=str)
+    return f"{op}-{hashlib.sha1(canonical.encode()).hexdigest()[:12]}"
+
+
+def _write_atomic(path: Path, array):
+    tmp = path.with_suffix(".tmp.npy")
+    np.save(tmp, array)
+    os.replace(tmp, path)
+
+
+class Fixture:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path / "meta.json") as f:
+            self.meta = json.load(f)
+        self._inputs = None
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def specs(self) -> list:
+        return self.meta["inputs"]
+
+    @property
+    def inputs(self) -> list:
+        """Read-only memmaps, one per input."""
+        if self._inputs is None:
+            self._inputs = [self._open(spec) for spec in self.specs]
+        return self._inputs
+
+    def _open(self, spec):
+        path = self.path / spec["file"]
+        if path.suffix == ".npy":
+            return np.load(path, mmap_mode="r")
+        return np.memmap(path, dtype=_storage_dtype(spec["dtype"]), mode="r", shape=tuple(spec["shape"]))
+
+    def to_device(self, i: int, device: str = "cuda", dtype=None, chunk_bytes: int = CHUNK_BYTES):
+        """Input ``i`` on ``device``: the memmap itself on CPU, else a torch tensor."""
+        src = self.inputs[i]
+        if device == "cpu":
+            return src if dtype is None else np.asarray(src, dtype=dtype)
+
+        import torch
+
+        spec_dtype = getattr(torch, self.specs[i]["dtype"])
+        out = torch.empty(src.shape, dtype=dtype or spec_dtype, device=device)
+        flat_src = src.reshape(-1)
+        flat_out = out.view(-1)
+        n = flat_src.size
+        rows = max(1, chunk_bytes // src.itemsize)
+        staging = [torch.empty(min(rows, n), dtype=spec_dtype, pin_memory=True) for _ in range(2)]
+        copied = [None, None]
+        for j, start in enumerate(range(0, n, rows)):
+            buf = staging[j % 2]
+            if copied[j % 2] is not None:
+                # The copy that last used this buffer must finish before it is refilled.
+                copied[j % 2].synchronize()
+            count = min(rows, n - start)
+            buf_np = buf.view(torch.uint16).numpy() if spec_dtype == torch.bfloat16 else buf.numpy()
+            buf_np[:count] = flat_src[start:start + count]
+            flat_out[start:start + count].copy_(buf[:count], non_blocking=True)
+            copied[j % 2] = torch.cuda.Event()
+            copied[j % 2].record()
+        torch.cuda.current_stream().synchronize()
+        return out
+
+    def expected(self, op: str, params: dict | None = None, compute=None, shape=None, dtype="float32"):
+        """Reference output for ``(op, params)``, computed once and then memory-mapped.
+
+        Without ``compute`` the NumPy backend's ``op`` runs on the memmapped
+        inputs. With ``compute`` and no ``shape`` it is called with no arguments
+        and returns the array. With ``shape``, it gets a writable ``.npy`` memmap
+        of that shape to fill in place (for outputs too large for host memory).
+        """
+        path = self.path / "expected" / f"{params_key(op, params)}.npy"
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            if shape is not None:
+                tmp = path.with_suffix(".tmp.npy")
+                out = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=tuple(shape))
+                compute(out)
+                out.flush()
+                del out
+                os.replace(tmp, path)
+            else:
+                if compute is None:
+                    from gpu_tile import registry
+
+                    registry.ensure_backends()
+                    fn = registry.REGISTRY.get(op, "numpy")
+                    result = fn(*self.inputs, **(params or {}))
+                else:
+                    result = compute()
+                _write_atomic(path, np.asarray(result))
+        return np.load(path, mmap_mode="r")
+
+
+class FixtureStore:
+    def __init__(self, root=None):
+        self.root = Path(root or os.environ.get("GPU_TILE_FIXTURES", DEFAULT_ROOT))
+
+    def __contains__(self, name: str) -> bool:
+        return (self.root / name / "meta.json").exists()
+
+    def names(self) -> list:
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if (p / "meta.json").exists())
+
+    def open(self, name: str) -> Fixture:
+        if name not in self:
+            raise FileNotFoundError(f"No fixture {name!r} in {self.root}")
+        return Fixture(self.root / name)
+
+    def save(self, name: str, inputs, meta: dict | None = None) -> Fixture:
+        """Write arrays (NumPy or torch, any device) as a new fixture, replacing an old one."""
+        path = self._fresh(name)
+        specs = []
+        for i, x in enumerate(inputs):
+            if type(x).__module__.startswith("torch"):
+                import torch
+
+                dtype = str(x.dtype).removeprefix("torch.")
+                x = x.detach().cpu()
+                if dtype in _RAW_STORAGE:
+                    x = x.view(getattr(torch, _RAW_STORAGE[dtype]))
+                x = x.numpy()
+            else:
+                x = np.asarray(x)
+                dtype = x.dtype.name
+            if dtype in _RAW_STORAGE:
+                file = f"input{i}.bin"
+                np.ascontiguousarray(x).tofile(path / file)
+            else:
+                file = f"input{i}.npy"
+                np.save(path / file, x)
+            specs.append({"file": file, "dtype": dtype, "shape": list(x.shape)})
+        return self._finish(path, specs, meta)
+
+    def import_raw(self, name: str, files, meta: dict | None = None) -> Fixture:
+        """Adopt existing raw dumps: ``files`` is ``[(path, dtype, shape), ...]``."""
+        path = self._fresh(name)
+        specs = []
+        for i, (src, dtype, shape) in enumerate(files):
+            file = f"input{i}.bin"
+            shutil.copyfile(src, path / file)
+            specs.append({"file": file, "dtype": dtype, "shape": list(shape)})
+        return self._finish(path, specs, meta)
+
+    def generate(self, name: str, shapes, dtype: str = "float32", seed: int = 0, meta: dict | None = None) -> Fixture:
+        """Standard-normal inputs, written in chunks. Reused if already present with the same recipe."""
+        recipe = {"shapes": [list(s) for s in shapes], "dtype": dtype, "seed": seed}
+        if name in self:
+            fixture = self.open(name)
+            if fixture.meta.get("recipe") == recipe:
+                return fixture
+        path = self._fresh(name)
+        rng = np.random.default_rng(seed)
+        specs = []
+        for i, shape in enumerate(shapes):
+            file = f"input{i}.npy"
+            out = np.lib.format.open_memmap(path / file, mode="w+", dtype=dtype, shape=tuple(shape))
+            flat = out.reshape(-1)
+            for start in range(0, flat.size, GENERATE_CHUNK):
+                stop = min(flat.size, start + GENERATE_CHUNK)
+                flat[start:stop] = rng.standard_normal(stop - start, dtype=np.float32)
+            out.flush()
+            del out, flat
+            specs.append({"file": file, "dtype": dtype, "shape": list(shape)})
+        return self._finish(path, specs, {**(meta or {}), "recipe": recipe})
+
+    def _fresh(self, name: str) -> Path:
+        if not re.fullmatch(r"[\w.\-]+", name):
+            raise ValueError(f"Fixture names are file names, got {name!r}")
+        path = self.root / name
+        if path.exists():
+            shutil.rmtree(path)
+        path.mkdir(parents=True)
+        return path
+
+    def _finish(self, path: Path, specs, meta) -> Fixture:
+        with open(path / "meta.json", "w") as f:
+            json.dump({"inputs": specs, **(meta or {})}, f, indent=2)
+        return Fixture(path)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    all_passed = True
+
+    def check(cond, msg):
+        global all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    print("Testing fixture store (CPU):")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FixtureStore(tmp)
+
+        fx = store.generate("vadd", [(1000,), (1000,)], seed=1)
+        again = store.generate("vadd", [(1000,), (1000,)], seed=1)
+        check(isinstance(fx.inputs[0], np.memmap) and fx.inputs[0].shape == (1000,), "generated inputs open as memmaps")
+        check(np.array_equal(fx.inputs[0], again.inputs[0]), "same recipe reuses the stored data")
+        check(not np.array_equal(fx.inputs[0], store.generate("vadd", [(1000,), (1000,)], seed=2).inputs[0]), "new seed regenerates")
+
+        fx = store.open("vadd")
+        a, b = fx.inputs
+        ref = fx.expected("vector_add")
+        check(np.allclose(ref, a + b), "reference computed by the NumPy backend on memmapped inputs")
+        check(isinstance(fx.expected("vector_add"), np.memmap), "cached reference reopens as a memmap")
+
+        calls = []
+
+        def slow_ref():
+            calls.append(1)
+            return np.convolve(a, b[:5][::-1], mode="same")
+
+        fx.expected("conv1d", {"stride": 1, "padding": 2}, compute=slow_ref)
+        fx.expected("conv1d", {"padding": 2, "stride": 1}, compute=slow_ref)
+        check(len(calls) == 1, "reference is computed once per (op, params), independent of key order")
+        fx.expected("conv1d", {"stride": 1, "padding": 3}, compute=slow_ref)
+        check(len(calls) == 2, "different params get their own cache entry")
+
+        big = store.generate("pool", [(4, 8, 4096)], seed=0)
+
+        def fill(out):
+            for i in range(out.shape[0]):
+                out[i] = big.inputs[0][i].mean(axis=-1, keepdims=True)
+
+        got = big.expected("row_mean", {}, compute=fill, shape=(4, 8, 1))
+        check(np.allclose(got, big.inputs[0].mean(axis=-1, keepdims=True)), "large references fill a memmap in place")
+
+        x = np.arange(12, dtype=np.uint16).reshape(3, 4)
+        raw = Path(tmp) / "dump.bin"
+        x.tofile(raw)
+        fx = store.import_raw("prod", [(raw, "bfloat16", (3, 4))], meta={"source": "decode step 17"})
+        check(fx.inputs[0].dtype == np.uint16 and np.array_equal(fx.inputs[0], x), "raw bfloat16 dumps open as uint16 memmaps")
+        check(store.open("prod").meta["source"] == "decode step 17", "metadata round-trips")
+
+        fx = store.save("saved", [np.ones((2, 3), dtype=np.float16)])
+        check(fx.to_device(0, "cpu").dtype == np.float16, "to_device('cpu') hands the memmap to the NumPy backend")
+        check(store.names() == ["pool", "prod", "saved", "vadd"], "store lists its fixtures")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
@@ -0,0 +1,396 @@
+"""Asynchronous multi-stream launcher for independent op calls.
+
+Every ``solution()`` launches on ``cupy.cuda.get_current_stream()``, so
+independent requests issued one after another serialize on a single stream.
+``Executor`` keeps a pool of streams and makes one of them current (round
+robin) around each launch::
+
+    ex = Executor(num_streams=4)
+    y = ex.submit("rms_norm", x)          # registry op, or any callable
+    z = ex.submit("gelu", y)              # y is a dependency: an event edge
+    out = z.result()                      # or: out = await z
+
+A submitted op returns a ``LaunchFuture`` right away. When the op is launched,
+an event is recorded on its stream. A later launch that depends on the
+future, on a different stream, first waits on that event. A dependency is
+either passed as an argument or listed in ``after=``.
+
+The pool stream is current for both cupy (cuTile launches) and torch (Triton
+and torch launches, and the ``torch.empty`` outputs of every backend), so the
+event covers the op whatever backend runs it. Torch tensors the op reads or
+returns are recorded on the stream, so the caching allocator does not reuse
+their memory while the stream may still touch it. cute-DSL kernels ignore the
+current stream and launch on the legacy default stream; the pool streams are
+blocking, so those launches are ordered against all of them.
+
+Homogeneous requests to row-wise ops (same op, params, dtype, device and
+trailing shape) are held back and launched as one call on the row-wise
+concatenation. Each caller's future then resolves to its own slice of the
+output. Pending batches launch when they reach ``max_batch``, when a result is
+needed, or on ``flush()``.
+
+The scheduling core only sees the small stream/event interface of
+``CupyStreams``; ``FakeStreams`` implements it on the host for testing.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import sys
+from collections import defaultdict
+
+# Ops whose rows are independent, so requests can be concatenated along axis 0.
+BATCHABLE = frozenset({"relu", "leaky_relu", "gelu", "rms_norm", "l1_norm"})
+
+
+class CupyStreams:
+    """Cupy streams and events. ``use(stream)`` makes a stream current for cupy and torch."""
+
+    def __init__(self):
+        import cupy
+
+        self._cuda = cupy.cuda
+        self._torch_streams = {}  # cupy stream pointer -> torch.cuda.ExternalStream
+
+    def stream(self):
+        # Blocking streams: the cute-DSL kernels are compiled without a stream
+        # argument and launch on the legacy default stream, which then orders
+        # against every pool stream.
+        return self._cuda.Stream(non_blocking=False)
+
+    def _torch_stream(self, stream):
+        torch = sys.modules.get("torch")
+        if torch is None or not torch.cuda.is_available():
+            return None
+        ts = self._torch_streams.get(stream.ptr)
+        if ts is None:
+            ts = self._torch_streams[stream.ptr] = torch.cuda.ExternalStream(stream.ptr)
+        return ts
+
+    def use(self, stream):
+        ctx = contextlib.ExitStack()
+        ctx.enter_context(stream)
+        ts = self._torch_stream(stream)
+        if ts is not None:
+            import torch
+
+            ctx.enter_context(torch.cuda.stream(ts))
+        return ctx
+
+    def retain(self, values, stream):
+        """Record torch CUDA tensors on ``stream`` so the allocator waits for it before reuse."""
+        ts = self._torch_stream(stream)
+        if ts is None:
+            return
+        import torch
+
+        for v in values:
+            if isinstance(v, torch.Tensor) and v.is_cuda:
+                v.record_stream(ts)
+
+    def event(self):
+        return self._cuda.Event(block=False, disable_timing=True)
+
+    @staticmethod
+    def record(event, stream):
+        event.record(stream)
+
+    @staticmethod
+    def wait(stream, event):
+        stream.wait_event(event)
+
+    @staticmethod
+    def query(event) -> bool:
+        return event.done
+
+    @staticmethod
+    def synchronize(event):
+        event.synchronize()
+
+
+class FakeStreams:
+    """Host-only stand-in: ops run immediately and every stream call is logged."""
+
+    class Stream:
+        def __init__(self, streams, index):
+            self.streams = streams
+            self.index = index
+
+        def __enter__(self):
+            self.streams.current.append(self)
+            return self
+
+        def __exit__(self, *exc):
+            self.streams.current.pop()
+
+        def __repr__(self):
+            return f"stream{self.index}"
+
+    def __init__(self):
+        self.log = []
+        self.current = []
+        self._ids = itertools.count()
+
+    def stream(self):
+        return FakeStreams.Stream(self, next(self._ids))
+
+    def event(self):
+        return {"recorded_on": None}
+
+    def record(self, event, stream):
+        event["recorded_on"] = stream
+        self.log.append(("record", stream.index))
+
+    def wait(self, stream, event):
+        self.log.append(("wait", stream.index, event["recorded_on"].index))
+
+    def query(self, event) -> bool:
+        return event["recorded_on"] is not None
+
+    def synchronize(self, event):
+        pass
+
+    def use(self, stream):
+        return stream
+
+    def retain(self, values, stream):
+        self.log.append(("retain", stream.index, len(values)))
+
+
+class LaunchFuture:
+    """Result of ``Executor.submit``: the op's output once its stream reaches the event."""
+
+    __slots__ = ("_executor", "_batch", "value", "stream", "event")
+
+    def __init__(self, executor, batch=None):
+        self._executor = executor
+        self._batch = batch  # pending batch key until launched
+        self.value = None
+        self.stream = None
+        self.event = None
+
+    @property
+    def launched(self) -> bool:
+        return self.event is not None
+
+    def done(self) -> bool:
+        return self.launched and self._executor.streams.query(self.event)
+
+    def result(self):
+        if not self.launched:
+            self._executor._flush_batch(self._batch)
+        self._executor.streams.synchronize(self.event)
+        return self.value
+
+    def __await__(self):
+        if not self.launched:
+            self._executor._flush_batch(self._batch)
+        # Event.synchronize blocks the calling thread, so poll instead.
+        while not self.done():
+            yield from asyncio.sleep(0.0001).__await__()
+        return self.value
+
+
+class Executor:
+    def __init__(self, num_streams: int = 4, streams=None, max_batch: int = 64, batching: bool = True, registry=None):
+        self.streams = streams if streams is not None else CupyStreams()
+        self.registry = registry  # None: the global registry
+        self._pool = [self.streams.stream() for _ in range(num_streams)]
+        self._next = itertools.cycle(self._pool)
+        self.max_batch = max_batch
+        self.batching = batching
+        self._pending = defaultdict(list)  # batch key -> [(future, args, deps)]
+        self.launches = 0
+
+    def submit(self, op, *args, after=(), **params) -> LaunchFuture:
+        """Queue ``op(*args, **params)``. ``op`` is a registry op name or a callable."""
+        deps = list(after)
+        if any(isinstance(a, LaunchFuture) for a in args):
+            deps += [a for a in args if isinstance(a, LaunchFuture)]
+            args = tuple(self._resolve(a) for a in args)
+        key = self._batch_key(op, args, params)
+        if key is None:
+            future = LaunchFuture(self)
+            self._launch(op, args, params, deps, [future])
+            return future
+
+        future = LaunchFuture(self, key)
+        group = self._pending[key]
+        group.append((future, args, deps))
+        if len(group) >= self.max_batch:
+            self._flush_batch(key)
+        return future
+
+    def flush(self):
+        """Launch every pending batch."""
+        for key in list(self._pending):
+            self._flush_batch(key)
+
+    def synchronize(self):
+        self.flush()
+        for stream in self._pool:
+            event = self.streams.event()
+            self.streams.record(event, stream)
+            self.streams.synchronize(event)
+
+    def _resolve(self, value):
+        if not isinstance(value, LaunchFuture):
+            return value
+        if not value.launched:
+            self._flush_batch(value._batch)
+        return value.value
+
+    def _batch_key(self, op, args, params):
+        if not self.batching or not isinstance(op, str) or op not in BATCHABLE or len(args) != 1:
+            return None
+        from gpu_tile.registry import array_spec
+
+        spec = array_spec(args[0])
+        if spec is None or len(spec.shape) < 1 or not spec.contiguous:
+            return None
+        key = (op, spec.lib, spec.device, spec.dtype, spec.shape[1:], tuple(sorted(params.items())))
+        try:
+            hash(key)
+        except TypeError:  # unhashable params (``axes=[0, 1]``): launch on its own
+            return None
+        return key
+
+    def _flush_batch(self, key):
+        group = self._pending.pop(key, None)
+        if not group:
+            return
+        futures = [f for f, _, _ in group]
+        deps = [d for _, _, ds in group for d in ds]
+        if len(group) == 1:
+            self._launch(key[0], group[0][1], dict(key[5]), deps, futures)
+            return
+        arrays = [args[0] for _, args, _ in group]
+        self._launch(key[0], arrays, dict(key[5]), deps, futures, rows=[a.shape[0] for a in arrays])
+
+    def _launch(self, op, args, params, deps, futures, rows=None):
+        """Run ``op`` on the next pool stream. With ``rows``, ``args`` are the batch's
+        arrays, concatenated on that stream after its dependency waits."""
+        stream = next(self._next)
+        for dep in deps:
+            if not dep.launched:
+                self._flush_batch(dep._batch)
+            if dep.stream is not stream:
+                self.streams.wait(stream, dep.event)
+
+        with self.streams.use(stream):
+            if rows is not None:
+                self.streams.retain(args, stream)
+                args = (_concat(args),)
+            if isinstance(op, str) and self.registry is not None:
+                out = self.registry.call(op, *args, **params)
+            elif isinstance(op, str):
+                from gpu_tile import registry
+
+                out = registry.call(op, *args, **params)
+            else:
+                out = op(*args, **params)
+        self.streams.retain([*args, *params.values(), out], stream)
+        event = self.streams.event()
+        self.streams.record(event, stream)
+        self.launches += 1
+
+        if rows is None:
+            values = [out]
+        else:
+            offsets = list(itertools.accumulate(rows, initial=0))
+            values = [out[lo:hi] for lo, hi in zip(offsets, offsets[1:])]
+        for future, value in zip(futures, values):
+            future.value, future.stream, future.event, future._batch = value, stream, event, None
+
+
+def _concat(arrays):
+    lib = type(arrays[0]).__module__.split(".")[0]
+    if lib == "torch":
+        import torch
+
+        return torch.cat(arrays)
+    if lib == "cupy":
+        import cupy
+
+        return cupy.concatenate(arrays)
+    import numpy as np
+
+    return np.concatenate(arrays)
+
+
+if __name__ == "__main__":
+    import numpy as np
+
+    all_passed = True
+
+    def check(cond, msg):
+        global all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    from gpu_tile.registry import Registry
+
+    print("Testing async executor (fake streams):")
+    rng = np.random.default_rng(0)
+
+    reg = Registry()
+    reg.register_backend("host")
+    reg.register("relu", "host", lambda x: np.maximum(x, 0))
+    reg.register("leaky_relu", "host", lambda x, alpha=0.01: np.where(x > 0, x, alpha * x))
+    reg.register("gelu", "host", lambda x: 0.5 * x * (1 + np.tanh(0.7978845608 * (x + 0.044715 * x**3))))
+    reg.register("rms_norm", "host", lambda x, eps=1e-5: x / np.sqrt(np.mean(x**2, axis=1, keepdims=True) + eps))
+    reg.register("l1_norm", "host", lambda x: x / np.abs(x).mean(axis=1, keepdims=True))
+
+    fake = FakeStreams()
+    ex = Executor(num_streams=3, streams=fake, batching=False)
+    seen = []
+
+    def probe(x):
+        seen.append(fake.current[-1].index)
+        return x + 1
+
+    futures = [ex.submit(probe, np.zeros(4)) for _ in range(6)]
+    check(seen == [0, 1, 2, 0, 1, 2], "independent launches go round-robin over the stream pool")
+    check(all(f.done() for f in futures), "futures complete once their event is recorded")
+
+    fake.log.clear()
+    a = ex.submit(probe, np.zeros(4))  # stream 0
+    b = ex.submit(probe, a)  # stream 1, depends on a
+    check(("wait", 1, 0) in fake.log, "argument dependency becomes a cross-stream event wait")
+    check(np.array_equal(b.result(), np.full(4, 2.0)), "dependent launch sees the producer's output")
+    fake.log.clear()
+    c = ex.submit(probe, np.zeros(4), after=[a, b])  # stream 2
+    check([e for e in fake.log if e[0] == "wait"] == [("wait", 2, 0), ("wait", 2, 1)], "after= adds one wait per foreign stream")
+
+    fake = FakeStreams()
+    ex = Executor(num_streams=2, streams=fake, max_batch=8, registry=reg)
+    xs = [rng.standard_normal((n, 16), dtype=np.float32) for n in (1, 3, 2, 5)]
+    fs = [ex.submit("relu", x) for x in xs]
+    odd = ex.submit("relu", rng.standard_normal((2, 8), dtype=np.float32))
+    check(ex.launches == 0, "homogeneous requests wait in a batch")
+    ok = all(np.array_equal(f.result(), np.maximum(x, 0)) for f, x in zip(fs, xs))
+    check(ok and ex.launches == 1, "one launch serves the whole batch, each future gets its rows")
+    check(not odd.launched, "a different trailing shape is a separate batch")
+    ex.flush()
+    check(odd.launched and ex.launches == 2, "flush launches the remaining batch")
+
+    fake.log.clear()
+    f = ex.submit("leaky_relu", xs[0], alpha=[0.2])
+    check(f.launched and np.allclose(f.result(), np.where(xs[0] > 0, xs[0], 0.2 * xs[0])), "unhashable params skip batching")
+    check([e for e in fake.log if e[0] == "retain"] == [("retain", f.stream.index, 3)], "inputs, params and output are recorded on the launch stream")
+
+    fs = [ex.submit("leaky_relu", x, alpha=0.2) for x in [xs[0]] * 8]
+    check(all(f.launched for f in fs) and ex.launches == 4, "a full batch launches at max_batch")
+
+    y = ex.submit("rms_norm", xs[1])
+    z = ex.submit("gelu", y)
+    check(np.allclose(z.result(), ex.submit("gelu", ex.submit("rms_norm", xs[1]).result()).result()), "batched futures chain as arguments")
+
+    async def main():
+        futures = [ex.submit("l1_norm", x) for x in xs]
+        return await asyncio.gather(*futures)
+
+    outs = asyncio.run(main())
+    check(all(np.allclose(o, x / np.abs(x).mean(axis=1, keepdims=True)) for o, x in zip(outs, xs)), "futures are awaitable from asyncio")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
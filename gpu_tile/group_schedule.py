@@ -0,0 +1,109 @@
+"""Tile schedules for the grouped GEMM in ``triton/04-grouped-gemm.py``.
+
+A grouped GEMM runs ``C[g] = A[g] @ B[g]`` for many small problems of different
+sizes in one launch. The host flattens every group's output tiles into a single
+table of ``(group, tile_m, tile_n)`` rows. A persistent grid of ``programs``
+then walks it: program ``p`` takes rows ``p, p + programs, ...``.
+
+Within a group, tiles follow the ``GROUP_M`` swizzle of the Triton matmul
+tutorial: column-major inside bands of ``GROUP_M`` tile rows, so programs that
+run at the same time share rows of A and columns of B in L2. Groups are laid
+out longest-K first. A tile costs roughly ``K`` steps, so the expensive tiles
+are dealt out first and the cheap ones even out the tail.
+"""
+
+import math
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Schedule:
+    sizes: tuple  # (M, N, K) per group
+    block_m: int
+    block_n: int
+    programs: int
+    tiles: tuple  # (group, tile_m, tile_n) rows in launch order
+
+    @property
+    def num_tiles(self) -> int:
+        return len(self.tiles)
+
+    def flat(self) -> list:
+        """Row-major ``[group, tile_m, tile_n, ...]`` for an int32 device tensor."""
+        return [v for row in self.tiles for v in row]
+
+    def program_tiles(self, p: int) -> tuple:
+        return self.tiles[p :: self.programs]
+
+    def program_costs(self) -> list:
+        """Sum of K over the tiles each program runs: the load-balance measure."""
+        return [sum(self.sizes[g][2] for g, _, _ in self.program_tiles(p)) for p in range(self.programs)]
+
+
+def group_tiles(m: int, n: int, block_m: int, block_n: int, group_m: int) -> list:
+    """``(tile_m, tile_n)`` of one problem in ``GROUP_M``-swizzled order."""
+    grid_m = math.ceil(m / block_m)
+    grid_n = math.ceil(n / block_n)
+    out = []
+    for pid in range(grid_m * grid_n):
+        num_pid_in_group = group_m * grid_n
+        first_pid_m = (pid // num_pid_in_group) * group_m
+        # The last band of rows can be shorter than group_m.
+        band = min(grid_m - first_pid_m, group_m)
+        pid_in_group = pid % num_pid_in_group
+        out.append((first_pid_m + pid_in_group % band, pid_in_group // band))
+    return out
+
+
+def build(sizes, block_m: int = 32, block_n: int = 32, group_m: int = 4, max_programs: int | None = None) -> Schedule:
+    sizes = tuple((int(m), int(n), int(k)) for m, n, k in sizes)
+    order = sorted(range(len(sizes)), key=lambda g: -sizes[g][2])
+    tiles = []
+    for g in order:
+        m, n, _ = sizes[g]
+        if m and n:
+            tiles.extend((g, tm, tn) for tm, tn in group_tiles(m, n, block_m, block_n, group_m))
+    programs = max(1, min(len(tiles), max_programs or len(tiles)))
+    return Schedule(sizes, block_m, block_n, programs, tuple(tiles))
+
+
+if __name__ == "__main__":
+    all_passed = True
+
+    def check(cond, msg):
+        global all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    print("Testing grouped GEMM schedule:")
+
+    ok = True
+    for m, n in ((32, 32), (100, 70), (256, 512), (33, 1000), (1000, 33)):
+        order = group_tiles(m, n, 32, 32, 4)
+        grid_m, grid_n = math.ceil(m / 32), math.ceil(n / 32)
+        ok = ok and sorted(order) == [(i, j) for i in range(grid_m) for j in range(grid_n)]
+        # Each aligned run of GROUP_M tiles in a full band is one column of that band.
+        if grid_m % 4 == 0:
+            ok = ok and all(len({t[1] for t in order[i:i + 4]}) == 1 for i in range(0, len(order), 4))
+    check(ok, "per-group order is a GROUP_M-swizzled permutation of the tiles")
+
+    sizes = [(64, 128, 256), (0, 128, 256), (17, 96, 512), (200, 64, 128), (1, 1, 1)]
+    s = build(sizes, 32, 32, 4, max_programs=8)
+    covered = sorted(s.tiles)
+    expected = sorted(
+        (g, tm, tn) for g, (m, n, _) in enumerate(sizes) for tm in range(math.ceil(m / 32)) for tn in range(math.ceil(n / 32))
+    )
+    check(covered == expected, f"every output tile of every group appears exactly once ({s.num_tiles} tiles)")
+    check(all(g != 1 for g, _, _ in s.tiles), "empty groups (M == 0) get no tiles")
+    check([g for g, _, _ in s.tiles][:1] == [2], "longest-K group is scheduled first")
+    check(sum(len(s.program_tiles(p)) for p in range(s.programs)) == s.num_tiles, "programs partition the tile table")
+    check(len(s.flat()) == 3 * s.num_tiles, "flat table has three ints per tile")
+
+    # MoE-like: 64 experts with skewed token counts
+    sizes = [(m, 1024, 512) for m in [1 + (37 * i) % 300 for i in range(64)]]
+    s = build(sizes, 64, 64, 4, max_programs=132)
+    costs = s.program_costs()
+    check(max(costs) - min(costs) <= 512, f"persistent programs stay within one tile of each other ({min(costs)}..{max(costs)})")
+    check(build([(8, 8, 8)], max_programs=132).programs == 1, "grid never exceeds the number of tiles")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
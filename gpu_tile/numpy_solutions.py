@@ -0,0 +1,318 @@
+"""NumPy stand-ins for the scripts' ``solution()`` entry points.
+
+Each stand-in has the same signature as the GPU entry point it replaces and
+writes into the caller's output array, so a test written against
+``cuda-tile/10-rms-norm.py`` runs unchanged on a CPU-only host::
+
+    from gpu_tile import numpy_solutions
+
+    rms = numpy_solutions.load("cuda-tile/10-rms-norm.py")
+    rms.solution(X, Y, B, N)  # X, Y are NumPy arrays
+
+The arithmetic is the vectorized ``numpy`` backend in
+``gpu_tile/backends/numpy_ref.py``; nothing here loops over elements.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from gpu_tile import reduce_plan, scan_plan
+from gpu_tile.backends import numpy_ref as ref
+
+
+def _write(out, value):
+    np.copyto(out, np.reshape(value, np.shape(out)), casting="unsafe")
+
+
+# cuda-tile
+
+
+def launch_vector_add(a, b, result, tile_size=256, stream=None):
+    _write(result, ref.vector_add(a, b))
+
+
+def relu(input, output, n, m):
+    _write(output, ref.relu(input))
+
+
+def same_conv1d(A, B, C, N, K):
+    _write(C, ref.conv1d(A, B, stride=1, padding=K // 2)[:N])
+
+
+def mat_vec(input_a, input_b, output_c, m, k):
+    _write(output_c, ref.gemv(input_a, input_b))
+
+
+def fused_mat_vec(input_a, input_b, output_c, m, k, *, bias=None, activation=None, alpha=0.01, residual=None, scale=1.0, trans_a=False):
+    if activation not in (None, "relu", "leaky_relu", "gelu"):
+        raise ValueError(f"Unknown activation {activation!r}")
+    # A float32 x keeps the epilogue in float32 until the single rounding on write.
+    y = ref.fused_gemv(input_a, np.asarray(input_b, np.float32), bias, residual, activation, alpha, scale, trans_a)
+    _write(output_c, y)
+
+
+def quant_gemv(q, scales, zeros, x, y, m, k, bits, group_size):
+    from gpu_tile import quant
+
+    qw = quant.QuantizedWeight(np.asarray(q), np.asarray(scales), np.asarray(zeros), bits, group_size, (m, k))
+    _write(y, quant.reference_gemv(qw, x))
+
+
+def spmv_csr(indptr, indices, data, x, y, short_rows, long_rows, short_nnz, long_nnz):
+    from gpu_tile import sparse
+
+    _write(y, sparse.CSR(np.asarray(indptr), np.asarray(indices), np.asarray(data), (len(indptr) - 1, len(x))).matvec(x))
+
+
+def spmv_bsr(indptr, indices, blocks, x, y, max_blocks):
+    from gpu_tile import sparse
+
+    _, bm, bk = np.shape(blocks)
+    shape = ((len(indptr) - 1) * bm, -(-len(x) // bk) * bk)
+    out = sparse.BSR(np.asarray(indptr), np.asarray(indices), np.asarray(blocks), shape).matvec(x)
+    _write(y, out[: len(y)])
+
+
+def leaky_relu(input, alpha, output, n, m):
+    _write(output, ref.leaky_relu(input, alpha))
+
+
+def avg_pool1d(input, kernel_size, stride, padding, output, H):
+    _write(output, ref.avg_pool1d(input[:H], kernel_size, stride, padding))
+
+
+def gelu(input, output, n, m):
+    _write(output, ref.gelu(input))
+
+
+def sum_dim(input, dim, output, shape, ndim):
+    _write(output, ref.sum_dim(input, dim))
+
+
+def rms_norm(X, Y, B, N):
+    _write(Y, ref.rms_norm(X))
+
+
+def layer_norm(X, Y, B, N, weight=None, bias=None, mean=None, rstd=None, eps=1e-5):
+    if (mean is None) != (rstd is None):
+        raise ValueError("mean and rstd are saved together")
+    _write(Y, ref.layer_norm(X, weight, bias, eps))
+    if mean is not None:
+        x = ref._f32(X)
+        _write(mean, x.mean(axis=1))
+        _write(rstd, 1 / np.sqrt(x.var(axis=1) + eps))
+
+
+def l1_norm(X, Y, B, D):
+    _write(Y, ref.l1_norm(X))
+
+
+def reduce(input, output, axes=None, op="sum", keepdims=False):
+    reduce_plan.plan(np.shape(input), axes, op, keepdims)  # same validation as the kernel
+    _write(output, ref.reduce(input, op, axes, keepdims))
+
+
+def pool(input, kernel_size, stride, padding, output, H, *, kind="avg", p=2.0, activation=None, alpha=0.01, scale=1.0, method=None):
+    _write(output, ref.pool1d(input[:H], kernel_size, stride, padding, kind, p, activation, alpha, scale))
+
+
+def pool_multi(input, kernel_sizes, stride, padding, outputs, H, **epilogue):
+    for k, out in zip(kernel_sizes, outputs):
+        pool(input, k, stride, padding, out, H, **epilogue)
+
+
+def scan(input, output, axis=-1, exclusive=False, flags=None):
+    _write(output, scan_plan.reference(input, axis, exclusive, flags))
+
+# cute-dsl and triton
+
+
+def vector_add(a, b, c, n=None, verbose=False):
+    _write(c, ref.vector_add(a, b))
+
+
+def conv1d(X, W, Y, stride, padding):
+    _write(Y, ref.conv1d(X, W, stride, padding))
+
+
+def matmul(A, B, C):
+    _write(C, ref.gemm(A, B))
+
+
+def grouped_matmul(As, Bs, Cs, max_programs=None):
+    for a, b, c in zip(As, Bs, Cs):
+        _write(c, ref.gemm(a, b))
+
+
+def flash_attention(q, k, v, causal=False, lens=None, sm_scale=None, out=None):
+    value = ref.attention(q, k, v, causal, lens, sm_scale)
+    if out is None:
+        return value
+    _write(out, value)
+    return out
+
+
+SCRIPTS = {
+    "cuda-tile/01-vector-add.py": {"launch_vector_add": launch_vector_add},
+    "cuda-tile/02-relu.py": {"solution": relu},
+    "cuda-tile/03-conv1d.py": {"solution": same_conv1d},
+    "cuda-tile/04-matrix-vector-multiplication.py": {"solution": mat_vec},
+    "cuda-tile/05-optimize-matrix-vector-multiplication.py": {"solution": fused_mat_vec},
+    "cuda-tile/06-leaky-relu.py": {"solution": leaky_relu},
+    "cuda-tile/07-average-pool-1d.py": {"solution": avg_pool1d},
+    "cuda-tile/08-gelu.py": {"solution": gelu},
+    "cuda-tile/09-sum-over-dimension.py": {"solution": sum_dim},
+    "cuda-tile/10-rms-norm.py": {"solution": rms_norm},
+    "cuda-tile/11-rms-norm-2stage.py": {"solution": rms_norm},
+    "cuda-tile/12-l1-norm.py": {"solution": l1_norm},
+    "cuda-tile/13-reduction.py": {"solution": reduce},
+    "cuda-tile/14-pooling.py": {"solution": pool, "solution_multi": pool_multi},
+    "cuda-tile/15-layer-norm.py": {"solution": layer_norm},
+    "cuda-tile/16-quantized-gemv.py": {"solution": quant_gemv},
+    "cuda-tile/17-spmv.py": {"solution": spmv_csr, "solution_bsr": spmv_bsr},
+    "cuda-tile/18-scan.py": {"solution": scan},
+    "cute-dsl/09-optimize-vector-addition.py": {"solution": vector_add},
+    "cute-dsl/10-1d-conv.py": {"conv1d": conv1d},
+    "cute-dsl/12-simple-tile-gemm.py": {"simple_tile_gemm": matmul},
+    "triton/01-vector-add.py": {"vadd": vector_add},
+    "triton/02-tiled-matmul.py": {"simple_matmul": matmul},
+    "triton/04-grouped-gemm.py": {"grouped_matmul": grouped_matmul},
+    "triton/05-flash-attention.py": {"attention": flash_attention},
+}
+
+
+def load(relpath: str) -> SimpleNamespace:
+    """The NumPy counterpart of ``_scripts.load(relpath)``."""
+    if relpath not in SCRIPTS:
+        raise KeyError(f"No NumPy stand-in for {relpath}; have {sorted(SCRIPTS)}")
+    return SimpleNamespace(**SCRIPTS[relpath])
+
+
+if __name__ == "__main__":
+    import time
+
+    all_passed = True
+
+    def check(cond, msg):
+        global all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    def timed(fn, *args, **kwargs):
+        start = time.perf_counter()
+        fn(*args, **kwargs)
+        return (time.perf_counter() - start) * 1e3
+
+    print("Testing NumPy solution() stand-ins (1M-element inputs):")
+    rng = np.random.default_rng(0)
+    n, m = 1024, 1024
+    x = rng.standard_normal((n, m), dtype=np.float32)
+    y = np.empty_like(x)
+
+    ms = timed(load("cuda-tile/02-relu.py").solution, x, y, n, m)
+    check(np.array_equal(y, x * (x > 0)), f"relu ({ms:.1f} ms)")
+    ms = timed(load("cuda-tile/06-leaky-relu.py").solution, x, 0.1, y, n, m)
+    check(np.allclose(y, np.maximum(x, 0.1 * x)), f"leaky relu ({ms:.1f} ms)")
+    ms = timed(load("cuda-tile/08-gelu.py").solution, x, y, n, m)
+    check(np.allclose(y, 0.5 * x * (1 + np.tanh(np.sqrt(2 / np.pi) * (x + 0.044715 * x**3))), atol=1e-6), f"gelu ({ms:.1f} ms)")
+    ms = timed(load("cuda-tile/10-rms-norm.py").solution, x, y, n, m)
+    check(np.allclose(y, x / np.sqrt((x.astype(np.float64) ** 2).mean(1, keepdims=True) + 1e-5), atol=1e-5), f"rms norm ({ms:.1f} ms)")
+    ms = timed(load("cuda-tile/12-l1-norm.py").solution, x, y, n, m)
+    check(np.allclose(y, x / np.abs(x).astype(np.float64).mean(1, keepdims=True), atol=1e-5), f"l1 norm ({ms:.1f} ms)")
+
+    half = x.astype(np.float16)
+    out = np.empty_like(half)
+    load("cuda-tile/02-relu.py").solution(half, out, n, m)
+    check(out.dtype == np.float16 and np.array_equal(out, np.maximum(half, 0)), "float16 in, float16 out")
+
+    v = x.reshape(-1)
+    w = rng.standard_normal(v.size, dtype=np.float32)
+    out = np.empty_like(v)
+    ms = timed(load("cuda-tile/01-vector-add.py").launch_vector_add, v, w, out)
+    check(np.array_equal(out, v + w), f"vector add ({ms:.1f} ms)")
+    load("triton/01-vector-add.py").vadd(v, w, out)
+    check(np.array_equal(out, v + w), "triton and cute-dsl vector add share the stand-in")
+
+    K = 15
+    kernel = rng.standard_normal(K, dtype=np.float32)
+    ms = timed(load("cuda-tile/03-conv1d.py").solution, v, kernel, out, v.size, K)
+    full = np.convolve(v, kernel[::-1], mode="same")  # cross-correlation via a flipped kernel
+    check(np.allclose(out, full, atol=1e-4), f"centered conv1d ({ms:.1f} ms)")
+    for S, P in ((1, 0), (3, 1), (4, 7)):
+        L = v.size
+        Y = np.empty((L + 2 * P - K) // S + 1, np.float32)
+        load("cute-dsl/10-1d-conv.py").conv1d(v, kernel, Y, S, P)
+        full = np.correlate(np.pad(v, P), kernel, mode="valid")[::S]
+        check(np.allclose(Y, full, atol=1e-4), f"strided conv1d S={S}, P={P}")
+
+    for k, S, P in ((3, 1, 1), (4, 2, 0), (7, 3, 3)):
+        H = v.size
+        Y = np.empty((H + 2 * P - k) // S + 1, np.float32)
+        ms = timed(load("cuda-tile/07-average-pool-1d.py").solution, v, k, S, P, Y, H)
+        padded = np.pad(v, P)
+        csum = np.concatenate([[0.0], np.cumsum(padded, dtype=np.float64)])
+        starts = np.arange(Y.size) * S
+        check(np.allclose(Y, (csum[starts + k] - csum[starts]) / k, atol=1e-5), f"avg pool k={k}, S={S}, P={P} ({ms:.1f} ms)")
+
+    Y = np.empty(v.size + 1, np.float32)
+    ms = timed(load("cuda-tile/14-pooling.py").solution, v, 64, 1, 32, Y, v.size, kind="lp")
+    windows = np.lib.stride_tricks.sliding_window_view(np.pad(v.astype(np.float64), 32), 64)
+    check(np.allclose(Y, np.sqrt((windows**2).sum(axis=1)), rtol=1e-5), f"lp pool k=64 ({ms:.1f} ms)")
+    Y = Y[: (v.size + 2 - 4) // 2 + 1]
+    load("cuda-tile/14-pooling.py").solution(v, 4, 2, 1, Y, v.size, kind="max", activation="relu")
+    windows = np.lib.stride_tricks.sliding_window_view(np.pad(v, 1, constant_values=-np.inf), 4)[::2]
+    check(np.array_equal(Y, np.maximum(windows.max(axis=1), 0)), "max pool with a fused relu")
+
+    c = np.empty(n, np.float32)
+    ms = timed(load("cuda-tile/04-matrix-vector-multiplication.py").solution, x, x[0], c, n, m)
+    check(np.allclose(c, np.einsum("mk,k->m", x, x[0]), rtol=1e-4, atol=1e-3), f"gemv ({ms:.1f} ms)")
+    bias, res = rng.standard_normal(n, dtype=np.float32), rng.standard_normal(n, dtype=np.float32)
+    load("cuda-tile/05-optimize-matrix-vector-multiplication.py").solution(
+        x, x[0], c, n, m, bias=bias, activation="relu", residual=res, scale=0.5, trans_a=True
+    )
+    check(np.allclose(c, np.maximum(0.5 * np.einsum("km,k->m", x, x[0]) + bias, 0) + res, rtol=1e-4, atol=1e-3), "fused gemv epilogue, transposed A")
+
+    C = np.empty((n, m), np.float32)
+    ms = timed(load("triton/02-tiled-matmul.py").simple_matmul, x, x, C)
+    check(np.allclose(C, np.einsum("ik,kj->ij", x, x), rtol=1e-4, atol=1e-2), f"gemm ({ms:.1f} ms)")
+    As = [rng.standard_normal((r, 64), dtype=np.float32) for r in (0, 5, 33)]
+    Bs = [rng.standard_normal((64, 48), dtype=np.float32) for _ in As]
+    Cs = [np.empty((a.shape[0], 48), np.float32) for a in As]
+    load("triton/04-grouped-gemm.py").grouped_matmul(As, Bs, Cs)
+    check(all(np.allclose(c_, a @ b, atol=1e-4) for a, b, c_ in zip(As, Bs, Cs)), "grouped gemm, including an empty group")
+
+    q, k_, v_ = (rng.standard_normal((2, 4, 256, 64), dtype=np.float32) for _ in range(3))
+    lens = np.array([256, 100])
+    visible = np.tril(np.ones((256, 256), bool)) & (np.arange(256) < lens[:, None, None, None])
+    s = np.where(visible, np.einsum("bhqd,bhkd->bhqk", q, k_) / 8, -np.inf)
+    p = np.exp(s - s.max(axis=-1, keepdims=True))
+    O = np.empty_like(q)
+    ms = timed(load("triton/05-flash-attention.py").attention, q, k_, v_, causal=True, lens=lens, out=O)
+    check(np.allclose(O, p @ v_ / p.sum(axis=-1, keepdims=True), atol=1e-5), f"causal attention with key padding ({ms:.1f} ms)")
+
+    flags = rng.random(v.size) < 1e-3
+    ms = timed(load("cuda-tile/18-scan.py").solution, v, out, exclusive=True, flags=flags)
+    starts = np.flatnonzero(flags | (np.arange(v.size) == 0))
+    ends = np.append(starts[1:], v.size)
+    ok = all(np.allclose(out[a:b], np.cumsum(v[a:b], dtype=np.float64) - v[a:b], atol=1e-3) for a, b in zip(starts, ends))
+    check(ok, f"segmented exclusive scan ({ms:.1f} ms)")
+
+    t = x.reshape(16, 256, 256)
+    for dim in range(3):
+        shape = list(t.shape)
+        shape[dim] = 1
+        out = np.empty(shape, np.float32)
+        ms = timed(load("cuda-tile/09-sum-over-dimension.py").solution, t, dim, out, np.array(t.shape, np.int32), t.ndim)
+        check(np.allclose(out, np.add.reduce(t.astype(np.float64), axis=dim, keepdims=True), atol=1e-3), f"sum over dim {dim} ({ms:.1f} ms)")
+    out = np.empty((16, 256), np.float32)
+    load("cuda-tile/13-reduction.py").solution(t, out, axes=(1,), op="max")
+    check(np.array_equal(out, t.max(axis=1)), "N-D reduction")
+
+    try:
+        load("cuda-tile/00-missing.py")
+        check(False, "unknown script raises")
+    except KeyError:
+        check(True, "unknown script raises")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
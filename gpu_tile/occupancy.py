@@ -0,0 +1,417 @@
+"""Validate CuTe launch configs and compute their theoretical occupancy.
+
+A launch config is what a kernel asks of one SM per block: threads, registers
+per thread and shared memory. Against a device spec it either cannot launch
+(``InvalidLaunch``) or fits ``blocks_per_sm`` blocks, whichever of four limits
+bites first:
+
+- threads: ``max_warps_per_sm // warps_per_block``;
+- registers: allocated per warp in units of 256, warps rounded down to a
+  multiple of 4, as in the CUDA occupancy calculator;
+- shared memory: the block's bytes plus the 1 KiB the driver reserves per
+  block (sm_80 and later), rounded up to 128 bytes;
+- the hardware cap on resident blocks.
+
+``occupancy = active warps / max warps``. ``rank`` orders candidate configs for
+the autotuner by occupancy times wave efficiency (the share of the last wave
+that is not idle), so a config whose grid leaves most SMs idle in its last wave
+comes after one that fills them.
+
+Register counts are estimates until ``ptxas -v`` or Nsight Compute gives real
+numbers; pass those in when you have them::
+
+    python -m gpu_tile.occupancy report --device A100
+    python -m gpu_tile.occupancy rank 4096 4096 --device H100
+"""
+
+import argparse
+import ast
+import math
+import sys
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+
+class InvalidLaunch(ValueError):
+    """The config cannot launch on the device at all."""
+
+
+@dataclass(frozen=True)
+class Device:
+    name: str
+    arch: str
+    sms: int
+    max_threads_per_sm: int
+    max_blocks_per_sm: int
+    smem_per_sm: int  # bytes, with the largest carveout
+    smem_per_block: int  # bytes, dynamic opt-in limit
+    reserved_smem: int = 1024  # per block, sm_80 and later
+    regs_per_sm: int = 65536
+    max_regs_per_block: int = 65536
+    max_regs_per_thread: int = 255
+    max_threads_per_block: int = 1024
+    max_block_dims: tuple = (1024, 1024, 64)
+    warp_size: int = 32
+    reg_unit: int = 256  # registers are allocated per warp in these units
+    warp_granularity: int = 4
+    smem_unit: int = 128
+    static_smem_limit: int = 48 * 1024  # larger blocks need dynamic smem and an opt-in
+
+    @property
+    def max_warps_per_sm(self) -> int:
+        return self.max_threads_per_sm // self.warp_size
+
+
+DEVICES = {
+    "V100": Device("V100", "sm_70", 80, 2048, 32, 96 * 1024, 96 * 1024, reserved_smem=0),
+    "A100": Device("A100", "sm_80", 108, 2048, 32, 164 * 1024, 163 * 1024),
+    "A10": Device("A10", "sm_86", 72, 1536, 16, 100 * 1024, 99 * 1024),
+    "L4": Device("L4", "sm_89", 58, 1536, 24, 100 * 1024, 99 * 1024),
+    "RTX4090": Device("RTX4090", "sm_89", 128, 1536, 24, 100 * 1024, 99 * 1024),
+    "H100": Device("H100", "sm_90", 132, 2048, 32, 228 * 1024, 227 * 1024),
+    "B200": Device("B200", "sm_100", 148, 2048, 32, 228 * 1024, 227 * 1024),
+}
+
+
+def current_device(index=0) -> Device:
+    """The spec of a visible CUDA device, read through torch."""
+    import torch
+
+    p = torch.cuda.get_device_properties(index)
+    arch = f"sm_{p.major}{p.minor}"
+    base = next((d for d in DEVICES.values() if d.arch == arch), DEVICES["H100"])
+    return replace(
+        base,
+        name=p.name,
+        sms=p.multi_processor_count,
+        max_threads_per_sm=getattr(p, "max_threads_per_multi_processor", base.max_threads_per_sm),
+        regs_per_sm=getattr(p, "regs_per_multiprocessor", base.regs_per_sm),
+        smem_per_sm=getattr(p, "shared_memory_per_multiprocessor", base.smem_per_sm),
+        smem_per_block=getattr(p, "shared_memory_per_block_optin", base.smem_per_block),
+    )
+
+
+@dataclass(frozen=True)
+class LaunchConfig:
+    name: str
+    block: tuple  # threads per block, (x, y, z)
+    regs: int  # per thread
+    smem: int = 0  # bytes per block, static and dynamic
+    tile: tuple = ()  # output elements per block, for wave math
+    meta: dict = field(default_factory=dict, compare=False)
+
+    def __post_init__(self):
+        block = tuple(self.block) if isinstance(self.block, (tuple, list)) else (self.block,)
+        object.__setattr__(self, "block", block + (1,) * (3 - len(block)))
+
+    @property
+    def threads(self) -> int:
+        return math.prod(self.block)
+
+    def warps(self, warp_size=32) -> int:
+        return -(-self.threads // warp_size)
+
+    def grid(self, shape) -> int:
+        """Blocks needed to cover an output of ``shape``."""
+        if len(shape) != len(self.tile):
+            raise ValueError(f"{self.name}: shape {shape} does not match tile {self.tile}")
+        return math.prod(-(-s // t) for s, t in zip(shape, self.tile))
+
+
+def _round_up(n, unit):
+    return -(-n // unit) * unit
+
+
+def validate(config: LaunchConfig, device: Device) -> list:
+    """Raise ``InvalidLaunch`` if the config cannot launch. Returns warnings."""
+    errors, notes = [], []
+    if any(d < 1 for d in config.block):
+        errors.append(f"empty block {config.block}")
+    for axis, (d, limit) in enumerate(zip(config.block, device.max_block_dims)):
+        if d > limit:
+            errors.append(f"block dim {'xyz'[axis]}={d} exceeds {limit}")
+    if config.threads > device.max_threads_per_block:
+        errors.append(f"{config.threads} threads per block exceeds {device.max_threads_per_block}")
+    if config.regs > device.max_regs_per_thread:
+        errors.append(f"{config.regs} registers per thread exceeds {device.max_regs_per_thread}")
+    regs_per_block = config.warps(device.warp_size) * _round_up(config.regs * device.warp_size, device.reg_unit)
+    if regs_per_block > device.max_regs_per_block:
+        errors.append(
+            f"{regs_per_block} registers per block exceeds {device.max_regs_per_block}"
+            f" (at most {device.max_regs_per_block // config.threads} per thread at {config.threads} threads)"
+        )
+    if config.smem > device.smem_per_block:
+        errors.append(f"{config.smem} bytes of shared memory exceeds {device.smem_per_block} per block")
+    if errors:
+        raise InvalidLaunch(f"{config.name} on {device.name}: " + "; ".join(errors))
+
+    if config.threads % device.warp_size:
+        notes.append(f"{config.threads} threads is not a multiple of {device.warp_size}; the last warp idles lanes")
+    if config.smem > device.static_smem_limit:
+        notes.append(f"{config.smem} bytes of shared memory needs dynamic smem and the opt-in attribute")
+    return notes
+
+
+@dataclass(frozen=True)
+class Plan:
+    config: LaunchConfig
+    device: Device
+    limits: dict  # blocks per SM allowed by "threads", "registers", "smem" and "blocks"
+    notes: tuple = ()
+
+    @property
+    def blocks_per_sm(self) -> int:
+        return min(self.limits.values())
+
+    @property
+    def limiter(self) -> str:
+        return min(self.limits, key=self.limits.get)
+
+    @property
+    def active_warps(self) -> int:
+        return self.blocks_per_sm * self.config.warps(self.device.warp_size)
+
+    @property
+    def occupancy(self) -> float:
+        return self.active_warps / self.device.max_warps_per_sm
+
+    def waves(self, blocks: int) -> float:
+        return blocks / (self.blocks_per_sm * self.device.sms)
+
+    def wave_efficiency(self, blocks: int) -> float:
+        waves = self.waves(blocks)
+        return waves / math.ceil(waves) if blocks else 0.0
+
+    def summary(self) -> str:
+        c = self.config
+        return (
+            f"{c.name}: {c.threads} threads, {c.regs} regs, {c.smem / 1024:.1f} KiB smem -> "
+            f"{self.blocks_per_sm} blocks/SM, {self.active_warps}/{self.device.max_warps_per_sm} warps "
+            f"({self.occupancy:.0%}), limited by {self.limiter}"
+        )
+
+
+def plan(config: LaunchConfig, device: Device) -> Plan:
+    notes = validate(config, device)
+    warps = config.warps(device.warp_size)
+    regs_per_warp = _round_up(max(config.regs, 1) * device.warp_size, device.reg_unit)
+    warps_by_regs = device.regs_per_sm // regs_per_warp // device.warp_granularity * device.warp_granularity
+    smem_per_block = _round_up(config.smem + device.reserved_smem, device.smem_unit)
+    limits = {
+        "threads": device.max_warps_per_sm // warps,
+        "registers": warps_by_regs // warps,
+        "smem": device.smem_per_sm // smem_per_block if smem_per_block else device.max_blocks_per_sm,
+        "blocks": device.max_blocks_per_sm,
+    }
+    return Plan(config, device, limits, tuple(notes))
+
+
+def rank(candidates, device: Device, shape=None) -> list:
+    """Valid candidates, best first; invalid ones are dropped.
+
+    With an output ``shape``, occupancy is weighted by wave efficiency using
+    each config's ``tile``.
+    """
+    plans = []
+    for config in candidates:
+        try:
+            plans.append(plan(config, device))
+        except InvalidLaunch:
+            continue
+
+    def score(p):
+        eff = p.wave_efficiency(p.config.grid(shape)) if shape is not None else 1.0
+        return (-p.occupancy * eff, -p.occupancy, -math.prod(p.config.tile or (1,)))
+
+    return sorted(plans, key=score)
+
+
+def gemm_tile(bm, bn, bk, thr=(32, 32), val=(4, 4), dtype_bytes=4, regs=None, name="gemm_kernel") -> LaunchConfig:
+    """The launch of ``cute-dsl/12``-style GEMM: one ``val`` fragment of C per thread.
+
+    Each thread copies ``bm*bk/threads`` elements of A and ``bk*bn/threads`` of
+    B into shared memory per K step, so both must split evenly. Without a
+    measured ``regs``, the estimate is the C fragment, one row and one column
+    of operands, and 24 for addresses, loop counters and predicates.
+    """
+    threads = thr[0] * thr[1]
+    if (thr[0] * val[0], thr[1] * val[1]) != (bm, bn):
+        raise InvalidLaunch(f"{name}: thread layout {thr} x values {val} covers {thr[0] * val[0]}x{thr[1] * val[1]}, not the {bm}x{bn} tile")
+    for label, elems in (("A", bm * bk), ("B", bk * bn)):
+        if elems % threads:
+            raise InvalidLaunch(f"{name}: the {label} tile ({elems} elements) does not split over {threads} threads")
+    if regs is None:
+        regs = _round_up(val[0] * val[1] + val[0] + val[1] + 24, 8)
+    smem = (bm * bk + bk * bn) * dtype_bytes
+    return LaunchConfig(name, thr, regs, smem, tile=(bm, bn), meta=dict(bm=bm, bn=bn, bk=bk, thr=thr, val=val))
+
+
+def tv_tile(name, threads, values, regs=32, smem=0) -> LaunchConfig:
+    """A 1D ``make_layout_tv`` launch: ``threads`` threads with ``values`` elements each."""
+    return LaunchConfig(name, (threads,), regs, smem, tile=(threads * values,))
+
+
+def gemm_candidates(bks=(8, 16, 32), dtype_bytes=4) -> list:
+    """GEMM tile shapes for the autotuner, valid or not."""
+    out = []
+    for tm in (2, 4, 8):
+        for tn in (2, 4, 8):
+            for ty in (8, 16, 32):
+                for tx in (8, 16, 32):
+                    for bk in bks:
+                        try:
+                            out.append(gemm_tile(tx * tm, ty * tn, bk, (tx, ty), (tm, tn), dtype_bytes))
+                        except InvalidLaunch:
+                            pass
+    return out
+
+
+# Launches of the CuTe scripts for the host-side report. The scripts build
+# their own from their constants; the self-check compares the two.
+CONFIGS = {
+    "cute-dsl/09-optimize-vector-addition.py": tv_tile("vector_add_kernel", 128, 8),
+    "cute-dsl/10-1d-conv.py": tv_tile("conv1d_kernel", 128, 1),
+    "cute-dsl/12-simple-tile-gemm.py": gemm_tile(128, 128, 32, thr=(32, 32), val=(4, 4)),
+}
+
+
+def _script_constants(script) -> dict:
+    """Module-level literal constants of a script, read without importing it
+    (``BM = cutlass.const_expr(128)`` reads as 128)."""
+    tree = ast.parse((Path(__file__).resolve().parents[1] / script).read_text())
+    out = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            value = node.value
+            if isinstance(value, ast.Call) and len(value.args) == 1:
+                value = value.args[0]
+            try:
+                out[node.targets[0].id] = ast.literal_eval(value)
+            except ValueError:
+                pass
+    return out
+
+
+def report(plans) -> str:
+    lines = []
+    for p in plans:
+        lines.append(p.summary())
+        lines.extend(f"  ! {note}" for note in p.notes)
+    return "\n".join(lines)
+
+
+def selfcheck() -> bool:
+    all_passed = True
+
+    def check(cond, msg):
+        nonlocal all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    a100, h100, l4 = DEVICES["A100"], DEVICES["H100"], DEVICES["L4"]
+
+    print("Testing occupancy:")
+    p = plan(LaunchConfig("k", 256, 32), a100)
+    check((p.blocks_per_sm, p.occupancy) == (8, 1.0), "256 threads x 32 regs fills an A100 SM")
+    p = plan(LaunchConfig("k", 256, 64), a100)
+    check((p.blocks_per_sm, p.limiter, p.occupancy) == (4, "registers", 0.5), "64 regs halve it")
+    p = plan(LaunchConfig("k", 128, 32, smem=48 * 1024), a100)
+    check((p.blocks_per_sm, p.limiter) == (3, "smem"), "48 KiB + 1 KiB reserved fits 3 blocks in 164 KiB")
+    p = plan(LaunchConfig("k", 32, 16), a100)
+    check((p.blocks_per_sm, p.limiter, p.occupancy) == (32, "blocks", 0.5), "one-warp blocks hit the block cap")
+    p = plan(LaunchConfig("k", 1024, 32), l4)
+    check((p.blocks_per_sm, p.occupancy) == (1, 32 / 48), "1024-thread blocks strand a third of an L4 SM")
+    p = plan(LaunchConfig("k", 96, 40), a100)
+    check(p.limits["registers"] == 16, "register warps round down to a multiple of 4")
+    p = plan(LaunchConfig("k", 100, 32), a100)
+    check(p.config.warps() == 4 and any("multiple of 32" in n for n in p.notes), "partial warps are noted")
+
+    print("Testing validation:")
+    for config, why in [
+        (LaunchConfig("k", (32, 64), 32), "2048 threads"),
+        (LaunchConfig("k", (1, 1, 128), 32), "block z > 64"),
+        (LaunchConfig("k", 128, 256), "256 registers"),
+        (LaunchConfig("k", 1024, 72), "72 regs x 1024 threads"),
+        (LaunchConfig("k", 128, 32, smem=200 * 1024), "200 KiB smem on A100"),
+    ]:
+        try:
+            plan(config, a100)
+            check(False, f"rejects {why}")
+        except InvalidLaunch as e:
+            check(True, f"rejects {why}: {e}")
+    check(plan(LaunchConfig("k", 128, 32, smem=200 * 1024), h100).blocks_per_sm == 1, "  ...which fits an H100")
+    check(any("opt-in" in n for n in plan(LaunchConfig("k", 128, 32, smem=64 * 1024), a100).notes), "over 48 KiB needs the opt-in")
+
+    print("Testing CuTe configs:")
+    gemm = plan(CONFIGS["cute-dsl/12-simple-tile-gemm.py"], h100)
+    check(gemm.config.threads == 1024 and gemm.config.smem == 32 * 1024, "simple_tile_gemm: 1024 threads, 32 KiB smem")
+    check((gemm.blocks_per_sm, gemm.occupancy) == (1, 0.5), "  ...one block and 50% occupancy per SM")
+    check(plan(gemm_tile(128, 128, 32, regs=64), h100).blocks_per_sm == 1, "  ...still launches at 64 regs")
+    try:
+        plan(gemm_tile(128, 128, 32, regs=72), h100)
+        check(False, "  ...and fails at 72")
+    except InvalidLaunch:
+        check(True, "  ...and fails at 72")
+    for bad, why in [(dict(bm=128, bn=64, bk=32), "tile not covered by thr x val"), (dict(bm=128, bn=128, bk=4), "A tile not split over threads")]:
+        try:
+            gemm_tile(**bad)
+            check(False, f"gemm_tile rejects a {why}")
+        except InvalidLaunch:
+            check(True, f"gemm_tile rejects a {why}")
+    add = plan(CONFIGS["cute-dsl/09-optimize-vector-addition.py"], h100)
+    check(add.occupancy == 1.0 and add.config.grid((2**24,)) == 2**14, "vector add: full occupancy, 16384 blocks for 16M")
+
+    c = _script_constants("cute-dsl/12-simple-tile-gemm.py")
+    script_gemm = gemm_tile(c["BM"], c["BN"], c["BK"], thr=c["THREADS"], val=(c["TM"], c["TN"]))
+    check(script_gemm == CONFIGS["cute-dsl/12-simple-tile-gemm.py"], "the gemm config matches the script's BM/BN/BK/THREADS/TM/TN")
+    c = _script_constants("cute-dsl/10-1d-conv.py")
+    check(tv_tile("conv1d_kernel", c["THREADS"], 1) == CONFIGS["cute-dsl/10-1d-conv.py"], "the conv1d config matches the script's THREADS")
+
+    print("Testing ranking:")
+    configs = [LaunchConfig("big", 1024, 64, tile=(1024,)), LaunchConfig("small", 256, 32, tile=(256,)), LaunchConfig("bad", 2048, 32, tile=(2048,))]
+    ranked = rank(configs, a100)
+    check([p.config.name for p in ranked] == ["small", "big"], "orders by occupancy and drops invalid configs")
+    # 864 blocks per wave at 100%, 648 at 75%: "tail" needs 866 blocks, "even" exactly 648
+    tail = [LaunchConfig("tail", 256, 32, tile=(256,)), LaunchConfig("even", 256, 40, tile=(342,))]
+    check(rank(tail, a100, shape=(648 * 342,))[0].config.name == "even", "a nearly empty last wave costs more than lower occupancy")
+    cands = gemm_candidates()
+    best = rank(cands, h100, shape=(4096, 4096))
+    check(len(best) < len(cands) and best[0].occupancy >= best[-1].occupancy, f"gemm sweep: {len(best)} of {len(cands)} candidates launch")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
+    return all_passed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m gpu_tile.occupancy")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_report = sub.add_parser("report", help="Occupancy of the CuTe scripts' launches")
+    p_report.add_argument("--device", choices=sorted(DEVICES), default="H100")
+
+    p_rank = sub.add_parser("rank", help="Rank GEMM tile shapes for an M x N output")
+    p_rank.add_argument("m", type=int)
+    p_rank.add_argument("n", type=int)
+    p_rank.add_argument("--device", choices=sorted(DEVICES), default="H100")
+    p_rank.add_argument("--top", type=int, default=10)
+
+    sub.add_parser("selfcheck", help="Check against hand-computed occupancy")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "selfcheck":
+        return 0 if selfcheck() else 1
+    device = DEVICES[args.device]
+    if args.cmd == "report":
+        for script, config in CONFIGS.items():
+            print(script)
+            print("  " + report([plan(config, device)]).replace("\n", "\n  "))
+        return 0
+    for p in rank(gemm_candidates(), device, shape=(args.m, args.n))[: args.top]:
+        m = p.config.meta
+        eff = p.wave_efficiency(p.config.grid((args.m, args.n)))
+        print(f"BM={m['bm']:<4} BN={m['bn']:<4} BK={m['bk']:<3} thr={m['thr']} val={m['val']}  {p.summary().split(' -> ')[1]}, wave efficiency {eff:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
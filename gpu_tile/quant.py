@@ -0,0 +1,230 @@
+"""Weight-only int8/int4 quantization for the GEMV in ``cuda-tile/16-quantized-gemv.py``.
+
+A (M, K) weight is split along K into groups of ``group_size`` columns. Each
+(row, group) gets a float16 scale and a uint8 zero-point, and its values are
+stored as unsigned codes::
+
+    q = clip(round(w / scale) + zero, 0, 2**bits - 1)
+    w ~= (q - zero) * scale
+
+Asymmetric quantization (the default) maps each group's [min, max] onto the
+full code range. ``symmetric=True`` fixes ``zero = 2**(bits - 1)`` and scales
+by the group's absolute maximum.
+
+Storage, row-major, with K padded up to a multiple of ``group_size``:
+
+- ``bits=8``: one code per byte, shape (M, Kp);
+- ``bits=4``: two codes per byte, shape (M, Kp // 2). Column ``2j`` is the
+  low nibble of byte ``j`` and column ``2j + 1`` the high nibble;
+- ``scales`` float16 (M, Kp // group_size), ``zeros`` uint8 of the same shape.
+
+Only the kernel and ``dequantize`` read this layout, and ``selfcheck`` pins it
+down against explicit bytes. ``python -m gpu_tile.quant bytes`` prints the
+bytes per call next to float32 A::
+
+    qw = quant.quantize(A, bits=4, group_size=128)
+    gemv = _scripts.load("cuda-tile/16-quantized-gemv.py")
+    gemv.solution(qw.q, qw.scales, qw.zeros, x, y, M, K, qw.bits, qw.group_size)
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+BITS = (4, 8)
+
+
+@dataclass(frozen=True)
+class QuantizedWeight:
+    q: np.ndarray  # uint8 codes, packed two per byte for bits=4
+    scales: np.ndarray  # float16 (M, groups)
+    zeros: np.ndarray  # uint8 (M, groups)
+    bits: int
+    group_size: int
+    shape: tuple  # (M, K) before padding
+
+    @property
+    def nbytes(self) -> int:
+        return self.q.nbytes + self.scales.nbytes + self.zeros.nbytes
+
+
+def padded_k(k: int, group_size: int) -> int:
+    return -(-k // group_size) * group_size
+
+
+def _check(bits, group_size):
+    if bits not in BITS:
+        raise ValueError(f"bits must be one of {BITS}, not {bits}")
+    if group_size < 2 or group_size & (group_size - 1):
+        raise ValueError(f"group_size must be a power of two >= 2, not {group_size}")
+
+
+def pack_int4(codes: np.ndarray) -> np.ndarray:
+    """(..., K) codes in [0, 16) -> (..., K // 2) bytes, even columns in the low nibble."""
+    codes = np.asarray(codes, np.uint8)
+    if codes.shape[-1] % 2:
+        raise ValueError(f"int4 packing needs an even last dimension, got {codes.shape}")
+    if codes.size and codes.max() > 15:
+        raise ValueError("int4 codes must be < 16")
+    return codes[..., 0::2] | (codes[..., 1::2] << 4)
+
+
+def unpack_int4(packed: np.ndarray) -> np.ndarray:
+    packed = np.asarray(packed, np.uint8)
+    out = np.empty(packed.shape[:-1] + (2 * packed.shape[-1],), np.uint8)
+    out[..., 0::2] = packed & 0xF
+    out[..., 1::2] = packed >> 4
+    return out
+
+
+def quantize(w, bits: int = 4, group_size: int = 128, symmetric: bool = False) -> QuantizedWeight:
+    _check(bits, group_size)
+    w = np.asarray(w, np.float32)
+    m, k = w.shape
+    kp = padded_k(k, group_size)
+    groups = np.pad(w, ((0, 0), (0, kp - k))).reshape(m, kp // group_size, group_size)
+    qmax = 2**bits - 1
+
+    if symmetric:
+        zeros = np.full(groups.shape[:2], 2 ** (bits - 1), np.float32)
+        scales = np.abs(groups).max(axis=2) / (2 ** (bits - 1) - 1)
+    else:
+        lo = np.minimum(groups.min(axis=2), 0)  # keep 0 exactly representable (the padding)
+        hi = np.maximum(groups.max(axis=2), 0)
+        scales = (hi - lo) / qmax
+        zeros = np.clip(np.round(-lo / np.where(scales > 0, scales, 1)), 0, qmax)
+        # Rounding the zero-point shifts the range by up to half a step; widen
+        # the step so [lo, hi] still maps inside [0, qmax] and nothing clips.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scales = np.maximum(np.where(zeros < qmax, hi / (qmax - zeros), 0), np.where(zeros > 0, -lo / zeros, 0))
+    # Store the scale in float16, rounded up so the codes still fit.
+    scales = np.where(scales > 0, scales, 1).astype(np.float32)
+    half = scales.astype(np.float16)
+    scales = np.where(half.astype(np.float32) < scales, np.nextafter(half, np.float16(np.inf)), half)
+    s = scales.astype(np.float32)[..., None]
+    codes = np.clip(np.round(groups / s) + zeros[..., None], 0, qmax).astype(np.uint8).reshape(m, kp)
+    q = pack_int4(codes) if bits == 4 else codes
+    return QuantizedWeight(q, scales, zeros.astype(np.uint8), bits, group_size, (m, k))
+
+
+def codes(qw: QuantizedWeight) -> np.ndarray:
+    return unpack_int4(qw.q) if qw.bits == 4 else qw.q
+
+
+def dequantize(qw: QuantizedWeight) -> np.ndarray:
+    """The float32 (M, K) weight the kernel multiplies by."""
+    m, k = qw.shape
+    c = codes(qw).reshape(m, -1, qw.group_size).astype(np.float32)
+    w = (c - qw.zeros[..., None]) * qw.scales.astype(np.float32)[..., None]
+    return w.reshape(m, -1)[:, :k]
+
+
+def reference_gemv(qw: QuantizedWeight, x) -> np.ndarray:
+    """NumPy float32 reference for the quantized GEMV: dequantize(qw) @ x."""
+    return dequantize(qw) @ np.asarray(x, np.float32)
+
+
+def gemv_bytes(m: int, k: int, bits: int | None, group_size: int = 128, x_itemsize: int = 4) -> int:
+    """Bytes one GEMV call moves: weights (+ scales and zeros), x and y."""
+    if bits is None:
+        weight = 4 * m * k
+    else:
+        kp = padded_k(k, group_size)
+        weight = m * kp * bits // 8 + 3 * m * (kp // group_size)
+    return weight + x_itemsize * k + 4 * m
+
+
+def selfcheck() -> bool:
+    from gpu_tile.tilesim import Simulator
+
+    all_passed = True
+
+    def check(cond, msg):
+        nonlocal all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    rng = np.random.default_rng(0)
+
+    print("Testing int4 packing:")
+    c = np.array([[1, 2, 3, 4, 15, 0]], np.uint8)
+    check(pack_int4(c).tolist() == [[0x21, 0x43, 0x0F]], "even column in the low nibble: [1, 2, 3, 4, 15, 0] -> 21 43 0f")
+    c = rng.integers(0, 16, (7, 256), dtype=np.uint8)
+    check(np.array_equal(unpack_int4(pack_int4(c)), c), "unpack(pack(codes)) round-trips")
+    try:
+        pack_int4(np.array([16, 0]))
+        check(False, "codes >= 16 are rejected")
+    except ValueError:
+        check(True, "codes >= 16 are rejected")
+
+    print("Testing quantization:")
+    m, k = 96, 1000
+    w = rng.standard_normal((m, k), dtype=np.float32)
+    w[3] += 5.0  # a row that is all positive
+    w[4] = 0.0  # and an all-zero row
+    for bits in BITS:
+        for symmetric in (False, True):
+            qw = quantize(w, bits, 128, symmetric)
+            err = np.abs(dequantize(qw) - w).reshape(m, -1)
+            step = np.repeat(qw.scales.astype(np.float32), 128, axis=1)[:, :k]
+            label = f"int{bits} {'symmetric' if symmetric else 'asymmetric'}"
+            check(qw.q.shape == (m, 1024 * bits // 8) and qw.scales.shape == (m, 8), f"{label}: layout {qw.q.shape}, scales {qw.scales.shape}")
+            check(np.all(err <= step * 0.501 + 1e-6), f"{label}: error within half a step (max {err.max():.4f})")
+            check(np.all(dequantize(qw)[4] == 0), f"{label}: zeros stay exactly zero")
+    qw = quantize(w, 4, 128)
+    expected = np.array([(int(codes(qw)[0, j]) - int(qw.zeros[0, j // 128])) * float(qw.scales[0, j // 128]) for j in range(k)])
+    check(np.allclose(dequantize(qw)[0], expected), "dequantize matches the per-element formula")
+
+    print("Testing the cuTile kernel in the simulator:")
+    sim = Simulator()
+    gemv = sim.load_script("cuda-tile/16-quantized-gemv.py")
+    for bits, group_size, (m, k) in ((8, 128, (100, 1000)), (4, 128, (64, 4096)), (4, 64, (37, 777)), (4, 256, (128, 2048))):
+        w = rng.standard_normal((m, k), dtype=np.float32)
+        x = rng.standard_normal(k, dtype=np.float32)
+        qw = quantize(w, bits, group_size)
+        y = np.empty(m, np.float32)
+        gemv.solution(qw.q, qw.scales, qw.zeros, x, y, m, k, bits, group_size)
+        ref = reference_gemv(qw, x)
+        rel = np.abs(y - ref).max() / np.abs(ref).max()
+        check(rel < 1e-5, f"int{bits} g{group_size} {m}x{k}: kernel matches dequantize(qw) @ x (rel err {rel:.1e})")
+        if (bits, m) == (4, 64):
+            err = np.linalg.norm(y - w @ x) / np.linalg.norm(w @ x)
+            check(err < 0.15, f"  ...and the fp32 product within {err:.1%}")
+
+    print("Testing traffic:")
+    m, k = 2048, 131072
+    fp32 = gemv_bytes(m, k, None)
+    ratios = {bits: fp32 / gemv_bytes(m, k, bits) for bits in BITS}
+    check(ratios[8] > 3.8 and ratios[4] > 7.0, f"M={m}, K={k}: int8 {ratios[8]:.2f}x, int4 {ratios[4]:.2f}x fewer bytes than fp32")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
+    return all_passed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m gpu_tile.quant")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_bytes = sub.add_parser("bytes", help="Bytes per GEMV call for fp32, int8 and int4 weights")
+    p_bytes.add_argument("--m", type=int, default=2048)
+    p_bytes.add_argument("--k", type=int, default=131072)
+    p_bytes.add_argument("--group-size", type=int, default=128)
+    p_bytes.add_argument("--gbps", type=float, default=3350.0, help="HBM bandwidth for the time estimate (H100: 3350)")
+
+    sub.add_parser("selfcheck", help="Check packing, quantization and the kernel on the host")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "selfcheck":
+        return 0 if selfcheck() else 1
+    fp32 = gemv_bytes(args.m, args.k, None)
+    print(f"{'weights':8} {'MiB':>10} {'vs fp32':>8} {'us at ' + format(args.gbps, 'g') + ' GB/s':>16}")
+    for label, bits in (("fp32", None), ("int8", 8), ("int4", 4)):
+        n = gemv_bytes(args.m, args.k, bits, args.group_size)
+        print(f"{label:8} {n / 2**20:10.1f} {fp32 / n:7.2f}x {n / (args.gbps * 1e3):16.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""Plan N-D reductions for ``cuda-tile/13-reduction.py``.
+
+A reduction over any set of axes is first coalesced: size-1 axes are dropped
+and adjacent axes that are both kept or both reduced are merged. What is left
+alternates kept/reduced groups, e.g. ``(K0, R1, K2, R3)``. Each reduced group
+becomes one pass over a ``(outer, reduce, inner)`` view, innermost group first,
+and each pass picks one of three strategies:
+
+* ``inner``  -- ``inner == 1``: rows of a contiguous ``(outer, reduce)`` matrix.
+* ``outer``  -- ``inner > 1``: a strided reduce, coalesced along ``inner``.
+* ``full``   -- ``outer == inner == 1``: grid-stride partials, then one block.
+
+Tiles are chosen from the collapsed shape, so ``(128, 64, 64, 64), dim=3``
+(half a million 64-element rows) and ``(32, 512, 512), dim=0`` (a 32-deep
+strided reduce) get very different launches.
+"""
+
+import math
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ReduceOp:
+    name: str
+    combine: str  # sum | prod | max | min | argmax | argmin
+    identity: float
+    map: str | None = None  # applied to the input before the first pass: abs | square
+    post: str | None = None  # applied after the last pass: mean | sqrt
+
+
+OPS = {
+    op.name: op
+    for op in (
+        ReduceOp("sum", "sum", 0.0),
+        ReduceOp("mean", "sum", 0.0, post="mean"),
+        ReduceOp("prod", "prod", 1.0),
+        ReduceOp("max", "max", -math.inf),
+        ReduceOp("min", "min", math.inf),
+        ReduceOp("argmax", "argmax", -math.inf),
+        ReduceOp("argmin", "argmin", math.inf),
+        ReduceOp("l1", "sum", 0.0, map="abs"),
+        ReduceOp("l2", "sum", 0.0, map="square", post="sqrt"),
+    )
+}
+
+# Elements per tile the tile choices aim for (16 KiB of float32).
+TILE_ELEMS = 4096
+# Upper bounds on a single tile dimension.
+MAX_REDUCE_TILE = 1024
+MAX_INNER_TILE = 256
+# Blocks producing partials for the first stage of a full reduce.
+FULL_BLOCKS = 256
+
+
+@dataclass(frozen=True)
+class Pass:
+    strategy: str  # inner | outer | full
+    shape: tuple  # (outer, reduce, inner)
+    tiles: dict
+    grid: tuple
+    map: str | None  # only on the first pass
+    post: str | None  # only on the last pass
+
+
+@dataclass(frozen=True)
+class Plan:
+    op: ReduceOp
+    in_shape: tuple
+    axes: tuple
+    out_shape: tuple
+    count: int  # number of elements reduced into each output
+    passes: tuple
+
+
+def _pow2(n: int) -> int:
+    return 1 << max(n - 1, 0).bit_length()
+
+
+def normalize_axes(ndim: int, axes) -> tuple:
+    if axes is None:
+        return tuple(range(ndim))
+    if isinstance(axes, int):
+        axes = (axes,)
+    out = []
+    for axis in axes:
+        if not -ndim <= axis < ndim:
+            raise ValueError(f"axis {axis} is out of bounds for {ndim}-d input")
+        out.append(axis % ndim)
+    if len(set(out)) != len(out):
+        raise ValueError(f"repeated axis in {axes}")
+    return tuple(sorted(out))
+
+
+def _merge(groups) -> list:
+    merged = []
+    for size, reduced in groups:
+        if merged and merged[-1][1] == reduced:
+            merged[-1] = (merged[-1][0] * size, reduced)
+        else:
+            merged.append((size, reduced))
+    return merged
+
+
+def coalesce(shape, axes) -> list:
+    """Merge adjacent axes into ``[(size, reduced), ...]`` groups, dropping size-1 axes."""
+    return _merge((size, i in axes) for i, size in enumerate(shape) if size != 1)
+
+
+def _tiles(strategy: str, outer: int, reduce: int, inner: int):
+    if strategy == "inner":
+        r_tile = min(MAX_REDUCE_TILE, _pow2(reduce))
+        o_tile = min(_pow2(outer), max(1, TILE_ELEMS // r_tile))
+        return {"O_TILE": o_tile, "R_TILE": r_tile}, (math.ceil(outer / o_tile),)
+    if strategy == "outer":
+        i_tile = min(MAX_INNER_TILE, _pow2(inner))
+        r_tile = min(_pow2(reduce), max(1, TILE_ELEMS // i_tile))
+        return {"R_TILE": r_tile, "I_TILE": i_tile}, (outer, math.ceil(inner / i_tile))
+    tile = min(MAX_REDUCE_TILE, _pow2(reduce))
+    blocks = min(FULL_BLOCKS, math.ceil(reduce / tile))
+    return {"TILE": tile, "BLOCKS": blocks, "P_TILE": _pow2(blocks)}, (blocks,)
+
+
+def plan(shape, axes=None, op: str = "sum", keepdims: bool = False) -> Plan:
+    if op not in OPS:
+        raise ValueError(f"Unknown reduction {op!r}, expected one of {list(OPS)}")
+    rop = OPS[op]
+    shape = tuple(int(s) for s in shape)
+    axes = normalize_axes(len(shape), axes)
+    if rop.combine in ("argmax", "argmin") and len(axes) not in (1, len(shape)):
+        raise ValueError(f"{op} reduces one axis or all of them, got axes={axes}")
+
+    count = math.prod(shape[a] for a in axes)
+    if keepdims:
+        out_shape = tuple(1 if i in axes else s for i, s in enumerate(shape))
+    else:
+        out_shape = tuple(s for i, s in enumerate(shape) if i not in axes)
+
+    groups = coalesce(shape, axes)
+    steps = []
+    while any(reduced for _, reduced in groups):
+        # Innermost reduced group first: its inner extent is already contiguous.
+        j = max(i for i, (_, reduced) in enumerate(groups) if reduced)
+        outer = math.prod(s for s, _ in groups[:j])
+        inner = math.prod(s for s, _ in groups[j + 1:])
+        steps.append((outer, groups[j][0], inner))
+        groups = _merge(groups[:j] + groups[j + 1:])
+    if not steps:
+        # Every reduced axis has size 1: a single pass with reduce == 1 keeps the map/post.
+        steps.append((math.prod(shape), 1, 1))
+
+    passes = []
+    for i, (outer, reduce, inner) in enumerate(steps):
+        if inner > 1:
+            strategy = "outer"
+        elif outer > 1:
+            strategy = "inner"
+        else:
+            strategy = "full"
+        tiles, grid = _tiles(strategy, outer, reduce, inner)
+        passes.append(
+            Pass(
+                strategy,
+                (outer, reduce, inner),
+                tiles,
+                grid,
+                map=rop.map if i == 0 else None,
+                post=rop.post if i == len(steps) - 1 else None,
+            )
+        )
+    return Plan(rop, shape, axes, out_shape, count, tuple(passes))
+
+
+def execute(x, p: Plan):
+    """Run a plan pass by pass with NumPy on the same collapsed views the kernels use."""
+    import numpy as np
+
+    x = np.asarray(x, dtype=np.float32)
+    rop = p.op
+    y = x.reshape(-1)
+    for ps in p.passes:
+        view = y.reshape(ps.shape)
+        if ps.map == "abs":
+            view = np.abs(view)
+        elif ps.map == "square":
+            view = view * view
+        if rop.combine == "sum":
+            y = view.sum(axis=1, dtype=np.float32)
+        elif rop.combine == "prod":
+            y = view.prod(axis=1, dtype=np.float32)
+        elif rop.combine == "max":
+            y = view.max(axis=1)
+        elif rop.combine == "min":
+            y = view.min(axis=1)
+        elif rop.combine == "argmax":
+            y = view.argmax(axis=1)
+        else:
+            y = view.argmin(axis=1)
+        if ps.post == "mean":
+            y = y / np.float32(p.count)
+        elif ps.post == "sqrt":
+            y = np.sqrt(y)
+        y = y.reshape(-1)
+    return y.reshape(p.out_shape)
+
+
+def reference(x, axes=None, op: str = "sum", keepdims: bool = False):
+    """Direct NumPy evaluation of a reduction, independent of any plan."""
+    import numpy as np
+
+    x = np.asarray(x, dtype=np.float32)
+    axes = normalize_axes(x.ndim, axes)
+    if op in ("argmax", "argmin"):
+        fn = np.argmax if op == "argmax" else np.argmin
+        if len(axes) == x.ndim and x.ndim != 1:
+            out = fn(x.reshape(-1))
+            return out.reshape((1,) * x.ndim) if keepdims else out
+        return fn(x, axis=axes[0], keepdims=keepdims)
+    if op == "l1":
+        return np.abs(x).sum(axis=axes, keepdims=keepdims)
+    if op == "l2":
+        return np.sqrt((x * x).sum(axis=axes, keepdims=keepdims))
+    return getattr(np, op)(x, axis=axes, keepdims=keepdims)
+
+
+if __name__ == "__main__":
+    import numpy as np
+
+    all_passed = True
+
+    def check(cond, msg):
+        global all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    print("Testing reduction planner:")
+
+    check(coalesce((4, 1, 8, 16, 2), {2, 3}) == [(4, False), (128, True), (2, False)], "adjacent reduced axes coalesce")
+    check(coalesce((4, 8, 16), {0, 1, 2}) == [(512, True)], "full reduce collapses to one group")
+
+    p = plan((128, 64, 64, 64), 3)
+    check([ps.strategy for ps in p.passes] == ["inner"], "(128, 64, 64, 64) dim=3 -> contiguous inner")
+    check(p.passes[0].tiles == {"O_TILE": 64, "R_TILE": 64}, f"  inner tiles {p.passes[0].tiles}")
+    p = plan((32, 512, 512), 0)
+    check([ps.strategy for ps in p.passes] == ["outer"], "(32, 512, 512) dim=0 -> strided outer")
+    check(p.passes[0].tiles == {"R_TILE": 16, "I_TILE": 256}, f"  outer tiles {p.passes[0].tiles}")
+    p = plan((64, 32, 16), None)
+    check([ps.strategy for ps in p.passes] == ["full"], "all axes -> full reduce")
+    p = plan((8, 4, 16, 32), (1, 3))
+    check([ps.shape for ps in p.passes] == [(512, 32, 1), (8, 4, 16)], "disjoint axes -> one pass per group, innermost first")
+    try:
+        plan((4, 5, 6), (0, 2), "argmax")
+        check(False, "argmax over disjoint axes is rejected")
+    except ValueError:
+        check(True, "argmax over disjoint axes is rejected")
+
+    rng = np.random.default_rng(0)
+    shapes = [((16, 128, 256), 1), ((4, 1, 6), 1), ((32, 64, 64), 0), ((8, 4, 16, 32), (1, 3)), ((6, 1, 5, 7), (1, 2)), ((64, 33), None), ((3, 5), 1)]
+    for op in OPS:
+        ok = True
+        for shape, axes in shapes:
+            if op in ("argmax", "argmin") and axes is not None and not isinstance(axes, int):
+                continue
+            x = rng.standard_normal(shape, dtype=np.float32)
+            if op == "prod":
+                x = 1 + 0.01 * x
+            for keepdims in (False, True):
+                expected = reference(x, axes, op, keepdims)
+                got = execute(x, plan(shape, axes, op, keepdims))
+                ok = ok and got.shape == np.shape(expected) and np.allclose(got, expected, rtol=1e-4, atol=1e-4)
+        check(ok, f"{op}: planned passes match NumPy")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
@@ -0,0 +1,471 @@
+"""Op registry with per-call backend dispatch.
+
+The same op is implemented several times in this repo (vector add in
+``cuda-tile/01``, ``cute-dsl/09`` and ``triton/01``; conv1d in ``cuda-tile/03``
+and ``cute-dsl/10``; GEMM in ``triton/02`` and ``cute-dsl/12``). Each backend
+registers its implementations here with a capability predicate, and
+``call(op, *args)`` picks one:
+
+1. implementations whose backend is installed and whose predicate accepts the
+   call signature are candidates;
+2. if tuning data has timings for the call's tuning key, the fastest candidate
+   wins, otherwise the one with the highest priority.
+
+The NumPy reference backend accepts host arrays, so on machines without a GPU
+every call lands there. The decision is cached per signature (array library,
+device, dtype, shape, contiguity and scalar arguments), so a repeated call
+costs one key build and one dict lookup before the implementation runs: about
+1 us for two NumPy arrays, a little over on slower hosts. Calls with
+unhashable parameters (``axes=[0, 1]``) are dispatched without the cache.
+
+Ops use a functional form that takes arrays positionally and op parameters by
+keyword, and returns the output: ``call("conv1d", x, w, stride=1, padding=1)``.
+"""
+
+import importlib.machinery
+import importlib.util
+import json
+from operator import attrgetter
+from dataclasses import dataclass, field
+from typing import Any, Callable, NamedTuple
+
+
+class ArraySpec(NamedTuple):
+    lib: str
+    device: str
+    dtype: str
+    shape: tuple
+    contiguous: bool
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def numel(self) -> int:
+        n = 1
+        for s in self.shape:
+            n *= s
+        return n
+
+
+@dataclass(frozen=True)
+class Signature:
+    """What capability predicates see: array specs in argument order plus scalar params."""
+
+    arrays: tuple
+    params: dict = field(default_factory=dict)
+
+    @property
+    def device(self) -> str | None:
+        devices = {a.device for a in self.arrays}
+        return devices.pop() if len(devices) == 1 else None
+
+
+@dataclass(frozen=True)
+class Impl:
+    op: str
+    backend: str
+    fn: Callable
+    supports: Callable[[Signature], bool] | None = None
+    priority: int = 0
+
+
+def _numpy_spec(x):
+    return ArraySpec("numpy", "cpu", x.dtype.name, x.shape, x.flags.c_contiguous)
+
+
+def _cupy_spec(x):
+    return ArraySpec("cupy", "cuda", x.dtype.name, x.shape, x.flags.c_contiguous)
+
+
+def _torch_spec(x):
+    return ArraySpec("torch", x.device.type, str(x.dtype)[6:], tuple(x.shape), x.is_contiguous())
+
+
+# Cache keys skip the string conversions above (``dtype.name`` alone costs
+# microseconds) and read the raw hashable attributes instead; strides stand in
+# for contiguity. ``select`` puts the array type in front of each key, so NumPy
+# and CuPy arrays of the same layout never share an entry; the device is part
+# of the key for the device libraries.
+
+
+def _cupy_key(x):
+    return (x.dtype, x.shape, x.strides, x.device.id)
+
+
+def _torch_key(x):
+    return (x.dtype, x.shape, x.device, x.is_contiguous())
+
+
+_SPEC_BY_LIB = {
+    "numpy": (_numpy_spec, attrgetter("dtype", "shape", "strides")),
+    "cupy": (_cupy_spec, _cupy_key),
+    "torch": (_torch_spec, _torch_key),
+}
+_spec_fns: dict[type, Callable | None] = {}
+_key_fns: dict[type, Callable] = {}
+
+
+def _identity(x):
+    return x
+
+
+def _learn_type(t: type):
+    spec, key = _SPEC_BY_LIB.get(t.__module__.split(".")[0], (None, _identity))
+    _spec_fns[t] = spec
+    _key_fns[t] = key
+    return key
+
+
+def array_spec(x) -> ArraySpec | None:
+    t = type(x)
+    if t not in _spec_fns:
+        _learn_type(t)
+    fn = _spec_fns[t]
+    return fn(x) if fn is not None else None
+
+
+# Predicate helpers. Each returns a ``Signature -> bool`` callable.
+
+
+def lib(*names: str):
+    allowed = frozenset(names)
+    return lambda sig: all(a.lib in allowed for a in sig.arrays)
+
+
+def on(device: str):
+    return lambda sig: all(a.device == device for a in sig.arrays)
+
+
+def dtypes(*names: str):
+    allowed = frozenset(names)
+    return lambda sig: all(a.dtype in allowed for a in sig.arrays)
+
+
+def ndim(*dims: int):
+    """``ndim(1)`` for all arrays, or one entry per array: ``ndim(2, 1)``."""
+    if len(dims) == 1:
+        return lambda sig: all(a.ndim == dims[0] for a in sig.arrays)
+    return lambda sig: tuple(a.ndim for a in sig.arrays) == dims
+
+
+def contiguous(sig: Signature) -> bool:
+    return all(a.contiguous for a in sig.arrays)
+
+
+def all_of(*preds):
+    return lambda sig: all(p(sig) for p in preds)
+
+
+def leading(n: int, *preds):
+    """``preds`` applied to the first ``n`` arrays only; the rest are checked separately."""
+    inner = all_of(*preds)
+    return lambda sig: len(sig.arrays) >= n and inner(Signature(sig.arrays[:n], sig.params))
+
+
+def tuning_key(sig: Signature) -> str:
+    """Coarse key used to look up timings: dtype and power-of-two bucket of the largest input."""
+    if not sig.arrays:
+        return "scalar"
+    numel = max(a.numel for a in sig.arrays)
+    return f"{sig.arrays[0].dtype}:{1 << max(numel - 1, 0).bit_length()}"
+
+
+class Registry:
+    def __init__(self):
+        self._impls: dict[str, list[Impl]] = {}
+        self._backends: dict[str, Callable[[], bool]] = {}
+        self._available: dict[str, bool] = {}
+        self._tuning: dict[str, dict[str, dict[str, float]]] = {}
+        self._cache: dict[tuple, Impl] = {}
+
+    def register_backend(self, name: str, requires: tuple[str, ...] = (), available: Callable[[], bool] | None = None):
+        """Declare a backend. It is usable when every module in ``requires`` is installed
+        and ``available()`` (if given) returns True. Nothing is imported to check this."""
+
+        def check():
+            return all(_installed(m) for m in requires) and (available is None or available())
+
+        self._backends[name] = check
+        self._available.pop(name, None)
+        self._cache.clear()
+
+    def register(self, op: str, backend: str, fn: Callable | None = None, *, supports=None, priority: int = 0):
+        """Register ``fn`` as ``backend``'s implementation of ``op``. Usable as a decorator."""
+
+        def decorator(fn):
+            impls = [i for i in self._impls.get(op, []) if i.backend != backend]
+            impls.append(Impl(op, backend, fn, supports, priority))
+            impls.sort(key=lambda i: -i.priority)
+            self._impls[op] = impls
+            self._cache.clear()
+            return fn
+
+        return decorator(fn) if fn is not None else decorator
+
+    def ops(self) -> list[str]:
+        return sorted(self._impls)
+
+    def impls(self, op: str) -> list[Impl]:
+        return list(self._impls.get(op, []))
+
+    def backends(self) -> list[str]:
+        return sorted(self._backends)
+
+    def is_available(self, backend: str) -> bool:
+        ok = self._available.get(backend)
+        if ok is None:
+            check = self._backends.get(backend)
+            ok = self._available[backend] = bool(check and check())
+        return ok
+
+    def get(self, op: str, backend: str) -> Callable:
+        for impl in self._impls.get(op, []):
+            if impl.backend == backend:
+                return impl.fn
+        raise KeyError(f"{backend} does not implement {op}")
+
+    # Tuning data: {op: {tuning_key: {backend: ms}}}
+
+    def set_tuning(self, data: dict):
+        self._tuning = {op: {k: dict(v) for k, v in keys.items()} for op, keys in data.items()}
+        self._cache.clear()
+
+    def load_tuning(self, path):
+        with open(path) as f:
+            self.set_tuning(json.load(f))
+
+    def save_tuning(self, path):
+        with open(path, "w") as f:
+            json.dump(self._tuning, f, indent=2, sort_keys=True)
+
+    def record_timing(self, op: str, key: str, backend: str, ms: float):
+        self._tuning.setdefault(op, {}).setdefault(key, {})[backend] = ms
+        self._cache.clear()
+
+    def signature(self, args, params) -> Signature:
+        # Arrays passed by keyword (``lens=...``) stay in params, as their specs.
+        arrays = []
+        scalars = {name: array_spec(v) or v for name, v in params.items()}
+        for i, a in enumerate(args):
+            spec = array_spec(a)
+            if spec is None:
+                scalars[i] = a
+            else:
+                arrays.append(spec)
+        return Signature(tuple(arrays), scalars)
+
+    def candidates(self, op: str, sig: Signature) -> list[Impl]:
+        return [
+            i
+            for i in self._impls.get(op, [])
+            if self.is_available(i.backend) and (i.supports is None or i.supports(sig))
+        ]
+
+    def select(self, op: str, /, *args, **params) -> Impl:
+        key = [op]
+        for a in args:
+            t = type(a)
+            fn = _key_fns.get(t) or _learn_type(t)
+            key.append(t)
+            key.append(fn(a))
+        for name, v in params.items():
+            t = type(v)
+            fn = _key_fns.get(t) or _learn_type(t)
+            key.append((name, t, fn(v)))
+        key = tuple(key)
+        try:
+            impl = self._cache.get(key)
+        except TypeError:
+            # unhashable arguments (``axes=[0, 1]``): decide without caching
+            return self._decide(op, self.signature(args, params))
+        if impl is None:
+            impl = self._cache[key] = self._decide(op, self.signature(args, params))
+        return impl
+
+    def call(self, op: str, /, *args, **params) -> Any:
+        return self.select(op, *args, **params).fn(*args, **params)
+
+    def _decide(self, op: str, sig: Signature) -> Impl:
+        if op not in self._impls:
+            raise KeyError(f"Unknown op: {op}")
+        candidates = self.candidates(op, sig)
+        if not candidates:
+            raise NotImplementedError(f"No available backend supports {op} for {sig}")
+        timings = self._tuning.get(op, {}).get(tuning_key(sig), {})
+        timed = [i for i in candidates if i.backend in timings]
+        if timed:
+            return min(timed, key=lambda i: timings[i.backend])
+        return candidates[0]
+
+    def clear_cache(self):
+        self._cache.clear()
+        self._available.clear()
+
+
+def _installed(module: str) -> bool:
+    # find_spec("cuda.tile") would import the ``cuda`` package to find its
+    # submodules; walking the search paths checks for it without running any
+    # package ``__init__``.
+    top, *parts = module.split(".")
+    try:
+        spec = importlib.util.find_spec(top)
+        for part in parts:
+            if spec is None or spec.submodule_search_locations is None:
+                return False
+            spec = importlib.machinery.PathFinder.find_spec(part, list(spec.submodule_search_locations))
+        return spec is not None
+    except (ImportError, ValueError):
+        return False
+
+
+REGISTRY = Registry()
+register = REGISTRY.register
+register_backend = REGISTRY.register_backend
+
+_backends_loaded = False
+
+
+def ensure_backends():
+    """Import every backend module so their implementations are registered."""
+    global _backends_loaded
+    if not _backends_loaded:
+        from gpu_tile import backends
+
+        backends.load()
+        _backends_loaded = True
+
+
+def call(op: str, /, *args, **params):
+    """Run ``op`` on the best available backend for these arguments."""
+    if not _backends_loaded:
+        ensure_backends()
+    return REGISTRY.call(op, *args, **params)
+
+
+def select(op: str, /, *args, **params) -> Impl:
+    if not _backends_loaded:
+        ensure_backends()
+    return REGISTRY.select(op, *args, **params)
+
+
+if __name__ == "__main__":
+    import timeit
+
+    import numpy as np
+
+    all_passed = True
+
+    def check(cond, msg):
+        global all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    print("Testing op registry:")
+
+    reg = Registry()
+    reg.register_backend("ref")
+    reg.register_backend("fast")
+    reg.register_backend("missing", requires=("no_such_module_xyz",))
+    reg.register("add", "ref", lambda a, b: a + b, supports=on("cpu"))
+    reg.register("add", "fast", lambda a, b: np.add(a, b), supports=all_of(dtypes("float32"), contiguous), priority=1)
+    reg.register("add", "missing", lambda a, b: None, priority=10)
+
+    a32 = np.ones(1000, dtype=np.float32)
+    a64 = np.ones(1000, dtype=np.float64)
+    check(reg.select("add", a32, a32).backend == "fast", "highest-priority capable backend wins")
+    check(reg.select("add", a64, a64).backend == "ref", "capability predicate filters by dtype")
+    check(reg.select("add", a32[::2], a32[::2]).backend == "ref", "capability predicate filters by contiguity")
+    check(not reg.is_available("missing"), "backend with missing module is unavailable")
+
+    reg.record_timing("add", tuning_key(reg.signature((a32, a32), {})), "fast", 2.0)
+    reg.record_timing("add", tuning_key(reg.signature((a32, a32), {})), "ref", 1.0)
+    check(reg.select("add", a32, a32).backend == "ref", "tuning data overrides priority")
+
+    reg.register("scale", "fast", lambda a: 2 * a, supports=dtypes("float32"))
+    try:
+        reg.select("scale", a64)
+        check(False, "unsupported call raises")
+    except NotImplementedError:
+        check(True, "unsupported call raises NotImplementedError")
+
+    class DeviceArray:
+        """Stands in for a cupy.ndarray: same dtype, shape and strides as a NumPy array."""
+
+        def __init__(self, x):
+            self.dtype, self.shape, self.strides, self.flags = x.dtype, x.shape, x.strides, x.flags
+            self.device = type("Device", (), {"id": 0})()
+
+    DeviceArray.__module__ = "cupy._core.core"
+    reg.register("neg", "ref", lambda a: "host", supports=on("cpu"))
+    reg.register("neg", "fast", lambda a: "device", supports=on("cuda"))
+    check(reg.call("neg", a32) == "host" and reg.call("neg", DeviceArray(a32)) == "device", "cached decisions are per array library")
+
+    reg.register("sum", "ref", lambda a, axes=None: np.sum(a, axis=tuple(axes)))
+    check(np.allclose(reg.call("sum", a32.reshape(10, 100), axes=[0, 1]), 1000), "unhashable params fall back to uncached dispatch")
+
+    reg.select("add", a32, a32)
+    n = 100000
+    cached_ns = min(timeit.repeat(lambda: reg.select("add", a32, a32), number=n, repeat=5)) / n * 1e9
+    uncached_ns = min(timeit.repeat(lambda: reg._decide("add", reg.signature((a32, a32), {})), number=n // 10, repeat=5)) / (n // 10) * 1e9
+    check(cached_ns * 5 < uncached_ns, f"cached dispatch {cached_ns:.0f} ns per call (uncached {uncached_ns:.0f} ns)")
+    # Not asserted: the 1 us budget holds on a fast host but not on every CI runner.
+    print(f"    {'within' if cached_ns < 1000 else 'over'} the 1 us dispatch budget")
+
+    # Go through the importable module so the backends register into the same registry.
+    from gpu_tile.registry import call, select
+
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(1024, dtype=np.float32)
+    w = rng.standard_normal(5, dtype=np.float32)
+    y = call("conv1d", x, w, stride=2, padding=2)
+    xp = np.pad(x, 2)
+    expected = np.array([xp[i * 2 : i * 2 + 5] @ w for i in range((1024 + 4 - 5) // 2 + 1)])
+    check(select("conv1d", x, w, stride=2, padding=2).backend == "numpy", "host arrays fall back to the numpy backend")
+    check(np.allclose(y, expected, atol=1e-5), "numpy conv1d matches the direct formula")
+    check(np.allclose(call("vector_add", x, x), 2 * x), "numpy vector_add")
+    A = rng.standard_normal((64, 32), dtype=np.float32)
+    B = rng.standard_normal((32, 16), dtype=np.float32)
+    check(np.allclose(call("gemm", A, B), A @ B, atol=1e-4), "numpy gemm")
+    check(np.allclose(call("gemv", A, B[:, 0]), A @ B[:, 0], atol=1e-4), "numpy gemv")
+    v, bias, res = B[:, 0], rng.standard_normal(64, dtype=np.float32), rng.standard_normal(64, dtype=np.float32)
+    check(np.allclose(call("fused_gemv", A, v), A @ v, atol=1e-4), "numpy fused_gemv without bias")
+    y = call("fused_gemv", A, v, bias, res, activation="relu")
+    check(np.allclose(y, np.maximum(A @ v + bias, 0) + res, atol=1e-4), "numpy fused_gemv with bias, relu and residual")
+    check(np.allclose(call("fused_gemv", A, v, None, res), A @ v + res, atol=1e-4), "numpy fused_gemv with a residual only")
+
+    class FakeTensor:
+        """Stands in for a torch.Tensor on the GPU: enough for the spec and cache key."""
+
+        def __init__(self, dtype, *shape):
+            self.dtype = type("dtype", (), {"__str__": lambda _: f"torch.{dtype}"})()
+            self.shape, self.device = shape, type("Device", (), {"type": "cuda"})()
+
+        def is_contiguous(self):
+            return True
+
+    FakeTensor.__module__ = "torch"
+    # Keyword arrays are specced by the importable module, which the backend predicates check against.
+    from gpu_tile import registry
+
+    triton_attention = next(i for i in registry.REGISTRY.impls("attention") if i.backend == "triton")
+    reg = registry.Registry()
+    reg.register_backend("fast")
+    reg.register_backend("ref")
+    reg.register("attention", "fast", lambda q, k, v, *args, **params: "triton", supports=triton_attention.supports, priority=1)
+    reg.register("attention", "ref", lambda q, k, v, *args, **params: "sdpa")
+    q = FakeTensor("float16", 2, 4, 128, 64)
+    lens32, lens64, lens_short = FakeTensor("int32", 2), FakeTensor("int64", 2), FakeTensor("int32", 1)
+    check(reg.call("attention", q, q, q) == "triton", "triton attention takes half (B, H, L, D) operands")
+    check(
+        reg.call("attention", q, q, q, True, lens32) == "triton" and reg.call("attention", q, q, q, lens=lens32) == "triton",
+        "triton attention takes int32 lens, positional or keyword",
+    )
+    check(
+        reg.call("attention", q, q, q, lens=lens64) == "sdpa" and reg.call("attention", q, q, q, False, lens_short) == "sdpa",
+        "lens of the wrong dtype or length falls back",
+    )
+    check(reg.call("attention", FakeTensor("float32", 2, 4, 128, 64), q, q) == "sdpa", "float32 attention falls back")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
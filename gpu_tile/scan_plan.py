@@ -0,0 +1,279 @@
+"""Plan prefix scans (cumsum) for ``cuda-tile/18-scan.py``.
+
+A scan along ``axis`` of an N-D array is a scan along the middle axis of its
+``(outer, n, inner)`` view. Each plan uses one of two strategies:
+
+* ``local``    -- block-local: a block owns whole scan lines and walks them
+  tile by tile with a running carry. Used for short lines, for strided lines
+  (``inner > 1``, coalesced along ``inner``) and whenever there are enough
+  lines to fill the GPU on their own.
+* ``lookback`` -- single-pass decoupled look-back (Merrill and Garland): long
+  contiguous lines are cut into chunks, one per block. A block scans its
+  chunk, publishes the chunk total, folds in its predecessors' totals (or the
+  first inclusive prefix it meets), publishes its own inclusive prefix and
+  writes the chunk out. The input is read once and the output written once;
+  the per-chunk status adds 12 bytes per chunk.
+
+Segmented scans restart at every nonzero entry of ``flags`` (an array of the
+input's shape). They scan the last axis and always use the look-back kernel:
+a chunk holding a segment head stops the look-back like an inclusive prefix.
+
+Inclusive and exclusive scans of float16, bfloat16 and float32 accumulate in
+float32; int32 scans accumulate (and wrap) in int32. ``reference`` is the
+NumPy ``cumsum`` version the kernels are checked against::
+
+    out = cupy.empty_like(x)
+    _scripts.load("cuda-tile/18-scan.py").solution(x, out, axis=1, exclusive=True)
+"""
+
+import argparse
+import math
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+DTYPES = ("float16", "bfloat16", "float32", "int32")
+
+# Local tiles: elements per tile and the largest tile along each axis.
+TILE_ELEMS = 4096
+MAX_N_TILE = 1024
+MAX_INNER_TILE = 256
+# Below this many local blocks, long contiguous lines switch to look-back.
+MIN_BLOCKS = 512
+# Look-back chunks are (ROWS, TILE) tiles. Segmented chunks are smaller: their
+# row-local scan is a (ROWS, TILE, TILE) masked sum.
+CHUNK_TILES = {False: (4, 1024), True: (16, 32)}
+# Predecessor statuses read per look-back step.
+LOOKBACK = 32
+
+
+@dataclass(frozen=True)
+class Plan:
+    strategy: str  # local | lookback
+    in_shape: tuple
+    axis: int
+    shape: tuple  # (outer, n, inner)
+    tiles: dict
+    grid: tuple
+    segmented: bool = False
+
+    @property
+    def chunk(self) -> int:
+        return self.tiles["ROWS"] * self.tiles["TILE"] if self.strategy == "lookback" else 0
+
+    @property
+    def status_bytes(self) -> int:
+        """Look-back status (flag, aggregate, prefix) plus the chunk counter."""
+        return 12 * self.grid[0] + 4 if self.strategy == "lookback" else 0
+
+
+def _pow2(n: int) -> int:
+    return 1 << max(n - 1, 0).bit_length()
+
+
+def accumulator(dtype) -> str:
+    """The kernel accumulator for an input dtype (NumPy, cupy or torch)."""
+    name = str(dtype).removeprefix("torch.")
+    if name not in DTYPES:
+        raise ValueError(f"scans support {DTYPES}, not {name}")
+    return "int32" if name == "int32" else "float32"
+
+
+def _local(outer: int, n: int, inner: int):
+    if inner == 1:
+        n_tile = min(MAX_N_TILE, _pow2(n))
+        o_tile = min(_pow2(outer), max(1, TILE_ELEMS // n_tile))
+        i_tile = 1
+    else:
+        i_tile = min(MAX_INNER_TILE, _pow2(inner))
+        n_tile = min(_pow2(n), max(1, TILE_ELEMS // i_tile))
+        o_tile = 1
+    tiles = {"O_TILE": o_tile, "N_TILE": n_tile, "I_TILE": i_tile, "NUM_N_TILES": math.ceil(n / n_tile)}
+    return tiles, (math.ceil(outer / o_tile), math.ceil(inner / i_tile))
+
+
+def plan(shape, axis: int = -1, segmented: bool = False) -> Plan:
+    shape = tuple(int(s) for s in shape)
+    if not shape:
+        raise ValueError("cannot scan a 0-d array")
+    if not -len(shape) <= axis < len(shape):
+        raise ValueError(f"axis {axis} is out of range for {len(shape)}-D input")
+    axis %= len(shape)
+    outer = math.prod(shape[:axis])
+    n = shape[axis]
+    inner = math.prod(shape[axis + 1:])
+    if segmented and inner != 1:
+        raise ValueError(f"segmented scans run along the last axis, not axis {axis} of {shape}")
+
+    tiles, grid = _local(outer, n, inner)
+    rows, tile = CHUNK_TILES[segmented]
+    if segmented or (inner == 1 and n > rows * tile and math.prod(grid) < MIN_BLOCKS):
+        chunks = math.ceil(n / (rows * tile))
+        tiles = {"ROWS": rows, "TILE": tile, "CHUNKS": chunks, "LOOKBACK": LOOKBACK}
+        return Plan("lookback", shape, axis, (outer, n, inner), tiles, (outer * chunks,), segmented)
+    return Plan("local", shape, axis, (outer, n, inner), tiles, grid, segmented)
+
+
+def reference(x, axis: int = -1, exclusive: bool = False, flags=None):
+    """NumPy ``cumsum`` with the kernels' options, in float64 (int64 for ints)."""
+    x = np.asarray(x)
+    wide = np.int64 if np.issubdtype(x.dtype, np.integer) else np.float64
+    xw = x.astype(wide)
+    out = np.cumsum(xw, axis=axis)
+    if flags is not None:
+        starts = np.asarray(flags) != 0
+        starts = np.moveaxis(starts, axis, -1).copy()
+        starts[..., 0] = True
+        pos = np.maximum.accumulate(np.where(starts, np.arange(starts.shape[-1]), 0), axis=-1)
+        before = np.moveaxis(out - xw, axis, -1)
+        out = out - np.moveaxis(np.take_along_axis(before, pos, axis=-1), -1, axis)
+    if exclusive:
+        out = out - xw
+    return out
+
+
+def selfcheck() -> bool:
+    from gpu_tile.tilesim import Simulator
+
+    all_passed = True
+
+    def check(cond, msg):
+        nonlocal all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    rng = np.random.default_rng(0)
+
+    print("Testing the scan planner:")
+    p = plan((1 << 22,))
+    check(p.strategy == "lookback" and p.grid == (1024,), f"4M elements, 1-D -> look-back over {p.grid[0]} chunks of {p.chunk}")
+    check(p.status_bytes / (8 << 22) < 0.005, f"  ...status is {p.status_bytes / (8 << 22):.2%} of the scan's traffic")
+    p = plan((1000,))
+    check(p.strategy == "local" and p.grid == (1, 1) and p.tiles["N_TILE"] == 1024, "1000 elements -> one local block")
+    p = plan((4096, 2048), axis=1)
+    check(p.strategy == "local" and p.tiles["O_TILE"] == 4, "4096 lines of 2048 -> local, 4 lines per block")
+    p = plan((8, 100000), axis=-1)
+    check(p.strategy == "lookback" and p.grid == (8 * 25,), "8 long lines -> look-back, chunks never span two lines")
+    p = plan((64, 5000, 3), axis=1)
+    check(p.strategy == "local" and p.shape == (64, 5000, 3) and p.tiles["I_TILE"] == 4, "a strided axis -> local, coalesced along inner")
+    p = plan((1000,), segmented=True)
+    check(p.strategy == "lookback" and p.grid == (2,), "segmented scans always look back")
+    try:
+        plan((4, 5, 6), axis=1, segmented=True)
+        check(False, "segmented scans along an inner axis are rejected")
+    except ValueError:
+        check(True, "segmented scans along an inner axis are rejected")
+
+    print("Testing the NumPy reference:")
+    x = np.arange(1, 9)
+    f = np.array([0, 0, 1, 0, 0, 1, 1, 0])
+    check(reference(x).tolist() == [1, 3, 6, 10, 15, 21, 28, 36], "inclusive cumsum")
+    check(reference(x, exclusive=True).tolist() == [0, 1, 3, 6, 10, 15, 21, 28], "exclusive cumsum")
+    check(reference(x, flags=f).tolist() == [1, 3, 3, 7, 12, 6, 7, 15], "segmented: restarts at every head")
+    check(reference(x, exclusive=True, flags=f).tolist() == [0, 1, 0, 3, 7, 0, 0, 7], "segmented exclusive")
+
+    print("Testing the cuTile kernels in the simulator:")
+    sim = Simulator()
+    scan = sim.load_script("cuda-tile/18-scan.py")
+    cases = [
+        # (shape, axis, dtype)
+        ((1000,), 0, np.float32),
+        ((300_001,), 0, np.float32),
+        ((70_000,), 0, np.int32),
+        ((4, 50_000), 1, np.float16),
+        ((3, 700, 5), 1, np.float32),
+        ((64, 33, 17), 0, np.int32),
+        ((2, 3, 4, 129), -1, np.float32),
+    ]
+    for shape, axis, dtype in cases:
+        x = rng.standard_normal(shape).astype(dtype) if dtype != np.int32 else rng.integers(-100, 100, shape, dtype=np.int32)
+        for exclusive in (False, True):
+            y = np.empty_like(x)
+            scan.solution(x, y, axis=axis, exclusive=exclusive)
+            ref = reference(x, axis, exclusive)
+            strategy = plan(shape, axis).strategy
+            label = f"{shape} axis={axis} {np.dtype(dtype).name} {'exclusive' if exclusive else 'inclusive'} ({strategy})"
+            if dtype == np.int32:
+                check(np.array_equal(y, ref.astype(np.int32)), label)
+            else:
+                # float32 running sums drift like sqrt(n) ulps of the partial sums
+                scale = np.sqrt(np.moveaxis(np.cumsum(np.moveaxis(x.astype(np.float64), axis, -1) ** 2, axis=-1), -1, axis))
+                tol = 1e-5 * np.sqrt(shape[axis]) if dtype == np.float32 else 2e-3
+                err = np.abs(y.astype(np.float64) - ref) / (scale + 1)
+                check(err.max() < tol, f"{label} (max error {err.max():.1e} of the running norm)")
+
+    for n, density in ((5000, 0.01), (200_000, 0.001), (100_000, 0.0)):
+        x = rng.integers(-100, 100, n, dtype=np.int32)
+        flags = (rng.random(n) < density).astype(np.int8)
+        y = np.empty_like(x)
+        scan.solution(x, y, flags=flags)
+        check(np.array_equal(y, reference(x, flags=flags)), f"segmented n={n}, {int(flags.sum())} heads")
+    x = rng.standard_normal((3, 3000), dtype=np.float32)
+    flags = rng.random(x.shape) < 0.002
+    y = np.empty_like(x)
+    scan.solution(x, y, exclusive=True, flags=flags)
+    check(np.allclose(y, reference(x, -1, True, flags), atol=1e-3), "segmented exclusive over 3 lines, float32")
+
+    # The simulator runs blocks in order, so every predecessor has already
+    # published its inclusive prefix. Publish only aggregates for chunks 1..k-1
+    # and start the counter at k: the next blocks must fold them in, window by
+    # window, as when their predecessors are still running.
+    for segmented, k in ((False, 45), (True, 70)):
+        rows, tile = CHUNK_TILES[segmented]
+        chunk = rows * tile
+        n = (k + 3) * chunk - 100
+        x = rng.integers(-100, 100, (1, n), dtype=np.int32)
+        flags = np.zeros((1, n), np.int32)
+        flags[0, 10 * chunk + 7] = 1  # segmented: the look-back stops at this aggregate-only chunk
+        ref = reference(x, flags=flags if segmented else None)
+        chunks = math.ceil(n / chunk)
+        counter = np.array([k], np.int32)
+        status = np.zeros(chunks, np.int32)
+        aggregates = np.zeros(chunks, np.int32)
+        prefixes = np.zeros(chunks, np.int32)
+        heads = np.zeros(chunks, np.int32)
+        status[:k] = 1
+        status[0] = 2
+        for c in range(k):
+            seg = slice(c * chunk, (c + 1) * chunk)
+            aggregates[c] = reference(x[:, seg], flags=flags[:, seg] if segmented else None)[0, -1]
+            heads[c] = flags[0, seg].any()
+        prefixes[0] = aggregates[0]
+        y = np.zeros_like(x)
+        tiles = {"ROWS": rows, "TILE": tile, "CHUNKS": chunks, "LOOKBACK": LOOKBACK}
+        args = (x, y, counter, status, aggregates, prefixes, flags, heads, 0, 1, int(segmented), *tiles.values())
+        sim.ct.launch(None, (chunks - k,), scan.scan_lookback_kernel, args)
+        done = slice(k * chunk, n)
+        folds = k - 11 if segmented else k - 1
+        label = f"{'segmented ' if segmented else ''}look-back folds {folds} aggregate-only predecessors"
+        check(np.array_equal(y[0, done], ref[0, done]) and np.all(status[k:] == 2), label)
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
+    return all_passed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m gpu_tile.scan_plan")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_plan = sub.add_parser("plan", help="Print the strategy, tiles and grid for a scan")
+    p_plan.add_argument("shape", type=int, nargs="+")
+    p_plan.add_argument("--axis", type=int, default=-1)
+    p_plan.add_argument("--segmented", action="store_true")
+
+    sub.add_parser("selfcheck", help="Check the planner, the reference and the kernels on the host")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "selfcheck":
+        return 0 if selfcheck() else 1
+    p = plan(args.shape, args.axis, args.segmented)
+    print(f"{p.strategy}: (outer, n, inner) = {p.shape}, grid {p.grid}")
+    print("  " + ", ".join(f"{k}={v}" for k, v in p.tiles.items()))
+    if p.strategy == "lookback":
+        print(f"  {p.chunk} elements per chunk, {p.status_bytes} bytes of status")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""Sparse matrix formats for the SpMV kernels in ``cuda-tile/17-spmv.py``.
+
+- ``CSR``: ``indptr`` (M + 1), ``indices`` and ``data`` (nnz). Rows are binned
+  by length on the host (``bin_rows``). Short rows go one per lane, so a block
+  covers ``R_TILE`` rows. Long rows get one block each, which walks the row in
+  ``NNZ_TILE`` chunks. A single long row no longer stalls a whole block of
+  lanes.
+- ``BSR``: the same structure over ``(bm, bk)`` blocks, with dense blocks in
+  ``blocks`` (nnzb, bm, bk). Each block is a full tile, as in the dense GEMV,
+  and only nonzero blocks are read. It is the better format when the nonzeros
+  cluster (pruned heads, embedding shards).
+
+``choose`` picks dense, CSR or BSR from a bytes-moved model: dense streams
+``M * K`` values, CSR ``nnz`` values plus a column index each at roughly half
+the bandwidth (the ``x`` gathers are irregular), and BSR every value of every
+nonzero block::
+
+    fmt = sparse.choose(A, blocksize=(16, 64))   # "dense", "csr" or "bsr"
+    csr = sparse.CSR.from_dense(A)
+    y = csr.matvec(x)                            # NumPy reference
+
+scipy is optional: ``from_scipy`` accepts any object with CSR/BSR
+attributes, and ``to_scipy`` imports it only when called.
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+from typing import NamedTuple
+
+import numpy as np
+
+SHORT_ROW_NNZ = 32  # rows with more nonzeros than this get their own block
+CSR_EFFICIENCY = 0.5  # fraction of peak bandwidth the CSR gathers reach
+BSR_EFFICIENCY = 0.9
+
+
+class RowBins(NamedTuple):
+    short: np.ndarray  # int32 row ids, one lane each
+    long: np.ndarray  # int32 row ids, one block each
+    short_nnz: int  # longest short row
+    long_nnz: int  # longest long row
+
+
+def bin_rows(indptr, threshold: int = SHORT_ROW_NNZ) -> RowBins:
+    lengths = np.diff(np.asarray(indptr))
+    is_long = lengths > threshold
+    short = np.flatnonzero(~is_long).astype(np.int32)
+    long = np.flatnonzero(is_long).astype(np.int32)
+    return RowBins(
+        short,
+        long,
+        int(lengths[short].max()) if short.size else 0,
+        int(lengths[long].max()) if long.size else 0,
+    )
+
+
+@dataclass
+class CSR:
+    indptr: np.ndarray  # int32 (M + 1,)
+    indices: np.ndarray  # int32 (nnz,)
+    data: np.ndarray  # (nnz,)
+    shape: tuple
+
+    @property
+    def nnz(self) -> int:
+        return int(self.indptr[-1])
+
+    @property
+    def density(self) -> float:
+        return self.nnz / (self.shape[0] * self.shape[1])
+
+    @classmethod
+    def from_dense(cls, a) -> "CSR":
+        a = np.asarray(a)
+        rows, cols = np.nonzero(a)
+        indptr = np.zeros(a.shape[0] + 1, np.int32)
+        np.cumsum(np.bincount(rows, minlength=a.shape[0]), out=indptr[1:])
+        return cls(indptr, cols.astype(np.int32), a[rows, cols], a.shape)
+
+    @classmethod
+    def from_scipy(cls, m) -> "CSR":
+        if hasattr(m, "tocsr"):
+            m = m.tocsr()
+        m.sum_duplicates()  # also sorts the column indices
+        return cls(m.indptr.astype(np.int32), m.indices.astype(np.int32), np.asarray(m.data), tuple(m.shape))
+
+    def to_scipy(self):
+        import scipy.sparse
+
+        return scipy.sparse.csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
+
+    def to_dense(self) -> np.ndarray:
+        a = np.zeros(self.shape, self.data.dtype)
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        a[rows, self.indices] = self.data
+        return a
+
+    def bins(self, threshold: int = SHORT_ROW_NNZ) -> RowBins:
+        return bin_rows(self.indptr, threshold)
+
+    def matvec(self, x) -> np.ndarray:
+        """NumPy float32 reference: one segmented sum over the nonzeros."""
+        m = self.shape[0]
+        products = self.data.astype(np.float32) * np.asarray(x, np.float32)[self.indices]
+        # bincount, not add.reduceat: reduceat rejects offsets past the end (trailing empty rows)
+        rows = np.repeat(np.arange(m), np.diff(self.indptr))
+        return np.bincount(rows, weights=products, minlength=m).astype(np.float32)
+
+
+@dataclass
+class BSR:
+    indptr: np.ndarray  # int32 (M / bm + 1,)
+    indices: np.ndarray  # int32 block columns (nnzb,)
+    blocks: np.ndarray  # (nnzb, bm, bk)
+    shape: tuple  # (M, K), multiples of the block size
+
+    @property
+    def blocksize(self) -> tuple:
+        return self.blocks.shape[1:]
+
+    @property
+    def nnzb(self) -> int:
+        return int(self.indptr[-1])
+
+    @property
+    def max_blocks(self) -> int:
+        return int(np.diff(self.indptr).max()) if self.indptr.size > 1 else 0
+
+    @classmethod
+    def from_dense(cls, a, blocksize=(16, 64)) -> "BSR":
+        a = np.asarray(a)
+        bm, bk = blocksize
+        m, k = a.shape
+        mp, kp = -(-m // bm) * bm, -(-k // bk) * bk
+        tiles = np.pad(a, ((0, mp - m), (0, kp - k))).reshape(mp // bm, bm, kp // bk, bk).swapaxes(1, 2)
+        occupied = tiles.any(axis=(2, 3))
+        rows, cols = np.nonzero(occupied)
+        indptr = np.zeros(mp // bm + 1, np.int32)
+        np.cumsum(occupied.sum(axis=1), out=indptr[1:])
+        return cls(indptr, cols.astype(np.int32), np.ascontiguousarray(tiles[rows, cols]), (mp, kp))
+
+    @classmethod
+    def from_scipy(cls, m, blocksize=(16, 64)) -> "BSR":
+        if hasattr(m, "tobsr"):
+            m = m.tobsr(blocksize=blocksize)
+        m.sum_duplicates()
+        return cls(m.indptr.astype(np.int32), m.indices.astype(np.int32), np.asarray(m.data), tuple(m.shape))
+
+    def to_scipy(self):
+        import scipy.sparse
+
+        return scipy.sparse.bsr_matrix((self.blocks, self.indices, self.indptr), shape=self.shape)
+
+    def to_dense(self) -> np.ndarray:
+        bm, bk = self.blocksize
+        a = np.zeros(self.shape, self.blocks.dtype)
+        rows = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        for r, c, block in zip(rows, self.indices, self.blocks):
+            a[r * bm : (r + 1) * bm, c * bk : (c + 1) * bk] = block
+        return a
+
+    def matvec(self, x) -> np.ndarray:
+        bm, bk = self.blocksize
+        xp = np.zeros(self.shape[1], np.float32)
+        xp[: len(x)] = x
+        partial = np.einsum("bij,bj->bi", self.blocks.astype(np.float32), xp.reshape(-1, bk)[self.indices])
+        rows = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        y = np.zeros((len(self.indptr) - 1, bm), np.float32)
+        np.add.at(y, rows, partial)
+        return y.reshape(-1)
+
+
+# -- format choice -------------------------------------------------------------
+
+
+def estimate(shape, nnz: int, nnzb: int | None = None, blocksize=None, itemsize: int = 4) -> dict:
+    """Effective bytes per SpMV for each format (bytes / achieved bandwidth fraction)."""
+    m, k = shape
+    vectors = itemsize * k + itemsize * m
+    cost = {
+        "dense": itemsize * m * k + vectors,
+        "csr": (nnz * (itemsize + 4) + 4 * (m + 1) + vectors) / CSR_EFFICIENCY,
+    }
+    if nnzb is not None:
+        bm, bk = blocksize
+        cost["bsr"] = (nnzb * (bm * bk * itemsize + 4) + 4 * (m // bm + 1) + vectors) / BSR_EFFICIENCY
+    return cost
+
+
+def choose(a, blocksize=(16, 64), itemsize: int = 4) -> str:
+    """``"dense"``, ``"csr"`` or ``"bsr"`` for a dense array, whichever moves the fewest bytes."""
+    a = np.asarray(a)
+    bm, bk = blocksize
+    m, k = a.shape
+    padded = np.pad(a != 0, ((0, -m % bm), (0, -k % bk)))
+    nnzb = int(padded.reshape(padded.shape[0] // bm, bm, -1, bk).any(axis=(1, 3)).sum())
+    cost = estimate(a.shape, int(np.count_nonzero(a)), nnzb, blocksize, itemsize)
+    return min(cost, key=cost.get)
+
+
+def random_sparse(rng, m, k, density, dtype=np.float32, skew=False) -> np.ndarray:
+    """Dense array with about ``density`` nonzeros; ``skew`` makes a few rows ~20x denser."""
+    p = np.full((m, 1), density)
+    if skew:
+        p[rng.random(m) < 0.05] = min(1.0, 20 * density)
+    mask = rng.random((m, k)) < p
+    return np.where(mask, rng.standard_normal((m, k)), 0).astype(dtype)
+
+
+def selfcheck() -> bool:
+    from gpu_tile.tilesim import Simulator
+
+    all_passed = True
+
+    def check(cond, msg):
+        nonlocal all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    rng = np.random.default_rng(0)
+
+    print("Testing formats:")
+    a = random_sparse(rng, 300, 500, 0.05, skew=True)
+    a[7] = 0  # an empty row
+    x = rng.standard_normal(500, dtype=np.float32)
+    csr = CSR.from_dense(a)
+    check(np.array_equal(csr.to_dense(), a) and csr.nnz == np.count_nonzero(a), f"CSR round-trips ({csr.nnz} nonzeros)")
+    check(np.allclose(csr.matvec(x), a @ x, atol=1e-4), "CSR reference matches the dense product")
+    eye = np.eye(4, dtype=np.float32)
+    eye[3, 3] = 0
+    check(np.array_equal(CSR.from_dense(eye).matvec(np.ones(4)), [1, 1, 1, 0]), "CSR reference with a trailing empty row")
+    check(np.array_equal(CSR.from_dense(np.zeros((3, 4), np.float32)).matvec(np.ones(4)), np.zeros(3)), "  ...and with no nonzeros at all")
+    bins = csr.bins()
+    check(bins.short.size + bins.long.size == 300 and bins.short_nnz <= SHORT_ROW_NNZ < bins.long_nnz, f"row bins: {bins.short.size} short, {bins.long.size} long")
+    bsr = BSR.from_dense(a, (16, 64))
+    check(np.array_equal(bsr.to_dense()[:300, :500], a) and bsr.shape == (304, 512), f"BSR round-trips, padded to {bsr.shape}")
+    check(np.allclose(bsr.matvec(x)[:300], a @ x, atol=1e-4), "BSR reference matches the dense product")
+    try:
+        import scipy.sparse
+    except ImportError:
+        print("  - scipy not installed, skipping the scipy checks")
+    else:
+        s = scipy.sparse.random(200, 300, density=0.1, format="coo", random_state=1, dtype=np.float32)
+        check(np.allclose(CSR.from_scipy(s).to_dense(), s.toarray()), "CSR from a scipy COO matrix")
+        check(np.allclose(CSR.from_dense(a).to_scipy() @ x, a @ x, atol=1e-4), "CSR to scipy")
+        b = scipy.sparse.bsr_matrix(bsr.to_dense(), blocksize=(16, 64))
+        check(np.allclose(BSR.from_scipy(b).to_dense(), bsr.to_dense()) and np.allclose(bsr.to_scipy().toarray(), bsr.to_dense()), "BSR to and from scipy")
+
+    print("Testing the format choice:")
+    m, k = 2048, 4096
+    check(choose(random_sparse(rng, m, k, 0.5)) == "dense", "50% dense: dense")
+    check(choose(random_sparse(rng, m, k, 0.05)) == "csr", "5% scattered: csr")
+    blocky = np.kron(rng.random((m // 16, k // 64)) < 0.05, np.ones((16, 64))) * rng.standard_normal((m, k))
+    check(choose(blocky) == "bsr", "5% in 16x64 blocks: bsr")
+    cost = estimate((m, k), int(0.1 * m * k))
+    check(cost["csr"] < cost["dense"], f"at 10% density CSR moves {cost['csr'] / cost['dense']:.0%} of the dense bytes")
+
+    print("Testing the cuTile kernels in the simulator:")
+    sim = Simulator()
+    spmv = sim.load_script("cuda-tile/17-spmv.py")
+    for m, k, density, skew in ((300, 500, 0.05, True), (1000, 2000, 0.01, False), (64, 4096, 0.2, True)):
+        a = random_sparse(rng, m, k, density, skew=skew)
+        a[-3:] = 0  # trailing empty rows
+        x = rng.standard_normal(k, dtype=np.float32)
+        csr = CSR.from_dense(a)
+        bins = csr.bins()
+        y = np.full(m, np.nan, np.float32)
+        spmv.solution(csr.indptr, csr.indices, csr.data, x, y, *bins)
+        check(np.allclose(y, a @ x, atol=1e-4), f"CSR {m}x{k} at {density:.0%}: {bins.short.size} rows per lane, {bins.long.size} per block")
+        bsr = BSR.from_dense(a, (16, 64))
+        y = np.full(bsr.shape[0], np.nan, np.float32)
+        spmv.solution_bsr(bsr.indptr, bsr.indices, bsr.blocks, x, y, bsr.max_blocks)
+        check(np.allclose(y[:m], a @ x, atol=1e-4), f"BSR {m}x{k}: {bsr.nnzb} blocks of {bsr.blocksize}")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
+    return all_passed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m gpu_tile.sparse")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_est = sub.add_parser("estimate", help="Effective bytes per SpMV for each format")
+    p_est.add_argument("--m", type=int, default=2048)
+    p_est.add_argument("--k", type=int, default=131072)
+    p_est.add_argument("--density", type=float, nargs="+", default=[0.5, 0.25, 0.1, 0.01])
+
+    sub.add_parser("selfcheck", help="Check conversions, the heuristic and the kernels on the host")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "selfcheck":
+        return 0 if selfcheck() else 1
+    print(f"{'density':>8} {'dense MiB':>10} {'csr MiB':>10}  choice")
+    for d in args.density:
+        cost = estimate((args.m, args.k), int(d * args.m * args.k))
+        print(f"{d:8.1%} {cost['dense'] / 2**20:10.1f} {cost['csr'] / 2**20:10.1f}  {min(cost, key=cost.get)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
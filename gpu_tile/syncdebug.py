@@ -0,0 +1,323 @@
+"""Opt-in detection of hidden device synchronizations on launch paths.
+
+Reading a device value on the host (``int(shape[i])`` on a CuPy array,
+``.item()`` or ``.cpu()`` on a torch tensor) copies it back and blocks the
+host until the stream has drained. On a launch path that costs the overlap
+between host-side launch work and kernels already in flight. Launch paths
+should take shapes from tensor attributes (``x.shape``) or a cached host-side
+descriptor instead.
+
+Nothing is checked until ``enable()`` is called. While disabled, ``watch``
+returns a shared no-op context manager and ``checked`` functions pay a single
+flag check. When enabled, each watched call counts the syncs it triggers:
+
+- torch: ``torch.cuda.set_sync_debug_mode`` is switched on for the duration
+  of the call; its warnings are counted (``"count"``) or it raises
+  (``"raise"``);
+- CuPy: ``cupyx.allow_synchronize(False)`` makes the first sync raise
+  ``DeviceSynchronized``. CuPy cannot report a sync and carry on, so CuPy
+  syncs are only caught in ``"raise"`` mode on the device;
+- the tile simulator (``gpu_tile/tilesim.py``): host reads of ``sim.cupy``
+  arrays report here, so CuPy-style syncs are counted on the host in either
+  mode.
+
+::
+
+    from gpu_tile import syncdebug
+
+    syncdebug.enable("count")
+    with syncdebug.watch("sum_dim"):
+        solution(x, 1, out, shape, 3)
+    print(syncdebug.stats())      # {'sum_dim': CallStats(calls=1, syncs=3, max_syncs=3)}
+"""
+
+import collections
+import contextlib
+import functools
+import importlib
+import sys
+import threading
+import traceback
+import warnings
+from typing import NamedTuple
+
+DEFAULT_CAPACITY = 4096
+MODES = ("count", "raise")
+
+
+class HiddenSync(RuntimeError):
+    """A watched call synchronized the device (``"raise"`` mode)."""
+
+
+class SyncEvent(NamedTuple):
+    label: str  # innermost watch, or "" outside any
+    what: str
+    where: str  # file:line of the code that synchronized
+
+
+class CallStats(NamedTuple):
+    calls: int
+    syncs: int
+    max_syncs: int  # in a single call
+
+
+_mode = None  # one of MODES while enabled
+_events = collections.deque(maxlen=DEFAULT_CAPACITY)
+_stats = {}  # label -> [calls, syncs, max_syncs]
+_local = threading.local()  # .frames: the active watches of this thread, as [label, syncs]
+
+# Frames of the detector itself, not of the code that synchronized
+_OWN = {"synchronized", "_where", "_replay", "__exit__", "_device_checks"}
+
+
+def _frames():
+    frames = getattr(_local, "frames", None)
+    if frames is None:
+        frames = _local.frames = []
+    return frames
+
+
+def _where() -> str:
+    for frame in reversed(traceback.extract_stack()):
+        internal = frame.filename == __file__ and frame.name in _OWN
+        if not internal and not frame.filename.endswith(("tilesim.py", "contextlib.py")):
+            return f"{frame.filename}:{frame.lineno}"
+    return "?"
+
+
+def synchronized(what: str):
+    """Report a device sync. Sources call this; it is a no-op while disabled."""
+    if _mode is None:
+        return
+    frames = _frames()
+    label = frames[-1][0] if frames else ""
+    event = SyncEvent(label, what, _where())
+    if _mode == "raise":
+        raise HiddenSync(f"{what} synchronizes the device" + (f" in {label}" if label else "") + f" at {event.where}")
+    _events.append(event)
+    for frame in frames:
+        frame[1] += 1
+
+
+class _Watch:
+    __slots__ = ("label", "frame", "stack")
+
+    def __init__(self, label):
+        self.label = label
+
+    def __enter__(self):
+        frames = _frames()
+        self.frame = [self.label, 0]
+        self.stack = contextlib.ExitStack()
+        if not frames:
+            self.stack.enter_context(_device_checks(_mode))
+        frames.append(self.frame)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self.stack.close()
+        finally:
+            _frames().pop()
+            stats = _stats.setdefault(self.label, [0, 0, 0])
+            stats[0] += 1
+            stats[1] += self.frame[1]
+            stats[2] = max(stats[2], self.frame[1])
+        return False
+
+
+@contextlib.contextmanager
+def _device_checks(mode):
+    torch = sys.modules.get("torch")
+    cupyx = importlib.import_module("cupyx") if "cupy" in sys.modules and mode == "raise" else None
+    with contextlib.ExitStack() as stack:
+        if torch is not None and torch.cuda.is_available():
+            previous = torch.cuda.get_sync_debug_mode()
+            torch.cuda.set_sync_debug_mode("error" if mode == "raise" else "warn")
+            stack.callback(torch.cuda.set_sync_debug_mode, previous)
+            if mode == "count":
+                caught = stack.enter_context(warnings.catch_warnings(record=True))
+                warnings.simplefilter("always")
+                stack.callback(_replay, caught)
+        if cupyx is not None:
+            stack.enter_context(cupyx.allow_synchronize(False))
+        yield
+
+
+def _replay(caught):
+    for w in caught:
+        if "synchroniz" in str(w.message):
+            synchronized(f"torch: {w.message}")
+        else:
+            warnings.warn_explicit(w.message, w.category, w.filename, w.lineno)
+
+
+_NULL_WATCH = contextlib.nullcontext()
+
+
+def watch(label: str):
+    """Context manager counting the syncs inside it under ``label``."""
+    if _mode is None:
+        return _NULL_WATCH
+    return _Watch(label)
+
+
+def checked(name: str | None = None):
+    """Decorator form of ``watch``: every call is one sample of ``stats()``."""
+
+    def decorator(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _mode is None:
+                return fn(*args, **kwargs)
+            with _Watch(label):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def enable(mode: str = "count"):
+    global _mode
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, not {mode!r}")
+    _mode = mode
+
+
+def disable():
+    """Stop checking. Events and stats are kept."""
+    global _mode
+    _mode = None
+
+
+def is_enabled() -> bool:
+    return _mode is not None
+
+
+def clear():
+    _events.clear()
+    _stats.clear()
+
+
+def events() -> list[SyncEvent]:
+    return list(_events)
+
+
+def stats() -> dict[str, CallStats]:
+    return {label: CallStats(*s) for label, s in _stats.items()}
+
+
+def check_scripts(scripts=None) -> dict[str, CallStats]:
+    """Run cuda-tile ``solution()``s in the tile simulator and count their syncs.
+
+    Every array argument is a ``sim.cupy`` device array, so any host read of
+    one is counted. Defaults to every built-in case of ``gpu_tile/cost.py``.
+    """
+    import numpy as np
+
+    from gpu_tile import cost
+    from gpu_tile.tilesim import Simulator
+
+    global _mode
+    previous, _mode = _mode, "count"
+    try:
+        result = {}
+        for script in scripts or cost.CASES:
+            sim = Simulator()
+            args, kwargs = cost.CASES[script](np.random.default_rng(0))
+            args = [sim.cupy.asarray(a) if isinstance(a, (np.ndarray, tuple)) else a for a in args]
+            solution = sim.load_script(script).solution
+            with _Watch(script) as w:
+                solution(*args, **kwargs)
+            result[script] = CallStats(1, w.frame[1], w.frame[1])
+        return result
+    finally:
+        _mode = previous
+
+
+if __name__ == "__main__":
+    import time
+
+    import numpy as np
+
+    # tilesim reports to the imported module, not to this __main__
+    from gpu_tile import syncdebug
+    from gpu_tile.syncdebug import CallStats, HiddenSync
+    from gpu_tile.tilesim import Simulator
+
+    all_passed = True
+
+    def check(cond, msg):
+        global all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    print("Testing sync detection:")
+    sim = Simulator()
+    shape = sim.cupy.array((16, 100, 48), dtype=sim.cupy.int32)
+
+    def launch_with_device_shape(shape, ndim):
+        # The pattern cuda-tile/09 used to have: one device-to-host read per dimension
+        return [int(shape[i]) for i in range(ndim)]
+
+    def launch_with_host_shape(x):
+        return tuple(x.shape)
+
+    launch_with_device_shape(shape, 3)
+    check(not syncdebug.events() and not syncdebug.stats(), "nothing recorded while disabled")
+    check(syncdebug.watch("x") is syncdebug._NULL_WATCH, "disabled watch is the shared no-op")
+
+    syncdebug.enable("count")
+    with syncdebug.watch("device shape"):
+        dims = launch_with_device_shape(shape, 3)
+    check(dims == [16, 100, 48] and syncdebug.stats()["device shape"] == CallStats(1, 3, 3), "int() of each device element counts as a sync")
+    line = launch_with_device_shape.__code__.co_firstlineno + 2
+    check({e.where for e in syncdebug.events()} == {f"{__file__}:{line}"}, "events point at the reading line")
+    with syncdebug.watch("host shape"):
+        launch_with_host_shape(shape)
+        len(shape), shape.shape, shape.dtype
+    check(syncdebug.stats()["host shape"].syncs == 0, "shape attributes are host metadata")
+
+    checked_fn = syncdebug.checked("loop")(lambda s: [float(v) for v in s] + [s.item(0), bool(s[0])])
+    checked_fn(shape)
+    checked_fn(shape[:1])
+    check(syncdebug.stats()["loop"] == CallStats(2, 5 + 3, 5), "per-call counts: iteration, item() and bool() sync too")
+
+    with syncdebug.watch("outer"):
+        with syncdebug.watch("inner"):
+            int(shape[0])
+    check(syncdebug.stats()["outer"].syncs == 1 and syncdebug.stats()["inner"].syncs == 1, "nested watches both count")
+
+    x = np.ones((4, 8), np.float32)
+    with syncdebug.watch("kernel"):
+        sim.load_script("cuda-tile/02-relu.py").solution(sim.cupy.asarray(x), sim.cupy.asarray(np.empty_like(x)), 4, 8)
+        sim.load_script("cuda-tile/12-l1-norm.py").solution(sim.cupy.asarray(x), sim.cupy.asarray(np.empty_like(x)), 4, 8)
+    check(syncdebug.stats()["kernel"].syncs == 0, "reads inside simulated kernels are device-side")
+
+    syncdebug.enable("raise")
+    try:
+        with syncdebug.watch("strict"):
+            launch_with_device_shape(shape, 3)
+        check(False, "raise mode stops at the first sync")
+    except HiddenSync as e:
+        check("strict" in str(e) and "syncdebug.py" in str(e), f"raise mode stops at the first sync: {e}")
+    syncdebug.disable()
+
+    print("Testing solution() launch paths:")
+    for script, s in syncdebug.check_scripts().items():
+        check(s.syncs == 0, f"{script}: {s.syncs} syncs")
+    check(not syncdebug.is_enabled(), "check_scripts restores the previous mode")
+
+    syncdebug.clear()
+    n = 200000
+    start = time.perf_counter()
+    for _ in range(n):
+        with syncdebug.watch("noop"):
+            pass
+    per_call_ns = (time.perf_counter() - start) / n * 1e9
+    check(per_call_ns < 1000, f"disabled overhead {per_call_ns:.0f} ns per watch")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
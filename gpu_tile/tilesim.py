@@ -0,0 +1,504 @@
+"""Run cuTile kernels on the host, one tile at a time, with NumPy.
+
+``Simulator`` provides a stand-in for the ``cuda.tile`` module (``sim.ct``)
+and a host-memory ``cupy`` (``sim.cupy``). ``sim.load_script`` imports a
+``cuda-tile/`` script against them, so its ``@ct.kernel`` functions and its
+``solution()`` run unchanged on NumPy arrays::
+
+    sim = Simulator()
+    l1 = sim.load_script("cuda-tile/12-l1-norm.py")
+    l1.solution(X, Y, B, D)            # X, Y are NumPy arrays
+    print(sim.launches[-1].total)      # bytes loaded / stored / atomically added
+
+``ct.launch`` runs the kernel body once per block of the grid, in row-major
+block order. Inside a block every tile op is a single NumPy call, so cost
+scales with the number of tiles and not the number of elements.
+
+The model follows the cuTile semantics the kernels rely on:
+
+- ``load`` reads the in-bounds part of the tile and fills the rest from
+  ``padding_mode``. ``UNDETERMINED`` (the default) fills with NaN (the
+  dtype's minimum for integers), so a kernel that reduces unpadded garbage
+  produces a visibly wrong result instead of a lucky zero.
+- ``store`` writes only the in-bounds part. The tile must already have the
+  array's dtype; a missing ``ct.astype`` raises ``TypeError`` as it fails to
+  compile on the device.
+- ``gather`` returns ``padding_value`` for out-of-bounds indices. ``scatter``
+  and ``atomic_add`` drop them. ``atomic_add`` accumulates duplicate indices
+  and returns the old values.
+- Tile shapes must be powers of two.
+- ``sim.cupy`` allocates ``DeviceArray``s. Reading one on the host outside a
+  kernel (``int(shape[0])``, ``.item()``, iteration) is a device sync and is
+  reported to ``gpu_tile/syncdebug.py``.
+
+Only the in-bounds elements a block touches count as traffic: padding is free,
+as it is on the device.
+"""
+
+import enum
+import functools
+import importlib.util
+import inspect
+import itertools
+import re
+import sys
+import types
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from gpu_tile import _scripts, syncdebug
+
+
+class PaddingMode(enum.Enum):
+    UNDETERMINED = "undetermined"
+    ZERO = "zero"
+    NEG_ZERO = "neg_zero"
+    NAN = "nan"
+    POS_INF = "pos_inf"
+    NEG_INF = "neg_inf"
+
+
+_PADDING = {
+    PaddingMode.ZERO: 0.0,
+    PaddingMode.NEG_ZERO: -0.0,
+    PaddingMode.NAN: np.nan,
+    PaddingMode.POS_INF: np.inf,
+    PaddingMode.NEG_INF: -np.inf,
+}
+
+
+class Constant:
+    """``ct.Constant[int]``: only an annotation on the host."""
+
+    def __class_getitem__(cls, item):
+        return cls
+
+
+_kernel_depth = 0  # > 0 while a simulated kernel body runs
+
+
+class DeviceArray(np.ndarray):
+    """A ``sim.cupy`` array. Like CuPy, indexing gives 0-d arrays, and turning
+    one into a host value outside a kernel is a device sync."""
+
+    def __getitem__(self, key):
+        out = super().__getitem__(key)
+        return out if isinstance(out, np.ndarray) else np.asarray(out).view(DeviceArray)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def _host(self, what):
+        if not _kernel_depth:
+            syncdebug.synchronized(f"{what} of a device array")
+        return self.view(np.ndarray)
+
+    def __int__(self):
+        return int(self._host("int()"))
+
+    def __index__(self):
+        return self._host("index").__index__()
+
+    def __float__(self):
+        return float(self._host("float()"))
+
+    def __bool__(self):
+        return bool(self._host("bool()"))
+
+    def item(self, *args):
+        return self._host("item()").item(*args)
+
+    def tolist(self):
+        return self._host("tolist()").tolist()
+
+    def get(self):
+        return self._host("get()").copy()
+
+
+def _device(make):
+    @functools.wraps(make)
+    def wrapper(*args, **kwargs):
+        return np.asarray(make(*args, **kwargs)).view(DeviceArray)
+
+    return wrapper
+
+
+class Kernel:
+    def __init__(self, fn, options):
+        self.fn = fn
+        self.options = options
+        self.__name__ = fn.__name__
+        self.__doc__ = fn.__doc__
+
+    def __call__(self, *args, **kwargs):
+        raise TypeError(f"{self.__name__} is a kernel; run it with ct.launch(stream, grid, kernel, args)")
+
+
+@dataclass
+class Traffic:
+    loaded: int = 0  # bytes
+    stored: int = 0
+    atomic: int = 0
+
+    def __add__(self, other):
+        return Traffic(self.loaded + other.loaded, self.stored + other.stored, self.atomic + other.atomic)
+
+
+@dataclass
+class Launch:
+    kernel: str
+    grid: tuple
+    blocks: dict = field(default_factory=dict)  # block id -> Traffic
+    # Only with Simulator(trace=True):
+    buffers: dict = field(default_factory=dict)  # kernel argument name -> (lo, hi) byte range
+    accesses: list = field(default_factory=list)  # (block id, kind, byte address per element, bytes)
+
+    @property
+    def total(self) -> Traffic:
+        return sum(self.blocks.values(), Traffic())
+
+
+def _tuple(v):
+    return tuple(int(i) for i in v) if isinstance(v, (tuple, list)) else (int(v),)
+
+
+def _check_shape(shape):
+    for n in shape:
+        if n <= 0 or n & (n - 1):
+            raise ValueError(f"tile shape {shape} must be powers of two")
+
+
+def _address(array):
+    return array.__array_interface__["data"][0]
+
+
+def _bounds(array):
+    lo = hi = _address(array)
+    for n, stride in zip(array.shape, array.strides):
+        lo += min(0, (n - 1) * stride)
+        hi += max(0, (n - 1) * stride)
+    return lo, hi + array.itemsize
+
+
+def _window_addresses(array, src):
+    grids = np.ix_(*(np.arange(s.start, s.stop, dtype=np.int64) * stride for s, stride in zip(src, array.strides)))
+    return (_address(array) + sum(grids, np.int64(0))).ravel()
+
+
+def _index_addresses(array, idx, mask):
+    return _address(array) + sum((i[mask].astype(np.int64) * stride for i, stride in zip(idx, array.strides)), np.int64(0))
+
+
+class Simulator:
+    def __init__(self, trace: bool = False):
+        self.trace = trace  # record the address of every element touched (see gpu_tile/cost.py)
+        self.launches = []  # one Launch per ct.launch
+        self._launch = None
+        self._bid = (0, 0, 0)
+        self._grid = (1, 1, 1)
+        self._scripts = {}
+        self.ct = self._make_ct()
+        self.cupy = self._make_cupy()
+
+    # -- traffic -----------------------------------------------------------
+
+    def _count(self, kind, nbytes, addresses):
+        # ``addresses()`` is only evaluated when tracing.
+        if self._launch is not None:
+            block = self._bid[: len(self._launch.grid)]
+            traffic = self._launch.blocks.setdefault(block, Traffic())
+            setattr(traffic, kind, getattr(traffic, kind) + int(nbytes))
+            if self.trace:
+                self._launch.accesses.append((block, kind, addresses(), int(nbytes)))
+
+    # -- ct.* ----------------------------------------------------------------
+
+    def launch(self, stream, grid, kernel, args):
+        grid = _tuple(grid)
+        record = Launch(kernel.__name__, grid)
+        self.launches.append(record)
+        if self.trace:
+            names = list(inspect.signature(kernel.fn).parameters)
+            for name, arg in zip(names, args):
+                # An array passed twice (an absent operand) keeps its first name.
+                if isinstance(arg, np.ndarray) and _bounds(arg) not in record.buffers.values():
+                    record.buffers[name] = _bounds(arg)
+        global _kernel_depth
+        self._launch, self._grid = record, grid + (1,) * (3 - len(grid))
+        _kernel_depth += 1
+        try:
+            for bid in itertools.product(*(range(n) for n in self._grid)):
+                self._bid = bid
+                kernel.fn(*args)
+        finally:
+            _kernel_depth -= 1
+            self._launch, self._bid, self._grid = None, (0, 0, 0), (1, 1, 1)
+        return record
+
+    def bid(self, axis):
+        return self._bid[axis]
+
+    def num_blocks(self, axis):
+        return self._grid[axis]
+
+    def load(self, array, index, shape, padding_mode=PaddingMode.UNDETERMINED, **hints):
+        index, shape = _tuple(index), _tuple(shape)
+        if len(index) != array.ndim or len(shape) != array.ndim:
+            raise ValueError(f"index {index} and shape {shape} must have one entry per axis of a {array.ndim}-D array")
+        _check_shape(shape)
+        if padding_mode is PaddingMode.UNDETERMINED:
+            fill = np.nan if np.issubdtype(array.dtype, np.floating) else np.iinfo(array.dtype).min
+        else:
+            fill = _PADDING[padding_mode]
+        tile = np.full(shape, fill, dtype=array.dtype)
+        src, dst = self._window(array.shape, index, shape)
+        tile[dst] = array[src]
+        self._count("loaded", tile[dst].nbytes, lambda: _window_addresses(array, src))
+        return tile
+
+    def store(self, array, index, tile):
+        tile = np.asarray(tile)
+        if tile.dtype != array.dtype:
+            raise TypeError(f"storing a {tile.dtype} tile into a {array.dtype} array; cast with ct.astype first")
+        index = _tuple(index)
+        _check_shape(tile.shape)
+        src, dst = self._window(array.shape, index, tile.shape)
+        array[src] = tile[dst]
+        self._count("stored", tile[dst].nbytes, lambda: _window_addresses(array, src))
+
+    @staticmethod
+    def _window(array_shape, index, shape):
+        # In-bounds part of tile ``index``: (slices into the array, slices into the tile)
+        src, dst = [], []
+        for i, s, n in zip(index, shape, array_shape):
+            if i < 0:
+                raise IndexError(f"negative tile index {index}")
+            start = i * s
+            stop = min(start + s, n)
+            length = max(stop - start, 0)
+            src.append(slice(min(start, n), min(start, n) + length))
+            dst.append(slice(0, length))
+        return tuple(src), tuple(dst)
+
+    def _indices(self, array, indices):
+        idx = np.broadcast_arrays(*(np.asarray(i) for i in (indices if isinstance(indices, tuple) else (indices,))))
+        if len(idx) != array.ndim:
+            raise ValueError(f"{len(idx)} index tiles for a {array.ndim}-D array")
+        mask = np.ones(idx[0].shape, dtype=bool)
+        for i, n in zip(idx, array.shape):
+            mask &= (i >= 0) & (i < n)
+        return idx, mask
+
+    def gather(self, array, indices, padding_value=0, **hints):
+        idx, mask = self._indices(array, indices)
+        safe = tuple(np.where(mask, i, 0) for i in idx)
+        out = np.where(mask, array[safe], padding_value).astype(array.dtype)
+        self._count("loaded", int(mask.sum()) * array.itemsize, lambda: _index_addresses(array, idx, mask))
+        return out
+
+    def scatter(self, array, indices, tile, **hints):
+        idx, mask = self._indices(array, indices)
+        tile = np.broadcast_to(np.asarray(tile), mask.shape)
+        if tile.dtype != array.dtype:
+            raise TypeError(f"scattering a {tile.dtype} tile into a {array.dtype} array; cast with ct.astype first")
+        array[tuple(i[mask] for i in idx)] = tile[mask]
+        self._count("stored", int(mask.sum()) * array.itemsize, lambda: _index_addresses(array, idx, mask))
+
+    def atomic_add(self, array, indices, update, **hints):
+        idx, mask = self._indices(array, indices)
+        safe = tuple(np.where(mask, i, 0) for i in idx)
+        old = np.where(mask, array[safe], 0).astype(array.dtype)
+        update = np.broadcast_to(np.asarray(update), mask.shape)
+        np.add.at(array, tuple(i[mask] for i in idx), update[mask].astype(array.dtype))
+        self._count("atomic", int(mask.sum()) * array.itemsize, lambda: _index_addresses(array, idx, mask))
+        return old
+
+    def num_tiles(self, array, axis, shape):
+        return -(-array.shape[axis] // _tuple(shape)[axis])
+
+    # -- namespaces ----------------------------------------------------------
+
+    def _make_ct(self):
+        ct = types.ModuleType("cuda.tile")
+
+        def kernel(fn=None, **options):
+            if fn is None:
+                return lambda f: Kernel(f, options)
+            return Kernel(fn, options)
+
+        def full(shape, fill_value, dtype):
+            _check_shape(_tuple(shape))
+            return np.full(_tuple(shape), fill_value, dtype=dtype)
+
+        def zeros(shape, dtype):
+            return full(shape, 0, dtype)
+
+        def arange(n, dtype):
+            _check_shape((int(n),))
+            return np.arange(int(n), dtype=dtype)
+
+        def reduction(fn):
+            # Reductions keep the tile dtype (np.sum would widen int32 to int64).
+            return lambda x, axis=None, keepdims=False: fn(x, axis=axis, keepdims=keepdims).astype(np.asarray(x).dtype)
+
+        ct.__dict__.update(
+            kernel=kernel,
+            launch=self.launch,
+            bid=self.bid,
+            num_blocks=self.num_blocks,
+            load=self.load,
+            store=self.store,
+            gather=self.gather,
+            scatter=self.scatter,
+            atomic_add=self.atomic_add,
+            num_tiles=self.num_tiles,
+            cdiv=lambda a, b: -(-int(a) // int(b)),
+            Constant=Constant,
+            PaddingMode=PaddingMode,
+            astype=lambda x, dtype: np.asarray(x).astype(dtype),
+            full=full,
+            zeros=zeros,
+            arange=arange,
+            sum=reduction(np.sum),
+            prod=reduction(np.prod),
+            max=reduction(np.max),
+            min=reduction(np.min),
+            cumsum=lambda x, axis=0: np.cumsum(x, axis=axis, dtype=np.asarray(x).dtype),
+            where=np.where,
+            maximum=np.maximum,
+            minimum=np.minimum,
+            sqrt=np.sqrt,
+            rsqrt=lambda x: 1 / np.sqrt(x),
+            exp=np.exp,
+            log=np.log,
+            tanh=np.tanh,
+            abs=np.abs,
+            expand_dims=np.expand_dims,
+            reshape=np.reshape,
+            transpose=np.transpose,
+            bool_=np.bool_,
+            int8=np.int8,
+            int16=np.int16,
+            int32=np.int32,
+            int64=np.int64,
+            uint8=np.uint8,
+            float16=np.float16,
+            float32=np.float32,
+            float64=np.float64,
+        )
+        return ct
+
+    def _make_cupy(self):
+        cupy = types.ModuleType("cupy")
+        cupy.cuda = types.SimpleNamespace(get_current_stream=lambda: None)
+        for name in ("array", "asarray", "empty", "zeros", "ones", "full"):
+            setattr(cupy, name, _device(getattr(np, name)))
+        for name in ("int32", "int64", "float16", "float32", "float64"):
+            setattr(cupy, name, getattr(np, name))
+        return cupy
+
+    def load_script(self, relpath: str):
+        """Import a ``cuda-tile/`` script with ``cuda.tile`` and ``cupy`` bound to this simulator."""
+        if relpath in self._scripts:
+            return self._scripts[relpath]
+        path = _scripts.ROOT / relpath
+        if not path.is_file():
+            raise FileNotFoundError(f"No such script: {relpath}")
+        cuda = types.ModuleType("cuda")
+        cuda.tile = self.ct
+        shims = {"cuda": cuda, "cuda.tile": self.ct, "cupy": self.cupy}
+        saved = {name: sys.modules.get(name) for name in shims}
+        name = f"_gpu_tile_sim{id(self)}_" + re.sub(r"\W", "_", relpath.removesuffix(".py"))
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules.update(shims)
+        try:
+            spec.loader.exec_module(module)
+        finally:
+            for shim, previous in saved.items():
+                if previous is None:
+                    sys.modules.pop(shim, None)
+                else:
+                    sys.modules[shim] = previous
+        self._scripts[relpath] = module
+        return module
+
+
+if __name__ == "__main__":
+    all_passed = True
+
+    def check(cond, msg):
+        global all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    print("Testing tile simulator:")
+    rng = np.random.default_rng(0)
+    sim = Simulator()
+    ct = sim.ct
+
+    a = np.arange(10, dtype=np.float32)
+    sim._launch = Launch("probe", (1,))
+    check(np.array_equal(ct.load(a, index=(1,), shape=(8,), padding_mode=ct.PaddingMode.ZERO), [8, 9, 0, 0, 0, 0, 0, 0]), "ZERO padding fills the tail of a partial tile")
+    check(np.isnan(ct.load(a, index=(1,), shape=(8,))[2:]).all(), "UNDETERMINED padding is poisoned with NaN")
+    check(np.isneginf(ct.load(a, index=(1,), shape=(8,), padding_mode=ct.PaddingMode.NEG_INF)[2:]).all(), "NEG_INF padding")
+    check(np.array_equal(ct.gather(a, np.array([-1, 3, 12]), padding_value=-5.0), [-5, 3, -5]), "gather returns padding_value out of bounds")
+    counts = np.zeros(4, np.float32)
+    old = ct.atomic_add(counts, np.array([1, 1, 3, 7]), np.float32(2))
+    check(np.array_equal(counts, [0, 4, 0, 2]) and np.array_equal(old, [0, 0, 0, 0]), "atomic_add accumulates duplicates and drops out-of-bounds")
+    check(sim._launch.total == Traffic(loaded=(2 + 2 + 2 + 1) * 4, stored=0, atomic=3 * 4), "only in-bounds elements count as traffic")
+    sim._launch = None
+    try:
+        ct.store(a, index=(0,), tile=np.zeros(8, np.float64))
+        check(False, "a store without ct.astype raises")
+    except TypeError:
+        check(True, "a store without ct.astype raises")
+    try:
+        ct.zeros((48,), ct.float32)
+        check(False, "non power-of-two tiles raise")
+    except ValueError:
+        check(True, "non power-of-two tiles raise")
+
+    sum_dim = sim.load_script("cuda-tile/09-sum-over-dimension.py")
+    for shape, dim in (((4, 100, 48), 1), ((37, 16, 8), 0), ((3, 5, 300), 2)):
+        x = rng.standard_normal(shape, dtype=np.float32)
+        out_shape = list(shape)
+        out_shape[dim] = 1
+        out = np.zeros(out_shape, np.float32)
+        sum_dim.solution(x, dim, out, np.array(shape), len(shape))
+        check(np.allclose(out, x.sum(axis=dim, keepdims=True), atol=1e-4), f"sum_dim_kernel shape={shape}, dim={dim} (atomics)")
+    total = sim.launches[-1].total
+    check(total.loaded == x.nbytes and total.atomic == 4 * np.prod(sim.launches[-1].grid), f"sum_dim reads the input once, one atomic per output per block: {total}")
+
+    l1 = sim.load_script("cuda-tile/12-l1-norm.py")
+    X = rng.standard_normal((64, 512), dtype=np.float32)
+    Y = np.empty_like(X)
+    l1.solution(X, Y, *X.shape)
+    check(np.allclose(Y, X / np.abs(X).mean(axis=1, keepdims=True), atol=1e-5), "l1_norm_kernel")
+    launch = sim.launches[-1]
+    check(launch.total == Traffic(loaded=2 * X.nbytes, stored=Y.nbytes), "l1_norm reads X twice and writes Y once")
+    check(len(launch.blocks) == 2 and all(t.loaded == X.nbytes for t in launch.blocks.values()), "traffic is recorded per block")
+
+    X16 = X.astype(np.float16)
+    Y16 = np.empty_like(X16)
+    sim.load_script("cuda-tile/10-rms-norm.py").solution(X16, Y16, *X.shape)
+    ref = X / np.sqrt((X.astype(np.float32) ** 2).mean(axis=1, keepdims=True) + 1e-5)
+    check(np.allclose(Y16, ref, atol=2e-3, rtol=2e-3), "float16 rms norm accumulates in float32")
+    sim.load_script("cuda-tile/11-rms-norm-2stage.py").solution(X, Y, *X.shape)
+    check(np.allclose(Y, ref, atol=1e-5), "two-stage rms norm (two launches)")
+
+    x = rng.standard_normal((100, 300), dtype=np.float32)
+    y = np.empty_like(x)
+    sim.load_script("cuda-tile/02-relu.py").solution(x, y, *x.shape)
+    check(np.array_equal(y, np.maximum(x, 0)), "relu with partial edge tiles")
+    v = rng.standard_normal(5000, dtype=np.float32)
+    w = rng.standard_normal(7, dtype=np.float32)
+    c = np.empty_like(v)
+    sim.load_script("cuda-tile/03-conv1d.py").solution(v, w, c, v.size, w.size)
+    check(np.allclose(c, np.correlate(np.pad(v, 3), w, mode="valid"), atol=1e-5), "conv1d gathers past both ends")
+    idx = np.empty(300, np.int64)
+    sim.load_script("cuda-tile/13-reduction.py").solution(x, idx, axes=0, op="argmax")
+    check(np.array_equal(idx, x.argmax(axis=0)), "argmax reduction over the outer axis")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
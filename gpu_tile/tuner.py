@@ -0,0 +1,444 @@
+"""Autotuning driver: compile candidates in parallel, benchmark them serially.
+
+Tuning a GEMM over a few dozen configs is dominated by compile time, and each
+compile is single-threaded. The driver works in three steps:
+
+1. Dedupe. Configs that ``target.specialize`` maps to the same
+   specialization (a 256-wide block on a 64-wide problem is a 64-wide block)
+   share one compile, and the specialized config is what gets compiled,
+   launched and recorded as each member's ``launch``.
+2. Compile in spawned worker processes, one job per worker at a time. The
+   parent terminates a worker whose job outlives the timeout, so a compile
+   stuck in native code or a ``ptxas`` subprocess cannot hang the run, and a
+   worker that dies marks exactly its own job ``crashed``. The compiler
+   returns a fingerprint of the binary, and specializations with the same
+   fingerprint are benchmarked once.
+3. Benchmark serially on the device in the parent.
+
+Results go to a JSON tuning DB after every job, so an interrupted run resumes
+where it stopped: configs that already have a record are skipped (failed ones
+too, unless ``retry_failed``). The DB layout is
+``{"kernels": {kernel: {problem: {config: record}}}}``.
+
+A target provides ``name``, ``specialize(config, problem)``,
+``compile(config, problem)`` (runs in a worker, so it must pickle) and
+``benchmark(config, problem)``. ``TritonMatmul`` tunes
+``triton/02-tiled-matmul.py``: its workers compile through ``warmup`` into
+the shared Triton cache, so the parent's launch is a cache hit. ``FakeTarget``
+stands in for a compiler on the host::
+
+    python -m gpu_tile.tuner run --fake --db /tmp/tuning.json --workers 4
+    python -m gpu_tile.tuner run --m 4096 --n 4096 --k 4096 --db tuning.json
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+DB_VERSION = 1
+
+
+def config_id(config: dict) -> str:
+    return json.dumps(config, sort_keys=True)
+
+
+def problem_id(problem: dict) -> str:
+    return json.dumps(problem, sort_keys=True)
+
+
+def grid_space(**axes) -> list:
+    """Every combination of the given axis values, as config dicts."""
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+
+# -- tuning DB -------------------------------------------------------------------
+
+
+class TuningDB:
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.data = {"version": DB_VERSION, "kernels": {}}
+        if self.path and self.path.exists():
+            with open(self.path) as f:
+                self.data = json.load(f)
+            if self.data.get("version") != DB_VERSION:
+                raise ValueError(f"{self.path}: tuning DB version {self.data.get('version')}, expected {DB_VERSION}")
+
+    def records(self, kernel: str, problem: dict) -> dict:
+        return self.data["kernels"].setdefault(kernel, {}).setdefault(problem_id(problem), {})
+
+    def put(self, kernel: str, problem: dict, config: dict, record: dict):
+        self.records(kernel, problem)[config_id(config)] = record
+        self.save()
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.data, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def best(self, kernel: str, problem: dict):
+        """``(config, ms)`` of the fastest measured launch, or None."""
+        ok = [(r.get("launch", json.loads(c)), r["ms"]) for c, r in self.records(kernel, problem).items() if r.get("status") == "ok"]
+        return min(ok, key=lambda cm: cm[1]) if ok else None
+
+
+# -- compile workers ---------------------------------------------------------------
+
+
+def _compile_job(target, config, problem):
+    start = time.perf_counter()
+    try:
+        fingerprint = target.compile(config, problem)
+        return {"status": "compiled", "fingerprint": fingerprint, "compile_s": time.perf_counter() - start}
+    except Exception as e:
+        return {"status": "error", "error": f"{type(e).__name__}: {e}", "compile_s": time.perf_counter() - start}
+
+
+def _serve(conn):
+    # Worker loop: one (target, config, problem) job at a time, None to stop.
+    while (job := conn.recv()) is not None:
+        conn.send(_compile_job(*job))
+
+
+class _Worker:
+    """A spawned compile process running one job at a time."""
+
+    def __init__(self, ctx):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_serve, args=(child,), daemon=True)
+        self.proc.start()
+        child.close()
+        self.job = None  # (key, started) while compiling
+
+    def submit(self, key, job):
+        self.conn.send(job)
+        self.job = (key, time.perf_counter())
+
+    def stop(self, kill=False):
+        if kill:
+            self.proc.terminate()
+            self.proc.join(1.0)
+            if self.proc.is_alive():
+                self.proc.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.proc.join()
+        self.conn.close()
+
+
+def compile_all(target, jobs, problem, workers=None, timeout=120.0, log=print) -> dict:
+    """Compile ``{key: config}`` jobs in spawned worker processes; returns ``{key: result}``.
+
+    Each worker runs one job at a time, so a worker that dies names its job
+    (``crashed``). The parent enforces the timeout: a worker still compiling
+    after ``timeout`` seconds is terminated (``timeout``), wherever it is
+    stuck. A dead or terminated worker is replaced.
+    """
+    ctx = multiprocessing.get_context("spawn")  # workers touch CUDA; forked ones cannot
+    queue = list(jobs.items())
+    results = {}
+    pool = [_Worker(ctx) for _ in range(min(workers or os.cpu_count() or 1, len(queue)))]
+    try:
+        while queue or any(w.job for w in pool):
+            for w in pool:
+                if w.job is None and queue:
+                    key, config = queue.pop(0)
+                    w.submit(key, (target, config, problem))
+            busy = [w for w in pool if w.job]
+            deadline = min(w.job[1] for w in busy) + timeout
+            multiprocessing.connection.wait([w.conn for w in busy] + [w.proc.sentinel for w in busy], max(0.0, deadline - time.perf_counter()))
+            for i, w in enumerate(pool):
+                if w.job is None:
+                    continue
+                key, started = w.job
+                elapsed = time.perf_counter() - started
+                if w.conn.poll():
+                    try:
+                        result = w.conn.recv()
+                    except EOFError:  # died while sending
+                        result = None
+                else:
+                    result = None
+                if result is None and w.proc.is_alive() and elapsed < timeout:
+                    continue
+                if result is None:
+                    result = {"status": "crashed" if not w.proc.is_alive() else "timeout", "compile_s": elapsed}
+                    w.stop(kill=True)
+                    if queue:
+                        pool[i] = w = _Worker(ctx)
+                w.job = None
+                results[key] = result
+                log(f"[compile {len(results)}/{len(jobs)}] {result['status']:8} {result.get('compile_s', 0):6.2f}s  {key}")
+    finally:
+        for w in pool:
+            if w.proc.is_alive():
+                w.stop(kill=w.job is not None)
+    return results
+
+
+# -- driver ----------------------------------------------------------------------
+
+
+@dataclass
+class TuneReport:
+    best: tuple | None  # (config, ms)
+    compiled: int  # compile jobs run
+    deduped: int  # configs that shared a specialization or binary
+    skipped: int  # configs already in the DB
+    failed: int
+
+
+def tune(target, configs, problem, db=None, workers=None, timeout=120.0, retry_failed=False, log=print) -> TuneReport:
+    db = db if db is not None else TuningDB()
+    done = db.records(target.name, problem)
+    todo, skipped = [], 0
+    for config in configs:
+        record = done.get(config_id(config))
+        if record is not None and (record.get("status") == "ok" or not retry_failed):
+            skipped += 1
+        else:
+            todo.append(config)
+    if skipped:
+        log(f"resuming: {skipped} of {len(configs)} configs already in the tuning DB")
+
+    # 1. one compile job per specialization, which is also what gets launched
+    groups, jobs = {}, {}
+    for config in todo:
+        spec = target.specialize(config, problem)
+        key = json.dumps(spec, sort_keys=True, default=str)
+        groups.setdefault(key, []).append(config)
+        jobs[key] = spec
+
+    # 2. compile in parallel
+    compiled = compile_all(target, jobs, problem, workers, timeout, log)
+
+    # 3. benchmark each distinct binary once, serially
+    timings = {}
+    failed = 0
+    for n, (key, members) in enumerate(groups.items(), 1):
+        result = compiled[key]
+        if result["status"] != "compiled":
+            failed += len(members)
+            for config in members:
+                db.put(target.name, problem, config, {k: v for k, v in result.items() if k != "fingerprint"})
+            continue
+        fp = result["fingerprint"]
+        if fp not in timings:
+            try:
+                timings[fp] = {"status": "ok", "ms": target.benchmark(jobs[key], problem)}
+            except Exception as e:
+                timings[fp] = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+            log(f"[bench {n}/{len(groups)}] {timings[fp].get('ms', float('nan')):8.4f} ms  {config_id(jobs[key])}")
+        for config in members:
+            record = dict(timings[fp], fingerprint=fp, compile_s=result["compile_s"], launch=jobs[key])
+            failed += record["status"] != "ok"
+            db.put(target.name, problem, config, record)
+
+    fingerprints = {compiled[k]["fingerprint"] for k in jobs if compiled[k]["status"] == "compiled"}
+    failures = sum(1 for k in jobs if compiled[k]["status"] != "compiled")
+    return TuneReport(db.best(target.name, problem), len(jobs), len(todo) - len(fingerprints) - failures, skipped, failed)
+
+
+# -- targets -----------------------------------------------------------------------
+
+
+def _pow2_at_least(n):
+    return 1 << max(0, (n - 1).bit_length())
+
+
+MATMUL_SPACE = grid_space(
+    BLOCK_M=[32, 64, 128],
+    BLOCK_N=[32, 64, 128],
+    BLOCK_K=[32, 64],
+    GROUP_M=[4, 8],
+    num_warps=[4, 8],
+    num_stages=[2, 3],
+)
+
+
+class TritonMatmul:
+    """``matmul_kernel`` from ``triton/02-tiled-matmul.py`` on float32 inputs."""
+
+    name = "triton/matmul_kernel"
+
+    def specialize(self, config, problem):
+        # Blocks wider than the (power-of-two padded) problem compute the same tile;
+        # GROUP_M has no effect once it covers every row of blocks.
+        c = dict(config)
+        for block, dim in (("BLOCK_M", "M"), ("BLOCK_N", "N"), ("BLOCK_K", "K")):
+            c[block] = min(c[block], max(16, _pow2_at_least(problem[dim])))
+        c["GROUP_M"] = min(c["GROUP_M"], -(-problem["M"] // c["BLOCK_M"]))
+        return c
+
+    def _tensors(self, problem):
+        import torch
+
+        M, N, K = problem["M"], problem["N"], problem["K"]
+        return (torch.randn(M, K, device="cuda"), torch.randn(K, N, device="cuda"), torch.empty(M, N, device="cuda"))
+
+    def compile(self, config, problem):
+        from gpu_tile import _scripts
+
+        mod = _scripts.load("triton/02-tiled-matmul.py")
+        kernel = mod.simple_matmul(*self._tensors(problem), **config, warmup=True)
+        return hashlib.sha256(kernel.asm["cubin"]).hexdigest()
+
+    def benchmark(self, config, problem, iters=20, warmup=3):
+        from gpu_tile import _scripts
+        from gpu_tile.bench import _time_ms
+
+        mod = _scripts.load("triton/02-tiled-matmul.py")
+        a, b, c = self._tensors(problem)
+        return _time_ms(lambda: mod.simple_matmul(a, b, c, **config), "cuda", iters, warmup)
+
+
+class FakeTarget:
+    """A compiler stand-in: sleeps, and hangs or crashes on chosen configs
+    (and on every config that specializes like one).
+
+    A hang blocks ``SIGALRM`` first, as a compile stuck in native code would
+    never run a Python signal handler. The fingerprint ignores ``num_stages``,
+    as if pipelining never changed the binary, so configs that specialize
+    differently can still share one. The timing is a deterministic function
+    of the config.
+    """
+
+    name = "fake/matmul"
+
+    def __init__(self, delay=0.05, hang=(), crash=(), error=()):
+        self.delay = delay
+        self.hang, self.crash, self.error = list(hang), list(crash), list(error)
+        self.benchmarked = []
+
+    def specialize(self, config, problem):
+        return TritonMatmul().specialize(config, problem)
+
+    def _chosen(self, configs, config, problem):
+        return config_id(config) in {config_id(self.specialize(c, problem)) for c in configs}
+
+    def compile(self, config, problem):
+        if self._chosen(self.crash, config, problem):
+            os._exit(1)
+        if self._chosen(self.error, config, problem):
+            raise RuntimeError("ptxas error")
+        if self._chosen(self.hang, config, problem):
+            signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+            time.sleep(3600)
+        time.sleep(self.delay)
+        binary = {k: v for k, v in self.specialize(config, problem).items() if k not in ("GROUP_M", "num_stages")}
+        return hashlib.sha256(config_id(binary).encode()).hexdigest()[:16]
+
+    def benchmark(self, config, problem):
+        self.benchmarked.append(config)
+        m, n, k = config["BLOCK_M"], config["BLOCK_N"], config["BLOCK_K"]
+        return 1.0 + abs(m * n - 64 * 128) / 8192 + abs(k - 32) / 64 + 0.1 * config["num_stages"] / config["num_warps"]
+
+
+def selfcheck() -> bool:
+    import tempfile
+
+    all_passed = True
+
+    def check(cond, msg):
+        nonlocal all_passed
+        print(f"  {'✓' if cond else '✗'} {msg}")
+        all_passed = all_passed and cond
+
+    print("Testing tuner with a fake compiler:")
+    problem = {"M": 64, "N": 1024, "K": 1024}
+    space = grid_space(BLOCK_M=[32, 64, 128], BLOCK_N=[64, 128], BLOCK_K=[32], GROUP_M=[4, 8], num_warps=[4], num_stages=[2, 3])
+    cfg = lambda m, n: dict(BLOCK_M=m, BLOCK_N=n, BLOCK_K=32, GROUP_M=4, num_warps=4, num_stages=2)  # noqa: E731
+    hang, crash, error = cfg(32, 64), cfg(64, 64), cfg(32, 128)
+    target = FakeTarget(delay=0.05, hang=[hang], crash=[crash], error=[error])
+    quiet = lambda *a: None  # noqa: E731
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tuning.json"
+        db = TuningDB(path)
+        report = tune(target, space, problem, db, workers=4, timeout=1.0, log=quiet)
+        records = db.records(target.name, problem)
+        check(len(records) == len(space), f"every config has a record ({len(records)})")
+        check(records[config_id(hang)]["status"] == "timeout", "a hung compile times out")
+        check(records[config_id(crash)]["status"] == "crashed", "a crashing compile is isolated and named")
+        check(records[config_id(error)]["status"] == "error" and "ptxas" in records[config_id(error)]["error"], "a compile error is recorded")
+        # On M=64, BLOCK_M 128 is BLOCK_M 64 and GROUP_M collapses: 24 configs, 8 specializations
+        check(report.compiled == 8, f"one compile per specialization: {report.compiled} jobs for {len(space)} configs")
+        check(report.failed == 2 + 4 + 2, f"a failed compile fails its whole specialization ({report.failed})")
+        # The fake binary ignores num_stages: 5 compiled specializations, 4 binaries
+        check(len(target.benchmarked) == 4, f"one benchmark per binary ({len(target.benchmarked)})")
+        check(all(target.specialize(c, problem) == c for c in target.benchmarked), "benchmarks launch the specialized config")
+        check(report.deduped == len(space) - 4 - 3, f"{report.deduped} configs reuse another config's result")
+        check(report.best is not None and report.best[0]["BLOCK_N"] == 128 and report.best[0]["BLOCK_M"] >= 64, f"best: {report.best}")
+        check(report.best[0] == target.specialize(report.best[0], problem), "  ...and is the config that was launched")
+
+        resumed = tune(target, space, problem, TuningDB(path), workers=4, timeout=1.0, log=quiet)
+        check(resumed.skipped == len(space) and resumed.compiled == 0, "a rerun resumes from the DB and compiles nothing")
+        fixed = FakeTarget(delay=0.01)
+        retried = tune(fixed, space, problem, TuningDB(path), workers=4, timeout=1.0, retry_failed=True, log=quiet)
+        fixed_records = TuningDB(path).records(fixed.name, problem)
+        check(retried.skipped == len(space) - 8 and retried.compiled == 3, "retry_failed recompiles only the failures")
+        check(all(r["status"] == "ok" for r in fixed_records.values()), "after the retry every config is measured")
+
+    slow = FakeTarget(delay=0.5)
+    start = time.perf_counter()
+    tune(slow, space[:8], problem, workers=4, log=quiet)  # 4 specializations
+    elapsed = time.perf_counter() - start
+    check(elapsed < 4 * 0.5, f"compiles run in parallel ({elapsed:.2f}s for 4 x 0.5s)")
+
+    print("Testing matmul specialization:")
+    t = TritonMatmul()
+    small = {"M": 48, "N": 48, "K": 8}
+    check(t.specialize(dict(BLOCK_M=128, BLOCK_N=64, BLOCK_K=64, GROUP_M=8, num_warps=4, num_stages=2), small)
+          == dict(BLOCK_M=64, BLOCK_N=64, BLOCK_K=16, GROUP_M=1, num_warps=4, num_stages=2), "blocks clamp to the padded problem")
+    check(len(MATMUL_SPACE) == 144, f"default search space: {len(MATMUL_SPACE)} configs")
+
+    print("✓ All tests passed!" if all_passed else "✗ Some tests failed!")
+    return all_passed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m gpu_tile.tuner")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_run = sub.add_parser("run", help="Tune the Triton matmul for one problem size")
+    p_run.add_argument("--m", type=int, default=4096)
+    p_run.add_argument("--n", type=int, default=4096)
+    p_run.add_argument("--k", type=int, default=4096)
+    p_run.add_argument("--db", default="tuning.json")
+    p_run.add_argument("--workers", type=int, default=None, help="default: one per CPU")
+    p_run.add_argument("--timeout", type=float, default=120.0, help="seconds per compile")
+    p_run.add_argument("--retry-failed", action="store_true")
+    p_run.add_argument("--fake", action="store_true", help="use the fake compiler (no GPU)")
+
+    sub.add_parser("selfcheck", help="Check the driver with a fake compiler")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "selfcheck":
+        return 0 if selfcheck() else 1
+    target = FakeTarget() if args.fake else TritonMatmul()
+    problem = {"M": args.m, "N": args.n, "K": args.k}
+    report = tune(target, MATMUL_SPACE, problem, TuningDB(args.db), args.workers, args.timeout, args.retry_failed)
+    print(f"{report.compiled} compiled, {report.deduped} deduplicated, {report.skipped} resumed, {report.failed} failed")
+    if report.best:
+        print(f"best: {report.best[1]:.4f} ms  {config_id(report.best[0])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,18 @@ import triton.language as tl
 import triton
 
 
+@triton.jit
+def grouped_pid(pid, grid_m, grid_n, GROUP_M: tl.constexpr):
+    # group programs along M to improve L2 locality: column-major inside bands
+    # of GROUP_M rows, as gpu_tile.group_schedule.group_tiles on the host
+    num_pid_in_group = GROUP_M * grid_n
+    first_pid_m = (pid // num_pid_in_group) * GROUP_M
+    # the last band of rows can be shorter than GROUP_M
+    band = min(grid_m - first_pid_m, GROUP_M)
+    pid_in_group = pid % num_pid_in_group
+    return first_pid_m + pid_in_group % band, pid_in_group // band
+
+
 @triton.jit
 def matmul_kernel(
     a_ptr,
@@ -23,16 +35,7 @@ def matmul_kernel(
     BLOCK_K: tl.constexpr,
     GROUP_M: tl.constexpr,
 ):
-    pid = tl.program_id(0)
-    # group programs along M to improve L2 locality
-    grid_m = tl.cdiv(M, BLOCK_M)
-    grid_n = tl.cdiv(N, BLOCK_N)
-    num_pid_in_group = GROUP_M * grid_n
-    group_id = pid // num_pid_in_group
-    first_pid_m = group_id * GROUP_M
-    pid_in_group = pid % num_pid_in_group
-    pid_m = first_pid_m + (pid_in_group // grid_n)
-    pid_n = pid_in_group % grid_n
+    pid_m, pid_n = grouped_pid(tl.program_id(0), tl.cdiv(M, BLOCK_M), tl.cdiv(N, BLOCK_N), GROUP_M)
 
     offs_m = pid_m * BLOCK_M + tl.arange(0, BLOCK_M)[:, None]
     offs_n = pid_n * BLOCK_N + tl.arange(0, BLOCK_N)[None, :]
@@ -58,17 +61,17 @@ def matmul_kernel(
     )
 
 
-def simple_matmul(A: torch.Tensor, B: torch.Tensor, C: torch.Tensor):
+def simple_matmul(A: torch.Tensor, B: torch.Tensor, C: torch.Tensor,
+                  BLOCK_M=32, BLOCK_N=32, BLOCK_K=32, GROUP_M=4, num_warps=4, num_stages=3, warmup=False):
+    # The block sizes and launch options are what gpu_tile/tuner.py searches over.
     M, K = A.shape
     N = B.shape[1]
-    BLOCK_M = 32
-    BLOCK_N = 32
-    BLOCK_K = 32
-    GROUP_M = 4
     grid_m = triton.cdiv(M, BLOCK_M)
     grid_n = triton.cdiv(N, BLOCK_N)
     grid = (grid_m * grid_n,)
-    matmul_kernel[grid](
+    # warmup compiles (or loads from the Triton cache) without launching
+    launch = matmul_kernel.warmup if warmup else matmul_kernel[grid]
+    return launch(
         A,
         B,
         C,
@@ -85,6 +88,9 @@ def simple_matmul(A: torch.Tensor, B: torch.Tensor, C: torch.Tensor):
         BLOCK_N=BLOCK_N,
         BLOCK_K=BLOCK_K,
         GROUP_M=GROUP_M,
+        num_warps=num_warps,
+        num_stages=num_stages,
+        **({"grid": grid} if warmup else {}),
     )
 
 
@@ -0,0 +1,238 @@
+import functools
+import sys
+from pathlib import Path
+
+import torch
+import triton.language as tl
+
+import triton
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from gpu_tile import _scripts, group_schedule  # noqa: E402
+
+
+@triton.jit
+def grouped_matmul_kernel(
+    groups,  # int64 [G, 9]: a, b, c pointers; M, N, K; lda, ldb, ldc (unit inner stride)
+    tiles,  # int32 [T, 3]: group, tile_m, tile_n
+    num_tiles,
+    DTYPE: tl.constexpr,  # element type of A, B and C
+    NUM_PROGRAMS: tl.constexpr,
+    BLOCK_M: tl.constexpr,
+    BLOCK_N: tl.constexpr,
+    BLOCK_K: tl.constexpr,
+):
+    # Persistent grid: program p runs tiles p, p + NUM_PROGRAMS, ... of the host schedule
+    for t in range(tl.program_id(0), num_tiles, NUM_PROGRAMS):
+        g = tl.load(tiles + t * 3)
+        pid_m = tl.load(tiles + t * 3 + 1)
+        pid_n = tl.load(tiles + t * 3 + 2)
+
+        row = groups + g * 9
+        a_ptr = tl.load(row).to(tl.pointer_type(DTYPE))
+        b_ptr = tl.load(row + 1).to(tl.pointer_type(DTYPE))
+        c_ptr = tl.load(row + 2).to(tl.pointer_type(DTYPE))
+        M = tl.load(row + 3)
+        N = tl.load(row + 4)
+        K = tl.load(row + 5)
+        lda = tl.load(row + 6)
+        ldb = tl.load(row + 7)
+        ldc = tl.load(row + 8)
+
+        offs_m = pid_m * BLOCK_M + tl.arange(0, BLOCK_M)[:, None]
+        offs_n = pid_n * BLOCK_N + tl.arange(0, BLOCK_N)[None, :]
+        offs_k = tl.arange(0, BLOCK_K)
+
+        acc = tl.zeros((BLOCK_M, BLOCK_N), dtype=tl.float32)
+        for k in range(0, K, BLOCK_K):
+            a = tl.load(
+                a_ptr + offs_m * lda + (k + offs_k)[None, :],
+                mask=(offs_m < M) & ((k + offs_k)[None, :] < K),
+                other=0.0,
+            )
+            b = tl.load(
+                b_ptr + (k + offs_k)[:, None] * ldb + offs_n,
+                mask=((k + offs_k)[:, None] < K) & (offs_n < N),
+                other=0.0,
+            )
+            if DTYPE == tl.float32:
+                acc += tl.dot(a, b, input_precision="ieee")
+            else:
+                acc += tl.dot(a, b)
+        tl.store(
+            c_ptr + offs_m * ldc + offs_n,
+            acc.to(DTYPE),
+            mask=(offs_m < M) & (offs_n < N),
+        )
+
+
+BLOCK_M = 32
+BLOCK_N = 32
+BLOCK_K = 32
+GROUP_M = 4
+
+_DTYPES = {torch.float32: tl.float32, torch.float16: tl.float16, torch.bfloat16: tl.bfloat16}
+
+
+def _upload(rows, dtype, device):
+    # One copy from pinned memory, queued on the current stream.
+    host = torch.tensor(rows, dtype=dtype)
+    if device.type == "cuda":
+        host = host.pin_memory()
+    return host.to(device, non_blocking=True)
+
+
+@functools.lru_cache(maxsize=64)
+def _device_schedule(sizes, device, max_programs):
+    # MoE steps repeat the same expert sizes often; reuse the uploaded tile table.
+    schedule = group_schedule.build(sizes, BLOCK_M, BLOCK_N, GROUP_M, max_programs)
+    return schedule, _upload(schedule.flat() or [0, 0, 0], torch.int32, device)
+
+
+def _check_groups(As, Bs, Cs):
+    if not (len(As) == len(Bs) == len(Cs)) or not As:
+        raise ValueError(f"need the same nonzero number of A, B and C matrices, got {len(As)}, {len(Bs)} and {len(Cs)}")
+    dtype, device = As[0].dtype, As[0].device
+    if dtype not in _DTYPES:
+        raise ValueError(f"grouped_matmul supports {[str(d) for d in _DTYPES]}, not {dtype}")
+    for g, (a, b, c) in enumerate(zip(As, Bs, Cs)):
+        for name, x in (("A", a), ("B", b), ("C", c)):
+            if x.dtype != dtype or x.device != device:
+                raise ValueError(f"group {g}: {name} is {x.dtype} on {x.device}, expected {dtype} on {device}")
+            if x.ndim != 2 or (x.stride(1) != 1 and x.shape[1] > 1):
+                raise ValueError(f"group {g}: {name} must be 2-D and row-major with unit inner stride, got strides {tuple(x.stride())}")
+        if a.shape[1] != b.shape[0] or tuple(c.shape) != (a.shape[0], b.shape[1]):
+            raise ValueError(f"group {g}: A {tuple(a.shape)} @ B {tuple(b.shape)} does not give C {tuple(c.shape)}")
+
+
+def grouped_matmul(As, Bs, Cs, max_programs=None):
+    """C[g] = A[g] @ B[g] for every group in one persistent launch.
+
+    A[g] is (M_g, K_g), B[g] is (K_g, N_g), C[g] is (M_g, N_g); all float32,
+    float16 or bfloat16 (one dtype for every group), row-major with unit inner
+    stride. Groups may have M_g == 0. Raises ValueError otherwise.
+    """
+    _check_groups(As, Bs, Cs)
+    device = As[0].device
+    sizes = tuple((a.shape[0], b.shape[1], a.shape[1]) for a, b in zip(As, Bs))
+    if max_programs is None:
+        # One resident program per SM; each loops over its share of the tiles.
+        max_programs = torch.cuda.get_device_properties(device).multi_processor_count
+    schedule, tiles = _device_schedule(sizes, device, max_programs)
+    if schedule.num_tiles == 0:
+        return
+
+    # Pointers, sizes and strides of every group: one host-to-device copy per call.
+    groups = _upload(
+        [
+            (a.data_ptr(), b.data_ptr(), c.data_ptr(), m, n, k, a.stride(0), b.stride(0), c.stride(0))
+            for a, b, c, (m, n, k) in zip(As, Bs, Cs, sizes)
+        ],
+        torch.int64,
+        device,
+    )
+
+    grid = (schedule.programs,)
+    grouped_matmul_kernel[grid](
+        groups,
+        tiles,
+        schedule.num_tiles,
+        DTYPE=_DTYPES[As[0].dtype],
+        NUM_PROGRAMS=schedule.programs,
+        BLOCK_M=BLOCK_M,
+        BLOCK_N=BLOCK_N,
+        BLOCK_K=BLOCK_K,
+    )
+
+
+def _make_groups(ms, N, K, dtype=torch.float32):
+    As = [torch.randn(m, K, dtype=dtype, device="cuda") for m in ms]
+    Bs = [torch.randn(K, N, dtype=dtype, device="cuda") for _ in ms]
+    Cs = [torch.zeros(m, N, dtype=dtype, device="cuda") for m in ms]
+    return As, Bs, Cs
+
+
+def test_grouped_matmul(ms, N, K, dtype=torch.float32):
+    print(f"Testing groups={len(ms)}, M={list(ms)[:8]}{'...' if len(ms) > 8 else ''}, N={N}, K={K}, {dtype}")
+
+    As, Bs, Cs = _make_groups(ms, N, K, dtype)
+    atol = 1e-4 if dtype == torch.float32 else 5e-2 * K**0.5
+
+    grouped_matmul(As, Bs, Cs)
+    torch.cuda.synchronize()
+
+    # Verification
+    is_correct = True
+    for g, (a, b, c) in enumerate(zip(As, Bs, Cs)):
+        expected = (a.float() @ b.float()).to(dtype)
+        if not torch.allclose(c.float(), expected.float(), atol=atol, rtol=1e-2):
+            print(f"  group {g}: Max diff: {(c - expected).abs().max()}")
+            is_correct = False
+    print(f"  Verification: {'Success' if is_correct else 'Failure'}")
+    return is_correct
+
+
+def test_rejects_bad_groups():
+    print("Testing argument checks")
+    As, Bs, Cs = _make_groups([16, 32], 64, 48)
+    bad = {
+        "float64": ([a.double() for a in As], [b.double() for b in Bs], [c.double() for c in Cs]),
+        "mixed dtypes": (As, [Bs[0], Bs[1].half()], Cs),
+        "transposed B": (As, [b.t().contiguous().t() for b in Bs], Cs),
+        "K mismatch": (As, [Bs[0], Bs[1][:40]], Cs),
+        "wrong C shape": (As, Bs, [Cs[0], Cs[1][:, :32]]),
+        "list lengths": (As, Bs, Cs[:1]),
+    }
+    is_correct = True
+    for name, args in bad.items():
+        try:
+            grouped_matmul(*args)
+        except ValueError:
+            continue
+        print(f"  {name}: accepted")
+        is_correct = False
+    print(f"  Verification: {'Success' if is_correct else 'Failure'}")
+    return is_correct
+
+
+def benchmark_grouped_matmul(ms, N, K, iters=100):
+    simple_matmul = _scripts.load("triton/02-tiled-matmul.py").simple_matmul
+
+    print(f"Benchmarking groups={len(ms)}, total M={sum(ms)}, N={N}, K={K}, iters={iters}")
+    As, Bs, Cs = _make_groups(ms, N, K)
+
+    def per_group():
+        for a, b, c in zip(As, Bs, Cs):
+            if a.shape[0]:
+                simple_matmul(a, b, c)
+
+    for name, fn in (("grouped", lambda: grouped_matmul(As, Bs, Cs)), ("per-group", per_group)):
+        for _ in range(10):
+            fn()
+        torch.cuda.synchronize()
+        start_event = torch.cuda.Event(enable_timing=True)
+        end_event = torch.cuda.Event(enable_timing=True)
+        start_event.record()
+        for _ in range(iters):
+            fn()
+        end_event.record()
+        torch.cuda.synchronize()
+        print(f"  {name:10s}: {start_event.elapsed_time(end_event) / iters:.3f} ms")
+
+
+if __name__ == "__main__":
+    # MoE-like routing: per-expert token counts, including idle experts
+    moe_ms = [(37 * i) % 97 for i in range(32)]
+    all_success = True
+    for ms, N, K in (([128], 128, 128), ([1, 17, 64, 200], 96, 80), (moe_ms, 256, 512)):
+        if not test_grouped_matmul(ms, N, K):
+            all_success = False
+    for dtype in (torch.float16, torch.bfloat16):
+        if not test_grouped_matmul([1, 17, 64, 200], 96, 80, dtype):
+            all_success = False
+    if not test_rejects_bad_groups():
+        all_success = False
+    print("\nOverall Status:", "PASS" if all_success else "FAIL")
+
+    if "--benchmark" in sys.argv:
+        benchmark_grouped_matmul(moe_ms, 1024, 512)
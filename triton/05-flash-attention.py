@@ -0,0 +1,272 @@
+import os
+import sys
+from pathlib import Path
+
+import torch
+import triton.language as tl
+
+import triton
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from gpu_tile import _scripts  # noqa: E402
+
+# Fused forward attention, O = softmax(Q K^T * sm_scale) V, FlashAttention
+# style: each program owns BLOCK_M query rows of one (batch, head) and streams
+# K and V through in BLOCK_N blocks, keeping a running row max m_i and row sum
+# l_i (the online softmax). The (L, L) score matrix never leaves registers.
+#
+# Runs under TRITON_INTERPRET=1 on CPU tensors; the autotuner then has a single
+# small config, so nothing is benchmarked.
+
+INTERPRET = os.environ.get("TRITON_INTERPRET") == "1"
+
+grouped_pid = _scripts.load("triton/02-tiled-matmul.py").grouped_pid
+
+
+def _configs():
+    if INTERPRET:
+        return [triton.Config({"BLOCK_M": 16, "BLOCK_N": 16, "GROUP_M": 2}, num_warps=1, num_stages=1)]
+    # BLOCK_M must be a multiple of BLOCK_N: the unmasked key range ends on a
+    # query block boundary.
+    return [
+        triton.Config({"BLOCK_M": bm, "BLOCK_N": bn, "GROUP_M": 4}, num_warps=w, num_stages=s)
+        for bm in (64, 128)
+        for bn in (32, 64)
+        for w in (4, 8)
+        for s in (2, 3)
+    ]
+
+
+@triton.jit
+def _attn_inner(
+    acc, l_i, m_i, q,
+    k_base, v_base, stride_kn, stride_kd, stride_vn, stride_vd,
+    offs_m, offs_n, offs_d, qk_scale, lo, hi, seqlen,
+    CAUSAL: tl.constexpr, MASKED: tl.constexpr, BLOCK_N: tl.constexpr,
+):
+    for start_n in range(lo, hi, BLOCK_N):
+        cols = start_n + offs_n
+        if MASKED:
+            k = tl.load(k_base + cols[None, :] * stride_kn + offs_d[:, None] * stride_kd, mask=cols[None, :] < seqlen, other=0.0)
+            v = tl.load(v_base + cols[:, None] * stride_vn + offs_d[None, :] * stride_vd, mask=cols[:, None] < seqlen, other=0.0)
+        else:
+            k = tl.load(k_base + cols[None, :] * stride_kn + offs_d[:, None] * stride_kd)
+            v = tl.load(v_base + cols[:, None] * stride_vn + offs_d[None, :] * stride_vd)
+
+        qk = tl.dot(q, k) * qk_scale
+        if MASKED:
+            visible = cols[None, :] < seqlen
+            if CAUSAL:
+                visible = visible & (offs_m[:, None] >= cols[None, :])
+            qk = tl.where(visible, qk, float("-inf"))
+
+        # rescale what is accumulated so far to the new row max
+        m_ij = tl.maximum(m_i, tl.max(qk, 1))
+        p = tl.math.exp2(qk - m_ij[:, None])
+        alpha = tl.math.exp2(m_i - m_ij)
+        l_i = l_i * alpha + tl.sum(p, 1)
+        acc = acc * alpha[:, None] + tl.dot(p.to(v.dtype), v)
+        m_i = m_ij
+    return acc, l_i, m_i
+
+
+@triton.autotune(configs=_configs(), key=["N_CTX_Q", "N_CTX_K", "HEAD_DIM", "CAUSAL", "HAS_LENS"])
+@triton.jit
+def attn_fwd_kernel(
+    q_ptr,
+    k_ptr,
+    v_ptr,
+    o_ptr,
+    lens_ptr,  # int32 [Z]: valid keys per batch, read when HAS_LENS
+    sm_scale,
+    Z,
+    H,
+    N_CTX_Q,
+    N_CTX_K,
+    stride_qz, stride_qh, stride_qm, stride_qd,
+    stride_kz, stride_kh, stride_kn, stride_kd,
+    stride_vz, stride_vh, stride_vn, stride_vd,
+    stride_oz, stride_oh, stride_om, stride_od,
+    HEAD_DIM: tl.constexpr,
+    CAUSAL: tl.constexpr,
+    HAS_LENS: tl.constexpr,
+    BLOCK_M: tl.constexpr,
+    BLOCK_N: tl.constexpr,
+    GROUP_M: tl.constexpr,
+):
+    # Rows of the grid are (batch, head) pairs and columns are query blocks.
+    # Every query block of a head reads all of its K and V, so the GROUP_M
+    # bands of matmul_kernel keep GROUP_M heads' K and V hot in L2.
+    grid_n = tl.cdiv(N_CTX_Q, BLOCK_M)
+    pid_zh, pid_n = grouped_pid(tl.program_id(0), Z * H, grid_n, GROUP_M)
+    if CAUSAL:
+        # the last query blocks see the most keys; start them first
+        pid_n = grid_n - 1 - pid_n
+    off_z = pid_zh // H
+    off_h = pid_zh % H
+
+    if HAS_LENS:
+        seqlen = tl.minimum(tl.load(lens_ptr + off_z), N_CTX_K)
+    else:
+        seqlen = N_CTX_K
+
+    offs_m = pid_n * BLOCK_M + tl.arange(0, BLOCK_M)
+    offs_n = tl.arange(0, BLOCK_N)
+    offs_d = tl.arange(0, HEAD_DIM)
+    q_base = q_ptr + off_z * stride_qz + off_h * stride_qh
+    k_base = k_ptr + off_z * stride_kz + off_h * stride_kh
+    v_base = v_ptr + off_z * stride_vz + off_h * stride_vh
+    o_base = o_ptr + off_z * stride_oz + off_h * stride_oh
+
+    q = tl.load(q_base + offs_m[:, None] * stride_qm + offs_d[None, :] * stride_qd, mask=offs_m[:, None] < N_CTX_Q, other=0.0)
+
+    # m_i starts finite, so a row with no visible key in a block gets
+    # exp2(-inf) = 0 instead of nan.
+    m_i = tl.full((BLOCK_M,), -1.0e30, dtype=tl.float32)
+    l_i = tl.zeros((BLOCK_M,), dtype=tl.float32)
+    acc = tl.zeros((BLOCK_M, HEAD_DIM), dtype=tl.float32)
+    qk_scale = sm_scale * 1.4426950408889634  # exp(x) == exp2(x * log2(e))
+
+    # Key blocks below the diagonal and inside seqlen are visible to every row:
+    # they skip the mask. The diagonal block and the ragged tail are masked.
+    full_hi = (seqlen // BLOCK_N) * BLOCK_N
+    hi = seqlen
+    if CAUSAL:
+        full_hi = tl.minimum(full_hi, pid_n * BLOCK_M)
+        hi = tl.minimum(hi, (pid_n + 1) * BLOCK_M)
+    acc, l_i, m_i = _attn_inner(
+        acc, l_i, m_i, q, k_base, v_base, stride_kn, stride_kd, stride_vn, stride_vd,
+        offs_m, offs_n, offs_d, qk_scale, 0, full_hi, seqlen, CAUSAL, False, BLOCK_N,
+    )
+    acc, l_i, m_i = _attn_inner(
+        acc, l_i, m_i, q, k_base, v_base, stride_kn, stride_kd, stride_vn, stride_vd,
+        offs_m, offs_n, offs_d, qk_scale, full_hi, hi, seqlen, CAUSAL, True, BLOCK_N,
+    )
+
+    # rows that see no key at all (seqlen == 0) come out as zeros
+    l_i = tl.where(l_i == 0.0, 1.0, l_i)
+    o = acc / l_i[:, None]
+    tl.store(
+        o_base + offs_m[:, None] * stride_om + offs_d[None, :] * stride_od,
+        o.to(o_ptr.dtype.element_ty),
+        mask=offs_m[:, None] < N_CTX_Q,
+    )
+
+
+def attention(q: torch.Tensor, k: torch.Tensor, v: torch.Tensor, causal=False, lens=None, sm_scale=None, out=None):
+    """softmax(q @ k^T * sm_scale) @ v without materializing the scores.
+
+    q is (B, H, Lq, D), k and v are (B, H, Lk, D), all float16 or all bfloat16;
+    any strides. D is a power of two from 16 to 256. ``causal`` lets query i see
+    keys j <= i (top-left aligned, as ``is_causal`` in torch SDPA). ``lens`` is
+    an int tensor of B valid key lengths; keys past a batch's length are
+    padding. sm_scale defaults to 1 / sqrt(D).
+    """
+    B, H, Lq, D = q.shape
+    Lk = k.shape[2]
+    if q.dtype not in (torch.float16, torch.bfloat16) or k.dtype != q.dtype or v.dtype != q.dtype:
+        raise ValueError(f"q, k and v must all be float16 or all bfloat16, got {q.dtype}, {k.dtype}, {v.dtype}")
+    if k.shape != (B, H, Lk, D) or v.shape != k.shape:
+        raise ValueError(f"expected k and v of shape {(B, H, Lk, D)}, got {tuple(k.shape)} and {tuple(v.shape)}")
+    if D < 16 or D > 256 or D & (D - 1):
+        raise ValueError(f"head dim must be a power of two in [16, 256], not {D}")
+    if lens is not None:
+        lens = lens.to(device=q.device, dtype=torch.int32)
+        if lens.shape != (B,):
+            raise ValueError(f"lens must have shape {(B,)}, got {tuple(lens.shape)}")
+    if sm_scale is None:
+        sm_scale = D**-0.5
+    if out is None:
+        out = torch.empty_like(q)
+
+    def grid(meta):
+        return (B * H * triton.cdiv(Lq, meta["BLOCK_M"]),)
+
+    attn_fwd_kernel[grid](
+        q,
+        k,
+        v,
+        out,
+        q if lens is None else lens,  # placeholder when there is no padding
+        sm_scale,
+        B,
+        H,
+        Lq,
+        Lk,
+        *q.stride(),
+        *k.stride(),
+        *v.stride(),
+        *out.stride(),
+        HEAD_DIM=D,
+        CAUSAL=causal,
+        HAS_LENS=lens is not None,
+    )
+    return out
+
+
+def reference(q, k, v, causal=False, lens=None, sm_scale=None):
+    """float32 attention with the same masks, through the full (Lq, Lk) scores."""
+    Lq, Lk, D = q.shape[2], k.shape[2], q.shape[3]
+    scores = q.float() @ k.float().transpose(-1, -2) * (D**-0.5 if sm_scale is None else sm_scale)
+    visible = torch.ones(Lq, Lk, dtype=torch.bool, device=q.device)
+    if causal:
+        visible = visible.tril()
+    if lens is not None:
+        visible = visible & (torch.arange(Lk, device=q.device) < lens.to(q.device)[:, None, None, None])
+    p = torch.softmax(scores.masked_fill(~visible, float("-inf")), dim=-1).nan_to_num(0.0)
+    return p @ v.float()
+
+
+def test_attention(B, H, Lq, Lk, D, causal, padded, dtype, device):
+    label = f"B={B}, H={H}, Lq={Lq}, Lk={Lk}, D={D}, {str(dtype).removeprefix('torch.')}"
+    label += ", causal" * causal + ", padded" * padded
+    torch.manual_seed(0)
+    q = torch.randn(B, H, Lq, D, dtype=dtype, device=device)
+    k = torch.randn(B, H, Lk, D, dtype=dtype, device=device)
+    v = torch.randn(B, H, Lk, D, dtype=dtype, device=device)
+    lens = torch.randint(1, Lk + 1, (B,), dtype=torch.int32, device=device) if padded else None
+
+    out = attention(q, k, v, causal=causal, lens=lens)
+    expected = reference(q, k, v, causal=causal, lens=lens)
+
+    # Tolerance: one rounding of O to the input dtype, plus P rounded before P @ V.
+    atol = 2e-2 if dtype == torch.float16 else 6e-2
+    diff = (out.float() - expected).abs().max().item()
+    if diff <= atol:
+        print(f"  ✓ {label}")
+        return True
+    print(f"  ✗ {label} - Max diff: {diff}")
+    return False
+
+
+if __name__ == "__main__":
+    if INTERPRET:
+        device = "cpu"
+        test_configs = [
+            # (B, H, Lq, Lk, D, causal, padded)
+            (1, 2, 16, 16, 16, False, False),
+            (2, 3, 40, 40, 16, True, False),
+            (2, 1, 37, 53, 32, False, True),
+            (3, 2, 48, 48, 32, True, True),
+            (1, 1, 5, 70, 16, False, False),
+        ]
+    else:
+        device = "cuda"
+        test_configs = [
+            (4, 16, 1024, 1024, 64, False, False),
+            (4, 16, 1024, 1024, 64, True, False),
+            (2, 8, 2048, 2048, 128, True, True),
+            (3, 5, 1000, 777, 64, False, True),
+            (1, 4, 1, 4096, 128, False, False),  # one decode step
+        ]
+
+    print(f"Testing fused attention{' (TRITON_INTERPRET=1)' if INTERPRET else ''}:")
+    all_passed = True
+    for dtype in (torch.float16, torch.bfloat16):
+        for config in test_configs:
+            all_passed = test_attention(*config, dtype, device) and all_passed
+
+    if all_passed:
+        print("✓ All tests passed!")
+    else:
+        print("✗ Some tests failed!")